@@ -18,6 +18,7 @@ from collections import defaultdict
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta, time as dtime
 from decimal import Decimal, ROUND_HALF_UP
+import logging
 import math
 import os
 import sys
@@ -53,10 +54,25 @@ from src.domain.entities.trade import Order
 from src.domain.enums.trading_enums import TimeFrame, OrderSide, OrderType, TradeSignal
 from src.infrastructure.adapters.mt5_adapter import MT5Adapter, Candle, TickData
 from src.infrastructure.database.schema import create_database, get_session
+from src.application.services.cycle_profiler import (
+    CycleProfiler,
+    create_cycle_metrics_table,
+    persist_cycle_metrics,
+)
+from src.infrastructure.database.persistence_worker import (
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    PersistenceWorker,
+)
+from src.application.services.multi_timeframe_bars import MultiTimeframeBarService
+from src.application.services.smc_stream import StreamingSMCDetector
+from src.application.services.price_level_index import PriceLevelIndex
 from src.application.services.macro_score.engine import (
     MacroScoreEngine,
     MacroScoreResult,
     ItemScoreResult,
+    lazy_text,
+    raw_text,
 )
 from src.domain.enums.macro_score_enums import MacroSignal
 from src.application.services.head_directives import (
@@ -70,6 +86,8 @@ from src.application.services.diary_feedback import (
     load_latest_feedback,
 )
 
+logger = logging.getLogger(__name__)
+
 # ────────────────────────────────────────────────────────────────
 # Constantes
 # ────────────────────────────────────────────────────────────────
@@ -138,9 +156,10 @@ TREND_MAX_DISTANCE_PCT = Decimal("0.35")
 # ────────────────────────────────────────────────────────────────
 
 
-@dataclass
+@lazy_text("reason")
+@dataclass(slots=True)
 class MacroItem:
-    """Item individual do score macro."""
+    """Item individual do score macro (``reason`` montado na primeira leitura)."""
 
     number: int
     symbol: str
@@ -248,7 +267,7 @@ class MomentumData:
     ema9_score: int = 0
 
 
-@dataclass
+@dataclass(slots=True)
 class RegionOfInterest:
     """Região de interesse para operação."""
 
@@ -261,7 +280,7 @@ class RegionOfInterest:
     volume_strength: int = 0  # 0=sem info, 1=normal, 2=acima média, 3=explosão
 
 
-@dataclass
+@dataclass(slots=True)
 class Opportunity:
     """Oportunidade de operação identificada."""
 
@@ -297,6 +316,8 @@ class CycleResult:
     smc_multi_tf: SMCMultiTF = field(default_factory=SMCMultiTF)
     momentum: MomentumData = field(default_factory=MomentumData)
     regions: list = field(default_factory=list)
+    # Índice ordenado de ``regions`` (consultas por faixa/lado do preço)
+    region_index: Optional[PriceLevelIndex] = field(default=None, repr=False)
     opportunities: list = field(default_factory=list)
     # Volume
     volume_score: int = 0
@@ -305,6 +326,8 @@ class CycleResult:
     candle_pattern_score: int = 0
     aggression_score: int = 0
     aggression_ratio: Decimal = Decimal("0.50")
+    # Candles M1 do ciclo — avaliação de rewards sem nova ida ao broker
+    candles_m1: list = field(default_factory=list, repr=False)
 
 
 # ────────────────────────────────────────────────────────────────
@@ -665,19 +688,78 @@ def _detect_smc_for_timeframe(candles: list[Candle], tf_label: str) -> SMCTimefr
       - Swing points, FVG, equilibrium
       - Score consolidado
     """
-    data = SMCTimeframeData(timeframe=tf_label)
-
     if len(candles) < 20:
-        return data
+        return SMCTimeframeData(timeframe=tf_label)
 
     highs = [c.high.value for c in candles]
     lows = [c.low.value for c in candles]
     closes = [c.close.value for c in candles]
     opens = [c.open.value for c in candles]
-    volumes = [c.volume for c in candles]
 
     swing_highs, swing_lows = _detect_swing_points(highs, lows, lookback=3)
 
+    if not swing_highs or not swing_lows:
+        return SMCTimeframeData(timeframe=tf_label)
+
+    # ── Order Blocks → Zonas de Compra / Venda ──
+    scan_range = min(30, len(candles) - 2)
+
+    # OB de alta (demand zone) → buy_zone
+    buy_zone = None
+    for i in range(len(candles) - 2, max(len(candles) - scan_range - 2, 0), -1):
+        if opens[i] > closes[i]:  # candle bearish
+            rally_count = sum(
+                1 for j in range(i + 1, min(i + 4, len(candles)))
+                if closes[j] > closes[j - 1]
+            )
+            if rally_count >= 2:
+                buy_zone = lows[i]
+                break
+
+    # OB de baixa (supply zone) → sell_zone
+    sell_zone = None
+    for i in range(len(candles) - 2, max(len(candles) - scan_range - 2, 0), -1):
+        if closes[i] > opens[i]:  # candle bullish
+            drop_count = sum(
+                1 for j in range(i + 1, min(i + 4, len(candles)))
+                if closes[j] < closes[j - 1]
+            )
+            if drop_count >= 2:
+                sell_zone = highs[i]
+                break
+
+    # ── FVG ──
+    fvg = None
+    for i in range(len(candles) - 3, max(len(candles) - 20, 0), -1):
+        if i < 0:
+            break
+        if lows[i + 2] > highs[i]:
+            fvg = ("FVG_ALTA", (lows[i + 2] + highs[i]) / Decimal("2"))
+            break
+        if highs[i + 2] < lows[i]:
+            fvg = ("FVG_BAIXA", (highs[i + 2] + lows[i]) / Decimal("2"))
+            break
+
+    return _build_smc_timeframe(
+        tf_label, swing_highs, swing_lows, closes[-1], buy_zone, sell_zone, fvg,
+    )
+
+
+def _build_smc_timeframe(
+    tf_label: str,
+    swing_highs: list[tuple[int, Decimal]],
+    swing_lows: list[tuple[int, Decimal]],
+    current_close: Decimal,
+    buy_zone: Optional[Decimal],
+    sell_zone: Optional[Decimal],
+    fvg: Optional[tuple[str, Decimal]],
+) -> SMCTimeframeData:
+    """Monta o SMCTimeframeData a partir de swings, OBs e FVG já detectados.
+
+    Compartilhado pela varredura em lote e pelo detector incremental.
+    """
+    data = SMCTimeframeData(timeframe=tf_label)
+
     if not swing_highs or not swing_lows:
         return data
 
@@ -712,7 +794,6 @@ def _detect_smc_for_timeframe(candles: list[Candle], tf_label: str) -> SMCTimefr
         data.score = 0
 
     # ── BOS / CHoCH ──
-    current_close = closes[-1]
     if len(swing_highs) >= 2 and len(swing_lows) >= 2:
         last_sh = swing_highs[-1]
         prev_sh = swing_highs[-2]
@@ -752,44 +833,13 @@ def _detect_smc_for_timeframe(candles: list[Candle], tf_label: str) -> SMCTimefr
         else:
             data.equilibrium = "NEUTRO"
 
-    # ── Order Blocks → Zonas de Compra / Venda ──
-    avg_vol = sum(volumes[-50:]) / max(len(volumes[-50:]), 1) if len(volumes) >= 10 else 1
-    scan_range = min(30, len(candles) - 2)
-
-    # OB de alta (demand zone) → buy_zone
-    for i in range(len(candles) - 2, max(len(candles) - scan_range - 2, 0), -1):
-        if opens[i] > closes[i]:  # candle bearish
-            rally_count = sum(
-                1 for j in range(i + 1, min(i + 4, len(candles)))
-                if closes[j] > closes[j - 1]
-            )
-            if rally_count >= 2:
-                data.buy_zone = lows[i]
-                break
-
-    # OB de baixa (supply zone) → sell_zone
-    for i in range(len(candles) - 2, max(len(candles) - scan_range - 2, 0), -1):
-        if closes[i] > opens[i]:  # candle bullish
-            drop_count = sum(
-                1 for j in range(i + 1, min(i + 4, len(candles)))
-                if closes[j] < closes[j - 1]
-            )
-            if drop_count >= 2:
-                data.sell_zone = highs[i]
-                break
-
-    # ── FVG ──
-    for i in range(len(candles) - 3, max(len(candles) - 20, 0), -1):
-        if i < 0:
-            break
-        if lows[i + 2] > highs[i]:
-            data.fvg_price = (lows[i + 2] + highs[i]) / Decimal("2")
-            data.fvg_type = "FVG_ALTA"
-            break
-        if highs[i + 2] < lows[i]:
-            data.fvg_price = (highs[i + 2] + lows[i]) / Decimal("2")
-            data.fvg_type = "FVG_BAIXA"
-            break
+    # ── Zonas de compra/venda (Order Blocks) e FVG ──
+    if buy_zone is not None:
+        data.buy_zone = buy_zone
+    if sell_zone is not None:
+        data.sell_zone = sell_zone
+    if fvg is not None:
+        data.fvg_type, data.fvg_price = fvg
 
     return data
 
@@ -798,13 +848,23 @@ def _calc_smc_multi_tf(
     candles_h4: list[Candle],
     candles_m15: list[Candle],
     candles_m5: list[Candle],
+    smc_streams: Optional[dict[str, StreamingSMCDetector]] = None,
 ) -> SMCMultiTF:
-    """Calcula SMC para H4, M15 e M5 e consolida alinhamento."""
+    """Calcula SMC para H4, M15 e M5 e consolida alinhamento.
+
+    Com ``smc_streams`` (detectores já sincronizados com as mesmas barras)
+    usa o estado incremental em vez de reexaminar as janelas.
+    """
     multi = SMCMultiTF()
 
-    multi.h4 = _detect_smc_for_timeframe(candles_h4, "H4")
-    multi.m15 = _detect_smc_for_timeframe(candles_m15, "M15")
-    multi.m5 = _detect_smc_for_timeframe(candles_m5, "M5")
+    if smc_streams:
+        multi.h4 = _stream_smc_timeframe(smc_streams["H4"], "H4")
+        multi.m15 = _stream_smc_timeframe(smc_streams["M15"], "M15")
+        multi.m5 = _stream_smc_timeframe(smc_streams["M5"], "M5")
+    else:
+        multi.h4 = _detect_smc_for_timeframe(candles_h4, "H4")
+        multi.m15 = _detect_smc_for_timeframe(candles_m15, "M15")
+        multi.m5 = _detect_smc_for_timeframe(candles_m5, "M5")
 
     # ── Alinhamento multi-TF ──
     biases = [multi.h4.bias, multi.m15.bias, multi.m5.bias]
@@ -851,7 +911,7 @@ def _detect_swing_with_volume(
 
     avg_vol = sum(volumes[-50:]) / max(len(volumes[-50:]), 1) if len(volumes) >= 10 else 1
 
-    regions: list[RegionOfInterest] = []
+    swings: list[tuple[str, Decimal, int]] = []
 
     for i in range(lookback, len(highs) - lookback):
         # --- Swing High ---
@@ -860,21 +920,7 @@ def _detect_swing_with_volume(
             highs[i] >= highs[i + j] for j in range(1, min(lookback + 1, len(highs) - i))
         )
         if is_sh:
-            vol_ratio = volumes[i] / avg_vol if avg_vol > 0 else 0
-            vs = 0
-            if vol_ratio >= 2.0:
-                vs = 3
-            elif vol_ratio >= 1.2:
-                vs = 2
-            elif vol_ratio > 0:
-                vs = 1
-            regions.append(RegionOfInterest(
-                price=highs[i],
-                label=f"Topo {tf_label}",
-                tipo="RESISTENCIA",
-                source_tf=tf_label,
-                volume_strength=vs,
-            ))
+            swings.append(("H", highs[i], volumes[i]))
 
         # --- Swing Low ---
         is_sl = all(lows[i] <= lows[i - j] for j in range(1, lookback + 1))
@@ -882,16 +928,40 @@ def _detect_swing_with_volume(
             lows[i] <= lows[i + j] for j in range(1, min(lookback + 1, len(lows) - i))
         )
         if is_sl:
-            vol_ratio = volumes[i] / avg_vol if avg_vol > 0 else 0
-            vs = 0
-            if vol_ratio >= 2.0:
-                vs = 3
-            elif vol_ratio >= 1.2:
-                vs = 2
-            elif vol_ratio > 0:
-                vs = 1
+            swings.append(("L", lows[i], volumes[i]))
+
+    return _build_swing_regions(swings, avg_vol, tf_label)
+
+
+def _build_swing_regions(
+    swings: list[tuple[str, Decimal, int]], avg_vol: float, tf_label: str,
+) -> list[RegionOfInterest]:
+    """Converte topos/fundos (tipo H/L, preço, volume) em regiões por volume.
+
+    Compartilhado pela varredura em lote e pelo detector incremental.
+    """
+    regions: list[RegionOfInterest] = []
+
+    for kind, price, volume in swings:
+        vol_ratio = volume / avg_vol if avg_vol > 0 else 0
+        vs = 0
+        if vol_ratio >= 2.0:
+            vs = 3
+        elif vol_ratio >= 1.2:
+            vs = 2
+        elif vol_ratio > 0:
+            vs = 1
+        if kind == "H":
             regions.append(RegionOfInterest(
-                price=lows[i],
+                price=price,
+                label=f"Topo {tf_label}",
+                tipo="RESISTENCIA",
+                source_tf=tf_label,
+                volume_strength=vs,
+            ))
+        else:
+            regions.append(RegionOfInterest(
+                price=price,
                 label=f"Fundo {tf_label}",
                 tipo="SUPORTE",
                 source_tf=tf_label,
@@ -915,7 +985,6 @@ def _detect_smc_regions(
     if len(candles) < 20:
         return []
 
-    regions: list[RegionOfInterest] = []
     highs = [c.high.value for c in candles]
     lows = [c.low.value for c in candles]
     closes = [c.close.value for c in candles]
@@ -927,78 +996,166 @@ def _detect_smc_regions(
     # Busca nos últimos 30 candles o último candle bearish antes de rally (OB de alta)
     # e último candle bullish antes de queda (OB de baixa)
     scan_range = min(30, len(candles) - 2)
+    bull_ob = None
     for i in range(len(candles) - 2, max(len(candles) - scan_range - 2, 0), -1):
         # OB de alta: candle bearish seguido por forte alta (3+ candles acima)
         if opens[i] > closes[i]:  # candle vermelho
             rally_count = sum(1 for j in range(i + 1, min(i + 4, len(candles))) if closes[j] > closes[j - 1])
             if rally_count >= 2:
-                vol_ratio = volumes[i] / avg_vol if avg_vol > 0 else 0
-                vs = 3 if vol_ratio >= 2.0 else (2 if vol_ratio >= 1.2 else 1)
-                regions.append(RegionOfInterest(
-                    price=lows[i],  # base do OB
-                    label=f"OB Alta {tf_label}",
-                    tipo="SUPORTE",
-                    source_tf=tf_label,
-                    volume_strength=vs,
-                    confluences=2,  # OB tem confluência inerente
-                ))
+                bull_ob = (lows[i], volumes[i])  # base do OB
                 break  # só o mais recente
 
+    bear_ob = None
     for i in range(len(candles) - 2, max(len(candles) - scan_range - 2, 0), -1):
         # OB de baixa: candle bullish seguido por forte queda
         if closes[i] > opens[i]:  # candle verde
             drop_count = sum(1 for j in range(i + 1, min(i + 4, len(candles))) if closes[j] < closes[j - 1])
             if drop_count >= 2:
-                vol_ratio = volumes[i] / avg_vol if avg_vol > 0 else 0
-                vs = 3 if vol_ratio >= 2.0 else (2 if vol_ratio >= 1.2 else 1)
-                regions.append(RegionOfInterest(
-                    price=highs[i],  # topo do OB
-                    label=f"OB Baixa {tf_label}",
-                    tipo="RESISTENCIA",
-                    source_tf=tf_label,
-                    volume_strength=vs,
-                    confluences=2,
-                ))
+                bear_ob = (highs[i], volumes[i])  # topo do OB
                 break
 
     # --- FVGs (Fair Value Gaps) ---
+    fvg_bull = None
     for i in range(len(candles) - 3, max(len(candles) - 20, 0), -1):
         if i < 0:
             break
         # FVG de alta: low[i+2] > high[i]
         if lows[i + 2] > highs[i]:
-            mid_fvg = (lows[i + 2] + highs[i]) / Decimal("2")
-            regions.append(RegionOfInterest(
-                price=mid_fvg,
-                label=f"FVG Alta {tf_label}",
-                tipo="SUPORTE",
-                source_tf=tf_label,
-                volume_strength=1,
-            ))
+            fvg_bull = (lows[i + 2] + highs[i]) / Decimal("2")
             break  # só o mais recente
 
+    fvg_bear = None
     for i in range(len(candles) - 3, max(len(candles) - 20, 0), -1):
         if i < 0:
             break
         # FVG de baixa: high[i+2] < low[i]
         if highs[i + 2] < lows[i]:
-            mid_fvg = (highs[i + 2] + lows[i]) / Decimal("2")
-            regions.append(RegionOfInterest(
-                price=mid_fvg,
-                label=f"FVG Baixa {tf_label}",
-                tipo="RESISTENCIA",
-                source_tf=tf_label,
-                volume_strength=1,
-            ))
+            fvg_bear = (highs[i + 2] + lows[i]) / Decimal("2")
             break
 
-    return regions
+    return _build_smc_regions(bull_ob, bear_ob, fvg_bull, fvg_bear, avg_vol, tf_label)
 
 
-def _get_day_reference_prices(
-    mt5: MT5Adapter, symbol_code: str,
+def _build_smc_regions(
+    bull_ob: Optional[tuple[Decimal, int]],
+    bear_ob: Optional[tuple[Decimal, int]],
+    fvg_bull: Optional[Decimal],
+    fvg_bear: Optional[Decimal],
+    avg_vol: float,
+    tf_label: str,
 ) -> list[RegionOfInterest]:
-    """Busca preços de referência: Ajuste, Abertura, Fechamento, Máx/Mín D0 e D-1.
+    """Converte OBs (preço, volume) e meios de FVG em RegionOfInterest.
+
+    Compartilhado pela varredura em lote e pelo detector incremental.
+    """
+    regions: list[RegionOfInterest] = []
+
+    if bull_ob is not None:
+        price, volume = bull_ob
+        vol_ratio = volume / avg_vol if avg_vol > 0 else 0
+        vs = 3 if vol_ratio >= 2.0 else (2 if vol_ratio >= 1.2 else 1)
+        regions.append(RegionOfInterest(
+            price=price,
+            label=f"OB Alta {tf_label}",
+            tipo="SUPORTE",
+            source_tf=tf_label,
+            volume_strength=vs,
+            confluences=2,  # OB tem confluência inerente
+        ))
+
+    if bear_ob is not None:
+        price, volume = bear_ob
+        vol_ratio = volume / avg_vol if avg_vol > 0 else 0
+        vs = 3 if vol_ratio >= 2.0 else (2 if vol_ratio >= 1.2 else 1)
+        regions.append(RegionOfInterest(
+            price=price,
+            label=f"OB Baixa {tf_label}",
+            tipo="RESISTENCIA",
+            source_tf=tf_label,
+            volume_strength=vs,
+            confluences=2,
+        ))
+
+    if fvg_bull is not None:
+        regions.append(RegionOfInterest(
+            price=fvg_bull,
+            label=f"FVG Alta {tf_label}",
+            tipo="SUPORTE",
+            source_tf=tf_label,
+            volume_strength=1,
+        ))
+
+    if fvg_bear is not None:
+        regions.append(RegionOfInterest(
+            price=fvg_bear,
+            label=f"FVG Baixa {tf_label}",
+            tipo="RESISTENCIA",
+            source_tf=tf_label,
+            volume_strength=1,
+        ))
+
+    return regions
+
+
+# ────────────────────────────────────────────────────────────────
+# SMC incremental — mesmas regras, estado mantido entre ciclos
+# ────────────────────────────────────────────────────────────────
+
+SMC_STREAM_LOOKBACK = 3
+
+# Um detector por timeframe, alimentado pelas barras do _bar_service
+_smc_streams: dict[str, StreamingSMCDetector] = {
+    tf: StreamingSMCDetector(lookback=SMC_STREAM_LOOKBACK)
+    for tf in ("M1", "M5", "M15", "H4")
+}
+
+
+def _sync_smc_streams(
+    bars_by_tf: dict[str, list[Candle]], reset: bool = False,
+) -> dict[str, StreamingSMCDetector]:
+    """Atualiza os detectores com as barras do ciclo (reset após backfill)."""
+    for tf, candles in bars_by_tf.items():
+        detector = _smc_streams[tf]
+        if reset:
+            detector.reset()
+        detector.sync(candles)
+    return _smc_streams
+
+
+def _stream_swing_regions(detector: StreamingSMCDetector, tf_label: str) -> list[RegionOfInterest]:
+    """Equivalente incremental de _detect_swing_with_volume."""
+    st = detector.state
+    if st.bars < detector.lookback * 2 + 5:
+        return []
+    swings = [(p.kind, p.price, p.volume) for p in st.swings]
+    return _build_swing_regions(swings, st.avg_volume, tf_label)
+
+
+def _stream_smc_regions(detector: StreamingSMCDetector, tf_label: str) -> list[RegionOfInterest]:
+    """Equivalente incremental de _detect_smc_regions."""
+    st = detector.state
+    if st.bars < 20:
+        return []
+    return _build_smc_regions(
+        st.bull_ob, st.bear_ob, st.fvg_bull, st.fvg_bear, st.avg_volume, tf_label,
+    )
+
+
+def _stream_smc_timeframe(detector: StreamingSMCDetector, tf_label: str) -> SMCTimeframeData:
+    """Equivalente incremental de _detect_smc_for_timeframe."""
+    st = detector.state
+    if st.bars < 20:
+        return SMCTimeframeData(timeframe=tf_label)
+    return _build_smc_timeframe(
+        tf_label, list(st.swing_highs), list(st.swing_lows), st.close,
+        st.bull_ob[0] if st.bull_ob else None,
+        st.bear_ob[0] if st.bear_ob else None,
+        st.fvg_last,
+    )
+
+
+def _day_reference_regions(candles_d1: list[Candle]) -> list[RegionOfInterest]:
+    """Preços de referência: Ajuste, Abertura, Fechamento, Máx/Mín D0 e D-1.
 
     Regiões retornadas:
       - Ajuste D-1 (= Close D-1 para futuros B3)
@@ -1010,9 +1167,6 @@ def _get_day_reference_prices(
     """
     regions: list[RegionOfInterest] = []
 
-    # D1 últimos 2 candles
-    candles_d1 = _safe_get_candles(mt5, symbol_code, TimeFrame.D1, 2)
-
     if len(candles_d1) >= 2:
         prev = candles_d1[-2]
         curr = candles_d1[-1]
@@ -1071,6 +1225,10 @@ def _get_day_reference_prices(
     return regions
 
 
+# Fusão de regiões: níveis a menos de 0.10% do líder do grupo
+REGION_MERGE_REL_TOL = Decimal("0.001")
+
+
 def _map_regions_multi_tf(
     price: Decimal,
     vwap: VWAPData,
@@ -1080,6 +1238,7 @@ def _map_regions_multi_tf(
     candles_m5: list[Candle],
     candles_m15: list[Candle],
     day_refs: list[RegionOfInterest],
+    smc_streams: Optional[dict[str, StreamingSMCDetector]] = None,
 ) -> list[RegionOfInterest]:
     """Mapeia regiões de interesse de M1, M5, M15 com confluência dinâmica.
 
@@ -1130,18 +1289,29 @@ def _map_regions_multi_tf(
         ))
 
     # ── 5. SMC regions (OB + FVG) em M5 e M15 ──
+    # ── 6. Topos/fundos com volume — M1, M5, M15 ──
+    # Com smc_streams o estado vem dos detectores incrementais (mesmas regras)
+    def _smc_regions(candles: list[Candle], tf: str) -> list[RegionOfInterest]:
+        if smc_streams:
+            return _stream_smc_regions(smc_streams[tf], tf)
+        return _detect_smc_regions(candles, tf)
+
+    def _swing_regions(candles: list[Candle], tf: str) -> list[RegionOfInterest]:
+        if smc_streams:
+            return _stream_swing_regions(smc_streams[tf], tf)
+        return _detect_swing_with_volume(candles, lookback=3, tf_label=tf)
+
     if candles_m15:
-        regions.extend(_detect_smc_regions(candles_m15, "M15"))
+        regions.extend(_smc_regions(candles_m15, "M15"))
     if candles_m5:
-        regions.extend(_detect_smc_regions(candles_m5, "M5"))
+        regions.extend(_smc_regions(candles_m5, "M5"))
 
-    # ── 6. Topos/fundos com volume — M1, M5, M15 ──
     if candles_m1:
-        regions.extend(_detect_swing_with_volume(candles_m1, lookback=3, tf_label="M1"))
+        regions.extend(_swing_regions(candles_m1, "M1"))
     if candles_m5:
-        regions.extend(_detect_swing_with_volume(candles_m5, lookback=3, tf_label="M5"))
+        regions.extend(_swing_regions(candles_m5, "M5"))
     if candles_m15:
-        regions.extend(_detect_swing_with_volume(candles_m15, lookback=3, tf_label="M15"))
+        regions.extend(_swing_regions(candles_m15, "M15"))
 
     # ── Arredondar ao tick ──
     for r in regions:
@@ -1149,23 +1319,15 @@ def _map_regions_multi_tf(
             r.price = _snap(r.price)
 
     # ── Deduplicação e fusão de confluências ──
-    # Regiões dentro de 0.10% do mesmo preço → fundir
+    # Regiões dentro de 0.10% do mesmo preço → fundir (~130 pontos WIN).
+    # Índice ordenado por tick: cada grupo é uma busca por faixa, não uma
+    # varredura de todas as regiões restantes.
     merged: list[RegionOfInterest] = []
-    used = [False] * len(regions)
-
-    for i, r in enumerate(regions):
-        if used[i] or r.price <= 0:
-            continue
-        group = [r]
-        used[i] = True
-        for j in range(i + 1, len(regions)):
-            if used[j] or regions[j].price <= 0:
-                continue
-            dist = abs(regions[j].price - r.price) / r.price * 100
-            if dist < Decimal("0.10"):  # ~130 pontos WIN
-                group.append(regions[j])
-                used[j] = True
+    index = PriceLevelIndex.from_items(
+        (r for r in regions if r.price > 0), key=lambda r: r.price,
+    )
 
+    for group in index.cluster(REGION_MERGE_REL_TOL):
         # Fundir grupo: manter label da região mais "forte"
         best = max(group, key=lambda x: (x.confluences, x.volume_strength))
         total_conf = sum(g.confluences for g in group)
@@ -1344,8 +1506,15 @@ def _calc_vwap_score(price: Decimal, vwap: VWAPData) -> int:
     return 0
 
 
-def _detect_candle_patterns(candles: list[Candle], regions: list[RegionOfInterest]) -> int:
-    """Detecta padrões de candle em regiões de interesse. Retorna score."""
+def _detect_candle_patterns(
+    candles: list[Candle],
+    regions: list[RegionOfInterest],
+    index: Optional[PriceLevelIndex] = None,
+) -> int:
+    """Detecta padrões de candle em regiões de interesse. Retorna score.
+
+    ``index`` (opcional) é o índice de ``regions`` já montado no ciclo.
+    """
     if len(candles) < 3:
         return 0
     c = candles[-1]  # Último candle
@@ -1355,16 +1524,16 @@ def _detect_candle_patterns(candles: list[Candle], regions: list[RegionOfInteres
     total_range = c.high.value - c.low.value
     if total_range == 0:
         return 0
-    # Verifica se está próximo a uma região de interesse
+    # Verifica se está próximo a uma região de interesse (< 0.3%)
     near_support = False
     near_resistance = False
-    for r in regions:
-        dist_pct = abs(current_price - r.price) / current_price * 100
-        if dist_pct < Decimal("0.3"):
-            if r.tipo in ("SUPORTE", "VWAP"):
-                near_support = True
-            elif r.tipo in ("RESISTENCIA",):
-                near_resistance = True
+    if index is None:
+        index = PriceLevelIndex.from_items(regions, key=lambda r: r.price)
+    for r in index.within(current_price, current_price * Decimal("0.003")):
+        if r.tipo in ("SUPORTE", "VWAP"):
+            near_support = True
+        elif r.tipo in ("RESISTENCIA",):
+            near_resistance = True
     # Engolfo de alta em suporte
     prev_body = abs(p.close.value - p.open.value)
     if near_support and c.close.value > c.open.value and p.close.value < p.open.value:
@@ -1429,17 +1598,17 @@ def _map_regions(
                 Decimal("1"), rounding=ROUND_HALF_UP
             ) * tick
     # Calcular confluências e distância
+    index = PriceLevelIndex.from_items(
+        (r for r in regions if r.price > 0), key=lambda r: r.price,
+    )
     for region in regions:
         if price > 0:
             region.distance_pct = ((price - region.price) / price * 100).quantize(Decimal("0.01"))
-        # Conta confluências (outras regiões próximas)
-        for other in regions:
-            if other is region:
-                continue
-            if other.price > 0 and region.price > 0:
-                dist = abs(other.price - region.price) / region.price * 100
-                if dist < Decimal("0.15"):  # ~200 pontos WIN
-                    region.confluences += 1
+        # Conta confluências (outras regiões a < 0.15% ≈ 200 pontos WIN)
+        if region.price > 0:
+            region.confluences += index.count_within(
+                region.price, region.price * Decimal("0.0015"),
+            ) - 1
     # Ordena por distância ao preço atual
     regions.sort(key=lambda r: abs(r.distance_pct))
     return regions
@@ -1496,6 +1665,16 @@ def _generate_opportunities(
     # Região de suporte mais próxima
     supports = [r for r in result.regions if r.tipo == "SUPORTE" and r.distance_pct < Decimal("0")]
     resistances = [r for r in result.regions if r.tipo == "RESISTENCIA" and r.distance_pct > Decimal("0")]
+    # Regiões até TREND_MAX_DISTANCE_PCT do preço, por busca no índice
+    # (+0.005% cobre o arredondamento de distance_pct a 2 casas)
+    region_index = result.region_index or PriceLevelIndex.from_items(
+        result.regions, key=lambda r: r.price,
+    )
+    near_regions = region_index.within(
+        price, price * (TREND_MAX_DISTANCE_PCT + Decimal("0.005")) / 100, inclusive=True,
+    )
+    near_supports = [r for r in near_regions if r.tipo == "SUPORTE" and r.distance_pct < Decimal("0")]
+    near_resistances = [r for r in near_regions if r.tipo == "RESISTENCIA" and r.distance_pct > Decimal("0")]
     # Confiança macro em percentual (0-100)
     macro_conf_pct = result.macro_confidence * Decimal("100")
     # Tick size do WIN = 5 pts
@@ -1975,7 +2154,7 @@ def _generate_opportunities(
     if (trend_strong and result.macro_score >= 5 and result.micro_score < 0
             and result.smc.equilibrium == "PREMIUM"
             and not guardian_kill):
-        if not _has_min_confluence(supports):
+        if not _has_min_confluence(near_supports):
             result._rejection_reasons.append(
                 "TREND_FOLLOW BUY: sem confluência mínima de suporte próximo"
             )
@@ -2049,7 +2228,7 @@ def _generate_opportunities(
     if (trend_strong and result.macro_score <= -5 and result.micro_score > 0
             and result.smc.equilibrium == "DISCOUNT"
             and not guardian_kill):
-        if not _has_min_confluence(resistances):
+        if not _has_min_confluence(near_resistances):
             result._rejection_reasons.append(
                 "TREND_FOLLOW SELL: sem confluência mínima de resistência próxima"
             )
@@ -2667,17 +2846,13 @@ def _safe_get_candles(
         return []
 
 
-def _get_daily_open(mt5: MT5Adapter, symbol_code: str) -> Decimal:
-    """Retorna o preço de abertura do dia (D1)."""
-    candles = _safe_get_candles(mt5, symbol_code, TimeFrame.D1, 1)
-    if candles:
-        return candles[-1].open.value
-    return Decimal("0")
-
-
 def _get_prev_day_hlc(mt5: MT5Adapter, symbol_code: str) -> tuple[Decimal, Decimal, Decimal]:
     """Retorna High, Low, Close do dia anterior."""
-    candles = _safe_get_candles(mt5, symbol_code, TimeFrame.D1, 2)
+    return _prev_day_hlc(_safe_get_candles(mt5, symbol_code, TimeFrame.D1, 2))
+
+
+def _prev_day_hlc(candles: list[Candle]) -> tuple[Decimal, Decimal, Decimal]:
+    """High, Low, Close do penúltimo D1 (dia anterior)."""
     if len(candles) >= 2:
         prev = candles[-2]
         return prev.high.value, prev.low.value, prev.close.value
@@ -2719,7 +2894,7 @@ def _calc_macro_score(mt5: MT5Adapter) -> tuple[list[MacroItem], int, str, Decim
             price_current=isr.current_price or Decimal("0"),
             price_open=isr.opening_price or Decimal("0"),
             available=isr.available,
-            reason=isr.detail,
+            reason=raw_text(isr, "detail"),  # sem formatar o detalhe a cada ciclo
         )
         items.append(mi)
 
@@ -2801,6 +2976,45 @@ def _check_directive_divergence(result: CycleResult) -> None:
         _directive_diverge_counter = 0
 
 
+# ────────────────────────────────────────────────────────────────
+# Profiling do ciclo — latência por estágio (p50/p95/p99)
+# ────────────────────────────────────────────────────────────────
+
+PROFILE_WINDOW_CYCLES = 500       # Janela móvel dos percentis (~16h a 2 min/ciclo)
+PROFILE_DIR = os.path.join(ROOT_DIR, "data", "profiles")  # Dump cProfile (--profile)
+
+_cycle_profiler = CycleProfiler(window=PROFILE_WINDOW_CYCLES)
+
+# Barras M1..D1 do WIN mantidas entre ciclos (reamostragem incremental)
+_bar_service = MultiTimeframeBarService(SYMBOL)
+
+
+def _persist_cycle_metrics_async(db_path: str, result: CycleResult) -> None:
+    """Enfileira as latências do último ciclo em micro_cycle_metrics."""
+    rows = _cycle_profiler.metrics_rows(result.timestamp)
+    _submit_write(
+        "cycle_metrics",
+        lambda: persist_cycle_metrics(db_path, rows),
+        priority=PRIORITY_LOW,
+    )
+
+
+def _display_cycle_profile(mt5: Optional[MT5Adapter] = None) -> None:
+    """Rodapé: tempo do ciclo e por estágio, com percentis móveis."""
+    for line in _cycle_profiler.format_footer():
+        print(line)
+    bm = _bar_service.metrics
+    print(f"  ⏱ Barras: {bm.last_source} ({bm.last_new_m1} M1 novos) │ broker: "
+          f"{bm.native_calls} nativas + {bm.incremental_calls} incrementais")
+    if mt5 is not None:
+        cs = mt5.take_connection_stats()
+        print(f"  ⏱ Conexão MT5: {cs.checks} terminal_info ({cs.strict} em ordens) │ "
+              f"{cs.skipped} poupados pela janela de {mt5.connection_trust_s:.0f}s")
+    if _cycle_profiler.slowest_profile_path:
+        print(f"  ⏱ Ciclo mais lento do dia: {_cycle_profiler.slowest_ms:.0f} ms → "
+              f"{os.path.relpath(_cycle_profiler.slowest_profile_path, ROOT_DIR)}")
+
+
 # ────────────────────────────────────────────────────────────────
 # Execução de um ciclo completo
 # ────────────────────────────────────────────────────────────────
@@ -2810,9 +3024,11 @@ def _run_cycle(mt5: MT5Adapter) -> CycleResult:
     global _prev_macro_score, _prev_macro_date
     global _directive_diverge_counter
 
+    prof = _cycle_profiler
     result = CycleResult(timestamp=datetime.now())
     # 1) Score Macro (direcional do dia)
-    items, raw_macro_score, macro_signal, macro_conf = _calc_macro_score(mt5)
+    with prof.stage("macro"):
+        items, raw_macro_score, macro_signal, macro_conf = _calc_macro_score(mt5)
 
     # ── Dampening: EMA do score para evitar whipsaw ──
     today_str = result.timestamp.strftime("%Y-%m-%d")
@@ -2846,48 +3062,66 @@ def _run_cycle(mt5: MT5Adapter) -> CycleResult:
     # ── Guardian inline: auto-suspensão da diretiva ──
     _check_directive_divergence(result)
     # 2) Preço atual e abertura WIN
-    tick = _safe_get_tick(mt5, SYMBOL)
-    if tick:
-        result.price_current = tick.last.value
-    result.price_open = _get_daily_open(mt5, SYMBOL)
-    # 3) Candles M1, M5, M15, H1, H4 para micro tendência e regiões multi-TF
-    candles_m1 = _safe_get_candles(mt5, SYMBOL, TimeFrame.M1, 200)
-    candles_m5 = _safe_get_candles(mt5, SYMBOL, TimeFrame.M5, 100)
-    candles_m15 = _safe_get_candles(mt5, SYMBOL, TimeFrame.M15, 100)
-    candles_h1 = _safe_get_candles(mt5, SYMBOL, TimeFrame.H1, 50)
-    candles_h4 = _safe_get_candles(mt5, SYMBOL, TimeFrame.H4, 50)
-    # 4) VWAP (candles M5 do dia)
-    today = datetime.now().date()
-    candles_m5_today = [c for c in candles_m5 if c.timestamp.date() == today]
-    result.vwap = _calc_vwap_from_candles(candles_m5_today)
-    result.vwap_score = _calc_vwap_score(result.price_current, result.vwap)
-    # 5) Pivôs Diários
-    prev_h, prev_l, prev_c = _get_prev_day_hlc(mt5, SYMBOL)
-    if prev_h > 0:
-        result.pivots = _calc_pivot_levels(prev_h, prev_l, prev_c)
-    # 6) SMC (usa M15 para mais estabilidade)
-    result.smc = _detect_smc(candles_m15 if candles_m15 else candles_h1)
-    # 6b) SMC Multi-Timeframe (H4, M15, M5)
-    result.smc_multi_tf = _calc_smc_multi_tf(
-        candles_h4 if candles_h4 else [],
-        candles_m15 if candles_m15 else [],
-        candles_m5 if candles_m5 else [],
-    )
-    # 7) Momentum M5
-    result.momentum = _calc_momentum(candles_m5)
-    # 8) Volume e OBV
-    result.volume_score, result.obv_score = _calc_volume_score(candles_m5)
-    # 8b) Saldo de agressão
-    result.aggression_score, result.aggression_ratio = _calc_aggression_score(candles_m5)
+    with prof.stage("tick"):
+        tick = _safe_get_tick(mt5, SYMBOL)
+        if tick:
+            result.price_current = tick.last.value
+    # 3) Candles M1, M5, M15, H1, H4, D1 — um fetch de M1 por ciclo, demais
+    #    timeframes reamostrados (backfill nativo só quando necessário)
+    with prof.stage("candles"):
+        bars = _bar_service.refresh(mt5)
+    candles_m1, candles_m5, candles_m15 = bars.m1, bars.m5, bars.m15
+    candles_h1, candles_h4, candles_d1 = bars.h1, bars.h4, bars.d1
+    result.candles_m1 = candles_m1
+    result.price_open = candles_d1[-1].open.value if candles_d1 else Decimal("0")
+    with prof.stage("indicadores"):
+        # 4) VWAP (candles M5 do dia)
+        today = datetime.now().date()
+        candles_m5_today = [c for c in candles_m5 if c.timestamp.date() == today]
+        result.vwap = _calc_vwap_from_candles(candles_m5_today)
+        result.vwap_score = _calc_vwap_score(result.price_current, result.vwap)
+        # 5) Pivôs Diários
+        prev_h, prev_l, prev_c = _prev_day_hlc(candles_d1)
+        if prev_h > 0:
+            result.pivots = _calc_pivot_levels(prev_h, prev_l, prev_c)
+    with prof.stage("smc"):
+        # 6) SMC (usa M15 para mais estabilidade)
+        result.smc = _detect_smc(candles_m15 if candles_m15 else candles_h1)
+        # 6a) Detectores incrementais (swings/OB/FVG) — reset após backfill
+        smc_streams = _sync_smc_streams(
+            {"M1": candles_m1, "M5": candles_m5, "M15": candles_m15, "H4": candles_h4},
+            reset=_bar_service.metrics.last_source == "backfill",
+        )
+        # 6b) SMC Multi-Timeframe (H4, M15, M5)
+        result.smc_multi_tf = _calc_smc_multi_tf(
+            candles_h4 if candles_h4 else [],
+            candles_m15 if candles_m15 else [],
+            candles_m5 if candles_m5 else [],
+            smc_streams,
+        )
+    with prof.stage("momentum"):
+        # 7) Momentum M5
+        result.momentum = _calc_momentum(candles_m5)
+        # 8) Volume e OBV
+        result.volume_score, result.obv_score = _calc_volume_score(candles_m5)
+        # 8b) Saldo de agressão
+        result.aggression_score, result.aggression_ratio = _calc_aggression_score(candles_m5)
     # 9) Regiões de interesse — multi-timeframe (M1, M5, M15)
-    day_refs = _get_day_reference_prices(mt5, SYMBOL)
-    result.regions = _map_regions_multi_tf(
-        result.price_current, result.vwap, result.pivots,
-        result.smc, candles_m1, candles_m5, candles_m15,
-        day_refs,
-    )
+    with prof.stage("regioes"):
+        day_refs = _day_reference_regions(candles_d1)
+        result.regions = _map_regions_multi_tf(
+            result.price_current, result.vwap, result.pivots,
+            result.smc, candles_m1, candles_m5, candles_m15,
+            day_refs, smc_streams,
+        )
+        result.region_index = PriceLevelIndex.from_items(
+            result.regions, key=lambda r: r.price,
+        )
     # 10) Padrões de candle
-    result.candle_pattern_score = _detect_candle_patterns(candles_m5, result.regions)
+    with prof.stage("padroes"):
+        result.candle_pattern_score = _detect_candle_patterns(
+            candles_m5, result.regions, result.region_index,
+        )
     # 11) Score Micro (soma dos componentes intraday)
     result.micro_score = (
         result.smc.bos_score + result.smc.equilibrium_score + result.smc.fvg_score
@@ -2904,11 +3138,12 @@ def _run_cycle(mt5: MT5Adapter) -> CycleResult:
         result.macro_score, result.micro_score, result.momentum.adx,
     )
     # 13) Gerar oportunidades
-    closes_m5 = [c.close.value for c in candles_m5]
-    highs_m5 = [c.high.value for c in candles_m5]
-    lows_m5 = [c.low.value for c in candles_m5]
-    atr = _calc_atr(highs_m5, lows_m5, closes_m5, 14) if candles_m5 else Decimal("0")
-    result.opportunities = _generate_opportunities(result, atr)
+    with prof.stage("oportunidades"):
+        closes_m5 = [c.close.value for c in candles_m5]
+        highs_m5 = [c.high.value for c in candles_m5]
+        lows_m5 = [c.low.value for c in candles_m5]
+        atr = _calc_atr(highs_m5, lows_m5, closes_m5, 14) if candles_m5 else Decimal("0")
+        result.opportunities = _generate_opportunities(result, atr)
     return result
 
 
@@ -3063,27 +3298,84 @@ def _create_micro_trend_tables(db_path: str) -> None:
     conn.close()
 
 
-def _persist_cycle(db_path: str, result: CycleResult) -> None:
-    """Persiste resultado do ciclo no SQLite."""
-    import sqlite3
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    # Score bruto (antes do dampening) e status da suspensão da diretiva
-    raw_score = getattr(result, '_raw_macro_score', result.macro_score)
-    directive_suspended = 1 if (
+# Engine/sessões SQLAlchemy do RL — criados uma única vez por processo
+_rl_session_factory = None
+_rl_session_db_path: str | None = None
+_rl_dimensions_seeded = False
+
+_SQL_INSERT_DECISION = """
+    INSERT INTO micro_trend_decisions
+    (timestamp, macro_score, macro_signal, macro_confidence, micro_score,
+     micro_trend, price_current, price_open, vwap, pivot_pp,
+     smc_direction, smc_equilibrium, adx, rsi, num_opportunities,
+     macro_score_raw, directive_suspended)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_SQL_INSERT_ITEM = """
+    INSERT INTO micro_trend_items
+    (decision_id, timestamp, item_number, symbol, category, score,
+     price_current, price_open)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_SQL_INSERT_REGION = """
+    INSERT INTO micro_trend_regions
+    (decision_id, timestamp, price, label, tipo, confluences, distance_pct)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+_SQL_INSERT_OPPORTUNITY = """
+    INSERT INTO micro_trend_opportunities
+    (decision_id, timestamp, direction, entry, stop_loss, take_profit,
+     risk_reward, confidence, reason, region)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+@dataclass
+class CyclePersistStats:
+    """Resumo da unidade de persistência do ciclo (exibido no rodapé)."""
+    elapsed_ms: float = 0.0
+    micro_rows: int = 0
+    episode_id: Optional[str] = None
+    rewards_evaluated: int = 0
+    rewards_truncated: int = 0      # horizonte fora do ciclo, sem MFE/MAE
+    rl_error: Optional[str] = None
+
+
+def _get_rl_session_factory(db_path: str):
+    """Retorna o sessionmaker do RL, criando engine e tabelas só uma vez."""
+    global _rl_session_factory, _rl_session_db_path
+    if _rl_session_factory is None or _rl_session_db_path != db_path:
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        from src.infrastructure.database.rl_schema import create_rl_tables
+
+        engine = create_engine(f"sqlite:///{db_path}", echo=False)
+        create_rl_tables(engine)
+        _rl_session_factory = sessionmaker(bind=engine)
+        _rl_session_db_path = db_path
+    return _rl_session_factory
+
+
+def _directive_suspended_flag() -> int:
+    """1 se o guardian suspendeu a diretiva (bias override NEUTRO)."""
+    return 1 if (
         _diary_feedback and _diary_feedback.active
         and _diary_feedback.guardian_bias_override == "NEUTRO"
     ) else 0
+
+
+def _insert_micro_rows(conn, result: CycleResult, directive_suspended: int) -> int:
+    """Insere decisão + items + regiões + oportunidades em lote.
+
+    Uma execução por tabela (executemany) em vez de um INSERT por linha.
+    Retorna o número de linhas escritas.
+    """
+    ts = result.timestamp.isoformat()
+    # Score bruto (antes do dampening)
+    raw_score = getattr(result, '_raw_macro_score', result.macro_score)
     # Decisão principal
-    cursor.execute("""
-        INSERT INTO micro_trend_decisions
-        (timestamp, macro_score, macro_signal, macro_confidence, micro_score,
-         micro_trend, price_current, price_open, vwap, pivot_pp,
-         smc_direction, smc_equilibrium, adx, rsi, num_opportunities,
-         macro_score_raw, directive_suspended)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
-        result.timestamp.isoformat(),
+    decision_id = conn.exec_driver_sql(_SQL_INSERT_DECISION, (
+        ts,
         result.macro_score, result.macro_signal, float(result.macro_confidence),
         result.micro_score, result.micro_trend,
         float(result.price_current), float(result.price_open),
@@ -3092,47 +3384,203 @@ def _persist_cycle(db_path: str, result: CycleResult) -> None:
         float(result.momentum.adx), float(result.momentum.rsi),
         len(result.opportunities),
         raw_score, directive_suspended,
-    ))
-    decision_id = cursor.lastrowid
+    )).lastrowid
     # Items macro
-    for item in result.macro_items:
-        if item.available:
-            cursor.execute("""
-                INSERT INTO micro_trend_items
-                (decision_id, timestamp, item_number, symbol, category, score,
-                 price_current, price_open)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                decision_id, result.timestamp.isoformat(),
-                item.number, item.symbol, item.category, item.score,
-                float(item.price_current), float(item.price_open),
-            ))
+    items = [
+        (decision_id, ts, item.number, item.symbol, item.category, item.score,
+         float(item.price_current), float(item.price_open))
+        for item in result.macro_items if item.available
+    ]
     # Regiões (top 10 mais próximas)
-    for region in result.regions[:10]:
-        cursor.execute("""
-            INSERT INTO micro_trend_regions
-            (decision_id, timestamp, price, label, tipo, confluences, distance_pct)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (
-            decision_id, result.timestamp.isoformat(),
-            float(region.price), region.label, region.tipo,
-            region.confluences, float(region.distance_pct),
-        ))
+    regions = [
+        (decision_id, ts, float(region.price), region.label, region.tipo,
+         region.confluences, float(region.distance_pct))
+        for region in result.regions[:10]
+    ]
     # Oportunidades
-    for opp in result.opportunities:
-        cursor.execute("""
-            INSERT INTO micro_trend_opportunities
-            (decision_id, timestamp, direction, entry, stop_loss, take_profit,
-             risk_reward, confidence, reason, region)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            decision_id, result.timestamp.isoformat(),
-            opp.direction, float(opp.entry), float(opp.stop_loss),
-            float(opp.take_profit), float(opp.risk_reward),
-            float(opp.confidence), opp.reason, opp.region,
-        ))
-    conn.commit()
-    conn.close()
+    opps = [
+        (decision_id, ts, opp.direction, float(opp.entry), float(opp.stop_loss),
+         float(opp.take_profit), float(opp.risk_reward),
+         float(opp.confidence), opp.reason, opp.region)
+        for opp in result.opportunities
+    ]
+    for sql, rows in (
+        (_SQL_INSERT_ITEM, items),
+        (_SQL_INSERT_REGION, regions),
+        (_SQL_INSERT_OPPORTUNITY, opps),
+    ):
+        if rows:
+            conn.exec_driver_sql(sql, rows)
+    return 1 + len(items) + len(regions) + len(opps)
+
+
+def _persist_cycle(
+    db_path: str,
+    result: CycleResult,
+    get_price_range_fn=None,
+    directive_suspended: int = 0,
+) -> CyclePersistStats:
+    """Persiste o ciclo inteiro numa única unidade de persistência.
+
+    Uma conexão e um commit cobrem as tabelas micro_trend_* (em lote), o
+    episódio RL (rl_episodes, correlações, indicadores, rewards pendentes)
+    e a avaliação dos rewards vencidos. Se a parte RL falhar, a transação
+    é desfeita e só as tabelas micro são regravadas — mesmo comportamento
+    de antes, quando as duas escritas eram independentes.
+    """
+    from src.application.services.rl_persistence_service import RLPersistenceService
+    from src.infrastructure.repositories.rl_repository import SqliteRLRepository
+
+    global _rl_dimensions_seeded
+    t0 = time.perf_counter()
+    stats = CyclePersistStats()
+    session = _get_rl_session_factory(db_path)()
+    try:
+        stats.micro_rows = _insert_micro_rows(
+            session.connection(), result, directive_suspended,
+        )
+
+        rl_service = RLPersistenceService(SqliteRLRepository(session, autocommit=False))
+        try:
+            seeded_now = not _rl_dimensions_seeded and rl_service.initialize()
+            stats.episode_id = rl_service.persist_micro_cycle(result)
+            if stats.episode_id is None:
+                raise RuntimeError("episódio RL não persistido")
+            stats.rewards_evaluated = rl_service.evaluate_pending_rewards(
+                lambda: result.price_current, get_price_range_fn,
+            )
+            session.commit()
+            if seeded_now:
+                _rl_dimensions_seeded = True
+        except Exception as e:
+            # RL falhou: desfaz tudo e grava apenas as tabelas micro
+            stats.rl_error = str(e)
+            stats.episode_id = None
+            stats.rewards_evaluated = 0
+            session.rollback()
+            stats.micro_rows = _insert_micro_rows(
+                session.connection(), result, directive_suspended,
+            )
+            session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+    stats.elapsed_ms = (time.perf_counter() - t0) * 1000
+    return stats
+
+
+class _CandlePriceRange:
+    """(start, end) → (max, min) do WIN sobre os candles M1 do ciclo.
+
+    Substitui o get_candles_range no broker: a avaliação de rewards roda
+    no worker de persistência, fora da thread que fala com o MT5. Os 200
+    candles M1 do ciclo cobrem o maior horizonte de reward (120 min) em
+    regime; rewards atrasados (reinício do agente, fila cheia) começam
+    antes do primeiro candle. Esses ficam sem MFE/MAE (um extremo parcial
+    seria enganoso) e entram em ``truncated``. Só lê os candles já
+    carregados pelo ciclo — o worker nunca fala com o MT5.
+    """
+
+    def __init__(self, candles: list[Candle]):
+        self.candles = candles
+        self.truncated = 0
+
+    def __call__(self, start_dt, end_dt):
+        if self.candles and self.candles[0].timestamp <= start_dt:
+            window = [c for c in self.candles if start_dt <= c.timestamp <= end_dt]
+            if window:
+                return (
+                    float(max(c.high.value for c in window)),
+                    float(min(c.low.value for c in window)),
+                )
+        self.truncated += 1
+        return None, None
+
+
+# ────────────────────────────────────────────────────────────────
+# Persistência assíncrona — worker dedicado fora do caminho de decisão
+# ────────────────────────────────────────────────────────────────
+
+PERSIST_QUEUE_SIZE = 50           # Tarefas pendentes antes do backpressure
+PERSIST_BLOCK_TIMEOUT_S = 0.5     # Espera máxima do ciclo por espaço na fila
+PERSIST_SHUTDOWN_TIMEOUT_S = 30   # Tempo para drenar a fila no encerramento
+
+_persist_worker: PersistenceWorker | None = None
+_last_persist_stats: CyclePersistStats | None = None
+_rewards_truncated_total = 0
+
+
+def _start_persist_worker() -> PersistenceWorker:
+    """Cria e inicia o worker de persistência do processo."""
+    global _persist_worker
+    if _persist_worker is None:
+        _persist_worker = PersistenceWorker(
+            max_queue_size=PERSIST_QUEUE_SIZE,
+            block_timeout_s=PERSIST_BLOCK_TIMEOUT_S,
+            name="MicroPersist",
+        ).start()
+    return _persist_worker
+
+
+def _submit_write(
+    name: str,
+    fn,
+    priority: str = PRIORITY_HIGH,
+    coalesce_key: Optional[str] = None,
+) -> bool:
+    """Enfileira uma escrita no worker (ou executa inline se não houver)."""
+    if _persist_worker is None:
+        fn()
+        return True
+    return _persist_worker.submit(name, fn, priority, coalesce_key)
+
+
+def _persist_cycle_async(db_path: str, result: CycleResult) -> bool:
+    """Enfileira a unidade de persistência do ciclo (micro + RL + rewards)."""
+    directive_suspended = _directive_suspended_flag()
+    price_range_fn = _CandlePriceRange(result.candles_m1)
+
+    def _task() -> None:
+        global _last_persist_stats, _rewards_truncated_total
+        stats = _persist_cycle(db_path, result, price_range_fn, directive_suspended)
+        if stats.rewards_evaluated:
+            stats.rewards_truncated = price_range_fn.truncated
+        _last_persist_stats = stats
+        _cycle_profiler.record("persistencia", stats.elapsed_ms)
+        if stats.rewards_truncated:
+            _rewards_truncated_total += stats.rewards_truncated
+            logger.warning(
+                "RL: %d reward(s) sem MFE/MAE — horizonte fora dos candles do ciclo",
+                stats.rewards_truncated,
+            )
+        if stats.rl_error:
+            logger.warning("RL: %s", stats.rl_error)
+
+    return _submit_write("ciclo", _task)
+
+
+def _display_persistence_status() -> None:
+    """Rodapé: métricas do worker e do último commit do ciclo."""
+    if _persist_worker is None:
+        return
+    m = _persist_worker.metrics
+    last = _last_persist_stats
+    line = (f"  💾 Persistência: fila {m.queue_depth}/{_persist_worker.max_queue_size} "
+            f"(máx {m.max_queue_depth}) │ lag {m.last_lag_ms:.0f} ms "
+            f"(méd {m.avg_lag_ms:.0f}, máx {m.max_lag_ms:.0f})")
+    if last:
+        line += f" │ commit {last.elapsed_ms:.1f} ms ({last.micro_rows} linhas + RL)"
+        if last.rewards_evaluated:
+            line += f" │ {last.rewards_evaluated} rewards"
+    print(line)
+    if _rewards_truncated_total:
+        print(f"  💾 Rewards sem MFE/MAE (horizonte fora do ciclo): {_rewards_truncated_total}")
+    if m.dropped or m.dropped_high or m.coalesced or m.errors:
+        print(f"  💾 Descartes: {m.dropped} baixa prio / {m.dropped_high} alta prio │ "
+              f"Coalescidos: {m.coalesced} │ Erros: {m.errors}"
+              f"{f' ({m.last_error[:40]})' if m.last_error else ''}")
 
 
 # ────────────────────────────────────────────────────────────────
@@ -3292,16 +3740,11 @@ def _display_cycle(result: CycleResult):
     print(f"╠{'─' * 68}╣")
     # ── Regiões de Interesse — Mapa Vertical Multi-TF ──
     cur = result.price_current
-    regioes_acima = sorted(
-        [r for r in result.regions if r.price > cur],
-        key=lambda r: r.price,
+    region_index = result.region_index or PriceLevelIndex.from_items(
+        result.regions, key=lambda r: r.price,
     )
-    regioes_abaixo = sorted(
-        [r for r in result.regions if r.price <= cur],
-        key=lambda r: r.price, reverse=True,
-    )
-    sell_zones = regioes_acima[:3]
-    buy_zones = regioes_abaixo[:3]
+    sell_zones = region_index.above(cur, k=3)
+    buy_zones = region_index.below(cur, k=3, inclusive=True)
 
     def _stars(confluences: int) -> str:
         n = max(1, min(5, confluences))
@@ -3384,10 +3827,20 @@ def _display_cycle(result: CycleResult):
     print(f"╚{'═' * 68}╝")
 
 
-def _persist_simulated_trade(db_path: str, opp: 'Opportunity', result: 'CycleResult') -> None:
+def _persist_simulated_trade(db_path: str, opp: 'Opportunity', result: 'CycleResult') -> bool:
+    """Enfileira o trade simulado no worker de persistência."""
+    now = datetime.now()
+    return _submit_write(
+        "simulated_trade",
+        lambda: _write_simulated_trade(db_path, opp, result, now),
+    )
+
+
+def _write_simulated_trade(
+    db_path: str, opp: 'Opportunity', result: 'CycleResult', now: datetime,
+) -> None:
     """Persiste um trade simulado (shadow mode) no banco de dados."""
     import sqlite3
-    from datetime import date
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     cursor.execute("""
@@ -3397,8 +3850,8 @@ def _persist_simulated_trade(db_path: str, opp: 'Opportunity', result: 'CycleRes
          smc_direction, price_at_decision)
         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
     """, (
-        datetime.now().isoformat(),
-        date.today().isoformat(),
+        now.isoformat(),
+        now.date().isoformat(),
         opp.direction,
         float(opp.entry),
         float(opp.stop_loss),
@@ -3429,9 +3882,30 @@ def _persist_hedge_watchdog_event(
     message: str = "",
     error_message: Optional[str] = None,
 ) -> None:
-    """Persiste evento do watchdog hedge para auditoria e aprendizado."""
+    """Enfileira evento do watchdog hedge para auditoria e aprendizado."""
+    now = datetime.now()
+    _submit_write("hedge_watchdog_event", lambda: _write_hedge_watchdog_event(
+        db_path, now, event_type, action_taken, position_ticket, symbol,
+        volume, sl, tp, status, message, error_message,
+    ))
+
+
+def _write_hedge_watchdog_event(
+    db_path: str,
+    now: datetime,
+    event_type: str,
+    action_taken: str,
+    position_ticket: Optional[int],
+    symbol: Optional[str],
+    volume: Optional[float],
+    sl: Optional[float],
+    tp: Optional[float],
+    status: str,
+    message: str,
+    error_message: Optional[str],
+) -> None:
+    """Persiste evento do watchdog hedge no SQLite."""
     import sqlite3
-    from datetime import date
 
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
@@ -3444,8 +3918,8 @@ def _persist_hedge_watchdog_event(
         ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """,
         (
-            datetime.now().isoformat(),
-            date.today().isoformat(),
+            now.isoformat(),
+            now.date().isoformat(),
             event_type,
             action_taken,
             int(position_ticket) if position_ticket is not None else None,
@@ -3492,7 +3966,23 @@ def _get_simulated_summary(db_path: str) -> dict:
 
 
 def _persist_reversal_false_positive_kpi(db_path: str) -> dict:
-    """Calcula e persiste KPI diário de falso positivo para sinais de reversão."""
+    """Calcula o KPI diário de falso positivo de reversão e enfileira o upsert.
+
+    A gravação é de baixa prioridade e coalescida: se o worker ainda não
+    gravou o KPI anterior, só o valor mais recente é escrito.
+    """
+    kpi = _calc_reversal_false_positive_kpi(db_path)
+    _submit_write(
+        "reversal_kpi",
+        lambda: _write_reversal_false_positive_kpi(db_path, kpi),
+        priority=PRIORITY_LOW,
+        coalesce_key="reversal_kpi",
+    )
+    return kpi
+
+
+def _calc_reversal_false_positive_kpi(db_path: str) -> dict:
+    """Calcula KPI diário de falso positivo para sinais de reversão."""
     import sqlite3
     from datetime import date
 
@@ -3514,13 +4004,28 @@ def _persist_reversal_false_positive_kpi(db_path: str) -> dict:
         (today,),
     )
     row = cursor.fetchone() or (0, 0, 0, 0)
+    conn.close()
     total = int(row[0] or 0)
     resolved = int(row[1] or 0)
     wins = int(row[2] or 0)
     losses = int(row[3] or 0)
     false_positive_rate = (losses / resolved * 100.0) if resolved > 0 else 0.0
+    return {
+        "session_date": today,
+        "total": total,
+        "resolved": resolved,
+        "wins": wins,
+        "losses": losses,
+        "false_positive_rate": false_positive_rate,
+    }
 
-    cursor.execute(
+
+def _write_reversal_false_positive_kpi(db_path: str, kpi: dict) -> None:
+    """Grava (upsert) o KPI diário de falso positivo de reversão."""
+    import sqlite3
+
+    conn = sqlite3.connect(db_path)
+    conn.execute(
         """
         INSERT INTO reversal_kpi_daily (
             session_date, total_reversal_signals, resolved_reversal_signals,
@@ -3535,26 +4040,17 @@ def _persist_reversal_false_positive_kpi(db_path: str) -> dict:
             updated_at=excluded.updated_at
         """,
         (
-            today,
-            total,
-            resolved,
-            wins,
-            losses,
-            float(false_positive_rate),
+            kpi["session_date"],
+            kpi["total"],
+            kpi["resolved"],
+            kpi["wins"],
+            kpi["losses"],
+            float(kpi["false_positive_rate"]),
             datetime.now().isoformat(),
         ),
     )
-
     conn.commit()
     conn.close()
-    return {
-        "session_date": today,
-        "total": total,
-        "resolved": resolved,
-        "wins": wins,
-        "losses": losses,
-        "false_positive_rate": false_positive_rate,
-    }
 
 
 def _display_trading_status(trading_mgr: Optional['MicroTradingManager']) -> None:
@@ -3659,6 +4155,15 @@ def main():
     _create_micro_trend_tables(DB_PATH)
     create_directives_table(DB_PATH)
     create_diary_feedback_table(DB_PATH)
+    create_cycle_metrics_table(DB_PATH)
+
+    # Checa flag --profile (dump cProfile do ciclo mais lento do dia)
+    if "--profile" in sys.argv:
+        _cycle_profiler.profile_dir = PROFILE_DIR
+        print(f"\n  ⏱ Profiling ativo: ciclo mais lento do dia em {PROFILE_DIR}")
+
+    # Worker de persistência: escritas no SQLite saem do caminho de decisão
+    _start_persist_worker()
 
     # ── Carrega diretivas do Head Financeiro ──
     global _active_directive
@@ -3816,7 +4321,8 @@ def main():
             # Executa ciclo
             cycle_count += 1
             print(f"\n  ──── Ciclo #{cycle_count} ────")
-            result = _run_cycle(mt5)
+            with _cycle_profiler.cycle():
+                result = _run_cycle(mt5)
 
             # Exibe resultados
             _display_cycle(result)
@@ -3839,11 +4345,10 @@ def main():
                             print(f"     Entrada: {best.entry} │ SL: {best.stop_loss} │ "
                                   f"TP: {best.take_profit} │ R/R: {best.risk_reward}:1")
                             print(f"     Confiança: {best.confidence:.0f}% │ Razão: {best.reason}")
-                            try:
-                                _persist_simulated_trade(DB_PATH, best, result)
-                                print(f"  ✓ Sinal logado em simulated_trades (sem ordem real)")
-                            except Exception as e:
-                                print(f"  ✗ Erro ao logar sinal simulado: {e}")
+                            if _persist_simulated_trade(DB_PATH, best, result):
+                                print(f"  ✓ Sinal enfileirado para simulated_trades (sem ordem real)")
+                            else:
+                                print(f"  ✗ Erro ao logar sinal simulado: fila de persistência cheia")
                         else:
                             print(f"  🧪 Opp rejeitada (simulado): {eval_reason}")
                     else:
@@ -3883,64 +4388,13 @@ def main():
             # Exibe status do trading
             _display_trading_status(trading_mgr if AUTO_TRADING_ENABLED else None)
 
-            # Persiste no banco
-            try:
-                _persist_cycle(DB_PATH, result)
-                print(f"  ✓ Dados persistidos no SQLite")
-            except Exception as e:
-                print(f"  ✗ Erro ao persistir: {e}")
-
-            # Persiste episódio RL para aprendizagem por reforço
-            try:
-                from src.application.services.rl_persistence_service import RLPersistenceService
-                from src.infrastructure.repositories.rl_repository import SqliteRLRepository
-                from src.infrastructure.database.rl_schema import create_rl_tables
-                from sqlalchemy import create_engine
-                from sqlalchemy.orm import sessionmaker
-
-                engine = create_engine(f"sqlite:///{DB_PATH}", echo=False)
-                create_rl_tables(engine)
-                SessionLocal = sessionmaker(bind=engine)
-                rl_session = SessionLocal()
-                rl_repo = SqliteRLRepository(rl_session)
-                rl_service = RLPersistenceService(rl_repo)
-                rl_service.initialize()
-
-                episode_id = rl_service.persist_micro_cycle(result)
-                if episode_id:
-                    print(f"  ✓ Episódio RL persistido: {episode_id[:8]}...")
-
-                # Avaliar recompensas pendentes
-                def _get_win_price():
-                    try:
-                        return result.price_current
-                    except Exception:
-                        return None
-
-                def _get_win_price_range(start_dt, end_dt):
-                    """Retorna (max_price, min_price) do WIN no intervalo via candles M1."""
-                    try:
-                        candles = mt5.get_candles_range(
-                            Symbol(SYMBOL), TimeFrame.M1,
-                            start_dt, end_dt,
-                        )
-                        if not candles:
-                            return None, None
-                        max_price = max(c.high.value for c in candles)
-                        min_price = min(c.low.value for c in candles)
-                        return float(max_price), float(min_price)
-                    except Exception:
-                        return None, None
-
-                evaluated = rl_service.evaluate_pending_rewards(
-                    _get_win_price, _get_win_price_range
-                )
-                if evaluated > 0:
-                    print(f"  ✓ {evaluated} recompensas RL avaliadas")
-
-                rl_session.close()
-            except Exception as e:
-                print(f"  ⚠ RL: {e}")
+            # Persiste no banco (micro + RL + rewards num único commit),
+            # em background — o próximo ciclo não espera pelo disco
+            if not _persist_cycle_async(DB_PATH, result):
+                print(f"  ✗ Fila de persistência cheia — ciclo não gravado")
+            _persist_cycle_metrics_async(DB_PATH, result)
+            _display_persistence_status()
+            _display_cycle_profile(mt5)
 
             # Desconecta MT5
             try:
@@ -3953,6 +4407,12 @@ def main():
 
         except KeyboardInterrupt:
             print("\n\n  Agente encerrado pelo usuário.")
+            # Drena a fila de persistência antes de sair (durabilidade)
+            if _persist_worker is not None:
+                pending = _persist_worker.metrics.queue_depth
+                drained = _persist_worker.close(PERSIST_SHUTDOWN_TIMEOUT_S)
+                print(f"  {'✓' if drained else '✗'} Persistência: {pending} tarefa(s) "
+                      f"pendente(s) {'gravada(s)' if drained else 'NÃO drenada(s) a tempo'}")
             # Fecha posições abertas
             if trading_mgr and trading_mgr.open_trades:
                 print("  Fechando posições abertas...")
@@ -9,7 +9,7 @@ Fluxo:
 1) Lê artefato de extração do BDI (data/BDI/bdi_<data>_key_data.txt)
 2) Persiste diretiva ativa do Head (head_directives)
 3) Persiste feedback no diário operacional (diary_feedback)
-4) Persiste anotação histórica no reflections_log.jsonl
+4) Persiste anotação histórica no log de reflections (segmento do dia)
 5) Registra resumo em diário markdown do pregão alvo
 
 Idempotência: source_tag + target_date.
@@ -18,11 +18,10 @@ Idempotência: source_tag + target_date.
 from __future__ import annotations
 
 import argparse
-import json
 import sqlite3
 import sys
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
 
 ROOT_DIR = Path(__file__).resolve().parent.parent
@@ -35,6 +34,7 @@ from src.application.services.head_directives import (
     load_active_directive,
     save_directive,
 )
+from src.infrastructure.database.reflection_log import ReflectionLog
 
 
 @dataclass
@@ -72,8 +72,8 @@ class LessonContext:
         return ROOT_DIR / "data" / "BDI" / f"BDI_00_{self.bdi_date_code}.pdf"
 
     @property
-    def reflections_log(self) -> Path:
-        return ROOT_DIR / "data" / "db" / "reflections" / "reflections_log.jsonl"
+    def reflections_log(self) -> ReflectionLog:
+        return ReflectionLog(ROOT_DIR / "data" / "db" / "reflections")
 
     @property
     def diario_md(self) -> Path:
@@ -260,12 +260,15 @@ def _registrar_feedback(ctx: LessonContext) -> int:
 
 
 def _append_reflection_once(ctx: LessonContext, total_com_minis: str, total_sem_minis: str) -> bool:
-    ctx.reflections_log.parent.mkdir(parents=True, exist_ok=True)
-
-    if ctx.reflections_log.exists():
-        for line in ctx.reflections_log.read_text(encoding="utf-8", errors="ignore").splitlines()[-400:]:
-            if ctx.source_tag in line and ctx.target_date in line:
-                return False
+    log = ctx.reflections_log
+
+    # Anotações recentes bastam para a idempotência (antes: últimas 400 linhas);
+    # read cobre também os dias já compactados em Parquet
+    recentes = log.read(start=datetime.now() - timedelta(days=30), columns=["source", "date"])
+    if not recentes.empty and (
+        (recentes["source"] == ctx.source_tag) & (recentes["date"] == ctx.target_date)
+    ).any():
+        return False
 
     payload = {
         "timestamp": datetime.now().isoformat(),
@@ -290,8 +293,7 @@ def _append_reflection_once(ctx: LessonContext, total_com_minis: str, total_sem_
         ],
     }
 
-    with ctx.reflections_log.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(payload, ensure_ascii=False) + "\n")
+    log.append(payload)
 
     return True
 
@@ -1,318 +1,170 @@
 """
 Backtesting Script para Validação de Detectors
 
-Executa detectors contra dados históricos MT5 (60 dias WIN$N)
-e valida taxas de captura, false positives e win rates.
+Replay de barras reais (M5 do WIN$N por padrão) pelo DetectorVolatilidade
+e pelo DetectorPadroesTecnico. As barras vêm da tabela market_data
+(data/db/trading.db) ou de um export CSV (data/export); cada alerta é
+rotulado pelo retorno das próximas --horizonte barras.
+
+Uso:
+    python scripts/backtest_detector.py
+    python scripts/backtest_detector.py --inicio 2026-01-02 --fim 2026-02-27
+    python scripts/backtest_detector.py --csv data/export/WIN_N_5min.csv
 """
 
-import asyncio
-import logging
-from datetime import datetime, timedelta
-from typing import List
+import argparse
 import json
+import logging
+import os
 import sys
-from pathlib import Path
+from datetime import datetime, time
 
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent / ".." / "src"))
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT_DIR)
 
-from application.services.detector_volatilidade import DetectorVolatilidade
-from application.services.detector_padroes_tecnico import DetectorPadroesTecnico
-from domain.entities.alerta import AlertaOportunidade
-from domain.enums.alerta_enums import NivelAlerta, PatraoAlerta, StatusAlerta
-from infrastructure.config.alerta_config import get_config
-
-logger = logging.getLogger(__name__)
-
-# Configurar logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+from src.application.services.backtest.detector_replay import (
+    DEFAULT_DB_PATH,
+    BarrasHistoricas,
+    carregar_export_csv,
+    carregar_market_data,
+    executar_replay,
 )
+from src.infrastructure.config.alerta_config import get_config
 
+logger = logging.getLogger(__name__)
 
-class BacktestValidator:
-    """Validador de backtest para detectors."""
-
-    def __init__(self):
-        self.config = get_config()
-        self.detector_vol = DetectorVolatilidade(
-            window=self.config.detection.volatilidade.window,
-            threshold_sigma=self.config.detection.volatilidade.threshold_sigma,
-            lookback_bars=100
-        )
-        self.detector_padroes = DetectorPadroesTecnico()
-
-        # Métricas
-        self.alertas_gerados = []
-        self.oportunidades_manuais = []
-        self.matches = 0
-        self.false_positives = 0
-        self.false_negatives = 0
-        self.velas_processadas = 0
-
-    async def carregar_dados_historicos(self,
-                                       ativo: str = "WIN$N",
-                                       dias: int = 60,
-                                       timeframe: str = "M5") -> tuple:
-        """
-        Carrega dados históricos do MT5.
-
-        Args:
-            ativo: Símbolo (ex: WIN$N)
-            dias: Dias para voltar
-            timeframe: M1, M5, H1, D1, etc
-
-        Returns:
-            Tupla (velas, indices_spikes) onde spikes são oportunidades reais
-
-        NOTA: Esta é uma versão MOCK para testes. Em produção,
-              usaria MT5 API via MetaTrader5 package.
-        """
-        logger.info(f"Carregando {dias} dias de dados para {ativo}...")
-
-        # MOCK DATA para testes
-        # Em produção: import MetaTrader5 as mt5; mt5.copy_rates_from()
-        dados = []
-        data_fim = datetime.now()
-        data_inicio = data_fim - timedelta(days=dias)
-
-        # Simular 60 dias de velas M5 (candles por dia ÷ 5 min)
-        velas_por_dia = 288 if timeframe == "M5" else 1440  # M5: 288, M1: 1440
-        total_velas = dias * velas_por_dia
-
-        base_price = 127500.0
-        spike_indices = []  # Índices de velas com spikes
-
-        for i in range(total_velas):
-            timestamp = data_inicio + timedelta(minutes=5*i if timeframe == "M5" else i)
-
-            # Simular movimento com some volatilidade aleatória
-            import random
-            movimento = random.gauss(0, 100)  # Normal distribution
-            open_price = base_price + movimento
-            close_price = open_price + random.gauss(0, 150)
-            high_price = max(open_price, close_price) + abs(random.gauss(0, 50))
-            low_price = min(open_price, close_price) - abs(random.gauss(0, 50))
-            volume = random.randint(100, 5000)
-
-            # Simular spikes de volatilidade (30 vezes durante os 60 dias)
-            if i % (total_velas // 30) == 0 and i > 0:
-                close_price = base_price + random.gauss(0, 500)  # Spike volatilidade
-                high_price = close_price + abs(random.gauss(0, 200))
-                low_price = close_price - abs(random.gauss(0, 200))
-                volume = random.randint(5000, 20000)
-                spike_indices.append(i)  # Marcar como oportunidade real
-
-            dados.append({
-                "time": timestamp.isoformat(),
-                "open": round(open_price, 2),
-                "high": round(high_price, 2),
-                "low": round(low_price, 2),
-                "close": round(close_price, 2),
-                "volume": volume,
-                "ativo": ativo
-            })
-
-            base_price = close_price  # Price para próxima vela
-
-        logger.info(f"✅ Carregados {len(dados)} velas, {len(spike_indices)} spikes esperados")
-        return dados, spike_indices
-
-    async def processar_vela(self, vela: dict) -> List[AlertaOportunidade]:
-        """
-        Processa uma vela e retorna alertas gerados.
-
-        Args:
-            vela: Dict com [time, open, high, low, close, volume, ativo]
-
-        Returns:
-            Lista de AlertaOportunidade gerados
-        """
-        alertas = []
-
-        # Volatilidade
-        alerta_vol = self.detector_vol.analisar_vela(
-            symbol=vela["ativo"],
-            close=vela["close"],
-            timestamp=vela["time"]
-        )
-
-        if alerta_vol:
-            alertas.append(alerta_vol)
-
-        # Padrões técnicos
-        # TODO: Implementar chamada correta ao detector_padroes
-        # Por agora, apenas volatilidade é testada
-        alerta_padroes = None
-        # alerta_padroes = self.detector_padroes.detectar_padroes(
-        #     close=vela["close"],
-        #     high=vela["high"],
-        #     low=vela["low"],
-        #     volume=vela["volume"]
-        # )
-
-        if alerta_padroes:
-            alertas.append(alerta_padroes)
-
-        self.velas_processadas += 1
-        self.alertas_gerados.extend(alertas)
-
-        return alertas
-
-    async def executar_backtest(self, dados: List[dict], spike_indices: List[int] = None):
-        """
-        Executa backtest completo.
-
-        Args:
-            dados: Lista de velas históricas
-            spike_indices: Índices das velas com spikes (oportunidades reais)
-        """
-        if spike_indices:
-            self.oportunidades_manuais = [i for i in spike_indices]
-
-        logger.info(f"\n{'='*60}")
-        logger.info(f"🔍 INICIANDO BACKTEST - {len(dados)} velas")
-        logger.info(f"   Oportunidades esperadas: {len(self.oportunidades_manuais)}")
-        logger.info(f"{'='*60}\n")
-
-        for i, vela in enumerate(dados):
-            alertas = await self.processar_vela(vela)
-
-            # Verificar se há match com oportunidade esperada
-            if alertas and i in self.oportunidades_manuais:
-                self.matches += 1
-            elif alertas and i not in self.oportunidades_manuais:
-                self.false_positives += len(alertas)
-            elif not alertas and i in self.oportunidades_manuais:
-                self.false_negatives += 1
-
-            # Log a cada 100 velas
-            if (i + 1) % 100 == 0:
-                logger.debug(f"Processadas {i+1}/{len(dados)} velas ({len(alertas)} alertas)")
-
-        logger.info(f"\n{'='*60}")
-        logger.info(f"✅ BACKTEST COMPLETO")
-        logger.info(f"   Matches: {self.matches}/{len(self.oportunidades_manuais)}")
-        logger.info(f"   False Positives: {self.false_positives}")
-        logger.info(f"{'='*60}\n")
-
-    def gerar_relatorio(self) -> dict:
-        """
-        Gera relatório de backtest.
-
-        Returns:
-            Dict com métricas e validação
-        """
-        taxa_captura = (
-            (self.matches / max(len(self.oportunidades_manuais), 1)) * 100
-            if self.oportunidades_manuais else 0
-        )
-
-        taxa_fp = (
-            (self.false_positives / max(len(self.alertas_gerados), 1)) * 100
-            if self.alertas_gerados else 0
-        )
-
-        relatorio = {
-            "periodo": "60 dias históricos",
-            "ativo": "WIN$N",
-            "timeframe": "M5",
-            "metricas": {
-                "velas_processadas": self.velas_processadas,
-                "alertas_gerados": len(self.alertas_gerados),
-                "oportunidades_esperadas": len(self.oportunidades_manuais),
-                "matches": self.matches,
-                "false_positives": self.false_positives,
-                "false_negatives": self.false_negatives
-            },
-            "taxas": {
-                "taxa_captura_pct": round(taxa_captura, 2),
-                "taxa_false_positive_pct": round(taxa_fp, 2),
-                "win_rate_estimado_pct": round(60.0, 2)  # Estimado
-            },
-            "gates_validacao": {
-                "captura_minima_85pct": taxa_captura >= 85.0,
-                "fp_maxima_10pct": taxa_fp <= 10.0,
-                "win_rate_minimo_60pct": 60.0 >= 60.0
-            },
-            "status": "PASS" if all([
-                taxa_captura >= 85.0,
-                taxa_fp <= 10.0,
-                60.0 >= 60.0
-            ]) else "FAIL",
-            "timestamp": datetime.now().isoformat()
-        }
-
-        return relatorio
-
-    def imprimir_relatorio(self, relatorio: dict):
-        """Imprime relatório formatado."""
-        print(f"\n{'='*70}")
-        print(f"📊 RELATÓRIO DE BACKTEST")
-        print(f"{'='*70}\n")
-
-        print(f"Período: {relatorio['periodo']}")
-        print(f"Ativo: {relatorio['ativo']}")
-        print(f"Timeframe: {relatorio['timeframe']}\n")
-
-        print(f"{'MÉTRICAS':40} {'VALOR':>20}")
-        print(f"{'-'*70}")
-        for key, value in relatorio["metricas"].items():
-            print(f"  {key:37} {value:>20}")
-
-        print(f"\n{'TAXAS':40} {'VALOR':>20}")
-        print(f"{'-'*70}")
-        for key, value in relatorio["taxas"].items():
-            print(f"  {key:37} {value:>20.2f}%")
-
-        print(f"\n{'GATES DE VALIDAÇÃO':40} {'STATUS':>20}")
-        print(f"{'-'*70}")
-        for gate, passou in relatorio["gates_validacao"].items():
-            status = "✅ PASSOU" if passou else "❌ FALHOU"
-            print(f"  {gate:37} {status:>20}")
-
-        print(f"\n{'RESULTADO FINAL':40} {relatorio['status']:>20}")
-        print(f"{'='*70}\n")
-
-        if relatorio["status"] == "PASS":
-            print("🎉 BACKTEST VALIDADO COM SUCESSO!")
-            print("✅ Detector pronto para produção")
-            print("✅ Proceder com BETA 13/03\n")
-        else:
-            print("⚠️  BACKTEST NÃO PASSOU")
-            print("❌ Revisar parâmetros do detector")
-            print("❌ Iterar antes de BETA\n")
+# Gates de validação (critérios do detector)
+GATE_CAPTURA_PCT = 85.0
+GATE_WIN_RATE_PCT = 60.0
+GATE_PRECISAO_PCT = 90.0  # equivale a FP <= 10%
+
+
+def _data_fim(texto: str) -> datetime:
+    """--fim só com a data inclui o dia inteiro (limite é inclusivo)."""
+    fim = datetime.fromisoformat(texto)
+    if len(texto) == 10:
+        fim = datetime.combine(fim.date(), time.max)
+    return fim
+
+
+def adicionar_argumentos_fonte(parser: argparse.ArgumentParser) -> None:
+    """Argumentos de origem das barras e de rotulagem (comuns aos backtests)."""
+    parser.add_argument("--symbol", default="WIN$N", help="Símbolo em market_data")
+    parser.add_argument("--timeframe", default="M5")
+    parser.add_argument("--db", default=os.path.join(ROOT_DIR, DEFAULT_DB_PATH),
+                        help="SQLite com a tabela market_data")
+    parser.add_argument("--csv", help="Export CSV (data/export) no lugar do banco")
+    parser.add_argument("--inicio", type=datetime.fromisoformat, help="AAAA-MM-DD")
+    parser.add_argument("--fim", type=_data_fim,
+                        help="AAAA-MM-DD (dia inclusivo) ou AAAA-MM-DDTHH:MM")
+    parser.add_argument("--horizonte", type=int, default=6,
+                        help="Barras à frente para o retorno futuro")
+    parser.add_argument("--alvo-pct", type=float, default=0.3,
+                        help="Movimento mínimo (%%) para a barra ser oportunidade")
+
+
+def carregar_barras(args: argparse.Namespace) -> BarrasHistoricas:
+    if args.csv:
+        return carregar_export_csv(args.csv, symbol=args.symbol, timeframe=args.timeframe)
+    if not os.path.exists(args.db):
+        raise SystemExit(f"Banco não encontrado: {args.db} (use --csv para um export)")
+    return carregar_market_data(
+        args.symbol, args.timeframe, inicio=args.inicio, fim=args.fim, db_path=args.db,
+    )
 
 
-async def main():
-    """Função principal."""
-    logger.info("🤖 ML Expert: Iniciando Backtesting...")
+def avaliar_gates(resumo: dict) -> dict:
+    vol = resumo["volatilidade"]
+    return {
+        "captura_minima_85pct": resumo["captura_pct"] >= GATE_CAPTURA_PCT,
+        "fp_maxima_10pct": vol["precisao_pct"] >= GATE_PRECISAO_PCT,
+        "win_rate_minimo_60pct": vol["win_rate_pct"] >= GATE_WIN_RATE_PCT,
+    }
 
-    # Criar validador
-    validator = BacktestValidator()
 
-    # Carregar dados
-    dados, spike_indices = await validator.carregar_dados_historicos(
-        ativo="WIN$N",
-        dias=60,
-        timeframe="M5"
+def gerar_relatorio(resumo: dict, barras: BarrasHistoricas) -> dict:
+    gates = avaliar_gates(resumo)
+    periodo = (
+        f"{barras.timestamps[0]:%Y-%m-%d} a {barras.timestamps[-1]:%Y-%m-%d}"
+        if len(barras) else "-"
     )
+    return {
+        "periodo": periodo,
+        "ativo": barras.symbol,
+        "timeframe": barras.timeframe,
+        "metricas": resumo,
+        "gates_validacao": gates,
+        "status": "PASS" if all(gates.values()) else "FAIL",
+        "timestamp": datetime.now().isoformat(),
+    }
+
+
+def imprimir_relatorio(relatorio: dict) -> None:
+    m = relatorio["metricas"]
+    print(f"\n{'='*70}")
+    print("📊 RELATÓRIO DE BACKTEST (replay histórico)")
+    print(f"{'='*70}\n")
+    print(f"Período: {relatorio['periodo']}")
+    print(f"Ativo: {relatorio['ativo']}  Timeframe: {relatorio['timeframe']}")
+    print(f"Parâmetros: threshold_sigma={m['threshold_sigma']} window={m['window']}  "
+          f"horizonte={m['horizonte_barras']} barras  alvo={m['alvo_pct']:.2%}\n")
+
+    print(f"{'MÉTRICAS':40} {'VALOR':>20}")
+    print(f"{'-'*70}")
+    for chave in ("barras", "oportunidades", "alertas", "captura_pct",
+                  "win_rate_pct", "precisao_pct", "retorno_medio_pct", "barras_por_segundo"):
+        print(f"  {chave:37} {m[chave]:>20}")
+
+    print(f"\n{'PADRÃO':28} {'ALERTAS':>8} {'WIN %':>8} {'PRECISÃO %':>11} {'RET. MÉD %':>11}")
+    print(f"{'-'*70}")
+    for padrao, por_padrao in relatorio.get("por_padrao", {}).items():
+        print(f"  {padrao:26} {por_padrao['alertas']:>8} {por_padrao['win_rate_pct']:>8.2f} "
+              f"{por_padrao['precisao_pct']:>11.2f} {por_padrao['retorno_medio_pct']:>11.4f}")
+
+    print(f"\n{'GATES DE VALIDAÇÃO':40} {'STATUS':>20}")
+    print(f"{'-'*70}")
+    for gate, passou in relatorio["gates_validacao"].items():
+        print(f"  {gate:37} {'✅ PASSOU' if passou else '❌ FALHOU':>20}")
+    print(f"\n{'RESULTADO FINAL':40} {relatorio['status']:>20}")
+    print(f"{'='*70}\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay histórico dos detectores de alerta.")
+    adicionar_argumentos_fonte(parser)
+    config = get_config().detection.volatilidade
+    parser.add_argument("--threshold-sigma", type=float, default=config.threshold_sigma)
+    parser.add_argument("--window", type=int, default=config.window)
+    parser.add_argument("--sem-padroes", action="store_true",
+                        help="Só o DetectorVolatilidade")
+    parser.add_argument("--saida", default="backtest_results.json")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO,
+                        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    barras = carregar_barras(args)
+    if len(barras) <= args.window:
+        raise SystemExit(f"Barras insuficientes: {len(barras)}")
+
+    resultado = executar_replay(
+        barras,
+        threshold_sigma=args.threshold_sigma,
+        window=args.window,
+        horizonte=args.horizonte,
+        alvo_pct=args.alvo_pct / 100,
+        padroes=not args.sem_padroes,
+    )
+    relatorio = gerar_relatorio(resultado.resumo(), barras)
+    relatorio["por_padrao"] = {
+        padrao: resultado.metricas(padrao) for padrao in relatorio["metricas"]["alertas_por_padrao"]
+    }
+    imprimir_relatorio(relatorio)
 
-    # Executar backtest
-    await validator.executar_backtest(dados, spike_indices)
-
-    # Gerar relatório
-    relatorio = validator.gerar_relatorio()
-
-    # Imprimir
-    validator.imprimir_relatorio(relatorio)
-
-    # Salvar JSON
-    with open("backtest_results.json", "w", encoding="utf-8") as f:
+    with open(args.saida, "w", encoding="utf-8") as f:
         json.dump(relatorio, f, ensure_ascii=False, indent=2)
-        logger.info(f"✅ Relatório salvo em backtest_results.json")
+    logger.info(f"✅ Relatório salvo em {args.saida}")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    main()
@@ -1,225 +1,80 @@
 """
 ML Expert - Backtest Realista Otimizado (INTEGRATION-ML-002)
 
-Versão otimizada com simulação mais realista.
+Escolhe os parâmetros do DetectorVolatilidade pelo replay de barras
+reais: roda a grade de backtest_tuning_parameters.py e fica com a
+melhor combinação que passa em todos os gates (captura >= 85%,
+FP <= 10%, win rate >= 60%). Se nenhuma passa, reporta a mais próxima
+e sai com código 1.
+
+Uso:
+    python scripts/backtest_optimizado.py
+    python scripts/backtest_optimizado.py --csv data/export/WIN_N_5min.csv
 """
 
-import asyncio
-import logging
+import argparse
 import json
-from datetime import datetime, timedelta
-from typing import List
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
-
+import logging
+import os
+import sys
 
-class BacktestOtimizado:
-    """Backtest com simulação otimizada e realista."""
-
-    def __init__(self, threshold_sigma: float = 2.0):
-        """Inicializar com threshold ajustável."""
-        self.threshold_sigma = threshold_sigma
-        self.velas_processadas = 0
-        self.alertas_gerados = 0
-        self.matches = 0
-        self.false_positives = 0
-        self.win_rate = 0.62
-
-    async def processar_backtest(self) -> dict:
-        """
-        Simula backtest com distribuição realista.
-
-        Modelo:
-        - Espera-se 1-3 oportunidades por DIA (não por vela)
-        - 60 dias = ~150 oportunidades esperadas
-        - Detector detecta 87% delas (threshold 2.0)
-        - Gera ~5-10% de FP (uma por 20-30 setups reais)
-        """
-        import random
-
-        dias = 60
-        oportunidades_esperadas = 145  # ~2.4 por dia (realista)
-
-        # Captura vs threshold
-        captura_map = {
-            1.0: 0.95,  # Muito sensível
-            1.3: 0.92,
-            1.5: 0.90,
-            1.8: 0.88,
-            2.0: 0.86,  # Default
-            2.2: 0.83,
-            2.5: 0.80,
-            3.0: 0.76,
-        }
-
-        # FP rate vs threshold (muito mais conservador)
-        fp_rate_map = {
-            1.0: 0.08,   # 8% das detecções são FP
-            1.3: 0.07,
-            1.5: 0.06,
-            1.8: 0.05,
-            2.0: 0.04,   # Default: 4% FP rate
-            2.2: 0.03,
-            2.5: 0.02,
-            3.0: 0.01,
-        }
-
-        captura_rate = captura_map.get(self.threshold_sigma, 0.86)
-        fp_rate = fp_rate_map.get(self.threshold_sigma, 0.04)
-
-        # Simular detecções
-        detecções_corretas = int(oportunidades_esperadas * captura_rate)
-        self.matches = detecções_corretas
-
-        # False positives (porcentagem do total de detecções corretas)
-        fp_count = int(detecções_corretas * fp_rate / (1 - fp_rate))
-        self.false_positives = fp_count
-
-        self.alertas_gerados = detecções_corretas + fp_count
-        self.velas_processadas = dias * 288
-
-        # Calcular métricas
-        taxa_captura = (self.matches / oportunidades_esperadas) * 100
-        taxa_fp = (self.false_positives / self.alertas_gerados * 100
-                  if self.alertas_gerados > 0 else 0)
-
-        # Gates
-        gate_captura = taxa_captura >= 85.0
-        gate_fp = taxa_fp <= 10.0
-        gate_win_rate = self.win_rate >= 0.60  # Corrigido: comparar com 0.60, não 60.0
-
-        status = "PASS" if all([gate_captura, gate_fp, gate_win_rate]) else "FAIL"
-
-        return {
-            "threshold_sigma": self.threshold_sigma,
-            "metricas": {
-                "velas_processadas": self.velas_processadas,
-                "alertas_gerados": self.alertas_gerados,
-                "oportunidades_esperadas": oportunidades_esperadas,
-                "matches": self.matches,
-                "false_positives": self.false_positives,
-                "false_negatives": oportunidades_esperadas - self.matches,
-            },
-            "taxas": {
-                "taxa_captura_pct": round(taxa_captura, 2),
-                "taxa_false_positive_pct": round(taxa_fp, 2),
-                "win_rate_estimado_pct": round(self.win_rate * 100, 2),
-            },
-            "gates_validacao": {
-                "captura_minima_85pct": gate_captura,
-                "fp_maxima_10pct": gate_fp,
-                "win_rate_minimo_60pct": gate_win_rate,
-            },
-            "status": status,
-            "timestamp": datetime.now().isoformat()
-        }
-
-
-async def executar_backtest_otimizado():
-    """Executa backtest otimizado com grid search."""
-    print("\n" + "="*80)
-    print("🧠 ML EXPERT - Backtest Otimizado (Modelo Realista)")
-    print("="*80 + "\n")
-
-    thresholds = [1.0, 1.3, 1.5, 1.8, 2.0, 2.2, 2.5, 3.0]
-    resultados = []
-
-    print(f"{'Threshold':<12} {'Captura%':<12} {'FP%':<12} {'Win%':<12}"
-          f"{'Status':<12} {'Gates'}".center(20))
-    print("-" * 100)
-
-    best_result = None
-
-    for threshold in thresholds:
-        validator = BacktestOtimizado(threshold_sigma=threshold)
-        relatorio = await validator.processar_backtest()
-
-        captura = relatorio["taxas"]["taxa_captura_pct"]
-        fp = relatorio["taxas"]["taxa_false_positive_pct"]
-        win = relatorio["taxas"]["win_rate_estimado_pct"]
-        status = relatorio["status"]
-
-        gates_str = ""
-        if relatorio["gates_validacao"]["captura_minima_85pct"]:
-            gates_str += "✅Cap "
-        else:
-            gates_str += "❌Cap "
-
-        if relatorio["gates_validacao"]["fp_maxima_10pct"]:
-            gates_str += "✅FP "
-        else:
-            gates_str += "❌FP "
-
-        if relatorio["gates_validacao"]["win_rate_minimo_60pct"]:
-            gates_str += "✅Win"
-        else:
-            gates_str += "❌Win"
-
-        status_symbol = "✅ PASS" if status == "PASS" else "❌ FAIL"
-        print(f"{threshold:<12.1f} {captura:<12.2f} {fp:<12.2f} {win:<12.2f} "
-              f"{status_symbol:<12} {gates_str}")
-
-        resultados.append(relatorio)
-
-        if status == "PASS" and best_result is None:
-            best_result = relatorio
-
-    print("-" * 100)
-
-    if best_result:
-        print(f"\n✅ RESULTADO FINAL - BACKTEST PASSOU!")
-        print(f"   Threshold ótimo: {best_result['threshold_sigma']}")
-        print(f"   Captura: {best_result['taxas']['taxa_captura_pct']}%"
-              f" ≥ 85% ✅")
-        print(f"   False Positives: {best_result['taxas']['taxa_false_positive_pct']}%"
-              f" ≤ 10% ✅")
-        print(f"   Win Rate: {best_result['taxas']['win_rate_estimado_pct']}%"
-              f" ≥ 60% ✅\n")
-        return best_result
-    else:
-        print(f"\n⚠️  Nenhum threshold passou em TODOS os gates.")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-        best = max(resultados, key=lambda r: sum([
-            r["gates_validacao"]["captura_minima_85pct"],
-            r["gates_validacao"]["fp_maxima_10pct"],
-            r["gates_validacao"]["win_rate_minimo_60pct"],
-        ]))
+from backtest_tuning_parameters import (
+    adicionar_argumentos_grade,
+    executar_grid,
+    imprimir_grade,
+    pontuacao,
+)
 
-        print(f"   Melhor aproximação: threshold = {best['threshold_sigma']}")
+logger = logging.getLogger(__name__)
 
-        cap_status = "✅" if best['gates_validacao']['captura_minima_85pct'] else "❌"
-        print(f"   Captura: {best['taxas']['taxa_captura_pct']}% "
-              f"(target: 85%) - {cap_status}")
 
-        fp_status = "✅" if best['gates_validacao']['fp_maxima_10pct'] else "❌"
-        print(f"   FP: {best['taxas']['taxa_false_positive_pct']}% "
-              f"(target: 10%) - {fp_status}")
+def escolher(resultados: list[dict]) -> dict:
+    """Melhor F1 entre os que passam; sem nenhum, o que passa em mais gates."""
+    aprovados = [r for r in resultados if r["status"] == "PASS"]
+    if aprovados:
+        return max(aprovados, key=pontuacao)
+    return max(
+        resultados,
+        key=lambda r: (sum(r["gates_validacao"].values()), pontuacao(r)),
+    )
 
-        win_status = "✅" if best['gates_validacao']['win_rate_minimo_60pct'] else "❌"
-        print(f"   Win: {best['taxas']['win_rate_estimado_pct']}% "
-              f"(target: 60%) - {win_status}\n")
 
-        return best
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Backtest otimizado do DetectorVolatilidade.")
+    adicionar_argumentos_grade(parser)
+    parser.add_argument("--saida", default="backtest_optimized_results.json")
+    args = parser.parse_args()
 
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
-async def main():
-    """Executar backtest."""
-    best_config = await executar_backtest_otimizado()
+    resultados = executar_grid(args)
+    imprimir_grade(resultados)
+    melhor = escolher(resultados)
+    vol = melhor["volatilidade"]
 
-    print("[SALVANDO] Resultado final em backtest_optimized_results.json")
-    with open("backtest_optimized_results.json", "w",
-              encoding="utf-8") as f:
-        json.dump(best_config, f, ensure_ascii=False, indent=2)
+    if melhor["status"] == "PASS":
+        print(f"\n✅ Parâmetros ótimos: threshold={melhor['threshold_sigma']} "
+              f"window={melhor['window']}")
+    else:
+        print("\n⚠️  Nenhuma combinação passou em TODOS os gates.")
+        print(f"   Melhor aproximação: threshold={melhor['threshold_sigma']} "
+              f"window={melhor['window']}")
+    for gate, valor, alvo in (
+        ("captura_minima_85pct", melhor["captura_pct"], "85%"),
+        ("fp_maxima_10pct", 100 - vol["precisao_pct"], "10%"),
+        ("win_rate_minimo_60pct", vol["win_rate_pct"], "60%"),
+    ):
+        status = "✅" if melhor["gates_validacao"][gate] else "❌"
+        print(f"   {gate:<24} {valor:6.2f}% (target: {alvo}) {status}")
 
-    logger.info("✅ Backtest otimizado completado\n")
+    print(f"\n[SALVANDO] Resultado final em {args.saida}")
+    with open(args.saida, "w", encoding="utf-8") as f:
+        json.dump(melhor, f, ensure_ascii=False, indent=2)
 
-    return 0 if best_config["status"] == "PASS" else 1
+    return 0 if melhor["status"] == "PASS" else 1
 
 
 if __name__ == "__main__":
-    exit_code = asyncio.run(main())
-    exit(exit_code)
+    sys.exit(main())
@@ -1,284 +1,101 @@
 """
 ML Expert - Parameter Tuning for Detectors (INTEGRATION-ML-002)
 
-Ajusta threshold_sigma para otimizar métricas.
+Varre threshold_sigma x window do DetectorVolatilidade sobre barras
+reais (market_data ou export CSV), com as combinações distribuídas
+entre processos. Cada combinação é um replay completo, rotulado pelo
+retorno futuro (ver scripts/backtest_detector.py).
+
+Uso:
+    python scripts/backtest_tuning_parameters.py
+    python scripts/backtest_tuning_parameters.py --thresholds 1.5 2 2.5 3 --windows 10 20 40
 """
 
-import asyncio
-import logging
+import argparse
 import json
-from datetime import datetime, timedelta
-from typing import List, Dict
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
-
-
-class BacktestComTunagem:
-    """Backtest com suporte a variação de parâmetros."""
-
-    def __init__(self, threshold_sigma: float = 2.0):
-        """Inicializar com threshold ajustável."""
-        self.threshold_sigma = threshold_sigma
-        self.velas_processadas = 0
-        self.alertas_gerados = 0
-        self.oportunidades_esperadas = 30
-        self.matches = 0
-        self.false_positives = 0
-        self.false_negatives = 0
-        self.win_rate = 0.62
-
-    async def carregar_dados_historicos(self, dias: int = 60) -> tuple:
-        """Carregar dados históricos simulados."""
-        velas_por_dia = 288
-        total_velas = dias * velas_por_dia
-
-        import random
-        dados = []
-        spike_indices = []
-        base_price = 127500.0
-
-        for i in range(total_velas):
-            data = (datetime.now() - timedelta(days=dias) +
-                   timedelta(minutes=5*i))
-
-            movimento = random.gauss(0, 100)
-            open_p = base_price + movimento
-            close_p = open_p + random.gauss(0, 150)
-
-            if i % (total_velas // 30) == 0 and i > 0:
-                close_p = base_price + random.gauss(0, 500)
-                spike_indices.append(i)
-
-            dados.append({
-                "time": data.isoformat(),
-                "open": round(open_p, 2),
-                "high": round(max(open_p, close_p) +
-                            abs(random.gauss(0, 50)), 2),
-                "low": round(min(open_p, close_p) -
-                            abs(random.gauss(0, 50)), 2),
-                "close": round(close_p, 2),
-                "volume": random.randint(100, 5000),
-                "ativo": "WIN$N"
-            })
-            base_price = close_p
-
-        return dados, spike_indices
-
-    async def processar_velas(self, dados: List[dict],
-                            spike_indices: List[int]):
-        """
-        Processa velas com threshold ajustável.
-
-        Quanto maior o threshold_sigma:
-        - Menos sensível (menos FP, mas menos captura)
-
-        Quanto menor o threshold_sigma:
-        - Mais sensível (mais captura, mas mais FP)
-        """
-        import random
-
-        # Captura melhora com sigma mais baixo
-        # threshold_sigma = 2.0 → 87% captura
-        # threshold_sigma = 1.5 → 92% captura
-        # threshold_sigma = 1.0 → 95% captura
-        captura_base = {
-            1.0: 0.95,
-            1.3: 0.93,
-            1.5: 0.91,
-            1.8: 0.89,
-            2.0: 0.87,
-            2.2: 0.85,
-            2.5: 0.82,
-            3.0: 0.78,
-        }
-
-        # FP rate piora com sigma mais baixo
-        # threshold_sigma = 3.0 → 2% FP
-        # threshold_sigma = 2.5 → 5% FP
-        # threshold_sigma = 2.0 → 8% FP
-        # threshold_sigma = 1.5 → 15% FP
-        # threshold_sigma = 1.0 → 25% FP
-        fp_base = {
-            1.0: 0.25,
-            1.3: 0.20,
-            1.5: 0.15,
-            1.8: 0.10,
-            2.0: 0.08,
-            2.2: 0.06,
-            2.5: 0.04,
-            3.0: 0.02,
-        }
-
-        # Buscar valores mais próximos
-        captura_rate = min(captura_base.values(),
-                          key=lambda x: abs(x - captura_base.get(
-                              self.threshold_sigma,
-                              captura_base[2.0])))
-        fp_rate = fp_base.get(self.threshold_sigma, fp_base[2.0])
-
-        # Simular detecções
-        deteccoes = 0
-        for spike_idx in spike_indices:
-            if random.random() < captura_rate:
-                self.matches += 1
-                deteccoes += 1
-
-        # False positives
-        for i in range(len(dados)):
-            if i not in spike_indices and random.random() < fp_rate:
-                self.false_positives += 1
-                deteccoes += 1
-
-        self.false_negatives = len(spike_indices) - self.matches
-        self.alertas_gerados = deteccoes
-        self.velas_processadas = len(dados)
-        self.oportunidades_esperadas = len(spike_indices)
-
-    def gerar_relatorio(self) -> dict:
-        """Gera relatório com métricas."""
-        taxa_captura = (
-            (self.matches / max(self.oportunidades_esperadas, 1)) * 100
-        )
-        taxa_fp = (
-            (self.false_positives / max(self.alertas_gerados, 1)) * 100
-            if self.alertas_gerados > 0 else 0
-        )
-
-        gate_captura = taxa_captura >= 85.0
-        gate_fp = taxa_fp <= 10.0
-        gate_win_rate = self.win_rate >= 60.0
-
-        status = "PASS" if all([
-            gate_captura, gate_fp, gate_win_rate
-        ]) else "FAIL"
-
-        return {
-            "threshold_sigma": self.threshold_sigma,
-            "metricas": {
-                "velas_processadas": self.velas_processadas,
-                "alertas_gerados": self.alertas_gerados,
-                "oportunidades_esperadas": self.oportunidades_esperadas,
-                "matches": self.matches,
-                "false_positives": self.false_positives,
-                "false_negatives": self.false_negatives,
-            },
-            "taxas": {
-                "taxa_captura_pct": round(taxa_captura, 2),
-                "taxa_false_positive_pct": round(taxa_fp, 2),
-                "win_rate_estimado_pct": round(self.win_rate * 100, 2),
-            },
-            "gates_validacao": {
-                "captura_minima_85pct": gate_captura,
-                "fp_maxima_10pct": gate_fp,
-                "win_rate_minimo_60pct": gate_win_rate,
-            },
-            "status": status,
-            "timestamp": datetime.now().isoformat()
-        }
-
-
-async def executar_grid_search() -> Dict:
-    """
-    Grid search sobre valores de threshold_sigma.
-
-    Encontra o melhor parâmetro que PASSA todos os gates.
-    """
-    print("\n" + "="*80)
-    print("🧠 ML EXPERT - Grid Search de Parameters")
-    print("="*80 + "\n")
-
-    # Carregar dados UMA VEZ (reutilizar em múltiplos testes)
-    test_validator = BacktestComTunagem()
-    dados, spike_indices = await test_validator.carregar_dados_historicos()
-
-    # Testar range de thresholds
-    thresholds = [1.0, 1.3, 1.5, 1.8, 2.0, 2.2, 2.5, 3.0]
-    resultados = []
-
-    print(f"{'Threshold':<12} {'Captura%':<12} {'FP%':<12} {'Win%':<12}"
-          f"{'Status':<8}")
-    print("-" * 80)
-
-    best_result = None
-
-    for threshold in thresholds:
-        validator = BacktestComTunagem(threshold_sigma=threshold)
-        await validator.processar_velas(dados, spike_indices)
-        relatorio = validator.gerar_relatorio()
-
-        # Imprimir resultado
-        captura = relatorio["taxas"]["taxa_captura_pct"]
-        fp = relatorio["taxas"]["taxa_false_positive_pct"]
-        win = relatorio["taxas"]["win_rate_estimado_pct"]
-        status = relatorio["status"]
+import logging
+import os
+import sys
+import time
 
-        print(f"{threshold:<12.1f} {captura:<12.2f} {fp:<12.2f} {win:<12.2f} "
-              f"{'✅' if status == 'PASS' else '❌':<8}")
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-        resultados.append(relatorio)
+from backtest_detector import adicionar_argumentos_fonte, avaliar_gates, carregar_barras
+from src.application.services.backtest.detector_replay import varrer_parametros
 
-        # Guardar melhor resultado
-        if status == "PASS" and best_result is None:
-            best_result = relatorio
+logger = logging.getLogger(__name__)
 
+THRESHOLDS_PADRAO = [1.0, 1.3, 1.5, 1.8, 2.0, 2.2, 2.5, 3.0]
+WINDOWS_PADRAO = [10, 20, 40]
+
+
+def adicionar_argumentos_grade(parser: argparse.ArgumentParser) -> None:
+    adicionar_argumentos_fonte(parser)
+    parser.add_argument("--thresholds", type=float, nargs="+", default=THRESHOLDS_PADRAO)
+    parser.add_argument("--windows", type=int, nargs="+", default=WINDOWS_PADRAO)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Processos da varredura (padrão: núcleos da máquina)")
+
+
+def executar_grid(args: argparse.Namespace) -> list[dict]:
+    """Carrega as barras e roda a grade; cada resumo ganha os gates."""
+    barras = carregar_barras(args)
+    logger.info(
+        f"Varredura: {len(args.thresholds)} thresholds x {len(args.windows)} windows "
+        f"sobre {len(barras)} barras {barras.symbol} {barras.timeframe}"
+    )
+    inicio = time.perf_counter()
+    resultados = varrer_parametros(
+        barras, args.thresholds, args.windows,
+        horizonte=args.horizonte, alvo_pct=args.alvo_pct / 100, workers=args.workers,
+    )
+    logger.info(f"Varredura concluída em {time.perf_counter() - inicio:.1f}s")
+    for resumo in resultados:
+        resumo["gates_validacao"] = avaliar_gates(resumo)
+        resumo["status"] = "PASS" if all(resumo["gates_validacao"].values()) else "FAIL"
+    return resultados
+
+
+def pontuacao(resumo: dict) -> float:
+    """F1 entre captura e precisão do detector de volatilidade."""
+    captura = resumo["captura_pct"]
+    precisao = resumo["volatilidade"]["precisao_pct"]
+    return 2 * captura * precisao / (captura + precisao) if captura + precisao else 0.0
+
+
+def imprimir_grade(resultados: list[dict]) -> None:
+    print(f"\n{'THRESHOLD':<10} {'WINDOW':<7} {'ALERTAS':>8} {'CAPTURA %':>10} "
+          f"{'PRECISÃO %':>11} {'WIN %':>7} {'RET. MÉD %':>11} {'BARRAS/s':>10}")
     print("-" * 80)
+    for r in resultados:
+        vol = r["volatilidade"]
+        print(f"{r['threshold_sigma']:<10.1f} {r['window']:<7} {vol['alertas']:>8} "
+              f"{r['captura_pct']:>10.2f} {vol['precisao_pct']:>11.2f} "
+              f"{vol['win_rate_pct']:>7.2f} {vol['retorno_medio_pct']:>11.4f} "
+              f"{r['barras_por_segundo']:>10,}")
 
-    if best_result:
-        print(f"\n✅ MELHOR RESULTADO ENCONTRADO")
-        print(f"   Threshold: {best_result['threshold_sigma']}")
-        print(f"   Captura: {best_result['taxas']['taxa_captura_pct']}%")
-        print(f"   FP: {best_result['taxas']['taxa_false_positive_pct']}%")
-        print(f"   Win: {best_result['taxas']['win_rate_estimado_pct']}%\n")
-        return best_result
-    else:
-        print(f"\n⚠️  Nenhum resultado passou em TODOS os gates.")
-        print(f"   Procurando melhor aproximação...\n")
-
-        # Retornar o que chegou mais perto dos gates
-        best = max(resultados, key=lambda r: (
-            r["gates_validacao"]["captura_minima_85pct"] * 1000 +
-            r["gates_validacao"]["fp_maxima_10pct"] * 1000 +
-            r["gates_validacao"]["win_rate_minimo_60pct"] * 1000
-        ))
-
-        print(f"⚠️  MELHOR APROXIMAÇÃO:")
-        print(f"   Threshold: {best['threshold_sigma']}")
 
-        captura_status = "✅" if best['gates_validacao']['captura_minima_85pct'] else "❌"
-        print(f"   Captura: {best['taxas']['taxa_captura_pct']}% "
-              f"(target: 85%) - {captura_status}")
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Grade de parâmetros do DetectorVolatilidade.")
+    adicionar_argumentos_grade(parser)
+    parser.add_argument("--saida", default="backtest_tuning_results.json")
+    args = parser.parse_args()
 
-        fp_status = "✅" if best['gates_validacao']['fp_maxima_10pct'] else "❌"
-        print(f"   FP: {best['taxas']['taxa_false_positive_pct']}% "
-              f"(target: 10%) - {fp_status}")
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
-        win_status = "✅" if best['gates_validacao']['win_rate_minimo_60pct'] else "❌"
-        print(f"   Win: {best['taxas']['win_rate_estimado_pct']}% "
-              f"(target: 60%) - {win_status}\n")
-
-        return best
-
-
-async def main():
-    """Executar grid search."""
-    best_config = await executar_grid_search()
-
-    # Salvar melhor resultado
-    print("\n[SALVANDO] Resultados em backtest_tuning_results.json")
-    print("-" * 80)
+    resultados = executar_grid(args)
+    imprimir_grade(resultados)
 
-    with open("backtest_tuning_results.json", "w",
-              encoding="utf-8") as f:
-        json.dump(best_config, f, ensure_ascii=False, indent=2)
+    melhor = max(resultados, key=pontuacao)
+    print(f"\n🏆 Melhor F1 (captura x precisão): threshold={melhor['threshold_sigma']} "
+          f"window={melhor['window']} ({pontuacao(melhor):.1f})")
 
-    logger.info("✅ Grid search completado\n")
-    return 0
+    print(f"\n[SALVANDO] Resultados em {args.saida}")
+    with open(args.saida, "w", encoding="utf-8") as f:
+        json.dump({"melhor": melhor, "grade": resultados}, f, ensure_ascii=False, indent=2)
 
 
 if __name__ == "__main__":
-    exit_code = asyncio.run(main())
-    exit(exit_code)
+    main()
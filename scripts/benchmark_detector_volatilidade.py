@@ -0,0 +1,136 @@
+"""Benchmark: DetectorVolatilidade sobre o universo do macro score.
+
+Simula B velas para os ~100 ativos do macro score (mais o WIN$N) e
+compara o custo por rodada (um fechamento de cada ativo):
+
+  - antes:   reconstrucao do caminho anterior — list(deque) a cada vela
+             e np.mean/np.std da janela recalculados do zero
+  - vela:    DetectorVolatilidade.analisar_vela, um ativo por chamada
+  - lote:    DetectorVolatilidade.analisar_lote, todos os ativos de uma vez
+
+Tambem confere que os tres produzem os mesmos alertas.
+
+Uso:
+    python scripts/benchmark_detector_volatilidade.py
+    python scripts/benchmark_detector_volatilidade.py --bars 2000 --window 50
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import numpy as np
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT_DIR)
+
+from src.application.services.detector_volatilidade import DetectorVolatilidade
+from src.application.services.macro_score.item_registry import get_item_registry
+
+
+class _DetectorLegado:
+    """So o calculo de z do detector anterior (sem criar alertas)."""
+
+    def __init__(self, window: int, threshold_sigma: float, lookback_bars: int = 100):
+        self.window = window
+        self.threshold_sigma = threshold_sigma
+        self.lookback_bars = lookback_bars
+        self.cache_precos = {}
+        self.cache_z_score_anterior = {}
+
+    def analisar_vela(self, symbol: str, close: Decimal) -> bool:
+        if symbol not in self.cache_precos:
+            self.cache_precos[symbol] = deque(maxlen=self.lookback_bars)
+        self.cache_precos[symbol].append(float(close))
+        precos = list(self.cache_precos[symbol])
+        if len(precos) < self.window:
+            return False
+        precos_janela = precos[-self.window:]
+        media = float(np.mean(precos_janela))
+        sigma = float(np.std(precos_janela))
+        if sigma < 1e-6:
+            return False
+        z_score = (float(close) - media) / sigma
+        anterior = self.cache_z_score_anterior.get(symbol, 0)
+        self.cache_z_score_anterior[symbol] = z_score
+        return z_score > self.threshold_sigma and anterior > self.threshold_sigma
+
+
+def _universo() -> list[str]:
+    return ["WIN$N"] + [item.symbol for item in get_item_registry()]
+
+
+def _series(simbolos: list[str], bars: int, seed: int = 5) -> list[list[Decimal]]:
+    """Uma rodada por barra: fechamento de cada ativo (passeio com saltos)."""
+    rng = random.Random(seed)
+    precos = [rng.uniform(20, 130000) for _ in simbolos]
+    rodadas = []
+    for _ in range(bars):
+        for i, p in enumerate(precos):
+            passo = rng.gauss(0, p * 0.001)
+            if rng.random() < 0.02:
+                passo += p * 0.01 * rng.choice([-1, 1])
+            precos[i] = max(p + passo, 1.0)
+        rodadas.append([Decimal(f"{p:.2f}") for p in precos])
+    return rodadas
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark do detector de volatilidade.")
+    parser.add_argument("--bars", type=int, default=1000, help="Rodadas (velas por ativo)")
+    parser.add_argument("--window", type=int, default=20)
+    parser.add_argument("--threshold", type=float, default=2.0)
+    args = parser.parse_args()
+
+    logging.getLogger("src.application.services.detector_volatilidade").setLevel(logging.WARNING)
+    simbolos = _universo()
+    rodadas = _series(simbolos, args.bars)
+    t0_barra = datetime(2026, 3, 2, 10, 0)
+    resultados = {}
+
+    legado = _DetectorLegado(args.window, args.threshold)
+    disparos = []
+    t0 = time.perf_counter()
+    for b, closes in enumerate(rodadas):
+        for symbol, close in zip(simbolos, closes):
+            if legado.analisar_vela(symbol, close):
+                disparos.append((b, symbol))
+    resultados["antes"] = (time.perf_counter() - t0, disparos)
+
+    detector = DetectorVolatilidade(window=args.window, threshold_sigma=args.threshold)
+    disparos = []
+    t0 = time.perf_counter()
+    for b, closes in enumerate(rodadas):
+        ts = t0_barra + timedelta(minutes=5 * b)
+        for symbol, close in zip(simbolos, closes):
+            if detector.analisar_vela(symbol, close, ts):
+                disparos.append((b, symbol))
+    resultados["vela"] = (time.perf_counter() - t0, disparos)
+
+    detector = DetectorVolatilidade(window=args.window, threshold_sigma=args.threshold)
+    disparos = []
+    t0 = time.perf_counter()
+    for b, closes in enumerate(rodadas):
+        ts = t0_barra + timedelta(minutes=5 * b)
+        alertas = detector.analisar_lote(zip(simbolos, closes), ts)
+        disparos += [(b, str(a.ativo)) for a in alertas]
+    resultados["lote"] = (time.perf_counter() - t0, disparos)
+
+    base = resultados["antes"][0]
+    print(f"\n{len(simbolos)} ativos x {args.bars} velas, window={args.window}")
+    print("-" * 64)
+    for nome, (elapsed, disparos_) in resultados.items():
+        print(f"{nome:<6} {elapsed / args.bars * 1000:8.3f} ms/rodada │ "
+              f"{len(disparos_):5} alertas │ {base / elapsed:5.1f}x")
+    iguais = resultados["antes"][1] == resultados["vela"][1] == resultados["lote"][1]
+    print(f"\nMesmos alertas nos tres caminhos: {'sim' if iguais else 'NAO'}")
+
+
+if __name__ == "__main__":
+    main()
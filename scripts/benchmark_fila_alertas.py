@@ -0,0 +1,213 @@
+"""Benchmark: FilaAlertas (shards por padrao + expiracao O(1)) vs. layout anterior.
+
+Tempestade de alertas com P produtores concorrentes (tasks) enfileirando
+em paralelo e um consumidor esvaziando a fila. Compara:
+
+  - antes:  reconstrucao do algoritmo anterior — lock global, datetime.now,
+            SHA-256 da chave, dicts sem limite e limpeza varrendo o cache
+  - depois: a FilaAlertas atual
+
+Reporta vazao de enfileiramento (alertas ofertados/s), entradas retidas
+no cache de dedup, pico de memoria alocada (tracemalloc) e o custo de uma
+passada de limpeza com o cache cheio.
+
+Uso:
+    python scripts/benchmark_fila_alertas.py
+    python scripts/benchmark_fila_alertas.py --producers 16 --alerts 200000
+"""
+
+import argparse
+import asyncio
+import hashlib
+import logging
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from decimal import Decimal
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT_DIR)
+
+from src.domain.entities.alerta import AlertaOportunidade
+from src.domain.enums.alerta_enums import NivelAlerta, PatraoAlerta
+from src.domain.value_objects import Symbol
+from src.infrastructure.providers.fila_alertas import FilaAlertas
+
+logger = logging.getLogger("fila_legada")
+
+
+class _FilaLegada:
+    """Caminho de enfileiramento e limpeza como eram antes (referencia)."""
+
+    def __init__(self, max_queue_size: int, rate_limit_seconds: float, dedup_ttl_seconds: float):
+        self.fila = asyncio.Queue(maxsize=max_queue_size)
+        self.lock = asyncio.Lock()
+        self.rate_limiter = {}
+        self.dedup_cache = {}
+        self.rate_limit_seconds = rate_limit_seconds
+        self.dedup_ttl_seconds = dedup_ttl_seconds
+
+    async def enfileirar(self, alerta: AlertaOportunidade) -> bool:
+        async with self.lock:
+            agora = datetime.now()
+            ultima_vez = self.rate_limiter.get(alerta.padrao.value)
+            if ultima_vez:
+                elapsed = (agora - ultima_vez).total_seconds()
+                if elapsed < self.rate_limit_seconds:
+                    logger.debug(
+                        f"Rate limit: {alerta.padrao.value} ainda em cooldown "
+                        f"({elapsed:.1f}s < {self.rate_limit_seconds}s)"
+                    )
+                    return False
+            hash_alerta = self._calcular_hash(alerta)
+            if hash_alerta in self.dedup_cache:
+                idade = (agora - self.dedup_cache[hash_alerta]).total_seconds()
+                if idade < self.dedup_ttl_seconds:
+                    logger.debug(
+                        f"Dedup: alerta {alerta.id} é duplicado "
+                        f"(idade {idade:.1f}s, TTL {self.dedup_ttl_seconds}s)"
+                    )
+                    return False
+                del self.dedup_cache[hash_alerta]
+            try:
+                self.fila.put_nowait((alerta, agora))
+            except asyncio.QueueFull:
+                return False
+            self.rate_limiter[alerta.padrao.value] = agora
+            self.dedup_cache[hash_alerta] = agora
+            logger.info(f"✅ Alerta enfileirado: {alerta.id} (padrão: {alerta.padrao.value})")
+            alerta.marcar_enfileirado()
+            return True
+
+    def _calcular_hash(self, alerta: AlertaOportunidade) -> str:
+        preco_tolerance = float(alerta.preco_atual) * 0.005
+        preco_rounded = int(float(alerta.preco_atual) / preco_tolerance) * preco_tolerance
+        dados = f"{alerta.ativo}|{alerta.padrao.value}|{preco_rounded:.2f}"
+        return hashlib.sha256(dados.encode()).hexdigest()[:16]
+
+    def limpar(self) -> int:
+        agora = datetime.now()
+        expiradas = [
+            h for h, ts in self.dedup_cache.items()
+            if (agora - ts).total_seconds() > self.dedup_ttl_seconds
+        ]
+        for h in expiradas:
+            del self.dedup_cache[h]
+        return len(expiradas)
+
+    def tamanho_dedup(self) -> int:
+        return len(self.dedup_cache)
+
+
+def _limpar_atual(fila: FilaAlertas) -> int:
+    return sum(s.dedup.expurgar(time.monotonic()) for s in fila._shards.values())
+
+
+def _alertas(n: int, dup_ratio: float, seed: int = 7) -> list[AlertaOportunidade]:
+    rng = random.Random(seed)
+    padroes = list(PatraoAlerta)
+    agora = datetime.now()
+    out, recentes = [], []
+    for _ in range(n):
+        if recentes and rng.random() < dup_ratio:
+            padrao, preco = rng.choice(recentes)
+        else:
+            padrao, preco = rng.choice(padroes), 5 * rng.randint(20000, 32000)
+            recentes.append((padrao, preco))
+            del recentes[:-50]
+        out.append(AlertaOportunidade(
+            ativo=Symbol("WIN$N"), padrao=padrao, nivel=NivelAlerta.ALTO,
+            preco_atual=Decimal(preco), timestamp_deteccao=agora,
+            entrada_minima=Decimal(preco - 50), entrada_maxima=Decimal(preco + 50),
+            stop_loss=Decimal(preco - 300), confianca=Decimal("0.8"),
+            risk_reward=Decimal("2"),
+        ))
+    return out
+
+
+async def _tempestade(fila, alertas: list, producers: int) -> tuple[float, int]:
+    async def produtor(lote):
+        aceitos = 0
+        for i, alerta in enumerate(lote):
+            aceitos += await fila.enfileirar(alerta)
+            if i % 16 == 0:
+                await asyncio.sleep(0)  # intercala os produtores
+        return aceitos
+
+    async def consumidor():
+        while True:
+            await fila.fila.get()
+
+    tarefa = asyncio.create_task(consumidor())
+    lotes = [alertas[i::producers] for i in range(producers)]
+    t0 = time.perf_counter()
+    aceitos = sum(await asyncio.gather(*(produtor(lote) for lote in lotes)))
+    elapsed = time.perf_counter() - t0
+    tarefa.cancel()
+    return elapsed, aceitos
+
+
+def _medir(nome: str, criar, alertas: list, producers: int) -> dict:
+    # Aquecimento (caches e caminhos do interpretador)
+    asyncio.run(_tempestade(criar(), alertas[:2000], producers))
+
+    tracemalloc.start()
+    fila = criar()
+    elapsed, aceitos = asyncio.run(_tempestade(fila, alertas, producers))
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    if isinstance(fila, FilaAlertas):
+        retidas = fila.obter_metricas()["dedup_cache_size"]
+        limpar = lambda: _limpar_atual(fila)  # noqa: E731
+    else:
+        retidas = fila.tamanho_dedup()
+        limpar = fila.limpar
+    t0 = time.perf_counter()
+    limpar()  # nada vencido: mede so o custo de procurar
+    limpeza_ms = (time.perf_counter() - t0) * 1000
+    return {
+        "nome": nome, "elapsed": elapsed, "aceitos": aceitos, "retidas": retidas,
+        "pico_mb": pico / 2**20, "limpeza_ms": limpeza_ms,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de enfileiramento da FilaAlertas.")
+    parser.add_argument("--alerts", type=int, default=100_000, help="Alertas ofertados")
+    parser.add_argument("--producers", type=int, default=8, help="Produtores concorrentes")
+    parser.add_argument("--dup-ratio", type=float, default=0.3, help="Fracao de repetidos")
+    parser.add_argument("--dedup-ttl-s", type=float, default=120.0)
+    parser.add_argument("--max-dedup", type=int, default=10_000,
+                        help="max_dedup_por_padrao da fila atual")
+    args = parser.parse_args()
+
+    alertas = _alertas(args.alerts, args.dup_ratio)
+    fila_size = args.alerts + 1  # o consumidor acompanha; so para nao rejeitar por cheia
+
+    resultados = [
+        _medir("Antes", lambda: _FilaLegada(fila_size, 0, args.dedup_ttl_s),
+               alertas, args.producers),
+        _medir("Depois", lambda: FilaAlertas(
+            max_queue_size=fila_size, rate_limit_seconds=0,
+            dedup_ttl_seconds=args.dedup_ttl_s, max_dedup_por_padrao=args.max_dedup,
+        ), alertas, args.producers),
+    ]
+
+    print(f"\nTempestade: {args.alerts:,} alertas, {args.producers} produtores, "
+          f"{args.dup_ratio:.0%} repetidos, TTL {args.dedup_ttl_s:.0f}s")
+    print("-" * 86)
+    for r in resultados:
+        print(f"{r['nome']:<7} {args.alerts / r['elapsed']:10,.0f} alertas/s │ "
+              f"aceitos {r['aceitos']:7,} │ retidas {r['retidas']:7,} │ "
+              f"pico {r['pico_mb']:6.1f} MB │ limpeza {r['limpeza_ms']:7.2f} ms")
+    antes, depois = resultados
+    print(f"\nVazao: {antes['elapsed'] / depois['elapsed']:.1f}x │ "
+          f"limpeza: {antes['limpeza_ms'] / max(depois['limpeza_ms'], 1e-6):.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Benchmark: detail/summary sob demanda no BacktestMacroScoreEngine.
+
+Roda ``score_at_bar`` sobre um pregao sintetico (registry completo,
+barras M15 e candles M5 do WIN gerados em memoria) em dois modos:
+
+  - eager: le ``detail`` de todos os itens e o ``summary`` logo apos cada
+    barra — mesmo custo da formatacao antecipada de antes
+  - lazy:  so os numeros; nenhum texto e montado (uso tipico do backtest,
+    que consome score/sinal)
+
+Uso:
+    python scripts/benchmark_lazy_detail.py
+    python scripts/benchmark_lazy_detail.py --days 20 --sem-indicadores
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Optional
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT_DIR)
+
+from src.application.services.backtest.backtest_engine import BacktestMacroScoreEngine
+from src.application.services.macro_score.forex_handler import ForexScoreHandler
+from src.application.services.macro_score.item_registry import get_item_registry
+from src.application.services.macro_score.technical_scorer import TechnicalIndicatorScorer
+from src.domain.enums.macro_score_enums import ScoringType
+from src.domain.enums.trading_enums import TimeFrame
+from src.domain.value_objects import Price, Symbol
+from src.infrastructure.adapters.mt5_adapter import Candle, MT5Adapter
+
+BARS_PER_DAY = 37  # M15 de 09:00 a 18:00
+
+
+class _SyntheticDay:
+    """Interface do HistoricalDataProvider usada pelo engine de backtest."""
+
+    def __init__(self, registry, seed: int) -> None:
+        rng = random.Random(seed)
+        start = datetime(2026, 2, 16, 9, 0)
+        self._m5 = self._candles(rng, start - timedelta(hours=12), TimeFrame.M5, 300, 5)
+        self._m15 = self._candles(rng, start, TimeFrame.M15, BARS_PER_DAY, 15)
+        self._opens: dict[str, Decimal] = {}
+        self._closes: dict[str, list[Decimal]] = {}
+        for config in registry:
+            base = Decimal(rng.randint(10, 200000)) / Decimal(100)
+            self._opens[config.symbol] = base
+            self._closes[config.symbol] = [
+                base + Decimal(rng.randint(-300, 300)) / Decimal(100)
+                for _ in range(BARS_PER_DAY)
+            ]
+
+    @staticmethod
+    def _candles(rng, start, tf, count, minutes) -> list[Candle]:
+        out, price = [], 130000
+        for i in range(count):
+            o, c = price, price + 5 * rng.randint(-10, 10)
+            out.append(Candle(
+                symbol=Symbol("WIN$N"), timeframe=tf,
+                open=Price(Decimal(o)), high=Price(Decimal(max(o, c) + 15)),
+                low=Price(Decimal(min(o, c) - 15)), close=Price(Decimal(c)),
+                volume=rng.randint(100, 900), timestamp=start + timedelta(minutes=minutes * i),
+            ))
+            price = c
+        return out
+
+    def get_resolved_symbol(self, registry_symbol: str) -> Optional[str]:
+        return registry_symbol
+
+    def get_daily_open(self, resolved_symbol: str) -> Optional[Decimal]:
+        return self._opens.get(resolved_symbol)
+
+    def get_price_at_bar(self, resolved_symbol: str, bar_index: int) -> Optional[Decimal]:
+        closes = self._closes.get(resolved_symbol)
+        return closes[bar_index] if closes and bar_index < len(closes) else None
+
+    def get_win_bars(self) -> list[Candle]:
+        return self._m15
+
+    def get_win_m5_candles_up_to(self, up_to_time: datetime) -> list[Candle]:
+        return [c for c in self._m5 if c.timestamp <= up_to_time][-200:]
+
+
+def _run(engines, eager: bool) -> float:
+    t0 = time.perf_counter()
+    for engine in engines:
+        for bar in range(BARS_PER_DAY):
+            result = engine.score_at_bar(bar)
+            if eager:
+                for item in result.items:
+                    item.detail
+                result.summary
+    return (time.perf_counter() - t0) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de detail sob demanda no backtest.")
+    parser.add_argument("--days", type=int, default=5, help="Pregoes sinteticos")
+    parser.add_argument("--rounds", type=int, default=3, help="Repeticoes (mediana)")
+    parser.add_argument("--sem-indicadores", action="store_true",
+                        help="So itens de preco (isola o custo da formatacao)")
+    args = parser.parse_args()
+
+    registry = get_item_registry()
+    if args.sem_indicadores:
+        registry = [c for c in registry if c.scoring_type != ScoringType.TECHNICAL_INDICATOR]
+
+    mt5 = MT5Adapter(0, "", "")  # Nao conectado: o backtest nao consulta o terminal
+    engines = [
+        BacktestMacroScoreEngine(
+            data_provider=_SyntheticDay(registry, seed),
+            registry=registry,
+            technical_scorer=TechnicalIndicatorScorer(mt5),
+            forex_handler=ForexScoreHandler(mt5),
+        )
+        for seed in range(args.days)
+    ]
+
+    _run(engines[:1], eager=True)  # aquecimento
+    eager = statistics.median(_run(engines, eager=True) for _ in range(args.rounds))
+    lazy = statistics.median(_run(engines, eager=False) for _ in range(args.rounds))
+
+    bars = args.days * BARS_PER_DAY
+    print(f"\nBacktest sintetico: {args.days} pregoes x {BARS_PER_DAY} barras M15 "
+          f"x {len(registry)} itens")
+    print("-" * 60)
+    print(f"{'Texto antecipado':<20} {eager:9.1f} ms │ {eager / bars:6.2f} ms/barra")
+    print(f"{'Texto sob demanda':<20} {lazy:9.1f} ms │ {lazy / bars:6.2f} ms/barra")
+    print(f"\nEconomia: {eager - lazy:.1f} ms ({(1 - lazy / eager) * 100:.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
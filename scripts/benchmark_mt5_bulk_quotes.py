@@ -0,0 +1,155 @@
+"""Benchmark: cotacoes por simbolo vs. lote colunar no MT5Adapter.
+
+Compara, para N simbolos (padrao: os do registry do macro score):
+
+  - por simbolo: get_symbol_info_tick + get_daily_candle (TickData/Candle
+    com Decimal(str(...)) e _ensure_connected a cada chamada)
+  - em lote:     get_ticks + get_daily_bars (arrays numpy, uma checagem
+    de conexao por lote)
+
+Reporta tempo por ciclo (mediana/p95), custo de conversao por simbolo e
+numero de chamadas ao terminal. Sem --live, usa um terminal sintetico em
+memoria (mede so o overhead do adapter; latencia de IPC fica de fora).
+
+Uso:
+    python scripts/benchmark_mt5_bulk_quotes.py
+    python scripts/benchmark_mt5_bulk_quotes.py --symbols 300 --rounds 200
+    python scripts/benchmark_mt5_bulk_quotes.py --live
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+from types import SimpleNamespace
+
+import numpy as np
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT_DIR)
+
+from src.application.services.macro_score.item_registry import get_item_registry
+from src.infrastructure.adapters.mt5_adapter import MT5Adapter
+
+_RATE_DTYPE = np.dtype([
+    ("time", "<i8"), ("open", "<f8"), ("high", "<f8"), ("low", "<f8"),
+    ("close", "<f8"), ("tick_volume", "<u8"), ("spread", "<i4"), ("real_volume", "<u8"),
+])
+
+
+class _SyntheticTerminal:
+    """Imita as chamadas do pacote MetaTrader5 usadas pelo adapter."""
+
+    TIMEFRAME_D1 = 16408
+
+    def __init__(self) -> None:
+        self.calls: Counter = Counter()
+        now = int(time.time())
+        self._terminal = SimpleNamespace(trade_allowed=True)
+        self._tick = SimpleNamespace(
+            bid=128755.0, ask=128760.0, last=128760.0, volume=3, time=now,
+        )
+        self._rates = np.array(
+            [(now - now % 86400, 128100.0, 129020.0, 127880.0, 128760.0, 51234, 5, 0)],
+            dtype=_RATE_DTYPE,
+        )
+
+    def terminal_info(self):
+        self.calls["terminal_info"] += 1
+        return self._terminal
+
+    def symbol_info_tick(self, symbol):
+        self.calls["symbol_info_tick"] += 1
+        return self._tick
+
+    def copy_rates_from_pos(self, symbol, timeframe, start, count):
+        self.calls["copy_rates_from_pos"] += 1
+        return self._rates
+
+
+def _per_symbol(adapter: MT5Adapter, symbols: list[str]) -> None:
+    for code in symbols:
+        adapter.get_symbol_info_tick(code)
+        adapter.get_daily_candle(code)
+
+
+def _bulk(adapter: MT5Adapter, symbols: list[str]) -> None:
+    adapter.get_ticks(symbols)
+    adapter.get_daily_bars(symbols)
+
+
+def _measure(fn, adapter, symbols, rounds, terminal) -> dict:
+    fn(adapter, symbols)  # aquecimento
+    if terminal is not None:
+        terminal.calls.clear()
+    samples = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn(adapter, symbols)
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    calls = (
+        {k: v / rounds for k, v in terminal.calls.items()} if terminal is not None else {}
+    )
+    return {
+        "median_ms": statistics.median(samples),
+        "p95_ms": samples[max(0, int(len(samples) * 0.95) - 1)],
+        "calls": calls,
+    }
+
+
+def _symbols(n: int) -> list[str]:
+    base = [c.symbol for c in get_item_registry()]
+    out = []
+    while len(out) < n:
+        out.extend(base)
+    return out[:n]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de cotacoes em lote do MT5Adapter.")
+    parser.add_argument("--symbols", type=int, default=None, help="Numero de simbolos (padrao: registry)")
+    parser.add_argument("--rounds", type=int, default=100, help="Ciclos medidos por modo")
+    parser.add_argument("--live", action="store_true", help="Usar o terminal MT5 real (config/.env)")
+    args = parser.parse_args()
+
+    n = args.symbols or len(get_item_registry())
+    symbols = _symbols(n)
+
+    if args.live:
+        from config import get_config
+
+        config = get_config()
+        adapter = MT5Adapter(config.mt5_login, config.mt5_password, config.mt5_server)
+        adapter.connect()
+        terminal = None
+    else:
+        adapter = MT5Adapter(0, "", "")
+        terminal = _SyntheticTerminal()
+        adapter._mt5 = terminal
+
+    try:
+        per_symbol = _measure(_per_symbol, adapter, symbols, args.rounds, terminal)
+        bulk = _measure(_bulk, adapter, symbols, args.rounds, terminal)
+    finally:
+        if args.live:
+            adapter.disconnect()
+
+    mode = "terminal real" if args.live else "terminal sintetico"
+    print(f"\nCotacoes de {n} simbolos x {args.rounds} ciclos ({mode})")
+    print("-" * 64)
+    for label, r in (("Por simbolo", per_symbol), ("Lote colunar", bulk)):
+        per_sym_us = r["median_ms"] * 1000 / n
+        print(f"{label:<14} mediana {r['median_ms']:8.2f} ms | p95 {r['p95_ms']:8.2f} ms"
+              f" | {per_sym_us:6.1f} us/simbolo")
+        if r["calls"]:
+            calls = ", ".join(f"{k}={v:.0f}" for k, v in sorted(r["calls"].items()))
+            print(f"{'':<14} chamadas/ciclo: {calls}")
+    if bulk["median_ms"] > 0:
+        print(f"\nGanho: {per_symbol['median_ms'] / bulk['median_ms']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
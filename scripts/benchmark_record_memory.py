@@ -0,0 +1,210 @@
+"""Benchmark de memoria: registros com __slots__ vs. com __dict__.
+
+Compara os registros mais numerosos de backtests e diarios nas duas
+formas:
+
+  - antes:  dataclass comum (um ``__dict__`` por instancia) — reconstruida
+            aqui a partir dos campos da classe real
+  - depois: a classe real, ``@dataclass(slots=True)``
+
+Classes: Price, TickData, Candle (mt5_adapter), ItemScoreResult (macro
+score), MacroItem, RegionOfInterest e Opportunity (agente micro).
+
+Reporta o tamanho por objeto (objeto + ``__dict__``) e, para um dia
+completo sintetico (ticks, candles M1/M5/M15 por ciclo, itens macro,
+regioes e oportunidades de cada ciclo, tudo retido como num backtest),
+o pico de memoria alocada (tracemalloc) e o pico de RSS do processo.
+Cada modo roda em um subprocesso proprio para o RSS nao se misturar.
+
+Uso:
+    python scripts/benchmark_record_memory.py
+    python scripts/benchmark_record_memory.py --ticks 120000 --cycles 280
+"""
+
+import argparse
+import dataclasses
+import json
+import os
+import random
+import subprocess
+import sys
+import tracemalloc
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "scripts"))
+
+from src.application.services.macro_score.engine import ItemScoreResult
+from src.domain.enums.macro_score_enums import AssetCategory, CorrelationType
+from src.domain.enums.trading_enums import TimeFrame
+from src.domain.value_objects import Price, Symbol
+from src.infrastructure.adapters.mt5_adapter import Candle, TickData
+
+
+def _record_classes() -> dict[str, type]:
+    import agente_micro_tendencia_winfut as agente
+
+    return {
+        "Price": Price,
+        "TickData": TickData,
+        "Candle": Candle,
+        "ItemScoreResult": ItemScoreResult,
+        "MacroItem": agente.MacroItem,
+        "RegionOfInterest": agente.RegionOfInterest,
+        "Opportunity": agente.Opportunity,
+    }
+
+
+def _dict_clone(cls: type) -> type:
+    """Mesma dataclass, sem slots (layout de antes)."""
+    specs = []
+    for f in dataclasses.fields(cls):
+        kw = {}
+        if f.default is not dataclasses.MISSING:
+            kw["default"] = f.default
+        if f.default_factory is not dataclasses.MISSING:
+            kw["default_factory"] = f.default_factory
+        specs.append((f.name, f.type, dataclasses.field(**kw)))
+    frozen = cls.__dataclass_params__.frozen
+    return dataclasses.make_dataclass(f"{cls.__name__}Dict", specs, frozen=frozen)
+
+
+def _classes(mode: str) -> dict[str, type]:
+    real = _record_classes()
+    if mode == "slots":
+        return real
+    return {name: _dict_clone(cls) for name, cls in real.items()}
+
+
+def _deep_size(obj) -> int:
+    """Objeto + __dict__ (os valores dos campos ficam de fora)."""
+    size = sys.getsizeof(obj)
+    if hasattr(obj, "__dict__"):
+        size += sys.getsizeof(obj.__dict__)
+    return size
+
+
+# ────────────────────────────────────────────────────────────────
+# Dia sintetico
+# ────────────────────────────────────────────────────────────────
+
+def _full_day(c: dict[str, type], n_ticks: int, n_cycles: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    P = c["Price"]
+    sym = Symbol("WIN$N")
+    start = datetime(2026, 2, 16, 9, 0)
+    kept: list = []
+
+    price = 130000
+    for i in range(n_ticks):
+        price += 5 * rng.randint(-1, 1)
+        kept.append(c["TickData"](
+            symbol=sym, bid=P(Decimal(price - 5)), ask=P(Decimal(price)),
+            last=P(Decimal(price)), volume=rng.randint(1, 20),
+            timestamp=start + timedelta(milliseconds=300 * i),
+        ))
+
+    for cycle in range(n_cycles):
+        now = start + timedelta(minutes=2 * cycle)
+        # Janelas de candles buscadas a cada ciclo (M1 x 500, M5 x 200, M15 x 100)
+        for tf, count in ((TimeFrame.M1, 500), (TimeFrame.M5, 200), (TimeFrame.M15, 100)):
+            p = 130000 + 5 * rng.randint(-200, 200)
+            for _ in range(count):
+                o, cl = p, p + 5 * rng.randint(-6, 6)
+                kept.append(c["Candle"](
+                    symbol=sym, timeframe=tf,
+                    open=P(Decimal(o)), high=P(Decimal(max(o, cl) + 10)),
+                    low=P(Decimal(min(o, cl) - 10)), close=P(Decimal(cl)),
+                    volume=rng.randint(100, 900), timestamp=now,
+                ))
+                p = cl
+        for n in range(1, 109):
+            kept.append(c["ItemScoreResult"](
+                item_number=n, symbol=f"SYM{n}", name=f"Item {n}",
+                category=AssetCategory.INDICES_BRASIL, correlation=CorrelationType.DIRETA,
+                resolved_symbol=f"SYM{n}", opening_price=Decimal(1000 + n),
+                current_price=Decimal(1001 + n), raw_score=1, final_score=1,
+                weight=Decimal("1"), weighted_score=Decimal("1"), available=True,
+                detail=f"Abertura: {1000 + n} | Atual: {1001 + n}",
+            ))
+            kept.append(c["MacroItem"](
+                number=n, symbol=f"SYM{n}", name=f"Item {n}", category="INDICES_BR",
+                correlation="DIRETA", score=1, price_current=Decimal(1001 + n),
+                price_open=Decimal(1000 + n), available=True,
+            ))
+        for r in range(40):
+            kept.append(c["RegionOfInterest"](
+                price=Decimal(129000 + 50 * r), label=f"R{r}", tipo="SUPORTE",
+                confluences=1 + r % 3, source_tf="M5",
+            ))
+        for _ in range(2):
+            kept.append(c["Opportunity"](
+                direction="COMPRA", entry=Decimal(130000), stop_loss=Decimal(129850),
+                take_profit=Decimal(130300), risk_reward=Decimal("2"),
+                confidence=Decimal("0.7"), reason="teste", region="VWAP",
+            ))
+    return kept
+
+
+def _run_mode(mode: str, n_ticks: int, n_cycles: int) -> dict:
+    import resource
+
+    c = _classes(mode)
+    sample = _full_day(c, 1, 1)
+    sizes: dict[str, int] = {}
+    for obj in sample:
+        sizes.setdefault(type(obj).__name__.removesuffix("Dict"), _deep_size(obj))
+    sizes["Price"] = _deep_size(c["Price"](Decimal(1)))
+
+    tracemalloc.start()
+    kept = _full_day(c, n_ticks, n_cycles)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "mode": mode,
+        "objects": len(kept),
+        "sizes": sizes,
+        "peak_traced_mb": peak / 2**20,
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Memoria de registros slots vs __dict__.")
+    parser.add_argument("--ticks", type=int, default=60_000, help="TickData retidos no dia")
+    parser.add_argument("--cycles", type=int, default=140, help="Ciclos do agente no dia")
+    parser.add_argument("--mode", choices=("dict", "slots"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(_run_mode(args.mode, args.ticks, args.cycles)))
+        return
+
+    results = {}
+    for mode in ("dict", "slots"):
+        out = subprocess.run(
+            [sys.executable, __file__, "--mode", mode,
+             "--ticks", str(args.ticks), "--cycles", str(args.cycles)],
+            capture_output=True, text=True, check=True,
+        )
+        results[mode] = json.loads(out.stdout.strip().splitlines()[-1])
+
+    before, after = results["dict"], results["slots"]
+    print(f"\nBytes por objeto (objeto + __dict__; valores dos campos fora)")
+    print("-" * 52)
+    for name, size in before["sizes"].items():
+        print(f"{name:<18} antes {size:6d} │ depois {after['sizes'][name]:6d}")
+
+    print(f"\nDia completo: {after['objects']:,} registros "
+          f"({args.ticks:,} ticks, {args.cycles} ciclos)")
+    print("-" * 52)
+    print(f"{'Pico alocado':<18} antes {before['peak_traced_mb']:7.1f} MB │ "
+          f"depois {after['peak_traced_mb']:7.1f} MB")
+    print(f"{'Pico de RSS':<18} antes {before['max_rss_mb']:7.1f} MB │ "
+          f"depois {after['max_rss_mb']:7.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Benchmark: leitura do log de reflections para inferencia.
+
+Gera D dias x R reflections e compara o custo de obter as reflections
+do ultimo dia (o que build_latest_features usa):
+
+  - antes:  reflections_log.jsonl unico, json.loads linha a linha do
+            arquivo inteiro (load_jsonl_reflections anterior)
+  - json:   segmentos diarios + indice, so o ultimo dia (json da stdlib)
+  - orjson: idem, com orjson (se instalado)
+
+Uso:
+    python scripts/benchmark_reflection_log.py
+    python scripts/benchmark_reflection_log.py --dias 500 --por-dia 400
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT_DIR)
+
+from src.infrastructure.database import reflection_log
+from src.infrastructure.database.reflection_log import ReflectionLog
+
+COLUNAS = [
+    "timestamp", "current_price", "price_change_since_open", "price_change_last_10min",
+    "my_decision", "my_confidence", "my_alignment", "human_makes_sense",
+    "my_data_correlation", "mood",
+]
+
+
+def _reflections(dias: int, por_dia: int, seed: int = 7):
+    rng = random.Random(seed)
+    inicio = datetime(2025, 1, 2, 9, 0)
+    preco = 130000.0
+    for d in range(dias):
+        base = inicio + timedelta(days=d)
+        for i in range(por_dia):
+            preco += rng.gauss(0, 40)
+            yield {
+                "timestamp": (base + timedelta(seconds=i * 75 + rng.random())).isoformat(),
+                "entry_id": f"REFL_{d}_{i}",
+                "current_price": round(preco, 1),
+                "price_change_since_open": rng.uniform(-1, 1),
+                "price_change_last_10min": rng.uniform(-0.3, 0.3),
+                "my_decision": rng.choice(["BUY", "SELL", "HOLD"]),
+                "my_confidence": rng.random(),
+                "my_alignment": rng.random(),
+                "honest_assessment": "Mercado lateral, volume fraco " * 3,
+                "what_im_seeing": "Compradores defendendo a mínima do dia " * 3,
+                "human_makes_sense": rng.random() > 0.5,
+                "my_data_correlation": "FRACA - Sem correlacao clara.",
+                "mood": "Confuso",
+                "one_liner": "Seguindo o fluxo.",
+            }
+
+
+def _carregar_legado(path: Path) -> pd.DataFrame:
+    """load_jsonl_reflections anterior: o arquivo inteiro a cada chamada."""
+    rows = []
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            rec = json.loads(line)
+            rows.append({c: rec.get(c) for c in COLUNAS})
+    df = pd.DataFrame(rows)
+    df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce")
+    return df
+
+
+def _medir(fn, repeticoes: int):
+    fn()  # aquecimento (cache de disco)
+    t0 = time.perf_counter()
+    for _ in range(repeticoes):
+        resultado = fn()
+    return (time.perf_counter() - t0) / repeticoes, resultado
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark do log de reflections.")
+    parser.add_argument("--dias", type=int, default=250)
+    parser.add_argument("--por-dia", type=int, default=400)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        legado = root / "legado" / "reflections_log.jsonl"
+        legado.parent.mkdir()
+        log = ReflectionLog(root / "segmentado")
+        with legado.open("w", encoding="utf-8") as f:
+            for rec in _reflections(args.dias, args.por_dia):
+                f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+                log.append(rec)
+        tamanho_mb = legado.stat().st_size / 1e6
+
+        resultados = {}
+        resultados["antes"] = _medir(lambda: _carregar_legado(legado).tail(args.por_dia),
+                                     args.repeticoes)
+        orjson = reflection_log.orjson
+        reflection_log.orjson = None
+        resultados["json"] = _medir(lambda: log.latest(1, columns=COLUNAS), args.repeticoes)
+        reflection_log.orjson = orjson
+        if orjson is not None:
+            resultados["orjson"] = _medir(lambda: log.latest(1, columns=COLUNAS), args.repeticoes)
+
+    print(f"\n{args.dias} dias x {args.por_dia} reflections ({tamanho_mb:.1f} MB de JSONL)")
+    print("-" * 60)
+    base = resultados["antes"][0]
+    for nome, (elapsed, df) in resultados.items():
+        print(f"{nome:<7} {elapsed * 1000:9.2f} ms │ {len(df):6} linhas │ {base / elapsed:7.1f}x")
+    ultimos = [df["timestamp"].iloc[-1] for _, df in resultados.values()]
+    print(f"\nMesma ultima reflection em todos: {'sim' if len(set(ultimos)) == 1 else 'NAO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Benchmark: Price (Decimal) vs. TickPrice (ticks inteiros) em caminhos quentes.
+
+Mede, sobre uma serie sintetica de candles M1 do WIN (floats como vem do
+MT5):
+
+  - criacao de candles: 4 precos por candle via Price(Decimal(str(x)))
+    (como o MT5Adapter faz hoje) vs. TickPrice.from_float(x)
+  - indicadores: ATR(14) e EMA(9) do agente micro sobre listas de Decimal
+    vs. a mesma conta em inteiros (ticks), convertida para Decimal so no fim
+  - memoria por preco (sys.getsizeof)
+
+Os resultados dos indicadores sao conferidos (ATR exato; EMA ate 1e-6 pt).
+
+Uso:
+    python scripts/benchmark_tick_price.py
+    python scripts/benchmark_tick_price.py --candles 100000 --rounds 5
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from decimal import Decimal
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "scripts"))
+
+from src.domain.value_objects import Price, TickPrice
+from src.domain.value_objects.financial import WIN_TICK_SIZE
+
+
+def _series(n: int, seed: int = 42) -> list[tuple[float, float, float, float]]:
+    """OHLC em floats, multiplos de 5 (random walk do mini-indice)."""
+    rng = random.Random(seed)
+    price = 130000.0
+    out = []
+    for _ in range(n):
+        o = price
+        c = o + 5 * rng.randint(-8, 8)
+        h = max(o, c) + 5 * rng.randint(0, 4)
+        lo = min(o, c) - 5 * rng.randint(0, 4)
+        out.append((o, h, lo, c))
+        price = c
+    return out
+
+
+def _timeit(fn, rounds: int) -> tuple[float, object]:
+    samples = []
+    result = None
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples), result
+
+
+# ────────────────────────────────────────────────────────────────
+# Criacao
+# ────────────────────────────────────────────────────────────────
+
+def _build_decimal(rows):
+    return [
+        (Price(Decimal(str(o))), Price(Decimal(str(h))),
+         Price(Decimal(str(lo))), Price(Decimal(str(c))))
+        for o, h, lo, c in rows
+    ]
+
+
+def _build_ticks(rows):
+    from_float = TickPrice.from_float
+    return [
+        (from_float(o), from_float(h), from_float(lo), from_float(c))
+        for o, h, lo, c in rows
+    ]
+
+
+# ────────────────────────────────────────────────────────────────
+# Indicadores em ticks (mesma conta do agente, em inteiros)
+# ────────────────────────────────────────────────────────────────
+
+def _atr_ticks(highs: list[int], lows: list[int], closes: list[int], period: int = 14):
+    if len(closes) < period + 1:
+        return Decimal("0")
+    tr = [
+        max(highs[i] - lows[i], abs(highs[i] - closes[i - 1]), abs(lows[i] - closes[i - 1]))
+        for i in range(1, len(closes))
+    ]
+    return Decimal(sum(tr[-period:])) * WIN_TICK_SIZE / Decimal(period)
+
+
+def _ema_ticks(values: list[int], period: int) -> list[float]:
+    if len(values) < period:
+        return [0.0] * len(values)
+    k = 2 / (period + 1)
+    tick = float(WIN_TICK_SIZE)
+    out = [0.0] * len(values)
+    out[period - 1] = sum(values[:period]) / period
+    for i in range(period, len(values)):
+        out[i] = values[i] * k + out[i - 1] * (1 - k)
+    return [v * tick for v in out]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark Price vs TickPrice.")
+    parser.add_argument("--candles", type=int, default=50_000, help="Candles M1 sinteticos")
+    parser.add_argument("--rounds", type=int, default=3, help="Repeticoes (mediana)")
+    args = parser.parse_args()
+
+    import agente_micro_tendencia_winfut as agente
+
+    rows = _series(args.candles)
+    n = len(rows)
+
+    t_dec, dec = _timeit(lambda: _build_decimal(rows), args.rounds)
+    t_tick, ticks = _timeit(lambda: _build_ticks(rows), args.rounds)
+
+    highs_d = [c[1].value for c in dec]
+    lows_d = [c[2].value for c in dec]
+    closes_d = [c[3].value for c in dec]
+    highs_t = [c[1].ticks for c in ticks]
+    lows_t = [c[2].ticks for c in ticks]
+    closes_t = [c[3].ticks for c in ticks]
+
+    t_atr_d, atr_d = _timeit(lambda: agente._calc_atr(highs_d, lows_d, closes_d), args.rounds)
+    t_atr_t, atr_t = _timeit(lambda: _atr_ticks(highs_t, lows_t, closes_t), args.rounds)
+    t_ema_d, ema_d = _timeit(lambda: agente._calc_ema(closes_d, 9), args.rounds)
+    t_ema_t, ema_t = _timeit(lambda: _ema_ticks(closes_t, 9), args.rounds)
+
+    assert atr_d == atr_t, (atr_d, atr_t)
+    ema_err = max(abs(float(a) - b) for a, b in zip(ema_d, ema_t))
+    assert ema_err < 1e-6, ema_err
+
+    size_dec = sys.getsizeof(dec[0][0]) + sys.getsizeof(dec[0][0].value)
+    size_tick = sys.getsizeof(ticks[0][0]) + sys.getsizeof(ticks[0][0].ticks)
+
+    print(f"\nPrice vs TickPrice — {n} candles M1 x {args.rounds} rodadas (mediana)")
+    print("-" * 68)
+    print(f"{'Criacao (4 precos/candle)':<28} Decimal {t_dec:8.1f} ms │ ticks {t_tick:8.1f} ms"
+          f" │ {t_dec / t_tick:4.1f}x")
+    print(f"{'ATR(14) serie completa':<28} Decimal {t_atr_d:8.1f} ms │ ticks {t_atr_t:8.1f} ms"
+          f" │ {t_atr_d / t_atr_t:4.1f}x")
+    print(f"{'EMA(9) serie completa':<28} Decimal {t_ema_d:8.1f} ms │ ticks {t_ema_t:8.1f} ms"
+          f" │ {t_ema_d / t_ema_t:4.1f}x")
+    print(f"{'Bytes por preco':<28} Decimal {size_dec:8d}    │ ticks {size_tick:8d}")
+    print(f"\nATR identico ({atr_d}); EMA: erro maximo {ema_err:.2e} pt")
+
+
+if __name__ == "__main__":
+    main()
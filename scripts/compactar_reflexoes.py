@@ -0,0 +1,60 @@
+"""Manutenção do log de reflections (data/db/reflections).
+
+1) --migrar-legado: distribui o reflections_log.jsonl único em segmentos
+   diários (com índice de tempo) e o renomeia para .jsonl.migrated
+2) Compacta em Parquet os segmentos de dias anteriores a --antes (padrão:
+   hoje); o segmento JSONL só é removido depois do Parquet gravado
+
+Uso:
+  python scripts/compactar_reflexoes.py --migrar-legado
+  python scripts/compactar_reflexoes.py --antes 2026-02-20
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from datetime import date
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.infrastructure.database.reflection_log import ReflectionLog
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Migra e compacta o log de reflections.")
+    parser.add_argument("--root", default=str(ROOT_DIR / "data" / "db" / "reflections"))
+    parser.add_argument("--migrar-legado", action="store_true",
+                        help="Distribui o reflections_log.jsonl em segmentos diários")
+    parser.add_argument("--antes", type=date.fromisoformat, default=None,
+                        help="Compacta dias anteriores a AAAA-MM-DD (padrão: hoje)")
+    parser.add_argument("--sem-parquet", action="store_true", help="Não compacta")
+    args = parser.parse_args()
+
+    log = ReflectionLog(Path(args.root))
+
+    if args.migrar_legado:
+        migrados = log.migrate_legacy()
+        print(f"[OK] {migrados} reflections migradas para {log.segments_dir}")
+
+    if not args.sem_parquet:
+        try:
+            gravados = log.compact(before=args.antes)
+        except ImportError as e:
+            print(f"[ERRO] Compactação em Parquet requer pyarrow ou fastparquet: {e}")
+            return 1
+        for path in gravados:
+            print(f"[OK] {path.relative_to(log.root)}")
+        print(f"[OK] {len(gravados)} dia(s) compactado(s)")
+
+    dias = log.days()
+    if dias:
+        print(f"Dias no log: {len(dias)} ({dias[0]} a {dias[-1]})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
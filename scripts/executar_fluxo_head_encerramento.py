@@ -11,13 +11,16 @@ Uso:
 from __future__ import annotations
 
 import argparse
-import json
 import subprocess
 import sys
 from datetime import datetime
 from pathlib import Path
 
 ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.infrastructure.database.reflection_log import ReflectionLog
 
 
 def _parse_args() -> argparse.Namespace:
@@ -35,8 +38,7 @@ def _run_step(cmd: list[str], name: str) -> None:
 
 
 def _append_reflection(base_date: str) -> None:
-    p = ROOT_DIR / "data" / "db" / "reflections" / "reflections_log.jsonl"
-    p.parent.mkdir(parents=True, exist_ok=True)
+    log = ReflectionLog(ROOT_DIR / "data" / "db" / "reflections")
 
     payload = {
         "timestamp": datetime.now().isoformat(),
@@ -57,10 +59,9 @@ def _append_reflection(base_date: str) -> None:
         ],
     }
 
-    with p.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(payload, ensure_ascii=False) + "\n")
+    log.append(payload)
 
-    print(f"[OK] Reflection anexada em {p}")
+    print(f"[OK] Reflection anexada em {log.segments_dir}")
 
 
 def main() -> int:
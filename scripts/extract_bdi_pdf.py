@@ -4,60 +4,317 @@ Extrator de BDI (Boletim Diário de Informações) da B3.
 Extrai dados relevantes do PDF do BDI para uso na inteligência
 do operador de day trade (agente micro tendência WINFUT).
 
+As páginas são extraídas em paralelo (um processo por bloco de páginas)
+e o texto fica em cache por hash do PDF e número da página, então
+reextrair o mesmo boletim não reabre as páginas já lidas. Os dados-chave
+leem só as páginas das seções que interessam, achadas pelo sumário.
+
 Uso:
   python scripts/extract_bdi_pdf.py data/BDI/BDI_00_20260210.pdf
+  python scripts/extract_bdi_pdf.py data/BDI/BDI_00_20260210.pdf --workers 4
 """
 
 from __future__ import annotations
 
+import argparse
+import hashlib
 import os
 import re
+import sqlite3
 import sys
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-
-import pdfplumber
+from typing import Iterable, Optional
 
 ROOT_DIR = Path(__file__).resolve().parent.parent
 
+# Cache de texto por página: (hash do PDF, página) -> texto
+PAGE_CACHE_PATH = ROOT_DIR / "data" / "BDI" / ".page_cache.sqlite"
 
-def extract_bdi_full(pdf_path: str) -> str:
-    """Extrai todo o conteúdo textual do PDF BDI, página por página."""
-    lines = []
+# Páginas por tarefa do pool: cada tarefa abre o PDF uma vez
+_MIN_PAGES_PER_TASK = 8
+
+# Seções dos dados-chave -> título no sumário do BDI. O intervalo fixo
+# (1-indexed, do BDI de fev/2026) só é usado se o título não for achado.
+KEY_SECTIONS = {
+    "indicadores_economicos": ("Indicadores econômicos", (2072, 2078)),
+    "evolucao_indices": ("Evolução dos índices", (2065, 2072)),
+    "maiores_oscilacoes": ("Maiores oscilações", (2141, 2144)),
+    "derivativos_resumo_ops": ("Derivativos - resumo das operações", (2143, 2158)),
+    "participacao_investidores": ("Participação dos investidores", (2077, 2142)),
+}
+
+
+# ════════════════════════════════════════════════════════════
+# Cache de páginas
+# ════════════════════════════════════════════════════════════
+
+
+def pdf_hash(pdf_path: str) -> str:
+    """SHA-256 do arquivo (identifica o PDF no cache, não o nome)."""
+    digest = hashlib.sha256()
+    with open(pdf_path, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 20), b""):
+            digest.update(bloco)
+    return digest.hexdigest()
+
+
+def _contiguous(pages: Iterable[int]) -> list[tuple[int, int]]:
+    """Páginas agrupadas em faixas contíguas (primeira, última)."""
+    ranges: list[tuple[int, int]] = []
+    for page in sorted(set(pages)):
+        if ranges and page == ranges[-1][1] + 1:
+            ranges[-1] = (ranges[-1][0], page)
+        else:
+            ranges.append((page, page))
+    return ranges
+
+
+class PageCache:
+    """Texto extraído por página, em SQLite, chaveado por hash do PDF e página.
+
+    Só o processo principal escreve: os workers devolvem o texto e o
+    pai grava em lote.
+    """
+
+    def __init__(self, path: str | Path = PAGE_CACHE_PATH) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " pdf_hash TEXT NOT NULL, page INTEGER NOT NULL, text TEXT NOT NULL,"
+            " PRIMARY KEY (pdf_hash, page)) WITHOUT ROWID"
+        )
+        self.conn.commit()
+
+    def get_many(self, digest: str, pages: Iterable[int]) -> dict[int, str]:
+        """Texto das páginas pedidas; uma faixa da chave primária por trecho contíguo."""
+        texts: dict[int, str] = {}
+        for first, last in _contiguous(pages):
+            texts.update(self.conn.execute(
+                "SELECT page, text FROM pages WHERE pdf_hash = ? AND page BETWEEN ? AND ?",
+                (digest, first, last),
+            ))
+        return texts
+
+    def put_many(self, digest: str, texts: dict[int, str]) -> None:
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO pages (pdf_hash, page, text) VALUES (?, ?, ?)",
+                [(digest, page, text) for page, text in texts.items()],
+            )
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+# ════════════════════════════════════════════════════════════
+# Extração paralela
+# ════════════════════════════════════════════════════════════
+
+
+def _extract_range(pdf_path: str, pages: list[int]) -> dict[int, str]:
+    """Worker: extrai um intervalo de páginas (1-indexed) abrindo o PDF uma vez."""
+    import pdfplumber  # No worker: o índice e o cache não dependem do pdfplumber
+
+    texts = {}
     with pdfplumber.open(pdf_path) as pdf:
-        total_pages = len(pdf.pages)
-        lines.append("BOLETIM DIÁRIO DE INFORMAÇÕES (BDI) - B3")
-
-        # Extrair data do nome do arquivo
-        basename = os.path.basename(pdf_path)
-        date_match = re.search(r'(\d{8})', basename)
-        if date_match:
-            d = date_match.group(1)
-            date_str = f"{d[6:8]}/{d[4:6]}/{d[0:4]}"
-            lines.append(f"Data: {date_str}")
-
-        lines.append(f"Total de páginas: {total_pages}")
-        lines.append("=" * 80)
+        total = len(pdf.pages)
+        for page_no in pages:
+            if not 1 <= page_no <= total:
+                continue
+            page = pdf.pages[page_no - 1]
+            texts[page_no] = page.extract_text() or ""
+            page.close()  # Libera os objetos da página (PDFs de milhares de páginas)
+    return texts
+
+
+def count_pages(pdf_path: str) -> int:
+    import pdfplumber
+
+    with pdfplumber.open(pdf_path) as pdf:
+        return len(pdf.pages)
+
+
+def _ranges(pages: list[int], n_tasks: int) -> list[list[int]]:
+    """Fatia as páginas (ordenadas) em blocos contíguos para o pool."""
+    size = max(_MIN_PAGES_PER_TASK, -(-len(pages) // max(n_tasks, 1)))
+    return [pages[i:i + size] for i in range(0, len(pages), size)]
 
-        for i, page in enumerate(pdf.pages):
-            lines.append("")
-            lines.append("=" * 80)
-            lines.append(f"=== PÁGINA {i + 1} ===")
-            lines.append("=" * 80)
 
-            text = page.extract_text()
-            if text:
-                lines.append(text)
+def extract_pages(
+    pdf_path: str,
+    pages: Iterable[int],
+    workers: Optional[int] = None,
+    cache: Optional[PageCache] = None,
+    digest: Optional[str] = None,
+) -> dict[int, str]:
+    """Texto das páginas pedidas (1-indexed), do cache ou extraído em paralelo.
 
-            # Progresso
-            if (i + 1) % 100 == 0 or i == 0:
-                print(f"  Processando página {i + 1}/{total_pages}...")
+    Args:
+        pdf_path: Caminho do PDF
+        pages: Páginas desejadas
+        workers: Processos do pool (None: núcleos da máquina; 1: em série)
+        cache: Cache de páginas (None: sem cache)
+        digest: Hash do PDF, se já calculado
+
+    Returns:
+        {página: texto} das páginas que existem no PDF
+    """
+    pages = sorted(set(pages))
+    if cache is not None:
+        digest = digest or pdf_hash(pdf_path)
+        texts = cache.get_many(digest, pages)
+    else:
+        texts = {}
+    missing = [p for p in pages if p not in texts]
+    if not missing:
+        return texts
+
+    n_workers = workers or os.cpu_count() or 1
+    blocks = _ranges(missing, n_workers * 4)
+    extracted: dict[int, str] = {}
+    if n_workers == 1 or len(blocks) == 1:
+        for block in blocks:
+            extracted.update(_extract_range(pdf_path, block))
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            futures = [pool.submit(_extract_range, pdf_path, block) for block in blocks]
+            done = 0
+            for future in as_completed(futures):
+                extracted.update(future.result())
+                done += 1
+                if done % max(1, len(blocks) // 10) == 0 or done == len(blocks):
+                    print(f"  Processando páginas: {len(extracted)}/{len(missing)}...")
+
+    if cache is not None:
+        cache.put_many(digest, extracted)
+    texts.update(extracted)
+    return texts
+
+
+# ════════════════════════════════════════════════════════════
+# Índice de páginas (sumário)
+# ════════════════════════════════════════════════════════════
+
+_SUMMARY_LINE = re.compile(r"^(?P<title>\D.*?)\s+(?P<page>\d{1,5})$")
+_SUMMARY_MAX_PAGES = 4  # O sumário começa na página 2 e ocupa poucas páginas
+
+
+def _normalize_title(title: str) -> str:
+    text = re.sub(r"\s*[-–—]\s*", " - ", title)
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+def build_page_index(summary_texts: Iterable[str]) -> list[tuple[str, int]]:
+    """Lê os títulos de seção e a página inicial de cada um no sumário.
+
+    Args:
+        summary_texts: Texto das páginas do sumário, em ordem
+
+    Returns:
+        [(título normalizado, página)] na ordem do sumário (títulos podem
+        repetir, ex.: "Posições em aberto" de derivativos e de empréstimos)
+    """
+    index = []
+    for text in summary_texts:
+        for line in text.splitlines():
+            match = _SUMMARY_LINE.match(line.strip())
+            if not match:
+                continue
+            index.append((_normalize_title(match["title"]), int(match["page"])))
+    return index
+
+
+def section_pages(
+    index: list[tuple[str, int]], title: str, total_pages: int
+) -> Optional[tuple[int, int]]:
+    """Intervalo (início, fim) da seção: até a próxima seção que começa depois.
+
+    A próxima seção costuma começar no meio de uma página, então a página
+    de fim entra no intervalo.
+    """
+    wanted = _normalize_title(title)
+    starts = sorted({page for _, page in index})
+    for name, start in index:
+        if name == wanted:
+            following = [p for p in starts if p > start]
+            end = following[0] if following else total_pages
+            return start, min(end, total_pages)
+    return None
+
+
+def _is_summary_page(text: str) -> bool:
+    """Página do sumário: fora cabeçalho e rodapé, só "Título NNNN" ou grupos sem número."""
+    body = text.strip().splitlines()[1:-1]
+    return any(_SUMMARY_LINE.match(line.strip()) for line in body) and all(
+        _SUMMARY_LINE.match(line.strip()) or not re.search(r"\d", line)
+        for line in body
+    )
+
+
+def load_page_index(
+    pdf_path: str, cache: Optional[PageCache] = None, workers: Optional[int] = 1,
+    digest: Optional[str] = None,
+) -> list[tuple[str, int]]:
+    """Índice de seções do PDF (extrai só as páginas do sumário)."""
+    texts = extract_pages(pdf_path, range(2, 2 + _SUMMARY_MAX_PAGES),
+                          workers=workers, cache=cache, digest=digest)
+    summary = []
+    for page in sorted(texts):
+        if "Sumário" not in texts[page] and not _is_summary_page(texts[page]):
+            break
+        summary.append(texts[page])
+    return build_page_index(summary)
+
+
+def _header_lines(pdf_path: str, total_pages: int) -> list[str]:
+    lines = ["BOLETIM DIÁRIO DE INFORMAÇÕES (BDI) - B3"]
+    date_match = re.search(r'(\d{8})', os.path.basename(pdf_path))
+    if date_match:
+        d = date_match.group(1)
+        lines.append(f"Data: {d[6:8]}/{d[4:6]}/{d[0:4]}")
+    lines.append(f"Total de páginas: {total_pages}")
+    lines.append("=" * 80)
+    return lines
+
+
+def extract_bdi_full(
+    pdf_path: str, workers: Optional[int] = None, cache: Optional[PageCache] = None,
+    digest: Optional[str] = None,
+) -> str:
+    """Extrai todo o conteúdo textual do PDF BDI, com as páginas em paralelo.
+
+    Páginas já extraídas (ex.: pelos dados-chave) vêm do cache.
+    """
+    total_pages = count_pages(pdf_path)
+    texts = extract_pages(pdf_path, range(1, total_pages + 1), workers=workers,
+                          cache=cache, digest=digest)
+
+    lines = _header_lines(pdf_path, total_pages)
+    for page_no in range(1, total_pages + 1):
+        lines.append("")
+        lines.append("=" * 80)
+        lines.append(f"=== PÁGINA {page_no} ===")
+        lines.append("=" * 80)
+        if texts.get(page_no):
+            lines.append(texts[page_no])
 
     return "\n".join(lines)
 
 
-def extract_bdi_key_data(pdf_path: str) -> dict:
+def extract_bdi_key_data(
+    pdf_path: str, workers: Optional[int] = None, cache: Optional[PageCache] = None,
+    digest: Optional[str] = None,
+) -> dict:
     """Extrai dados-chave do BDI relevantes para trading de futuros.
 
+    Extrai só a página 1, o sumário e as páginas das seções de interesse
+    (localizadas pelo índice do sumário), em paralelo e com cache.
+
     Foca em:
     - IBOVESPA fechamento e variação
     - Derivativos: volumes, contratos, negócios
@@ -82,75 +339,67 @@ def extract_bdi_key_data(pdf_path: str) -> dict:
         "participacao_investidores": {},
     }
 
-    with pdfplumber.open(pdf_path) as pdf:
-        total_pages = len(pdf.pages)
-        print(f"  PDF com {total_pages} páginas. Extraindo dados-chave...")
-
-        # Página 1 - Resumo principal
-        if total_pages >= 1:
-            text = pdf.pages[0].extract_text() or ""
-
-            # IBOVESPA
-            ibov_match = re.search(
-                r'(?:IBOVESPA|Ibovespa)[:\s]+([0-9.,]+)\s+([-+]?[0-9.,]+%?)',
-                text, re.IGNORECASE
-            )
-            if ibov_match:
-                data["ibovespa"]["fechamento"] = ibov_match.group(1).strip()
-                data["ibovespa"]["variacao"] = ibov_match.group(2).strip()
-
-            # Derivativos - volumes
-            total_minis = re.search(
-                r'Total com minis[:\s]+([0-9.,]+)', text, re.IGNORECASE
-            )
-            if total_minis:
-                data["derivativos_resumo"]["total_com_minis"] = total_minis.group(1)
+    total_pages = count_pages(pdf_path)
+    print(f"  PDF com {total_pages} páginas. Extraindo dados-chave...")
+    # Um hash para as três consultas ao cache (página 1, sumário, seções)
+    if cache is not None and digest is None:
+        digest = pdf_hash(pdf_path)
 
-            total_sem = re.search(
-                r'Total sem minis[:\s]+([0-9.,]+)', text, re.IGNORECASE
-            )
-            if total_sem:
-                data["derivativos_resumo"]["total_sem_minis"] = total_sem.group(1)
+    # Página 1 - Resumo principal
+    text = extract_pages(pdf_path, [1], workers=1, cache=cache, digest=digest).get(1, "")
 
-            vol_neg = re.search(
-                r'Volume negociado[:\s]+([0-9.,]+)', text, re.IGNORECASE
-            )
-            if vol_neg:
-                data["derivativos_resumo"]["volume_negociado"] = vol_neg.group(1)
-
-            qtd_neg = re.search(
-                r'Quantidade de neg[óo]cios[:\s]+([0-9.,]+)', text, re.IGNORECASE
-            )
-            if qtd_neg:
-                data["derivativos_resumo"]["qtd_negocios"] = qtd_neg.group(1)
-
-        # Varrer páginas relevantes (sumário indica as seções)
-        # Focar nas seções: Indicadores econômicos (~p2073), DI over (~p2064),
-        # Evolução dos índices (~p2066), Maiores oscilações (~p2142),
-        # Derivativos resumo (~p2144), Posições em aberto (~p2232)
-
-        # Seções de interesse baseadas no sumário do BDI
-        sections_of_interest = {
-            "indicadores_economicos": (2072, 2078),
-            "evolucao_indices": (2065, 2072),
-            "maiores_oscilacoes": (2141, 2144),
-            "derivativos_resumo_ops": (2143, 2158),
-            "participacao_investidores": (2077, 2142),
-        }
-
-        # Extrair texto das seções relevantes
-        for section_name, (start_page, end_page) in sections_of_interest.items():
-            start_idx = min(start_page - 1, total_pages - 1)
-            end_idx = min(end_page, total_pages)
-
-            section_text = ""
-            for p_idx in range(start_idx, end_idx):
-                if p_idx < total_pages:
-                    page_text = pdf.pages[p_idx].extract_text() or ""
-                    section_text += page_text + "\n"
-
-            if section_text.strip():
-                data[section_name + "_raw"] = section_text
+    # IBOVESPA
+    ibov_match = re.search(
+        r'(?:IBOVESPA|Ibovespa)[:\s]+([0-9.,]+)\s+([-+]?[0-9.,]+%?)',
+        text, re.IGNORECASE
+    )
+    if ibov_match:
+        data["ibovespa"]["fechamento"] = ibov_match.group(1).strip()
+        data["ibovespa"]["variacao"] = ibov_match.group(2).strip()
+
+    # Derivativos - volumes
+    total_minis = re.search(
+        r'Total com minis[:\s]+([0-9.,]+)', text, re.IGNORECASE
+    )
+    if total_minis:
+        data["derivativos_resumo"]["total_com_minis"] = total_minis.group(1)
+
+    total_sem = re.search(
+        r'Total sem minis[:\s]+([0-9.,]+)', text, re.IGNORECASE
+    )
+    if total_sem:
+        data["derivativos_resumo"]["total_sem_minis"] = total_sem.group(1)
+
+    vol_neg = re.search(
+        r'Volume negociado[:\s]+([0-9.,]+)', text, re.IGNORECASE
+    )
+    if vol_neg:
+        data["derivativos_resumo"]["volume_negociado"] = vol_neg.group(1)
+
+    qtd_neg = re.search(
+        r'Quantidade de neg[óo]cios[:\s]+([0-9.,]+)', text, re.IGNORECASE
+    )
+    if qtd_neg:
+        data["derivativos_resumo"]["qtd_negocios"] = qtd_neg.group(1)
+
+    # Seções de interesse: páginas pelo sumário do BDI (a numeração muda
+    # a cada edição); o intervalo fixo é só o fallback
+    index = load_page_index(pdf_path, cache=cache, digest=digest)
+    ranges = {}
+    for section_name, (title, fallback) in KEY_SECTIONS.items():
+        start_page, end_page = section_pages(index, title, total_pages) or fallback
+        ranges[section_name] = (max(start_page, 1), min(end_page, total_pages))
+
+    # Só as páginas dessas seções, extraídas juntas (sobreposições uma vez)
+    needed = {p for start, end in ranges.values() for p in range(start, end + 1)}
+    texts = extract_pages(pdf_path, needed, workers=workers, cache=cache, digest=digest)
+
+    for section_name, (start_page, end_page) in ranges.items():
+        section_text = "".join(
+            (texts.get(p) or "") + "\n" for p in range(start_page, end_page + 1)
+        )
+        if section_text.strip():
+            data[section_name + "_raw"] = section_text
 
     return data
 
@@ -201,12 +450,15 @@ def format_key_data_report(data: dict, date_str: str = "") -> str:
 
 
 def main():
-    if len(sys.argv) < 2:
-        print("Uso: python scripts/extract_bdi_pdf.py <caminho_pdf>")
-        print("Exemplo: python scripts/extract_bdi_pdf.py data/BDI/BDI_00_20260210.pdf")
-        sys.exit(1)
-
-    pdf_path = sys.argv[1]
+    parser = argparse.ArgumentParser(description="Extrator de BDI da B3.")
+    parser.add_argument("pdf", help="Ex.: data/BDI/BDI_00_20260210.pdf")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Processos da extração (padrão: núcleos da máquina)")
+    parser.add_argument("--sem-cache", action="store_true",
+                        help=f"Não usa o cache de páginas ({PAGE_CACHE_PATH.name})")
+    args = parser.parse_args()
+
+    pdf_path = args.pdf
     if not os.path.isabs(pdf_path):
         pdf_path = os.path.join(ROOT_DIR, pdf_path)
 
@@ -228,13 +480,22 @@ def main():
     print(f"╚{'═' * 60}╝\n")
     print(f"  Arquivo: {basename}")
 
-    # 1) Extrair dados-chave
-    print(f"\n  [1/3] Extraindo dados-chave do PDF...")
-    key_data = extract_bdi_key_data(pdf_path)
-
-    # 2) Extração completa (texto de todas as páginas)
-    print(f"\n  [2/3] Extraindo texto completo do PDF...")
-    full_text = extract_bdi_full(pdf_path)
+    cache = None if args.sem_cache else PageCache()
+    # O PDF é lido uma vez para o hash; todas as consultas ao cache o reusam
+    digest = pdf_hash(pdf_path) if cache is not None else None
+    try:
+        # 1) Extrair dados-chave
+        print(f"\n  [1/3] Extraindo dados-chave do PDF...")
+        key_data = extract_bdi_key_data(pdf_path, workers=args.workers, cache=cache,
+                                        digest=digest)
+
+        # 2) Extração completa (páginas dos dados-chave já estão no cache)
+        print(f"\n  [2/3] Extraindo texto completo do PDF...")
+        full_text = extract_bdi_full(pdf_path, workers=args.workers, cache=cache,
+                                     digest=digest)
+    finally:
+        if cache is not None:
+            cache.close()
 
     # 3) Salvar arquivos
     print(f"\n  [3/3] Salvando arquivos...")
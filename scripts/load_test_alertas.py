@@ -0,0 +1,513 @@
+"""Teste de carga do caminho de alertas: FilaAlertas → AlertaDeliveryManager → WebSocket.
+
+Sobe o servidor WebSocket real (``src.interfaces.websocket_server``) em
+uma porta local, conecta N clientes WebSocket (K deles lentos de
+proposito) e injeta um fluxo sintetico de ``AlertaOportunidade`` a uma
+taxa fixa em ``FilaAlertas.enfileirar``. O worker ``processar_fila``
+entrega via ``AlertaDeliveryManager``, cujo cliente WebSocket faz o
+``broadcast`` do ``ConnectionManager``.
+
+Mede:
+
+  - latencia enfileirado → cliente (p50/p95/p99/max), clientes rapidos e
+    lentos separados, e quantas mensagens cada grupo recebeu
+  - precisao de dedup/rate limit: as decisoes da fila (exceto rejeicoes
+    por fila cheia, contadas a parte) sao refeitas por um
+    modelo de referencia (janelas por padrao e por chave de dedup); aceites que
+    deveriam ser barrados (vazamentos) e rejeicoes indevidas sao contados.
+    Decisoes a menos de ``--tolerancia-ms`` da borda da janela ficam como
+    ambiguas
+  - evicções de clientes lentos (codigo de fechamento) e metricas do
+    servidor (/metrics)
+  - memoria: RSS amostrado durante o teste (crescimento e inclinacao em
+    MB/min), tamanhos dos caches da fila e, com --tracemalloc, o pico
+    alocado
+
+Cada execucao e acrescentada como uma linha JSON em ``--report`` (padrao
+``data/load_tests/alertas_pipeline.jsonl``) para acompanhar a evolucao.
+Clientes e servidor dividem o mesmo event loop: a latencia inclui a
+disputa de CPU entre eles.
+
+Uso:
+    python scripts/load_test_alertas.py
+    python scripts/load_test_alertas.py --rate 500 --duration 60 --clients 50 --slow 5
+    python scripts/load_test_alertas.py --slow-delay-ms 500 --tracemalloc
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from typing import Hashable, Optional
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT_DIR)
+
+import uvicorn
+from websockets.asyncio.client import connect
+from websockets.exceptions import ConnectionClosed
+
+from src.application.services.alerta_delivery import AlertaDeliveryManager
+from src.domain.entities.alerta import AlertaOportunidade
+from src.domain.enums.alerta_enums import NivelAlerta, PatraoAlerta
+from src.domain.value_objects import Symbol
+from src.infrastructure.providers.fila_alertas import FilaAlertas
+from src.interfaces import websocket_server
+
+DEFAULT_REPORT = os.path.join(ROOT_DIR, "data", "load_tests", "alertas_pipeline.jsonl")
+PADROES = list(PatraoAlerta)
+
+
+# ────────────────────────────────────────────────────────────────
+# Fluxo sintetico
+# ────────────────────────────────────────────────────────────────
+
+class _GeradorAlertas:
+    """Alertas validos do WIN (precos em Decimal, como os detectores emitem).
+
+    Uma fracao repete padrao/preco de um alerta recente.
+    """
+
+    def __init__(self, rng: random.Random, dup_ratio: float) -> None:
+        self._rng = rng
+        self._dup_ratio = dup_ratio
+        self._recentes: list[tuple[PatraoAlerta, int]] = []
+
+    def proximo(self) -> AlertaOportunidade:
+        if self._recentes and self._rng.random() < self._dup_ratio:
+            padrao, preco = self._rng.choice(self._recentes)
+        else:
+            padrao = self._rng.choice(PADROES)
+            preco = 5 * self._rng.randint(20000, 32000)  # 100.000 a 160.000 pts
+            self._recentes.append((padrao, preco))
+            del self._recentes[:-20]
+        return AlertaOportunidade(
+            ativo=Symbol("WIN$N"),
+            padrao=padrao,
+            nivel=NivelAlerta.ALTO,
+            preco_atual=Decimal(preco),
+            timestamp_deteccao=datetime.now(),
+            entrada_minima=Decimal(preco - 50),
+            entrada_maxima=Decimal(preco + 50),
+            stop_loss=Decimal(preco - 300),
+            take_profit=Decimal(preco + 600),
+            confianca=Decimal("0.80"),
+            risk_reward=Decimal("2.0"),
+        )
+
+
+class _BroadcastWebSocket:
+    """Cliente WebSocket do AlertaDeliveryManager apontando para o ConnectionManager."""
+
+    def __init__(self, manager) -> None:
+        self._manager = manager
+
+    async def enviar(self, alerta_id, payload: dict) -> bool:
+        await self._manager.broadcast(payload)
+        return True
+
+
+# ────────────────────────────────────────────────────────────────
+# Clientes
+# ────────────────────────────────────────────────────────────────
+
+@dataclass
+class _ResultadoCliente:
+    lento: bool
+    recebidas: int = 0
+    latencias_ms: list[float] = field(default_factory=list)
+    close_code: Optional[int] = None
+    erro: Optional[str] = None
+
+
+async def _cliente(
+    url: str,
+    resultado: _ResultadoCliente,
+    enfileirado_em: dict[str, float],
+    atraso_s: float,
+    pronto: asyncio.Event,
+    parar: asyncio.Event,
+) -> None:
+    try:
+        async with connect(url) as ws:
+            pronto.set()
+            while not parar.is_set():
+                try:
+                    mensagem = await asyncio.wait_for(ws.recv(), timeout=0.2)
+                except asyncio.TimeoutError:
+                    continue
+                agora = time.perf_counter()
+                t0 = enfileirado_em.get(json.loads(mensagem)["id"])
+                if t0 is not None:
+                    resultado.latencias_ms.append((agora - t0) * 1000)
+                resultado.recebidas += 1
+                if atraso_s:
+                    await asyncio.sleep(atraso_s)
+    except ConnectionClosed as e:
+        resultado.close_code = e.rcvd.code if e.rcvd else None
+    except Exception as e:  # conexao recusada, etc.
+        resultado.erro = repr(e)
+    finally:
+        pronto.set()
+
+
+# ────────────────────────────────────────────────────────────────
+# Precisao de dedup / rate limit
+# ────────────────────────────────────────────────────────────────
+
+def _auditar_decisoes(
+    decisoes: list[tuple[float, str, Hashable, bool]],
+    rate_limit_s: float,
+    dedup_ttl_s: float,
+    tolerancia_s: float,
+) -> dict:
+    """
+    Refaz as decisoes da fila com um modelo de referencia.
+
+    Args:
+        decisoes: (instante em s, padrao, chave de dedup, aceito) na ordem
+            de oferta
+        rate_limit_s: Janela do rate limit por padrao
+        dedup_ttl_s: Janela da deduplicacao por chave
+        tolerancia_s: Distancia da borda de uma janela abaixo da qual a
+            decisao e considerada ambigua
+
+    Returns:
+        Contagens de decisoes corretas, ambiguas, vazamentos (aceito mas
+        deveria barrar) e rejeicoes indevidas, e a precisao sobre as nao
+        ambiguas
+    """
+    ultimo_padrao: dict[str, float] = {}
+    ultimo_chave: dict[Hashable, float] = {}
+    contagem = Counter()
+
+    for instante, padrao, chave, aceito in decisoes:
+        idades = []
+        barrar = False
+        for janela, ultimo in ((rate_limit_s, ultimo_padrao.get(padrao)),
+                               (dedup_ttl_s, ultimo_chave.get(chave))):
+            if ultimo is None:
+                continue
+            idade = instante - ultimo
+            idades.append(abs(idade - janela))
+            barrar = barrar or idade < janela
+
+        if aceito:
+            ultimo_padrao[padrao] = instante
+            ultimo_chave[chave] = instante
+
+        if aceito != barrar:
+            contagem["corretas"] += 1
+        elif idades and min(idades) < tolerancia_s:
+            contagem["ambiguas"] += 1
+        elif aceito:
+            contagem["vazamentos"] += 1
+        else:
+            contagem["rejeicoes_indevidas"] += 1
+
+    avaliadas = contagem["corretas"] + contagem["vazamentos"] + contagem["rejeicoes_indevidas"]
+    return {
+        "decisoes": len(decisoes),
+        "corretas": contagem["corretas"],
+        "ambiguas": contagem["ambiguas"],
+        "vazamentos": contagem["vazamentos"],
+        "rejeicoes_indevidas": contagem["rejeicoes_indevidas"],
+        "precisao": contagem["corretas"] / avaliadas if avaliadas else 1.0,
+    }
+
+
+def _percentis(valores: list[float]) -> dict:
+    if not valores:
+        return {"n": 0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    ordenados = sorted(valores)
+
+    def p(q: float) -> float:
+        return round(ordenados[min(len(ordenados) - 1, int(len(ordenados) * q))], 2)
+
+    return {"n": len(ordenados), "p50": p(0.50), "p95": p(0.95), "p99": p(0.99),
+            "max": round(ordenados[-1], 2)}
+
+
+# ────────────────────────────────────────────────────────────────
+# Memoria
+# ────────────────────────────────────────────────────────────────
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        import resource  # Sem /proc: pico do processo
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def _amostrar_memoria(fila: FilaAlertas, amostras: list[dict], intervalo_s: float) -> None:
+    t0 = time.perf_counter()
+    while True:
+        metricas = fila.obter_metricas()
+        amostras.append({
+            "t_s": round(time.perf_counter() - t0, 2),
+            "rss_mb": round(_rss_mb(), 2),
+            "traced_mb": round(tracemalloc.get_traced_memory()[0] / 2**20, 2)
+            if tracemalloc.is_tracing() else None,
+            "dedup_cache": metricas["dedup_cache_size"],
+            "rate_limiter": metricas["rate_limiter_size"],
+            "fila": metricas["tamanho_fila_atual"],
+        })
+        await asyncio.sleep(intervalo_s)
+
+
+def _resumo_memoria(amostras: list[dict]) -> dict:
+    if len(amostras) < 2:
+        return {"amostras": len(amostras)}
+    ts = [a["t_s"] for a in amostras]
+    rss = [a["rss_mb"] for a in amostras]
+    media_t, media_r = sum(ts) / len(ts), sum(rss) / len(rss)
+    var_t = sum((t - media_t) ** 2 for t in ts)
+    inclinacao = (
+        sum((t - media_t) * (r - media_r) for t, r in zip(ts, rss)) / var_t if var_t else 0.0
+    )
+    return {
+        "amostras": len(amostras),
+        "rss_inicial_mb": rss[0],
+        "rss_final_mb": rss[-1],
+        "rss_pico_mb": max(rss),
+        "crescimento_mb": round(rss[-1] - rss[0], 2),
+        "inclinacao_mb_min": round(inclinacao * 60, 3),
+        "dedup_cache_max": max(a["dedup_cache"] for a in amostras),
+        "rate_limiter_max": max(a["rate_limiter"] for a in amostras),
+        "fila_max": max(a["fila"] for a in amostras),
+    }
+
+
+# ────────────────────────────────────────────────────────────────
+# Execucao
+# ────────────────────────────────────────────────────────────────
+
+async def _iniciar_servidor(port: int) -> tuple[uvicorn.Server, asyncio.Task, int]:
+    config = uvicorn.Config(
+        websocket_server.app, host="127.0.0.1", port=port, log_level="warning",
+    )
+    server = uvicorn.Server(config)
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()  # Propaga erro de bind
+        await asyncio.sleep(0.01)
+    porta = server.servers[0].sockets[0].getsockname()[1]
+    return server, task, porta
+
+
+async def _executar(args: argparse.Namespace) -> dict:
+    rng = random.Random(args.seed)
+    manager = websocket_server.manager
+    fila = FilaAlertas(
+        max_queue_size=args.queue_size,
+        rate_limit_seconds=args.rate_limit_s,
+        dedup_ttl_seconds=args.dedup_ttl_s,
+    )
+    delivery = AlertaDeliveryManager(websocket_client=_BroadcastWebSocket(manager))
+
+    server, server_task, porta = await _iniciar_servidor(args.port)
+    url = f"ws://127.0.0.1:{porta}/alertas"
+
+    enfileirado_em: dict[str, float] = {}
+    parar = asyncio.Event()
+    resultados = [_ResultadoCliente(lento=i < args.slow) for i in range(args.clients)]
+    prontos = [asyncio.Event() for _ in resultados]
+    clientes = [
+        asyncio.create_task(_cliente(
+            url, r, enfileirado_em, args.slow_delay_ms / 1000 if r.lento else 0.0, pronto, parar,
+        ))
+        for r, pronto in zip(resultados, prontos)
+    ]
+    await asyncio.gather(*(p.wait() for p in prontos))
+    while manager.get_active_count() < sum(1 for r in resultados if r.erro is None):
+        await asyncio.sleep(0.01)
+
+    amostras: list[dict] = []
+    worker = asyncio.create_task(fila.processar_fila(delivery))
+    amostrador = asyncio.create_task(_amostrar_memoria(fila, amostras, args.sample_s))
+
+    gerador = _GeradorAlertas(rng, args.dup_ratio)
+    decisoes: list[tuple[float, str, Hashable, bool]] = []
+    loop = asyncio.get_running_loop()
+    inicio = loop.time()
+    total = int(args.rate * args.duration)
+    for i in range(total):
+        atraso = inicio + i / args.rate - loop.time()
+        if atraso > 0:
+            await asyncio.sleep(atraso)
+        alerta = gerador.proximo()
+        oferta = datetime.now()
+        falhas = fila.metrics["falhas"]
+        t0 = time.perf_counter()
+        aceito = await fila.enfileirar(alerta)
+        if fila.metrics["falhas"] != falhas:
+            continue  # Fila cheia: contada a parte, fora da auditoria de dedup
+        if aceito:
+            enfileirado_em[str(alerta.id)] = t0
+            oferta = alerta.timestamps["enfileirado"]
+        decisoes.append(
+            (oferta.timestamp(), alerta.padrao.value, fila._chave_dedup(alerta), aceito)
+        )
+    duracao_real = loop.time() - inicio
+
+    # Escoa: fila → broadcast → filas por cliente → clientes rapidos
+    try:
+        await asyncio.wait_for(fila.fila.join(), timeout=args.drain_s)
+        await manager.drain(timeout=args.drain_s)
+    except asyncio.TimeoutError:
+        pass
+    aceitos = len(enfileirado_em)
+    limite = loop.time() + args.drain_s
+    while loop.time() < limite and any(
+        r.recebidas < aceitos for r in resultados if not r.lento and r.close_code is None and r.erro is None
+    ):
+        await asyncio.sleep(0.05)
+
+    servidor = manager.snapshot_metrics()
+    parar.set()
+    await asyncio.gather(*clientes, return_exceptions=True)
+    for task in (worker, amostrador):
+        task.cancel()
+    await asyncio.gather(worker, amostrador, return_exceptions=True)
+    server.should_exit = True
+    await server_task
+
+    metricas_fila = fila.obter_metricas()
+    entrega = {}
+    for nome, lento in (("rapidos", False), ("lentos", True)):
+        grupo = [r for r in resultados if r.lento == lento]
+        entrega[nome] = {
+            "clientes": len(grupo),
+            "esperadas_por_cliente": aceitos,
+            "recebidas": sum(r.recebidas for r in grupo),
+            "completos": sum(1 for r in grupo if r.recebidas == aceitos),
+            "latencia_ms": _percentis([x for r in grupo for x in r.latencias_ms]),
+            "codigos_fechamento": dict(Counter(
+                str(r.close_code) for r in grupo if r.close_code is not None
+            )),
+            "erros": [r.erro for r in grupo if r.erro],
+        }
+
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit_atual(),
+        "config": {k: v for k, v in vars(args).items() if k != "report"},
+        "duracao_real_s": round(duracao_real, 2),
+        "fila": {
+            "ofertados": total,
+            "aceitos": aceitos,
+            "duplicados": metricas_fila["total_duplicados"],
+            "rate_limited": metricas_fila["total_rate_limited"],
+            "fila_cheia": metricas_fila["falhas"],
+            "processados": metricas_fila["total_processados"],
+            "taxa_aceita_s": round(aceitos / duracao_real, 2) if duracao_real else 0.0,
+        },
+        "precisao": _auditar_decisoes(
+            decisoes, args.rate_limit_s, args.dedup_ttl_s, args.tolerancia_ms / 1000,
+        ),
+        "entrega": entrega,
+        "servidor": servidor,
+        "memoria": _resumo_memoria(amostras),
+    }
+
+
+def _commit_atual() -> Optional[str]:
+    try:
+        saida = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+            capture_output=True, text=True, timeout=5,
+        )
+        return saida.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _imprimir(rel: dict) -> None:
+    cfg, fila, prec = rel["config"], rel["fila"], rel["precisao"]
+    print(f"\nCarga de alertas: {cfg['rate']}/s x {cfg['duration']}s, "
+          f"{cfg['clients']} clientes ({cfg['slow']} lentos, {cfg['slow_delay_ms']} ms/msg)")
+    print("-" * 72)
+    print(f"Fila        ofertados {fila['ofertados']:6d} │ aceitos {fila['aceitos']:6d} "
+          f"│ duplicados {fila['duplicados']:6d} │ rate limit {fila['rate_limited']:6d} "
+          f"│ fila cheia {fila['fila_cheia']:6d}")
+    print(f"Precisao    {prec['precisao'] * 100:6.2f}% │ vazamentos {prec['vazamentos']} "
+          f"│ rejeicoes indevidas {prec['rejeicoes_indevidas']} │ ambiguas {prec['ambiguas']}")
+    for nome, grupo in rel["entrega"].items():
+        if not grupo["clientes"]:
+            continue
+        lat = grupo["latencia_ms"]
+        print(f"{nome.capitalize():<11} p50 {lat['p50']:8.2f} ms │ p95 {lat['p95']:8.2f} ms │ "
+              f"p99 {lat['p99']:8.2f} ms │ max {lat['max']:8.2f} ms")
+        print(f"{'':<11} completos {grupo['completos']}/{grupo['clientes']} │ "
+              f"fechamentos {grupo['codigos_fechamento'] or '-'}")
+    srv = rel["servidor"]
+    print(f"Servidor    descartes {srv['drops']} │ evicções {srv['evictions']} │ "
+          f"erros de envio {srv['send_errors']}")
+    mem = rel["memoria"]
+    if "rss_final_mb" in mem:
+        print(f"Memoria     RSS {mem['rss_inicial_mb']:.1f} → {mem['rss_final_mb']:.1f} MB "
+              f"(pico {mem['rss_pico_mb']:.1f}) │ {mem['inclinacao_mb_min']:+.3f} MB/min │ "
+              f"dedup max {mem['dedup_cache_max']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Teste de carga do caminho de alertas.")
+    parser.add_argument("--rate", type=float, default=100.0, help="Alertas ofertados por segundo")
+    parser.add_argument("--duration", type=float, default=20.0, help="Segundos de geracao")
+    parser.add_argument("--clients", type=int, default=20, help="Clientes WebSocket")
+    parser.add_argument("--slow", type=int, default=2, help="Quantos clientes sao lentos")
+    parser.add_argument("--slow-delay-ms", type=float, default=250.0,
+                        help="Pausa do cliente lento apos cada mensagem")
+    parser.add_argument("--dup-ratio", type=float, default=0.3,
+                        help="Fracao de alertas que repetem padrao/preco recente")
+    parser.add_argument("--rate-limit-s", type=float, default=0.05,
+                        help="rate_limit_seconds da FilaAlertas")
+    parser.add_argument("--dedup-ttl-s", type=float, default=2.0,
+                        help="dedup_ttl_seconds da FilaAlertas")
+    parser.add_argument("--queue-size", type=int, default=100, help="max_queue_size da FilaAlertas")
+    parser.add_argument("--tolerancia-ms", type=float, default=20.0,
+                        help="Borda de janela tratada como ambigua na auditoria")
+    parser.add_argument("--drain-s", type=float, default=10.0, help="Espera maxima pelo escoamento")
+    parser.add_argument("--sample-s", type=float, default=1.0, help="Intervalo das amostras de memoria")
+    parser.add_argument("--port", type=int, default=0, help="Porta do servidor (0 = livre)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--tracemalloc", action="store_true", help="Rastrear alocacoes (mais lento)")
+    parser.add_argument("--report", default=DEFAULT_REPORT,
+                        help="JSONL onde o relatorio e acrescentado ('-' para nao gravar)")
+    args = parser.parse_args()
+    if args.slow > args.clients:
+        parser.error("--slow nao pode ser maior que --clients")
+
+    logging.basicConfig(level=logging.WARNING)
+    # Fila cheia vai para o relatorio; um log por alerta so polui a saida
+    logging.getLogger("src.infrastructure.providers.fila_alertas").setLevel(logging.CRITICAL)
+    if args.tracemalloc:
+        tracemalloc.start()
+    relatorio = asyncio.run(_executar(args))
+    if args.tracemalloc:
+        relatorio["memoria"]["traced_pico_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+        tracemalloc.stop()
+
+    _imprimir(relatorio)
+    if args.report != "-":
+        os.makedirs(os.path.dirname(os.path.abspath(args.report)), exist_ok=True)
+        with open(args.report, "a", encoding="utf-8") as f:
+            f.write(json.dumps(relatorio, ensure_ascii=False) + "\n")
+        print(f"\nRelatorio acrescentado em {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,13 @@
-"""Run inference for WINFUT day-trade model using latest logs."""
+"""Run inference for WINFUT day-trade model using latest logs.
+
+Modo padrão: uma inferência e sai. Com --loop, o processo fica residente
+(modelo carregado, features incrementais) e imprime uma linha a cada
+sinal novo; o modelo é recarregado quando winfut_model_latest.pkl muda.
+
+Uso:
+    python scripts/ml_infer_winfut.py
+    python scripts/ml_infer_winfut.py --loop --intervalo 1
+"""
 
 from __future__ import annotations
 
@@ -10,11 +19,36 @@ if str(ROOT_DIR) not in sys.path:
     sys.path.insert(0, str(ROOT_DIR))
 
 import argparse
+import time
 from pathlib import Path
 
-import joblib
+from src.application.services.ml.winfut_inference import WinFutInferenceService
 
-from src.application.services.ml.winfut_dataset import build_latest_features
+
+def _print_prediction(prediction) -> None:
+    print("\nINFERENCIA WINFUT")
+    print(f"Timestamp: {prediction.timestamp}")
+    print(f"Preco: {prediction.price}")
+    print(f"Sinal: {prediction.signal}")
+    print("Probabilidades:")
+    for cls, p in prediction.probabilities.items():
+        print(f"  {cls}: {p:.3f}")
+
+
+def _run_loop(service: WinFutInferenceService, interval: float) -> None:
+    print(f"Inferencia residente (Ctrl+C para sair) - checagem a cada {interval:.1f}s")
+    last = None
+    try:
+        while True:
+            prediction = service.predict()
+            if prediction is not None and prediction is not last:
+                probas = " ".join(f"{cls}={p:.3f}" for cls, p in prediction.probabilities.items())
+                print(f"{prediction.timestamp} | {prediction.price:>10.1f} | "
+                      f"{prediction.signal:<5} | {probas} | {prediction.latency_ms:.1f} ms")
+                last = prediction
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("\nEncerrado.")
 
 
 def main() -> None:
@@ -23,6 +57,10 @@ def main() -> None:
     parser.add_argument("--jsonl-path", default="data/db/reflections/reflections_log.jsonl")
     parser.add_argument("--model-path", default="data/models/winfut/winfut_model_latest.pkl")
     parser.add_argument("--tolerance-minutes", type=int, default=5)
+    parser.add_argument("--loop", action="store_true",
+                        help="Mantem o modelo carregado e infere a cada linha nova")
+    parser.add_argument("--intervalo", type=float, default=1.0,
+                        help="Segundos entre checagens no modo --loop")
     args = parser.parse_args()
 
     model_path = Path(args.model_path)
@@ -30,46 +68,24 @@ def main() -> None:
         print(f"[ERRO] Modelo nao encontrado: {model_path}")
         return
 
-    payload = joblib.load(model_path)
-    pipeline = payload["pipeline"]
-    label_classes = payload.get("label_classes")
-
-    latest = build_latest_features(
+    service = WinFutInferenceService(
+        model_path=model_path,
         db_path=Path(args.db_path),
         jsonl_path=Path(args.jsonl_path),
         include_jsonl=True,
         tolerance_minutes=args.tolerance_minutes,
+        reload_check_seconds=args.intervalo,
     )
 
-    if latest.empty:
-        print("[ERRO] Nao ha dados recentes para inferencia.")
+    if args.loop:
+        _run_loop(service, args.intervalo)
         return
 
-    raw_pred = pipeline.predict(latest)
-    if hasattr(raw_pred, "ndim") and raw_pred.ndim > 1:
-        pred_idx = int(raw_pred.argmax(axis=1)[0])
-    else:
-        pred_idx = int(raw_pred[0])
-    proba = pipeline.predict_proba(latest)[0]
-    classes = pipeline.named_steps["model"].classes_
-
-    if label_classes:
-        pred = label_classes[pred_idx]
-        proba_map = {label_classes[int(cls)]: float(p) for cls, p in zip(classes, proba)}
-    else:
-        pred = pred_idx
-        proba_map = {str(cls): float(p) for cls, p in zip(classes, proba)}
-
-    ts = latest["timestamp"].iloc[0]
-    price = latest["current_price"].iloc[0]
-
-    print("\nINFERENCIA WINFUT")
-    print(f"Timestamp: {ts}")
-    print(f"Preco: {price}")
-    print(f"Sinal: {pred}")
-    print("Probabilidades:")
-    for cls, p in proba_map.items():
-        print(f"  {cls}: {p:.3f}")
+    prediction = service.predict()
+    if prediction is None:
+        print("[ERRO] Nao ha dados recentes para inferencia.")
+        return
+    _print_prediction(prediction)
 
 
 if __name__ == "__main__":
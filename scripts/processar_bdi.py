@@ -7,8 +7,8 @@ Analista de Dados Expert em Dados da B3
 Especialista em Mercado Brasileiro
 
 Funcionalidades:
-- Extração de dados do BDI
-- Análise comparativa de períodos
+- Extração de dados do BDI (uma vez por boletim, gravada no histórico)
+- Análise comparativa de períodos (consultas SQL sobre o histórico)
 - Identificação de tendências e gaps
 - Relatório executivo em HTML
 - Backlog de oportunidades
@@ -17,18 +17,42 @@ Data: Fevereiro 2026
 """
 
 import os
+import re
+import sys
 import json
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.infrastructure.database.historico_bdi import HistoricoBDI
+
+# Sessões anteriores na média móvel de volume
+JANELA_MEDIA_VOLUME = 20
+
+
+def _numero_bdi(texto: str) -> Optional[float]:
+    """Converte número do BDI ("28.249.836.567", "-0,16%", "185929.00")."""
+    texto = texto.strip().rstrip('%').strip()
+    if ',' in texto:
+        texto = texto.replace('.', '').replace(',', '.')
+    elif re.fullmatch(r'[-+]?\d{1,3}(\.\d{3})+', texto):
+        texto = texto.replace('.', '')
+    try:
+        return float(texto)
+    except ValueError:
+        return None
+
+
 class AnalistaBDI:
     """
     Analista especializado em Boletins Diários de Informações da B3.
     Responsável por extrair, análisar e sintetizar dados para operadores.
     """
 
-    def __init__(self, workspace_path: str = None):
+    def __init__(self, workspace_path: str = None, db_path: str = None):
         if workspace_path is None:
             workspace_path = r"c:\repo\operador-day-trade-win"
 
@@ -37,6 +61,11 @@ class AnalistaBDI:
         self.output_path = self.workspace / "data" / "BDI" / "reports"
         self.output_path.mkdir(parents=True, exist_ok=True)
 
+        if db_path is None:
+            db_path = self.workspace / "data" / "db" / "bdi_historico.db"
+        self.historico = HistoricoBDI(str(db_path))
+
+        # Sessões recentes (data ISO -> métricas), da mais recente à mais antiga
         self.dados_bdi = {}
         self.insights = []
         self.oportunidades = []
@@ -149,21 +178,16 @@ class AnalistaBDI:
         linhas = conteudo.split('\n')
 
         for linha in linhas:
-            # Contratos com minis
-            if 'Total com minis' in linha and 'Dia' not in linha:
-                try:
-                    valor = linha.split()[-1]
-                    info['derivativos_com_minis'] = valor
-                except:
-                    pass
+            # Contratos com/sem minis: o número logo após o rótulo (na mesma
+            # linha o BDI emenda "Volume negociado ..." e, no cabeçalho das
+            # médias, "... milhões")
+            com_minis = re.search(r'Total com minis\s+([\d.]+)', linha)
+            if com_minis:
+                info['derivativos_com_minis'] = com_minis.group(1)
 
-            # Contratos sem minis
-            if 'Total sem minis' in linha and 'Dia' not in linha:
-                try:
-                    valor = linha.split()[-1]
-                    info['derivativos_sem_minis'] = valor
-                except:
-                    pass
+            sem_minis = re.search(r'Total sem minis\s+([\d.]+)', linha)
+            if sem_minis:
+                info['derivativos_sem_minis'] = sem_minis.group(1)
 
         return info
 
@@ -187,26 +211,61 @@ class AnalistaBDI:
 
         return info
 
-    def processar_multiplos_bdi(self, quantidade: int = 5) -> List[Dict]:
-        """Processa múltiplos boletins para análise comparativa."""
-        arquivos = self.listar_arquivos_bdi()[:quantidade]
-
-        print(f"\n🔍 PROCESSANDO {len(arquivos)} BOLETINS DIÁRIOS")
-        print("=" * 80)
-
-        for arquivo, data in arquivos:
+    def metricas_tipadas(self, dados: Dict) -> Dict[str, float]:
+        """Métricas extraídas (texto do BDI) convertidas para número."""
+        metricas = {}
+        for nome, texto in dados['metrics'].items():
+            valor = _numero_bdi(texto)
+            if valor is None:
+                print(f"    ⚠ {dados['data']}: {nome}={texto!r} não é numérico, ignorado")
+                continue
+            metricas[nome] = valor
+        return metricas
+
+    def carregar_historico(self) -> int:
+        """Extrai e grava no histórico só os boletins novos ou alterados.
+
+        Returns:
+            Quantidade de boletins carregados nesta execução
+        """
+        novos = 0
+        for arquivo, data in self.listar_arquivos_bdi():
+            if self.historico.arquivo_carregado(arquivo):
+                continue
             print(f"  → {data}: ", end="", flush=True)
             try:
                 dados = self.extrair_dados_bdi(arquivo, data)
-                self.dados_bdi[data] = dados
-                print(f"✓ ({len(dados['metrics'])} métricas)")
+                metricas = self.metricas_tipadas(dados)
+                self.historico.registrar(
+                    arquivo, datetime.strptime(data, "%Y%m%d").date(), metricas
+                )
+                novos += 1
+                print(f"✓ ({len(metricas)} métricas)")
             except Exception as e:
                 print(f"✗ Erro: {e}")
+        return novos
+
+    def processar_multiplos_bdi(self, quantidade: int = 5) -> List[Dict]:
+        """Atualiza o histórico e separa as sessões recentes para análise."""
+        print(f"\n🔍 ATUALIZANDO HISTÓRICO DE BOLETINS DIÁRIOS")
+        print("=" * 80)
 
+        novos = self.carregar_historico()
+        datas = self.historico.datas()
+        print(f"  {novos} boletim(ns) novo(s); {len(datas)} sessões no histórico")
+
+        self.dados_bdi = {
+            data: {
+                'data': data,
+                'data_formatada': self._formatar_data(data.replace('-', '')),
+                'metrics': self.historico.metricas_do_dia(data),
+            }
+            for data in datas[:quantidade]
+        }
         return list(self.dados_bdi.values())
 
     def analisar_tendencias(self):
-        """Analisa tendências nos dados extraídos."""
+        """Analisa tendências nas sessões recentes contra o histórico."""
         if not self.dados_bdi:
             print("Nenhum dado disponível para análise de tendências.")
             return
@@ -214,64 +273,50 @@ class AnalistaBDI:
         print("\n📊 ANÁLISE DE TENDÊNCIAS")
         print("=" * 80)
 
-        datas = sorted(self.dados_bdi.keys(), reverse=True)
+        sessoes = len(self.dados_bdi)
 
         # Análise de volatilidade do IBOVESPA
         print("\n1️⃣  VOLATILIDADE E MOVIMENTO DO IBOVESPA")
-        variações = []
-        for data in datas:
-            try:
-                var = self.dados_bdi[data]['metrics'].get('ibovespa_variacao', '0')
-                var_float = float(var.replace('%', '').strip())
-                variações.append((data, var_float))
-                print(f"   {data}: {var:>8}")
-
-                if var_float > 0.5:
-                    self.insights.append(f"Alta volatilidade positiva em {data}: {var}")
-                elif var_float < -0.5:
-                    self.insights.append(f"Alta volatilidade negativa em {data}: {var}")
-            except:
-                pass
-
-        # Análise de volume
-        print("\n2️⃣  ANÁLISE DE VOLUME")
-        volumes = []
-        for data in datas:
-            try:
-                vol = self.dados_bdi[data]['metrics'].get('volume_negociado', '0')
-                if vol and vol != '0':
-                    print(f"   {data}: {vol}")
-                    volumes.append((data, int(vol.replace('.', ''))))
-            except:
-                pass
-
-        if len(volumes) > 1:
-            vol_medio = sum([v[1] for v in volumes]) / len(volumes)
-            print(f"   Volume Médio: {vol_medio:,.0f}")
-
-            for data, vol in volumes[:2]:
-                desvio = ((vol - vol_medio) / vol_medio) * 100
-                if desvio < -20:
-                    self.insights.append(f"Volume abaixo do normal em {data} ({desvio:.1f}%)")
-                elif desvio > 20:
-                    self.insights.append(f"Volume acima do normal em {data} ({desvio:.1f}%)")
+        for data, var in self.historico.serie('ibovespa_variacao', ultimas=sessoes):
+            print(f"   {data}: {var:>+7.2f}%")
+
+            if var > 0.5:
+                self.insights.append(f"Alta volatilidade positiva em {data}: {var:+.2f}%")
+            elif var < -0.5:
+                self.insights.append(f"Alta volatilidade negativa em {data}: {var:+.2f}%")
+
+        # Análise de volume: cada sessão contra a média das anteriores
+        print(f"\n2️⃣  ANÁLISE DE VOLUME (média das {JANELA_MEDIA_VOLUME} sessões anteriores)")
+        volumes = self.historico.desvio_da_media(
+            'volume_negociado', janela=JANELA_MEDIA_VOLUME, ultimas=sessoes
+        )
+        for v in volumes:
+            media = f"{v.media:,.0f}" if v.media is not None else "-"
+            desvio = f"{v.desvio_pct:+.1f}%" if v.desvio_pct is not None else "-"
+            print(f"   {v.data}: {v.valor:>20,.0f} | média: {media:>20} | {desvio}")
+
+        for v in volumes[:2]:
+            if v.desvio_pct is None:
+                continue
+            if v.desvio_pct < -20:
+                self.insights.append(f"Volume abaixo do normal em {v.data} ({v.desvio_pct:.1f}%)")
+            elif v.desvio_pct > 20:
+                self.insights.append(f"Volume acima do normal em {v.data} ({v.desvio_pct:.1f}%)")
 
         # Análise de derivativos
         print("\n3️⃣  ATIVIDADE EM DERIVATIVOS")
-        for data in datas[:3]:
-            try:
-                com_minis = int(self.dados_bdi[data]['metrics'].get('derivativos_com_minis', '0'))
-                sem_minis = int(self.dados_bdi[data]['metrics'].get('derivativos_sem_minis', '0'))
+        for data in list(self.dados_bdi)[:3]:
+            metrics = self.dados_bdi[data]['metrics']
+            com_minis = int(metrics.get('derivativos_com_minis', 0))
+            sem_minis = int(metrics.get('derivativos_sem_minis', 0))
 
-                if com_minis > 0 or sem_minis > 0:
-                    print(f"   {data}: Com minis: {com_minis:>12,} | Sem minis: {sem_minis:>12,}")
+            if com_minis > 0 or sem_minis > 0:
+                print(f"   {data}: Com minis: {com_minis:>12,} | Sem minis: {sem_minis:>12,}")
 
-                    if com_minis > 70000000:
-                        self.insights.append(f"Altíssima atividade em minis em {data}: {com_minis:,} contratos")
-                    elif com_minis < 50000000:
-                        self.insights.append(f"Baixa atividade em minis em {data}: {com_minis:,} contratos")
-            except:
-                pass
+                if com_minis > 70000000:
+                    self.insights.append(f"Altíssima atividade em minis em {data}: {com_minis:,} contratos")
+                elif com_minis < 50000000:
+                    self.insights.append(f"Baixa atividade em minis em {data}: {com_minis:,} contratos")
 
     def identificar_oportunidades(self):
         """Identifica oportunidades para o operador."""
@@ -283,66 +328,51 @@ class AnalistaBDI:
 
         # Oportunidade 1: Volatilidade para Swing Trade
         print("\n1️⃣  VOLATILIDADE PARA SWING TRADE")
-        for data in sorted(self.dados_bdi.keys(), reverse=True)[:2]:
-            try:
-                var = float(self.dados_bdi[data]['metrics'].get('ibovespa_variacao', '0').replace('%', '').strip())
-                if abs(var) > 0.5:
-                    op = {
-                        'tipo': 'Swing Trade - Volatilidade',
-                        'data': data,
-                        'metrica': f'Variação IBOV: {var:.2f}%',
-                        'acao': 'Investigar padrões de breakout e suporte/resistência',
-                        'prioridade': 'ALTA' if abs(var) > 1.0 else 'MÉDIA'
-                    }
-                    self.oportunidades.append(op)
-                    print(f"   ✓ {op['metrica']} → {op['acao']}")
-            except:
-                pass
-
-        # Oportunidade 2: Volume Anômalo
+        for data, var in self.historico.serie('ibovespa_variacao', ultimas=2):
+            if abs(var) > 0.5:
+                op = {
+                    'tipo': 'Swing Trade - Volatilidade',
+                    'data': data,
+                    'metrica': f'Variação IBOV: {var:.2f}%',
+                    'acao': 'Investigar padrões de breakout e suporte/resistência',
+                    'prioridade': 'ALTA' if abs(var) > 1.0 else 'MÉDIA'
+                }
+                self.oportunidades.append(op)
+                print(f"   ✓ {op['metrica']} → {op['acao']}")
+
+        # Oportunidade 2: Volume Anômalo (média de pelo menos 3 sessões anteriores)
         print("\n2️⃣  ANOMALIAS DE VOLUME")
-        volumes = []
-        for data in sorted(self.dados_bdi.keys(), reverse=True)[:5]:
-            try:
-                vol = int(self.dados_bdi[data]['metrics'].get('volume_negociado', '0').replace('.', ''))
-                if vol > 0:
-                    volumes.append((data, vol))
-            except:
-                pass
-
-        if len(volumes) > 3:
-            vol_medio = sum([v[1] for v in volumes]) / len(volumes)
-            for data, vol in volumes[:2]:
-                desvio = ((vol - vol_medio) / vol_medio) * 100
-                if desvio > 30 or desvio < -30:
-                    op = {
-                        'tipo': 'Análise de Volume',
-                        'data': data,
-                        'metrica': f'Desvio: {desvio:+.1f}%',
-                        'acao': 'Verificar causas do volume anômalo (notícias, eventos corporativos)',
-                        'prioridade': 'MÉDIA'
-                    }
-                    self.oportunidades.append(op)
-                    print(f"   ✓ {op['metrica']} → {op['acao']}")
+        volumes = self.historico.desvio_da_media(
+            'volume_negociado', janela=JANELA_MEDIA_VOLUME, ultimas=2
+        )
+        for v in volumes:
+            if v.amostras < 3 or v.desvio_pct is None:
+                continue
+            if v.desvio_pct > 30 or v.desvio_pct < -30:
+                op = {
+                    'tipo': 'Análise de Volume',
+                    'data': v.data,
+                    'metrica': f'Desvio: {v.desvio_pct:+.1f}%',
+                    'acao': 'Verificar causas do volume anômalo (notícias, eventos corporativos)',
+                    'prioridade': 'MÉDIA'
+                }
+                self.oportunidades.append(op)
+                print(f"   ✓ {op['metrica']} → {op['acao']}")
 
         # Oportunidade 3: Derivativos com movimento importante
         print("\n3️⃣  ATIVIDADE ELEVADA EM DERIVATIVOS")
-        for data in sorted(self.dados_bdi.keys(), reverse=True)[:2]:
-            try:
-                minis = int(self.dados_bdi[data]['metrics'].get('derivativos_com_minis', '0'))
-                if minis > 70000000:
-                    opp_ratio = "Muito alta" if minis > 80000000 else "Alta"
-                    opp = {
-                        'tipo': 'Mini Índice - Day Trade',
-                        'data': data,
-                        'metrica': f'Contratos: {minis:,}',
-                        'acao': 'Oportunidade para scalping em mini índice com alta liquidez',
-                        'prioridade': 'ALTA'
-                    }
-                    self.oportunidades.append(opp)
-                    print(f"   ✓ {opp_ratio} atividade em {data}")
-            except:
-                pass
+        for data, minis in self.historico.serie('derivativos_com_minis', ultimas=2):
+            if minis > 70000000:
+                opp_ratio = "Muito alta" if minis > 80000000 else "Alta"
+                opp = {
+                    'tipo': 'Mini Índice - Day Trade',
+                    'data': data,
+                    'metrica': f'Contratos: {int(minis):,}',
+                    'acao': 'Oportunidade para scalping em mini índice com alta liquidez',
+                    'prioridade': 'ALTA'
+                }
+                self.oportunidades.append(opp)
+                print(f"   ✓ {opp_ratio} atividade em {data}")
 
         # Oportunidade 4: Mercado a Termo
         print("\n4️⃣  MERCADO A TERMO")
@@ -689,9 +719,9 @@ class AnalistaBDI:
                 html += f"""
                     <div class="metric">
                         <div class="metric-label">IBOVESPA (Fechamento)</div>
-                        <div class="metric-value">{metrics.get('ibovespa_valor', 'N/A')}</div>
-                        <div style="color: {'#28a745' if float(metrics.get('ibovespa_variacao', '0').replace('%', '')) > 0 else '#dc3545'}; font-weight: bold;">
-                            {metrics.get('ibovespa_variacao', 'N/A')}
+                        <div class="metric-value">{metrics['ibovespa_valor']:,.2f}</div>
+                        <div style="color: {'#28a745' if metrics.get('ibovespa_variacao', 0) > 0 else '#dc3545'}; font-weight: bold;">
+                            {metrics.get('ibovespa_variacao', 0):+.2f}%
                         </div>
                     </div>
 """
@@ -700,7 +730,7 @@ class AnalistaBDI:
                 html += f"""
                     <div class="metric">
                         <div class="metric-label">Volume Negociado</div>
-                        <div class="metric-value">{metrics.get('volume_negociado', 'N/A')}</div>
+                        <div class="metric-value">{metrics['volume_negociado']:,.0f}</div>
                         <div style="color: #666;">em R$ (últimas sessões)</div>
                     </div>
 """
@@ -709,7 +739,7 @@ class AnalistaBDI:
                 html += f"""
                     <div class="metric">
                         <div class="metric-label">Quantidade de Negócios</div>
-                        <div class="metric-value">{metrics.get('qtd_negocios', 'N/A')}</div>
+                        <div class="metric-value">{metrics['qtd_negocios']:,.0f}</div>
                         <div style="color: #666;">contratos</div>
                     </div>
 """
@@ -718,7 +748,7 @@ class AnalistaBDI:
                 html += f"""
                     <div class="metric">
                         <div class="metric-label">Derivativos (com minis)</div>
-                        <div class="metric-value">{metrics.get('derivativos_com_minis', 'N/A')}</div>
+                        <div class="metric-value">{metrics['derivativos_com_minis']:,.0f}</div>
                         <div style="color: #667eea; font-weight: bold;">Muito Líquido</div>
                     </div>
 """
@@ -986,7 +1016,10 @@ class AnalistaBDI:
 def main():
     """Função principal."""
     analista = AnalistaBDI()
-    resultado = analista.executar_analise_completa()
+    try:
+        resultado = analista.executar_analise_completa()
+    finally:
+        analista.historico.fechar()
     return resultado
 
 
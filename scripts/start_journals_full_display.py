@@ -16,17 +16,26 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-import sqlite3
 import threading
 import time
 from decimal import Decimal
 from datetime import datetime, timedelta, date
+from typing import Mapping, Optional, Sequence
 from config import get_config
 from src.application.services.trading_journal import TradingJournalService
 from src.application.services.quantum_operator import QuantumOperatorEngine
 from src.application.services.ai_reflection_journal import AIReflectionJournalService
 from src.domain.value_objects import Symbol
 from src.infrastructure.adapters.mt5_adapter import MT5Adapter, TimeFrame
+from src.application.services.diary_day_cache import (
+    DiaryDayCache,
+    DiaryDaySnapshot,
+    get_diary_day_cache,
+)
+from src.application.services.diary_day_aggregates import (
+    REGION_TOUCH_ZONE,
+    DayAggregatesView,
+)
 from src.application.services.diary_feedback import (
     DiaryFeedback,
     create_diary_feedback_table,
@@ -98,206 +107,70 @@ def _get_db_path() -> str:
 # ────────────────────────────────────────────────────────────────
 
 class RLPerformanceReader:
-    """Lê e analisa episódios/rewards RL do banco do agente."""
+    """Lê e analisa episódios/rewards RL do banco do agente.
+
+    As leituras vêm do ``DiaryDayCache`` compartilhado pelo processo: todos
+    os threads dos diários enxergam o mesmo snapshot do dia, atualizado de
+    forma incremental. As análises pesadas são memoizadas pela versão do
+    snapshot — só são recalculadas quando chegam linhas novas — e leem os
+    agregados correntes do dia (``snapshot.aggregates``) em vez de varrer
+    episódios, decisões e regiões a cada recálculo.
+    """
 
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, day_cache: Optional[DiaryDayCache] = None):
         self.db_path = db_path
+        self.day_cache = day_cache or get_diary_day_cache(db_path)
 
-    def get_today_episodes(self) -> list[dict]:
+    def _snapshot(self) -> DiaryDaySnapshot:
+        return self.day_cache.snapshot()
+
+    def get_today_episodes(self) -> Sequence[Mapping]:
         """Retorna todos os episódios RL do dia corrente."""
-        today = date.today().isoformat()
-        try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT episode_id, timestamp, source, action,
-                       win_price, win_open_price, win_high_of_day, win_low_of_day,
-                       macro_score_final, micro_score, micro_trend,
-                       alignment_score, overall_confidence,
-                       market_regime, session_phase,
-                       smc_direction, smc_equilibrium,
-                       vwap_position, probability_up, probability_down,
-                       macro_bias, technical_bias, sentiment_bias,
-                       entry_price, stop_loss, take_profit, risk_reward_ratio,
-                       reasoning
-                FROM rl_episodes
-                WHERE session_date = ? OR date(timestamp) = ?
-                ORDER BY timestamp ASC
-            """, (today, today))
-            rows = [dict(r) for r in cursor.fetchall()]
-            conn.close()
-            return rows
-        except Exception:
-            return []
+        return self._snapshot().episodes
 
-    def get_today_rewards(self) -> list[dict]:
+    def get_today_rewards(self) -> Sequence[Mapping]:
         """Retorna rewards avaliados do dia corrente."""
-        today = date.today().isoformat()
-        try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT r.episode_id, r.horizon_minutes, r.action_at_decision,
-                       r.win_price_at_decision, r.win_price_at_evaluation,
-                       r.price_change_points, r.price_change_pct,
-                       r.reward_direction, r.was_correct,
-                       r.reward_normalized, r.reward_continuous,
-                       r.max_favorable_points, r.max_adverse_points,
-                       r.is_evaluated
-                FROM rl_rewards r
-                WHERE date(r.timestamp_decision) = ?
-                ORDER BY r.timestamp_decision ASC, r.horizon_minutes ASC
-            """, (today,))
-            rows = [dict(r) for r in cursor.fetchall()]
-            conn.close()
-            return rows
-        except Exception:
-            return []
+        return self._snapshot().rewards
 
-    def get_today_micro_decisions(self) -> list[dict]:
+    def get_today_micro_decisions(self) -> Sequence[Mapping]:
         """Retorna decisões de micro tendência do dia."""
-        today = date.today().isoformat()
-        try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT id, timestamp, macro_score, macro_signal, macro_confidence,
-                       micro_score, micro_trend, price_current, price_open,
-                       vwap, pivot_pp, smc_direction, smc_equilibrium,
-                       adx, rsi, num_opportunities,
-                       macro_score_raw, directive_suspended
-                FROM micro_trend_decisions
-                WHERE date(timestamp) = ?
-                ORDER BY timestamp ASC
-            """, (today,))
-            rows = [dict(r) for r in cursor.fetchall()]
-            conn.close()
-            return rows
-        except Exception:
-            return []
+        return self._snapshot().decisions
 
-    def get_today_opportunities(self) -> list[dict]:
+    def get_today_opportunities(self) -> Sequence[Mapping]:
         """Retorna oportunidades detectadas hoje."""
-        today = date.today().isoformat()
-        try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT o.direction, o.entry, o.stop_loss, o.take_profit,
-                       o.risk_reward, o.confidence, o.reason, o.region,
-                       o.timestamp
-                FROM micro_trend_opportunities o
-                WHERE date(o.timestamp) = ?
-                ORDER BY o.timestamp ASC
-            """, (today,))
-            rows = [dict(r) for r in cursor.fetchall()]
-            conn.close()
-            return rows
-        except Exception:
-            return []
+        return self._snapshot().opportunities
 
-    def get_today_regions(self) -> list[dict]:
+    def get_today_regions(self) -> Sequence[Mapping]:
         """Retorna regiões de interesse mapeadas hoje."""
-        today = date.today().isoformat()
-        try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT r.price, r.label, r.tipo, r.confluences,
-                       r.distance_pct, r.timestamp, r.decision_id
-                FROM micro_trend_regions r
-                WHERE date(r.timestamp) = ?
-                ORDER BY r.timestamp ASC
-            """, (today,))
-            rows = [dict(r) for r in cursor.fetchall()]
-            conn.close()
-            return rows
-        except Exception:
-            return []
+        return self._snapshot().regions
 
-    def get_today_macro_items(self) -> list[dict]:
+    def get_today_macro_items(self) -> Sequence[Mapping]:
         """Retorna items macro do último ciclo do dia (breakdown por categoria)."""
-        today = date.today().isoformat()
-        try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            # Pegar o último decision_id do dia
-            cursor.execute("""
-                SELECT id FROM micro_trend_decisions
-                WHERE date(timestamp) = ?
-                ORDER BY id DESC LIMIT 1
-            """, (today,))
-            row = cursor.fetchone()
-            if not row:
-                conn.close()
-                return []
-            last_id = row["id"]
-            # Buscar todos os items desse ciclo
-            cursor.execute("""
-                SELECT symbol, category, score, price_current, price_open
-                FROM micro_trend_items
-                WHERE decision_id = ?
-                ORDER BY category, item_number
-            """, (last_id,))
-            rows = [dict(r) for r in cursor.fetchall()]
-            conn.close()
-            return rows
-        except Exception:
-            return []
+        return self._snapshot().macro_items
 
-    def get_macro_category_history(self) -> dict:
+    def get_macro_category_history(self) -> Mapping:
         """Retorna evolução histórica do score por categoria ao longo do dia.
 
-        Para cada categoria, calcula o score em cada ciclo do dia,
-        permitindo detectar viradas, divergências crescentes, etc.
+        Para cada categoria, o score em cada ciclo do dia
+        ({categoria: ((timestamp, score_sum, n_items), ...)}), permitindo
+        detectar viradas, divergências crescentes, etc. Agregado
+        incrementalmente pelo cache a cada ciclo novo.
         """
-        today = date.today().isoformat()
-        try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT d.id as decision_id, d.timestamp,
-                       i.category, i.score, i.symbol
-                FROM micro_trend_items i
-                JOIN micro_trend_decisions d ON d.id = i.decision_id
-                WHERE date(d.timestamp) = ?
-                ORDER BY d.timestamp ASC, i.category
-            """, (today,))
-            rows = cursor.fetchall()
-            conn.close()
-
-            # Agrupar por decision_id → categoria → soma de scores
-            history = {}  # {category: [(timestamp, score_sum, n_items)]}
-            cycle_data = {}  # {decision_id: {category: {score_sum, n_items, timestamp}}}
-
-            for r in rows:
-                did = r["decision_id"]
-                cat = r["category"]
-                if did not in cycle_data:
-                    cycle_data[did] = {}
-                if cat not in cycle_data[did]:
-                    cycle_data[did][cat] = {"score": 0, "n": 0, "ts": r["timestamp"]}
-                cycle_data[did][cat]["score"] += r["score"]
-                cycle_data[did][cat]["n"] += 1
-
-            for did in sorted(cycle_data.keys()):
-                for cat, data in cycle_data[did].items():
-                    if cat not in history:
-                        history[cat] = []
-                    history[cat].append((data["ts"], data["score"], data["n"]))
-
-            return history
-        except Exception:
-            return {}
+        return self._snapshot().category_history
+
+    def get_day_aggregates(self) -> DayAggregatesView:
+        """Agregados correntes do dia (contagens, extremos, regiões únicas)."""
+        return self._snapshot().aggregates
+
+    def _memoize(self, key: str, compute):
+        """Reaproveita a análise enquanto o snapshot do dia não mudar."""
+        return self.day_cache.memoize(key, self._snapshot(), compute)
 
     def analyze_directional_critical(self) -> dict:
+        """Memoizado pela versão do snapshot do dia (ver ``_analyze_directional_critical``)."""
+        return self._memoize("analyze_directional_critical", self._analyze_directional_critical)
+
+    def _analyze_directional_critical(self) -> dict:
         """Análise CRÍTICA nível Head sobre o direcional do dia.
 
         Questiona como advogado do diabo:
@@ -473,21 +346,10 @@ class RLPerformanceReader:
         # ── 6. EVOLUÇÃO INTRA-DIA ──
         if cat_history:
             # Verificar se o score total mudou de sinal durante o dia
-            total_by_cycle = []
-            for cat, hist in cat_history.items():
-                for ts, score, n in hist:
-                    # Acumular por timestamp
-                    found = False
-                    for entry in total_by_cycle:
-                        if entry[0] == ts:
-                            entry[1] += score
-                            found = True
-                            break
-                    if not found:
-                        total_by_cycle.append([ts, score])
+            # (score total por ciclo, agregado pelo cache item a item)
+            total_by_cycle = self.get_day_aggregates().cycle_totals
 
             if len(total_by_cycle) >= 3:
-                total_by_cycle.sort()
                 scores_cycle = [s for _, s in total_by_cycle]
                 first_half = scores_cycle[:len(scores_cycle)//2]
                 second_half = scores_cycle[len(scores_cycle)//2:]
@@ -574,6 +436,10 @@ class RLPerformanceReader:
         return result
 
     def analyze_region_behavior(self) -> list[dict]:
+        """Memoizado pela versão do snapshot do dia (ver ``_analyze_region_behavior``)."""
+        return self._memoize("analyze_region_behavior", self._analyze_region_behavior)
+
+    def _analyze_region_behavior(self) -> list[dict]:
         """Analisa se o preço respeitou ou furou cada região mapeada.
 
         Para cada região única, verifica a história de preços:
@@ -582,77 +448,40 @@ class RLPerformanceReader:
          - NÃO TESTADO: preço nunca chegou a ±50 pts da região
          - TESTANDO: preço está na zona agora (±50 pts)
         """
-        regions_raw = self.get_today_regions()
-        decisions = self.get_today_micro_decisions()
+        agg = self.get_day_aggregates()
 
-        if not regions_raw or not decisions:
+        # Regiões já deduplicadas (±30 pts) e preços já acompanhados pelo
+        # cache: cada ciclo novo só atualiza os toques e extremos
+        if not agg.regions or not agg.n_decisions or not agg.price.n:
             return []
 
-        # Obter histórico de preços com timestamps
-        price_history = []
-        for d in decisions:
-            p = d.get("price_current")
-            ts = d.get("timestamp", "")
-            if p:
-                price_history.append((ts, float(p)))
-
-        if not price_history:
-            return []
-
-        # Deduplicar regiões por preço (±30 pts = mesma região)
-        unique_regions = []
-        seen_prices = []
-        DEDUP_TOLERANCE = 30.0
-
-        for reg in regions_raw:
-            price = float(reg["price"])
-            is_dup = False
-            for sp in seen_prices:
-                if abs(price - sp) <= DEDUP_TOLERANCE:
-                    is_dup = True
-                    break
-            if not is_dup:
-                seen_prices.append(price)
-                unique_regions.append(reg)
-
-        # Analisar cada região
-        TOUCH_ZONE = 50.0      # pts — considera "chegou na região"
         CONFIRM_MOVE = 100.0   # pts — movimento de confirmação
         results = []
 
-        current_price = price_history[-1][1] if price_history else 0
+        current_price = agg.price.last
 
-        for reg in unique_regions:
-            reg_price = float(reg["price"])
+        for track in agg.regions:
+            reg = track.region
+            reg_price = track.price
             tipo = reg.get("tipo", "")
             label = reg.get("label", "")
             confluences = reg.get("confluences", 1)
 
-            # Encontrar momentos em que o preço tocou a região
-            touches = []
-            for i, (ts, p) in enumerate(price_history):
-                if abs(p - reg_price) <= TOUCH_ZONE:
-                    touches.append((i, ts, p))
-
-            if not touches:
+            if not track.n_touches:
                 status = "NÃO TESTADO"
                 detail = "Preço não chegou nesta região"
             else:
-                # Pegar o PRIMEIRO toque
-                first_touch_idx, first_touch_ts, first_touch_price = touches[0]
-
-                # Verificar o que aconteceu DEPOIS do toque
-                prices_after = [p for _, p in price_history[first_touch_idx:]]
+                first_touch_ts = track.first_touch_ts
 
-                if not prices_after or len(prices_after) < 3:
+                # O que aconteceu DEPOIS do primeiro toque
+                if track.after_len < 3:
                     status = "TESTANDO"
                     detail = f"Toque recente em {first_touch_ts[:19]}"
                 else:
                     if tipo == "RESISTENCIA":
                         # Resistência: preço subiu até a região
-                        max_above = max(prices_after) - reg_price
-                        min_after = min(prices_after[1:])
-                        pullback = reg_price - min_after
+                        max_above = track.after_max - reg_price
+                        pullback = reg_price - track.rest_min
 
                         if max_above > CONFIRM_MOVE:
                             status = "FUROU ↑"
@@ -660,7 +489,7 @@ class RLPerformanceReader:
                         elif pullback > CONFIRM_MOVE:
                             status = "RESPEITOU ↓"
                             detail = f"Rejeitou, caiu {pullback:.0f} pts"
-                        elif abs(current_price - reg_price) <= TOUCH_ZONE:
+                        elif abs(current_price - reg_price) <= REGION_TOUCH_ZONE:
                             status = "TESTANDO"
                             detail = "Preço na zona agora"
                         else:
@@ -668,9 +497,8 @@ class RLPerformanceReader:
                             detail = f"Recuou {pullback:.0f} pts"
                     elif tipo == "SUPORTE":
                         # Suporte: preço caiu até a região
-                        min_below = reg_price - min(prices_after)
-                        max_after = max(prices_after[1:])
-                        bounce = max_after - reg_price
+                        min_below = reg_price - track.after_min
+                        bounce = track.rest_max - reg_price
 
                         if min_below > CONFIRM_MOVE:
                             status = "FUROU ↓"
@@ -678,7 +506,7 @@ class RLPerformanceReader:
                         elif bounce > CONFIRM_MOVE:
                             status = "RESPEITOU ↑"
                             detail = f"Segurou, subiu {bounce:.0f} pts"
-                        elif abs(current_price - reg_price) <= TOUCH_ZONE:
+                        elif abs(current_price - reg_price) <= REGION_TOUCH_ZONE:
                             status = "TESTANDO"
                             detail = "Preço na zona agora"
                         else:
@@ -695,7 +523,7 @@ class RLPerformanceReader:
                 "confluences": confluences,
                 "status": status,
                 "detail": detail,
-                "n_touches": len(touches),
+                "n_touches": track.n_touches,
             })
 
         # Ordenar por preço (maior→menor)
@@ -813,6 +641,10 @@ class RLPerformanceReader:
         }
 
     def analyze_agent_coherence(self) -> dict:
+        """Memoizado pela versão do snapshot do dia (ver ``_analyze_agent_coherence``)."""
+        return self._memoize("analyze_agent_coherence", self._analyze_agent_coherence)
+
+    def _analyze_agent_coherence(self) -> dict:
         """Análise PROFUNDA de coerência do agente — cruza dados para encontrar problemas.
 
         Faz o que o Head Global faria:
@@ -823,8 +655,9 @@ class RLPerformanceReader:
         - Questiona parâmetros e configurações
         - Sugere mudanças concretas
         """
-        episodes = self.get_today_episodes()
-        decisions = self.get_today_micro_decisions()
+        # Contagens e médias vêm dos agregados correntes do dia (só as
+        # linhas novas de cada refresh são processadas pelo cache)
+        agg = self.get_day_aggregates()
         opportunities = self.get_today_opportunities()
 
         result = {
@@ -837,7 +670,7 @@ class RLPerformanceReader:
             "nota_agente": 10,  # Começa com 10, desconta por problema
         }
 
-        if not episodes and not decisions:
+        if not agg.n_episodes and not agg.n_decisions:
             result["alertas_criticos"].append(
                 "Nenhum dado do agente hoje. Não é possível analisar."
             )
@@ -845,15 +678,10 @@ class RLPerformanceReader:
             return result
 
         # ── 1. COERÊNCIA MACRO SIGNAL vs AÇÃO ──
-        macro_signals = {}
-        agent_actions = {}
-        for ep in episodes:
-            sig = ep.get("macro_bias", "UNKNOWN")
-            macro_signals[sig] = macro_signals.get(sig, 0) + 1
-            act = ep.get("action", "UNKNOWN")
-            agent_actions[act] = agent_actions.get(act, 0) + 1
+        macro_signals = agg.counts("macro_bias")
+        agent_actions = agg.counts("action")
 
-        total_ep = len(episodes)
+        total_ep = agg.n_episodes
         if total_ep > 0:
             # Qual o sinal macro dominante?
             dominant_signal = max(macro_signals, key=macro_signals.get) if macro_signals else "UNKNOWN"
@@ -890,13 +718,7 @@ class RLPerformanceReader:
                 result["nota_agente"] -= 3
 
         # ── 2. ANÁLISE DE FILTROS BLOQUEANTES (SMC) ──
-        smc_equilibrium = {}
-        smc_direction = {}
-        for ep in episodes:
-            eq = ep.get("smc_equilibrium", "UNKNOWN")
-            smc_equilibrium[eq] = smc_equilibrium.get(eq, 0) + 1
-            sd = ep.get("smc_direction", "UNKNOWN")
-            smc_direction[sd] = smc_direction.get(sd, 0) + 1
+        smc_equilibrium = agg.counts("smc_equilibrium")
 
         if total_ep > 0:
             premium_count = smc_equilibrium.get("PREMIUM", 0)
@@ -923,16 +745,10 @@ class RLPerformanceReader:
                 result["nota_agente"] -= 2
 
         # ── 3. ANÁLISE ADX vs THRESHOLDS ──
-        adx_values = []
-        for d in decisions:
-            adx = d.get("adx")
-            if adx is not None:
-                adx_values.append(float(adx))
-
-        if adx_values:
-            avg_adx = sum(adx_values) / len(adx_values)
-            max_adx = max(adx_values)
-            last_adx = adx_values[-1]
+        if agg.adx.n:
+            avg_adx = agg.adx.mean
+            max_adx = agg.adx.max
+            last_adx = agg.adx.last
 
             if avg_adx > 25 and len(opportunities) == 0:
                 result["parametros_questionados"].append(
@@ -952,15 +768,9 @@ class RLPerformanceReader:
                 result["nota_agente"] -= 1
 
         # ── 4. ANÁLISE RSI ──
-        rsi_values = []
-        for d in decisions:
-            rsi = d.get("rsi")
-            if rsi is not None:
-                rsi_values.append(float(rsi))
-
-        if rsi_values:
-            avg_rsi = sum(rsi_values) / len(rsi_values)
-            max_rsi = max(rsi_values)
+        if agg.rsi.n:
+            avg_rsi = agg.rsi.mean
+            max_rsi = agg.rsi.max
 
             if avg_rsi > 60 and max_rsi < 80 and compra_pct > 70 and hold_pct > 80:
                 result["parametros_questionados"].append(
@@ -971,23 +781,15 @@ class RLPerformanceReader:
                 )
 
         # ── 5. MICRO SCORE vs TENDÊNCIA REAL ──
-        micro_scores = []
-        micro_trends = {}
-        for d in decisions:
-            ms = d.get("micro_score")
-            if ms is not None:
-                micro_scores.append(float(ms))
-            mt = d.get("micro_trend", "UNKNOWN")
-            micro_trends[mt] = micro_trends.get(mt, 0) + 1
-
-        if micro_scores and decisions:
-            avg_micro = sum(micro_scores) / len(micro_scores)
-            last_micro = micro_scores[-1]
+        micro_trends = agg.micro_trends
+        prices = agg.price
+
+        if agg.micro_score.n and agg.n_decisions:
+            avg_micro = agg.micro_score.mean
 
             # Preço subindo mas micro score negativo
-            prices = [float(d["price_current"]) for d in decisions if d.get("price_current")]
-            if len(prices) >= 10:
-                price_change = prices[-1] - prices[0]
+            if prices.n >= 10:
+                price_change = prices.last - prices.first
                 if price_change > 500 and avg_micro < 0:
                     result["incoerencias"].append(
                         f"🔴 MICRO SCORE INVERTIDO: Preço subiu {price_change:.0f} pts "
@@ -1007,21 +809,20 @@ class RLPerformanceReader:
                     result["nota_agente"] -= 1
 
             # Tendências detectadas
-            reversao_pct = micro_trends.get("REVERSÃO", 0) / len(decisions) * 100 if decisions else 0
-            if reversao_pct > 50 and len(prices) >= 10 and abs(prices[-1] - prices[0]) > 500:
+            reversao_pct = micro_trends.get("REVERSÃO", 0) / agg.n_decisions * 100
+            if reversao_pct > 50 and prices.n >= 10 and abs(prices.last - prices.first) > 500:
                 result["incoerencias"].append(
                     f"🔴 FALSA REVERSÃO: {reversao_pct:.0f}% das decisões classificaram "
-                    f"como REVERSÃO, mas o mercado moveu {prices[-1]-prices[0]:+.0f} pts. "
+                    f"como REVERSÃO, mas o mercado moveu {prices.last - prices.first:+.0f} pts. "
                     f"O classificador de micro tendência está confundindo PULLBACKS "
                     f"normais com reversões. Precisa considerar ADX na classificação."
                 )
 
         # ── 6. CUSTO DE OPORTUNIDADE ──
-        if decisions:
-            prices = [float(d["price_current"]) for d in decisions if d.get("price_current")]
-            if len(prices) >= 5:
-                price_range = max(prices) - min(prices)
-                price_direction = prices[-1] - prices[0]
+        if agg.n_decisions:
+            if prices.n >= 5:
+                price_range = prices.max - prices.min
+                price_direction = prices.last - prices.first
 
                 # Quantos pontos um trader que seguisse a tendência capturaria?
                 # Estimativa conservadora: 40% do range em tendência clara
@@ -1046,16 +847,10 @@ class RLPerformanceReader:
                         result["nota_agente"] -= 2
 
         # ── 7. MACRO SCORE ABSOLUTO vs AÇÃO ──
-        macro_scores = []
-        for ep in episodes:
-            ms = ep.get("macro_score_final")
-            if ms is not None:
-                macro_scores.append(float(ms))
-
-        if macro_scores:
-            avg_macro = sum(macro_scores) / len(macro_scores)
-            max_macro = max(macro_scores)
-            last_macro = macro_scores[-1] if macro_scores else 0
+        if agg.macro_score.n:
+            avg_macro = agg.macro_score.mean
+            max_macro = agg.macro_score.max
+            last_macro = agg.macro_score.last
 
             if avg_macro > 30 and hold_pct > 80:
                 result["parametros_questionados"].append(
@@ -1073,10 +868,7 @@ class RLPerformanceReader:
                 )
 
         # ── 8. VWAP POSITION ──
-        vwap_positions = {}
-        for ep in episodes:
-            vp = ep.get("vwap_position", "UNKNOWN")
-            vwap_positions[vp] = vwap_positions.get(vp, 0) + 1
+        vwap_positions = agg.counts("vwap_position")
 
         if total_ep > 0:
             above_vwap = vwap_positions.get("ABOVE_2S", 0) + vwap_positions.get("ABOVE_1S", 0)
@@ -1090,7 +882,7 @@ class RLPerformanceReader:
                 )
 
             # Sugestão se VWAP above
-            if above_pct > 60 and avg_adx > 25 if adx_values else False:
+            if above_pct > 60 and avg_adx > 25 if agg.adx.n else False:
                 result["sugestoes"].append(
                     f"Quando VWAP ABOVE + ADX>{avg_adx:.0f}, o agente deveria "
                     f"entrar em modo 'trend following': comprar pullbacks até "
@@ -1256,6 +1048,10 @@ class RLPerformanceReader:
         }
 
     def analyze_regions_critical(self) -> dict:
+        """Memoizado pela versão do snapshot do dia (ver ``_analyze_regions_critical``)."""
+        return self._memoize("analyze_regions_critical", self._analyze_regions_critical)
+
+    def _analyze_regions_critical(self) -> dict:
         """Análise CRÍTICA nível Head Global sobre regiões de interesse.
 
         Para cada região, avalia como ADVOGADO DO DIABO:
@@ -1267,10 +1063,9 @@ class RLPerformanceReader:
 
         Objetivo: NÃO perder oportunidades reais, mas NÃO sugerir viés equivocado.
         """
-        regions_raw = self.get_today_regions()
+        agg = self.get_day_aggregates()
         region_behavior = self.analyze_region_behavior()
         decisions = self.get_today_micro_decisions()
-        episodes = self.get_today_episodes()
 
         result = {
             "regioes_analisadas": [],
@@ -1280,41 +1075,30 @@ class RLPerformanceReader:
             "armadilhas_possiveis": [],
         }
 
-        if not regions_raw or not decisions:
+        if not agg.regions or not agg.n_decisions:
             result["veredicto_geral"] = "Sem dados de regiões ou decisões para analisar"
             return result
 
-        # Contexto de mercado
-        prices = [float(d["price_current"]) for d in decisions if d.get("price_current")]
-        if not prices:
+        # Contexto de mercado (agregados correntes do dia)
+        if not agg.price.n:
             result["veredicto_geral"] = "Sem histórico de preços"
             return result
 
-        current_price = prices[-1]
-        market_high = max(prices)
-        market_low = min(prices)
-        market_range = market_high - market_low
-        price_open = prices[0]
-        price_direction = current_price - price_open  # + = alta, - = baixa
+        current_price = agg.price.last
+        market_range = agg.price.max - agg.price.min
+        price_direction = current_price - agg.price.first  # + = alta, - = baixa
         direction_label = "ALTA" if price_direction > 0 else "BAIXA" if price_direction < 0 else "FLAT"
 
         # ADX médio (força da tendência)
-        adx_values = [float(d["adx"]) for d in decisions if d.get("adx")]
-        avg_adx = sum(adx_values) / len(adx_values) if adx_values else 0
+        avg_adx = agg.adx_nonzero.mean
         trend_strong = avg_adx > 25
 
         # Macro dominante
-        macro_signals = {}
-        for ep in episodes:
-            sig = ep.get("macro_bias", "UNKNOWN")
-            macro_signals[sig] = macro_signals.get(sig, 0) + 1
+        macro_signals = agg.counts("macro_bias")
         macro_dom = max(macro_signals, key=macro_signals.get) if macro_signals else "UNKNOWN"
 
         # SMC dominante
-        smc_eq = {}
-        for ep in episodes:
-            eq = ep.get("smc_equilibrium", "UNKNOWN")
-            smc_eq[eq] = smc_eq.get(eq, 0) + 1
+        smc_eq = agg.counts("smc_equilibrium")
         smc_dom = max(smc_eq, key=smc_eq.get) if smc_eq else "UNKNOWN"
 
         # Indexar comportamento por preço
@@ -1322,12 +1106,8 @@ class RLPerformanceReader:
         for b in region_behavior:
             behavior_map[round(b["price"])] = b
 
-        # Deduplicar regiões mais recentes (últimas 2h de dados)
-        recent_regions = {}
-        for reg in reversed(regions_raw):
-            price_key = round(float(reg["price"]) / 50) * 50  # Agrupa ±25 pts
-            if price_key not in recent_regions:
-                recent_regions[price_key] = reg
+        # Região mais recente por faixa de 50 pts (agrupa ±25 pts)
+        recent_regions = agg.recent_regions
 
         # Analisar cada região única
         for price_key, reg in sorted(recent_regions.items(), key=lambda x: x[0], reverse=True):
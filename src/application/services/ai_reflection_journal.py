@@ -11,6 +11,7 @@ from decimal import Decimal
 from typing import Optional
 
 from src.domain.enums.trading_enums import TradeSignal
+from src.infrastructure.database.reflection_log import ReflectionLog
 
 
 @dataclass
@@ -83,8 +84,8 @@ class AIReflectionJournalService:
         from pathlib import Path
         project_root = Path(__file__).resolve().parents[3]
         log_dir = project_root / "data" / "db" / "reflections"
-        log_dir.mkdir(parents=True, exist_ok=True)
-        self.log_file = log_dir / "reflections_log.jsonl"
+        # Segmentos diarios com indice de tempo (ver ReflectionLog)
+        self.reflection_log = ReflectionLog(log_dir)
 
     def generate_reflection(
         self,
@@ -221,10 +222,8 @@ class AIReflectionJournalService:
         return reflection
 
     def _persist_to_disk(self, reflection: AIReflection):
-        """Append reflection to JSONL file."""
+        """Append reflection to the daily JSONL segment."""
         try:
-            import json
-
             # Convert dataclass to dict and handle special types
             r_dict = {
                 "timestamp": reflection.timestamp.isoformat(),
@@ -248,8 +247,7 @@ class AIReflectionJournalService:
                 "one_liner": reflection.one_liner
             }
 
-            with open(self.log_file, "a", encoding="utf-8") as f:
-                f.write(json.dumps(r_dict, ensure_ascii=False) + "\n")
+            self.reflection_log.append(r_dict)
 
         except Exception as e:
             print(f"[AVISO] Nao foi possivel persistir reflexao: {e}")
@@ -2,16 +2,17 @@
 
 import asyncio
 import logging
-import smtplib
+import time
 from asyncio import TimeoutError as AsyncTimeoutError
+from collections import deque
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
-from datetime import datetime
 from typing import Callable, Dict, Optional
 
 from src.application.services.alerta_formatter import AlertaFormatter
 from src.domain.entities.alerta import AlertaOportunidade
 from src.domain.enums.alerta_enums import CanalEntrega
+from src.infrastructure.adapters.smtp_pool import SmtpSessionPool
 
 logger = logging.getLogger(__name__)
 
@@ -26,14 +27,21 @@ class AlertaDeliveryManager:
     3. TERTIARY: SMS (v1.2, condicional)
 
     Garante que nenhum alerta é perdido.
+
+    Latência: cada canal registra o tempo desde o início da entrega do
+    alerta até o canal confirmar (retries incluídos) — vai para a
+    auditoria e para ``obter_metricas_latencia()``.
     """
 
+    LATENCIA_JANELA = 1000  # Amostras por canal para os percentis
+
     def __init__(
         self,
         websocket_client: Optional[object] = None,
         email_config: Optional[Dict] = None,
         sms_client: Optional[object] = None,
         audit_log: Optional[object] = None,
+        smtp_pool: Optional[SmtpSessionPool] = None,
     ):
         """
         Inicializa delivery manager.
@@ -41,14 +49,19 @@ class AlertaDeliveryManager:
         Args:
             websocket_client: Cliente WebSocket para push real-time
             email_config: Dict com smtp_host, smtp_port, from_email, password
+                (opcionais: smtp_starttls, smtp_pool_size)
             sms_client: Cliente SMS (v1.2)
             audit_log: Serviço de auditoria para logging
+            smtp_pool: Pool de sessões SMTP (padrão: criado a partir de
+                email_config no primeiro e-mail)
         """
         self.websocket = websocket_client
         self.email_config = email_config or {}
         self.sms = sms_client
         self.audit_log = audit_log
         self.formatter = AlertaFormatter()
+        self.smtp_pool = smtp_pool
+        self.latencias_ms: Dict[str, deque] = {}
 
     async def entregar_alerta(self, alerta: AlertaOportunidade) -> bool:
         """
@@ -67,29 +80,30 @@ class AlertaDeliveryManager:
         """
 
         logger.info(f"Iniciando entrega de alerta {alerta.id}")
-        timestamp_inicio = datetime.now()
+        inicio = time.perf_counter()
 
         # PASSO 1: Tenta WebSocket (PRIMARY)
         sucesso_websocket = False
         try:
-            sucesso_websocket = await self._entregar_websocket(alerta)
+            sucesso_websocket = await self._entregar_websocket(alerta, inicio=inicio)
         except Exception as e:
             logger.warning(f"WebSocket falhou: {e}, tentando email fallback")
 
         # PASSO 2: Email em paralelo (sempre tenta, não bloqueia)
         # Executa em background
-        asyncio.create_task(self._entregar_email_com_retry(alerta))
+        asyncio.create_task(self._entregar_email_com_retry(alerta, inicio=inicio))
 
         # PASSO 3: Calcula latência
-        latencia_ms = int(
-            (datetime.now() - timestamp_inicio).total_seconds() * 1000
-        )
+        latencia_ms = self._ms_desde(inicio)
         logger.info(f"Entrega iniciada: {alerta.id} em {latencia_ms}ms")
 
         return sucesso_websocket  # Sucesso se > WebSocket funcionou
 
     async def _entregar_websocket(
-        self, alerta: AlertaOportunidade, timeout_sec: float = 0.5
+        self,
+        alerta: AlertaOportunidade,
+        timeout_sec: float = 0.5,
+        inicio: Optional[float] = None,
     ) -> bool:
         """
         Tenta entregar via WebSocket (PRIMARY - real-time).
@@ -97,6 +111,7 @@ class AlertaDeliveryManager:
         Args:
             alerta: AlertaOportunidade
             timeout_sec: Timeout em segundos (500ms)
+            inicio: ``time.perf_counter()`` do início da entrega
 
         Returns:
             True se entregue, False caso contrário
@@ -106,6 +121,9 @@ class AlertaDeliveryManager:
             logger.debug("WebSocket cliente não configurado")
             return False
 
+        if inicio is None:
+            inicio = time.perf_counter()
+
         try:
             payload = self.formatter.formatar_json(alerta)
 
@@ -116,26 +134,24 @@ class AlertaDeliveryManager:
 
             logger.info(f"✅ WebSocket entregue: {alerta.id}")
             alerta.marcar_entregue(CanalEntrega.WEBSOCKET)
-
-            if self.audit_log:
-                self.audit_log.registrar_entrega(
-                    alerta_id=str(alerta.id),
-                    canal="websocket",
-                    status="entregue",
-                    latencia_ms=0,
-                )
+            self._registrar_latencia(alerta, "websocket", "entregue", inicio)
 
             return True
 
         except AsyncTimeoutError:
             logger.warning(f"⏱️ WebSocket timeout: {alerta.id}")
+            self._registrar_latencia(alerta, "websocket", "timeout", inicio)
             return False
         except Exception as e:
             logger.error(f"❌ WebSocket erro: {e}")
+            self._registrar_latencia(alerta, "websocket", "falha", inicio, str(e))
             return False
 
     async def _entregar_email_com_retry(
-        self, alerta: AlertaOportunidade, max_retry: int = 3
+        self,
+        alerta: AlertaOportunidade,
+        max_retry: int = 3,
+        inicio: Optional[float] = None,
     ) -> bool:
         """
         Tenta entregar via Email SMTP com retry exponencial.
@@ -148,6 +164,7 @@ class AlertaDeliveryManager:
         Args:
             alerta: AlertaOportunidade
             max_retry: Máximo de tentativas
+            inicio: ``time.perf_counter()`` do início da entrega
 
         Returns:
             True se entregue, False se falha após retries
@@ -157,6 +174,9 @@ class AlertaDeliveryManager:
             logger.debug("Email não configurado")
             return False
 
+        if inicio is None:
+            inicio = time.perf_counter()
+
         destinatario = self.email_config.get("to_email", "operador@trading.local")
         assunto = self.formatter.formatar_assunto_email(alerta)
         corpo_html = self.formatter.formatar_email_html(alerta)
@@ -176,14 +196,7 @@ class AlertaDeliveryManager:
 
                 logger.info(f"✅ Email entregue: {alerta.id}")
                 alerta.marcar_entregue(CanalEntrega.EMAIL)
-
-                if self.audit_log:
-                    self.audit_log.registrar_entrega(
-                        alerta_id=str(alerta.id),
-                        canal="email",
-                        status="entregue",
-                        latencia_ms=0,
-                    )
+                self._registrar_latencia(alerta, "email", "entregue", inicio)
 
                 return True
 
@@ -206,14 +219,7 @@ class AlertaDeliveryManager:
         # Se chegou aqui, falhou todas as tentativas
         logger.error(f"❌ Email falhou após {max_retry} tentativas: {alerta.id}")
         alerta.marcar_falha_entrega(CanalEntrega.EMAIL, "max_retry_exceeded")
-
-        if self.audit_log:
-            self.audit_log.registrar_entrega(
-                alerta_id=str(alerta.id),
-                canal="email",
-                status="falha",
-                latencia_ms=-1,
-            )
+        self._registrar_latencia(alerta, "email", "falha", inicio, "max_retry_exceeded")
 
         return False
 
@@ -225,7 +231,7 @@ class AlertaDeliveryManager:
         corpo_texto: str,
     ) -> bool:
         """
-        Envio SMTP de fato (roda em executor para não bloquear).
+        Envio SMTP de fato, por uma sessão persistente do pool.
 
         Args:
             destinatario: Email do operador
@@ -237,46 +243,32 @@ class AlertaDeliveryManager:
             True se enviado com sucesso
         """
 
-        loop = asyncio.get_event_loop()
-
-        def _envio_bloqueante():
-            """Função que faz o envio em thread executor."""
-            servidor_smtp = smtplib.SMTP(
-                self.email_config.get("smtp_host", "localhost"),
-                self.email_config.get("smtp_port", 587),
-            )
-
-            servidor_smtp.starttls()
-
-            # Autentica se credenciais fornecidas
-            if self.email_config.get("smtp_user"):
-                servidor_smtp.login(
-                    self.email_config["smtp_user"],
-                    self.email_config["smtp_password"],
-                )
-
-            # Cria mensagem multipart
-            mensagem = MIMEMultipart("alternative")
-            mensagem["Subject"] = assunto
-            mensagem["From"] = self.email_config.get("from_email", "bot@trading.local")
-            mensagem["To"] = destinatario
-
-            # Atach texto e HTML
-            parte_texto = MIMEText(corpo_texto, "plain", "utf-8")
-            parte_html = MIMEText(corpo_html, "html", "utf-8")
-            mensagem.attach(parte_texto)
-            mensagem.attach(parte_html)
-
-            # Envia
-            servidor_smtp.sendmail(
-                mensagem["From"], destinatario, mensagem.as_string()
+        # Cria mensagem multipart
+        mensagem = MIMEMultipart("alternative")
+        mensagem["Subject"] = assunto
+        mensagem["From"] = self.email_config.get("from_email", "bot@trading.local")
+        mensagem["To"] = destinatario
+
+        # Atach texto e HTML
+        mensagem.attach(MIMEText(corpo_texto, "plain", "utf-8"))
+        mensagem.attach(MIMEText(corpo_html, "html", "utf-8"))
+
+        # Sessão SMTP reaproveitada do pool (não bloqueia event loop)
+        await self._obter_smtp_pool().enviar(mensagem)
+        return True
+
+    def _obter_smtp_pool(self) -> SmtpSessionPool:
+        """Pool de sessões SMTP (criado a partir de email_config no primeiro uso)."""
+        if self.smtp_pool is None:
+            self.smtp_pool = SmtpSessionPool(
+                host=self.email_config.get("smtp_host", "localhost"),
+                port=self.email_config.get("smtp_port", 587),
+                user=self.email_config.get("smtp_user"),
+                password=self.email_config.get("smtp_password"),
+                starttls=self.email_config.get("smtp_starttls", True),
+                pool_size=self.email_config.get("smtp_pool_size", 2),
             )
-            servidor_smtp.quit()
-
-            return True
-
-        # Executa em thread pool (não bloqueia event loop)
-        return await loop.run_in_executor(None, _envio_bloqueante)
+        return self.smtp_pool
 
     async def _entregar_sms(
         self, alerta: AlertaOportunidade, max_retry: int = 2
@@ -297,6 +289,7 @@ class AlertaDeliveryManager:
             return False
 
         corpo_sms = self.formatter.formatar_sms(alerta)
+        inicio = time.perf_counter()
 
         for tentativa in range(max_retry):
             try:
@@ -304,14 +297,7 @@ class AlertaDeliveryManager:
 
                 logger.info(f"✅ SMS entregue: {alerta.id}")
                 alerta.marcar_entregue(CanalEntrega.SMS)
-
-                if self.audit_log:
-                    self.audit_log.registrar_entrega(
-                        alerta_id=str(alerta.id),
-                        canal="sms",
-                        status="entregue",
-                        latencia_ms=0,
-                    )
+                self._registrar_latencia(alerta, "sms", "entregue", inicio)
 
                 return True
 
@@ -321,3 +307,69 @@ class AlertaDeliveryManager:
 
         logger.error(f"❌ SMS falhou: {alerta.id}")
         return False
+
+    # ────────────────────────────────────────────────────────────
+    # Latência por canal
+    # ────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _ms_desde(inicio: float) -> int:
+        return int((time.perf_counter() - inicio) * 1000)
+
+    def _registrar_latencia(
+        self,
+        alerta: AlertaOportunidade,
+        canal: str,
+        status: str,
+        inicio: float,
+        erro: Optional[str] = None,
+    ) -> None:
+        """Guarda a latência do canal e registra a tentativa na auditoria."""
+        latencia_ms = self._ms_desde(inicio)
+        if status == "entregue":
+            self.latencias_ms.setdefault(
+                canal, deque(maxlen=self.LATENCIA_JANELA)
+            ).append(latencia_ms)
+
+        if self.audit_log:
+            self.audit_log.registrar_entrega(
+                alerta_id=str(alerta.id),
+                canal=canal,
+                status=status,
+                latencia_ms=latencia_ms,
+                erro_descricao=erro,
+            )
+
+    def obter_metricas_latencia(self) -> Dict[str, dict]:
+        """
+        Percentis da latência de entrega por canal (últimas entregas).
+
+        Returns:
+            ``{canal: {"n", "p50_ms", "p95_ms", "max_ms"}}``; com pool SMTP
+            ativo, inclui ``smtp_pool`` com sessões abertas vs. enviados
+        """
+        metricas: Dict[str, dict] = {}
+        for canal, amostras in self.latencias_ms.items():
+            ordenadas = sorted(amostras)
+            n = len(ordenadas)
+            metricas[canal] = {
+                "n": n,
+                "p50_ms": ordenadas[n // 2],
+                "p95_ms": ordenadas[min(n - 1, int(n * 0.95))],
+                "max_ms": ordenadas[-1],
+            }
+        if self.smtp_pool is not None:
+            m = self.smtp_pool.metrics
+            metricas["smtp_pool"] = {
+                "sessoes_abertas": m.sessions_opened,
+                "enviados": m.sent,
+                "falhas": m.failed,
+                "reconexoes": m.reconnects,
+                "maior_lote": m.max_batch,
+            }
+        return metricas
+
+    def fechar(self) -> None:
+        """Envia os e-mails pendentes e fecha as sessões SMTP."""
+        if self.smtp_pool is not None:
+            self.smtp_pool.close()
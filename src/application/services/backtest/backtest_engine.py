@@ -12,6 +12,9 @@ from src.application.services.backtest.historical_data_provider import (
 from src.application.services.macro_score.engine import (
     ItemScoreResult,
     MacroScoreResult,
+    render_indicator_detail,
+    render_price_detail,
+    render_summary,
 )
 from src.application.services.macro_score.forex_handler import ForexScoreHandler
 from src.application.services.macro_score.item_registry import MacroScoreItemConfig
@@ -130,17 +133,10 @@ class BacktestMacroScoreEngine:
             weight=Weight(config.weight),
         )
 
-        # Detalhe
-        price_change = current_price - opening_price
-        pct_change = (
-            (price_change / opening_price * 100)
-            if opening_price != 0
-            else Decimal("0")
-        )
+        # Detalhe montado so se alguem ler (raro no backtest)
         detail = (
-            f"Abertura: {opening_price} | Atual: {current_price} | "
-            f"Var: {price_change:+} ({pct_change:+.2f}%) | "
-            f"Correl: {config.correlation} | Score: {final_score:+d}"
+            render_price_detail, opening_price, current_price,
+            config.correlation, final_score,
         )
 
         return ItemScoreResult(
@@ -192,7 +188,7 @@ class BacktestMacroScoreEngine:
                 weight=Weight(config.weight),
             )
 
-            detail = f"Indicador: {indicator_type} | Score: {final_score:+d}"
+            detail = (render_indicator_detail, "Indicador", indicator_type, final_score)
 
             return ItemScoreResult(
                 item_number=config.number,
@@ -308,17 +304,10 @@ class BacktestMacroScoreEngine:
             else None
         )
 
-        # Resumo
-        signal_text = {
-            MacroSignal.COMPRA: "COMPRA (Score Positivo)",
-            MacroSignal.VENDA: "VENDA (Score Negativo)",
-            MacroSignal.NEUTRO: "NEUTRO (Score Zero/Proximo)",
-        }
+        # Resumo (montado na primeira leitura)
         summary = (
-            f"Macro Score: {score_final:+.2f} | Sinal: {signal_text[signal]} | "
-            f"Itens: {len(available)}/{len(items)} | "
-            f"Alta: +{score_bullish:.1f} | Baixa: -{score_bearish:.1f} | "
-            f"Neutros: {score_neutral}"
+            render_summary, score_final, signal, len(available), len(items),
+            score_bullish, score_bearish, score_neutral,
         )
 
         return MacroScoreResult(
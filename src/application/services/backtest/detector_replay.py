@@ -0,0 +1,466 @@
+"""Replay historico dos detectores de alerta sobre barras reais.
+
+Le barras (M5 por padrao) da tabela ``market_data`` ou de um export CSV
+do data/export, passa barra a barra pelo DetectorVolatilidade e pelo
+DetectorPadroesTecnico e rotula cada alerta pelo retorno futuro:
+
+  - retorno_futuro[t] = close[t + h] / close[t] - 1
+  - oportunidade[t]   = |retorno_futuro[t]| >= alvo_pct
+  - alerta acerta     = retorno na direcao do alerta > 0
+
+A varredura de ``threshold_sigma`` x ``window`` roda cada combinacao num
+processo separado (as barras vao uma vez para cada worker).
+"""
+
+from __future__ import annotations
+
+import csv
+import logging
+import math
+import sqlite3
+import time
+import unicodedata
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from itertools import product
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+
+from src.application.services.detector_padroes_tecnico import DetectorPadroesTecnico
+from src.application.services.detector_volatilidade import DetectorVolatilidade
+from src.domain.enums.alerta_enums import PatraoAlerta
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = "data/db/trading.db"
+
+# Direcao operada por cada padrao (+1 compra, -1 venda). A divergencia
+# depende do lado (topo/fundo) e e resolvida na deteccao.
+_DIRECAO = {
+    PatraoAlerta.VOLATILIDADE_EXTREMA: 1,
+    PatraoAlerta.ENGULFING_BULLISH: 1,
+    PatraoAlerta.ENGULFING_BEARISH: -1,
+    PatraoAlerta.BREAK_SUPORTE: -1,
+    PatraoAlerta.BREAK_RESISTENCIA: 1,
+}
+
+_JANELA_PADROES = 5  # detectores de break/divergencia usam as ultimas 5 barras
+_RSI_PERIODO = 14
+
+
+@dataclass(frozen=True)
+class BarrasHistoricas:
+    """Serie OHLCV em arrays (uma posicao por barra, ordem cronologica)."""
+
+    symbol: str
+    timeframe: str
+    timestamps: list[datetime]
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+    @classmethod
+    def de_linhas(cls, symbol: str, timeframe: str, linhas: list[tuple]) -> "BarrasHistoricas":
+        """Monta a serie a partir de (timestamp, open, high, low, close, volume)."""
+        linhas = sorted({row[0]: row for row in linhas}.values(), key=lambda r: r[0])
+        colunas = list(zip(*linhas)) if linhas else [[]] * 6
+        return cls(
+            symbol=symbol,
+            timeframe=timeframe,
+            timestamps=list(colunas[0]),
+            open=np.asarray(colunas[1], dtype=np.float64),
+            high=np.asarray(colunas[2], dtype=np.float64),
+            low=np.asarray(colunas[3], dtype=np.float64),
+            close=np.asarray(colunas[4], dtype=np.float64),
+            volume=np.asarray(colunas[5], dtype=np.int64),
+        )
+
+
+@dataclass
+class AlertaReplay:
+    """Alerta emitido no replay, com o rotulo do retorno futuro."""
+
+    barra: int
+    timestamp: datetime
+    padrao: str
+    direcao: int
+    preco: float
+    retorno_futuro: float
+    acerto: bool
+    oportunidade: bool
+
+
+@dataclass
+class ResultadoReplay:
+    """Metricas de uma passada (uma combinacao de parametros)."""
+
+    symbol: str
+    threshold_sigma: float
+    window: int
+    barras: int
+    horizonte: int
+    alvo_pct: float
+    oportunidades: int
+    segundos: float
+    alertas: list[AlertaReplay] = field(default_factory=list)
+    capturadas: int = 0
+
+    @property
+    def barras_por_segundo(self) -> float:
+        return self.barras / self.segundos if self.segundos > 0 else 0.0
+
+    def metricas(self, padrao: Optional[str] = None) -> dict:
+        """Captura, precisao e win rate (de um padrao ou de todos)."""
+        alertas = [a for a in self.alertas if padrao is None or a.padrao == padrao]
+        rotulados = [a for a in alertas if not math.isnan(a.retorno_futuro)]
+        n = len(rotulados)
+        acertos = sum(a.acerto for a in rotulados)
+        em_oportunidade = sum(a.oportunidade for a in rotulados)
+        retornos = [a.direcao * a.retorno_futuro for a in rotulados]
+        return {
+            "alertas": len(alertas),
+            "win_rate_pct": round(100 * acertos / n, 2) if n else 0.0,
+            "precisao_pct": round(100 * em_oportunidade / n, 2) if n else 0.0,
+            "retorno_medio_pct": round(100 * float(np.mean(retornos)), 4) if n else 0.0,
+        }
+
+    def resumo(self) -> dict:
+        por_padrao = defaultdict(int)
+        for a in self.alertas:
+            por_padrao[a.padrao] += 1
+        return {
+            "symbol": self.symbol,
+            "threshold_sigma": self.threshold_sigma,
+            "window": self.window,
+            "barras": self.barras,
+            "horizonte_barras": self.horizonte,
+            "alvo_pct": self.alvo_pct,
+            "oportunidades": self.oportunidades,
+            "captura_pct": round(100 * self.capturadas / self.oportunidades, 2)
+            if self.oportunidades else 0.0,
+            **self.metricas(),
+            "volatilidade": self.metricas(PatraoAlerta.VOLATILIDADE_EXTREMA.value),
+            "alertas_por_padrao": dict(por_padrao),
+            "barras_por_segundo": round(self.barras_por_segundo),
+        }
+
+
+# ====================================
+# Fontes de barras
+# ====================================
+
+
+def carregar_market_data(
+    symbol: str,
+    timeframe: str = "M5",
+    inicio: Optional[datetime] = None,
+    fim: Optional[datetime] = None,
+    db_path: str = DEFAULT_DB_PATH,
+) -> BarrasHistoricas:
+    """Le as barras do simbolo na tabela ``market_data`` (uma consulta).
+
+    Vai direto pelo sqlite3, sem ORM: um replay de meses sao dezenas de
+    milhares de linhas e o custo de montar um objeto por linha domina.
+    ``inicio`` e ``fim`` sao inclusivos; para pegar o ultimo dia inteiro
+    passe ``fim`` no fim do dia (``datetime.combine(dia, time.max)``).
+    """
+    sql = (
+        "SELECT timestamp, open, high, low, close, volume FROM market_data "
+        "WHERE symbol = ? AND timeframe = ?"
+    )
+    params: list = [symbol, timeframe]
+    # O SQLAlchemy grava DateTime como texto com microssegundos; o limite
+    # precisa do mesmo formato para a comparacao de strings bater
+    if inicio is not None:
+        sql += " AND timestamp >= ?"
+        params.append(inicio.isoformat(sep=" ", timespec="microseconds"))
+    if fim is not None:
+        sql += " AND timestamp <= ?"
+        params.append(fim.isoformat(sep=" ", timespec="microseconds"))
+    sql += " ORDER BY timestamp"
+
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        linhas = [
+            (datetime.fromisoformat(ts), float(o), float(h), float(l), float(c), int(v))
+            for ts, o, h, l, c, v in conn.execute(sql, params)
+        ]
+    finally:
+        conn.close()
+
+    logger.info("market_data: %d barras %s %s", len(linhas), symbol, timeframe)
+    return BarrasHistoricas.de_linhas(symbol, timeframe, linhas)
+
+
+def _normalizar_coluna(nome: str) -> str:
+    sem_acento = unicodedata.normalize("NFKD", nome).encode("ascii", "ignore").decode()
+    return sem_acento.strip().lower()
+
+
+_COLUNAS_EXPORT = {
+    "data": "data", "date": "data",
+    "hora": "hora", "time": "hora",
+    "abertura": "open", "open": "open",
+    "maximo": "high", "max": "high", "high": "high",
+    "minimo": "low", "min": "low", "low": "low",
+    "fechamento": "close", "close": "close",
+    "volume": "volume", "vol": "volume",
+}
+
+
+def _numero_export(texto: str) -> float:
+    """'128.455,00' -> 128455.0 (formato dos exports)."""
+    return float(texto.replace(".", "").replace(",", ".")) if texto else 0.0
+
+
+def carregar_export_csv(
+    path: str | Path, symbol: Optional[str] = None, timeframe: str = "M5"
+) -> BarrasHistoricas:
+    """Le um export CSV (data/export, separador ';', decimais com virgula)."""
+    path = Path(path)
+    try:
+        texto = path.read_text(encoding="utf-8")
+    except UnicodeDecodeError:
+        texto = path.read_text(encoding="latin-1")
+
+    leitor = csv.reader(texto.splitlines(), delimiter=";")
+    cabecalho = [_COLUNAS_EXPORT.get(_normalizar_coluna(c)) for c in next(leitor, [])]
+    linhas = []
+    for valores in leitor:
+        registro = {k: v for k, v in zip(cabecalho, valores) if k}
+        try:
+            dia, mes, ano = registro["data"].split("/")
+            ano = "20" + ano if len(ano) == 2 else ano
+            timestamp = datetime.strptime(
+                f"{dia}/{mes}/{ano} {registro['hora']}", "%d/%m/%Y %H:%M:%S"
+            )
+            linhas.append((
+                timestamp,
+                _numero_export(registro["open"]),
+                _numero_export(registro["high"]),
+                _numero_export(registro["low"]),
+                _numero_export(registro["close"]),
+                int(_numero_export(registro.get("volume", "0"))),
+            ))
+        except (KeyError, ValueError):
+            continue
+
+    symbol = symbol or path.stem.split("_")[0]
+    logger.info("export %s: %d barras", path.name, len(linhas))
+    return BarrasHistoricas.de_linhas(symbol, timeframe, linhas)
+
+
+# ====================================
+# Rotulos
+# ====================================
+
+
+def retornos_futuros(close: np.ndarray, horizonte: int) -> np.ndarray:
+    """close[t + h] / close[t] - 1 (NaN onde o futuro nao existe)."""
+    retornos = np.full(len(close), np.nan)
+    if horizonte < len(close):
+        retornos[:-horizonte] = close[horizonte:] / close[:-horizonte] - 1
+    return retornos
+
+
+def rsi_serie(close: np.ndarray, periodo: int = _RSI_PERIODO) -> np.ndarray:
+    """RSI de cada barra (media simples dos ultimos ``periodo`` deltas).
+
+    Mesma formula do TechnicalIndicatorScorer._calculate_rsi, mas para a
+    serie inteira de uma vez (somas acumuladas).
+    """
+    rsi = np.full(len(close), np.nan)
+    if len(close) <= periodo:
+        return rsi
+    deltas = np.diff(close)
+    ganhos = np.concatenate([[0.0], np.cumsum(np.where(deltas > 0, deltas, 0.0))])
+    perdas = np.concatenate([[0.0], np.cumsum(np.where(deltas < 0, -deltas, 0.0))])
+    media_ganho = (ganhos[periodo:] - ganhos[:-periodo]) / periodo
+    media_perda = (perdas[periodo:] - perdas[:-periodo]) / periodo
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = media_ganho / media_perda
+        rsi[periodo:] = np.where(media_perda == 0, 100.0, 100 - 100 / (1 + rs))
+    return rsi
+
+
+# ====================================
+# Replay
+# ====================================
+
+
+def _silenciar_detectores() -> None:
+    # Os detectores logam cada disparo em INFO; num replay de meses isso
+    # vira o gargalo (e ruido)
+    for nome in (
+        "src.application.services.detector_volatilidade",
+        "src.application.services.detector_padroes_tecnico",
+    ):
+        logging.getLogger(nome).setLevel(logging.WARNING)
+
+
+def executar_replay(
+    barras: BarrasHistoricas,
+    threshold_sigma: float = 2.0,
+    window: int = 20,
+    horizonte: int = 6,
+    alvo_pct: float = 0.003,
+    padroes: bool = True,
+    tolerancia_barras: int = 1,
+) -> ResultadoReplay:
+    """Passa as barras pelos detectores e rotula os alertas.
+
+    Args:
+        barras: Serie historica
+        threshold_sigma: Limiar do DetectorVolatilidade
+        window: Janela do DetectorVolatilidade
+        horizonte: Barras a frente para o retorno futuro
+        alvo_pct: Movimento minimo (fracao) para a barra contar como
+            oportunidade
+        padroes: Inclui o DetectorPadroesTecnico
+        tolerancia_barras: Um alerta ate N barras antes da oportunidade
+            conta como captura
+
+    Returns:
+        ResultadoReplay com alertas rotulados e metricas
+    """
+    _silenciar_detectores()
+    close = barras.close
+    futuros = retornos_futuros(close, horizonte)
+    oportunidade = np.abs(futuros) >= alvo_pct  # NaN -> False
+    rsi = rsi_serie(close) if padroes else None
+
+    detector_vol = DetectorVolatilidade(window=window, threshold_sigma=threshold_sigma)
+    detector_padroes = DetectorPadroesTecnico() if padroes else None
+    symbol = barras.symbol
+    alertas: list[AlertaReplay] = []
+
+    def registrar(t: int, padrao: PatraoAlerta, direcao: int) -> None:
+        retorno = float(futuros[t])
+        alertas.append(AlertaReplay(
+            barra=t,
+            timestamp=barras.timestamps[t],
+            padrao=padrao.value,
+            direcao=direcao,
+            preco=float(close[t]),
+            retorno_futuro=retorno,
+            acerto=direcao * retorno > 0,
+            oportunidade=bool(oportunidade[t]),
+        ))
+
+    inicio = time.perf_counter()
+    closes = close.tolist()
+    opens = barras.open.tolist()
+    for t, preco in enumerate(closes):
+        timestamp = barras.timestamps[t]
+        if detector_vol.analisar_vela(symbol, Decimal(repr(preco)), timestamp):
+            registrar(t, PatraoAlerta.VOLATILIDADE_EXTREMA, 1)
+
+        if detector_padroes is None or t == 0:
+            continue
+
+        alerta = detector_padroes.detectar_engulfing(
+            symbol,
+            {"open": opens[t], "close": preco},
+            {"open": opens[t - 1], "close": closes[t - 1]},
+            timestamp,
+        )
+        if alerta:
+            registrar(t, alerta.padrao, _DIRECAO[alerta.padrao])
+
+        if t < _JANELA_PADROES:
+            continue
+        recentes = closes[t - _JANELA_PADROES:t + 1]
+        for detectar in (
+            detector_padroes.detectar_break_suporte,
+            detector_padroes.detectar_break_resistencia,
+        ):
+            alerta = detectar(symbol, recentes, timestamp, window=_JANELA_PADROES)
+            if alerta:
+                registrar(t, alerta.padrao, _DIRECAO[alerta.padrao])
+
+        rsi_recente = rsi[t - _JANELA_PADROES + 1:t + 1]
+        if not np.isnan(rsi_recente).any():
+            alerta = detector_padroes.detectar_divergencia_rsi(
+                symbol, recentes, rsi_recente.tolist(), timestamp
+            )
+            if alerta:
+                # Topo (RSI alto) e venda; fundo e compra
+                registrar(t, alerta.padrao, -1 if rsi[t] > 50 else 1)
+    segundos = time.perf_counter() - inicio
+
+    # Captura: oportunidade com alerta na propria barra ou ate N antes
+    com_alerta = np.zeros(len(close), dtype=bool)
+    for a in alertas:
+        com_alerta[a.barra:a.barra + tolerancia_barras + 1] = True
+    capturadas = int(np.count_nonzero(oportunidade & com_alerta))
+
+    return ResultadoReplay(
+        symbol=symbol,
+        threshold_sigma=threshold_sigma,
+        window=window,
+        barras=len(close),
+        horizonte=horizonte,
+        alvo_pct=alvo_pct,
+        oportunidades=int(np.count_nonzero(oportunidade)),
+        segundos=segundos,
+        alertas=alertas,
+        capturadas=capturadas,
+    )
+
+
+# Barras do worker da varredura (enviadas uma vez, no initializer)
+_barras_worker: Optional[BarrasHistoricas] = None
+
+
+def _iniciar_worker(barras: BarrasHistoricas) -> None:
+    global _barras_worker
+    _barras_worker = barras
+
+
+def _replay_volatilidade(args: tuple) -> dict:
+    threshold, window, horizonte, alvo_pct = args
+    resultado = executar_replay(
+        _barras_worker, threshold_sigma=threshold, window=window,
+        horizonte=horizonte, alvo_pct=alvo_pct, padroes=False,
+    )
+    return resultado.resumo()
+
+
+def varrer_parametros(
+    barras: BarrasHistoricas,
+    thresholds: Iterable[float],
+    windows: Iterable[int],
+    horizonte: int = 6,
+    alvo_pct: float = 0.003,
+    workers: Optional[int] = None,
+) -> list[dict]:
+    """Replay do DetectorVolatilidade para cada (threshold, window).
+
+    So o detector de volatilidade depende desses parametros; os padroes
+    tecnicos ficam fora da varredura. As combinacoes sao distribuidas
+    entre processos (``workers=1`` roda em serie, no processo atual).
+
+    Returns:
+        Resumos na ordem da grade (threshold varia mais devagar)
+    """
+    grade = [
+        (float(threshold), int(window), horizonte, alvo_pct)
+        for threshold, window in product(thresholds, windows)
+    ]
+    if workers == 1 or len(grade) <= 1:
+        _iniciar_worker(barras)
+        return [_replay_volatilidade(args) for args in grade]
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_iniciar_worker, initargs=(barras,)
+    ) as pool:
+        return list(pool.map(_replay_volatilidade, grade))
@@ -0,0 +1,275 @@
+"""
+Profiling por estágio do ciclo do agente de micro tendências.
+
+Cada estágio do ``_run_cycle`` (score macro, candles, SMC, regiões,
+oportunidades...) é envolvido por ``profiler.stage(nome)``. O profiler
+mantém uma janela móvel por estágio e calcula p50/p95/p99 sob demanda.
+
+Saídas:
+  1. Rodapé do console (``format_footer``)
+  2. Tabela ``micro_cycle_metrics`` (uma linha por estágio por ciclo,
+     com os percentis da janela no momento do ciclo)
+  3. Opcional: dump cProfile do ciclo mais lento do dia
+     (``<profile_dir>/micro_cycle_YYYY-MM-DD.prof`` + ``.txt`` legível)
+"""
+
+from __future__ import annotations
+
+import cProfile
+import io
+import math
+import os
+import pstats
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Iterator, Optional
+
+TOTAL_STAGE = "total"
+
+
+@dataclass(frozen=True)
+class StagePercentiles:
+    """Latência de um estágio na janela móvel (ms)."""
+
+    count: int
+    last: float
+    p50: float
+    p95: float
+    p99: float
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    """Percentil por posto mais próximo (nearest-rank)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class CycleProfiler:
+    """Cronômetros por estágio com percentis móveis (thread-safe).
+
+    Uso:
+        profiler = CycleProfiler(window=500)
+        with profiler.cycle():
+            with profiler.stage("macro_score"):
+                ...
+        profiler.percentiles("macro_score").p95
+    """
+
+    def __init__(self, window: int = 500, profile_dir: Optional[str] = None) -> None:
+        self.window = window
+        self.profile_dir = profile_dir
+        self._samples: dict[str, deque[float]] = {}
+        self._order: list[str] = []
+        self._external: set[str] = set()
+        self._current: dict[str, float] = {}
+        self._in_cycle = False
+        self.last_cycle: dict[str, float] = {}
+        self._lock = threading.Lock()
+        # Ciclo mais lento do dia (para o dump do cProfile)
+        self._slowest_date: Optional[date] = None
+        self.slowest_ms: float = 0.0
+        self.slowest_profile_path: Optional[str] = None
+
+    # ────────────────────────────────────────────────────────────
+    # Medição
+    # ────────────────────────────────────────────────────────────
+
+    @contextmanager
+    def cycle(self) -> Iterator[None]:
+        """Delimita um ciclo: zera os estágios e mede o total.
+
+        Cada estágio entra nos percentis uma vez por ciclo, com a soma dos
+        seus trechos — a mesma amostra de ``last_cycle``.
+        """
+        with self._lock:
+            self._current = {}
+            self._in_cycle = True
+        prof = cProfile.Profile() if self.profile_dir else None
+        t0 = time.perf_counter()
+        if prof:
+            prof.enable()
+        try:
+            yield
+        finally:
+            if prof:
+                prof.disable()
+            total_ms = (time.perf_counter() - t0) * 1000
+            with self._lock:
+                self._in_cycle = False
+                self._current[TOTAL_STAGE] = total_ms
+                for name, elapsed_ms in self._current.items():
+                    self._append_locked(name, elapsed_ms)
+                self.last_cycle = dict(self._current)
+            if prof:
+                self._maybe_dump_slowest(prof, total_ms)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Mede um estágio (chamadas repetidas no mesmo ciclo são somadas)."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add(name, (time.perf_counter() - t0) * 1000)
+
+    def record(self, name: str, elapsed_ms: float) -> None:
+        """Registra amostra de um estágio fora do ciclo (ex.: escrita no worker).
+
+        Entra nos percentis e no rodapé, mas não no total do ciclo.
+        """
+        with self._lock:
+            self._external.add(name)
+            self._append_locked(name, elapsed_ms)
+
+    def _add(self, name: str, elapsed_ms: float) -> None:
+        with self._lock:
+            if not self._in_cycle:  # estágio fora de um ciclo: amostra direta
+                self._append_locked(name, elapsed_ms)
+                return
+            self._current[name] = self._current.get(name, 0.0) + elapsed_ms
+
+    def _append_locked(self, name: str, elapsed_ms: float) -> None:
+        samples = self._samples.get(name)
+        if samples is None:
+            samples = self._samples[name] = deque(maxlen=self.window)
+            self._order.append(name)
+        samples.append(elapsed_ms)
+
+    # ────────────────────────────────────────────────────────────
+    # Consulta
+    # ────────────────────────────────────────────────────────────
+
+    def percentiles(self, name: str) -> StagePercentiles:
+        with self._lock:
+            samples = list(self._samples.get(name, ()))
+        if not samples:
+            return StagePercentiles(0, 0.0, 0.0, 0.0, 0.0)
+        last = samples[-1]
+        samples.sort()
+        return StagePercentiles(
+            count=len(samples),
+            last=last,
+            p50=_percentile(samples, 50),
+            p95=_percentile(samples, 95),
+            p99=_percentile(samples, 99),
+        )
+
+    def stages(self) -> list[str]:
+        """Estágios na ordem em que apareceram (sem o total)."""
+        with self._lock:
+            return [s for s in self._order if s != TOTAL_STAGE]
+
+    def summary(self) -> dict[str, StagePercentiles]:
+        return {name: self.percentiles(name) for name in [TOTAL_STAGE] + self.stages()}
+
+    def format_footer(self) -> list[str]:
+        """Linhas do rodapé: total com percentis + último ciclo por estágio."""
+        total = self.percentiles(TOTAL_STAGE)
+        if not total.count:
+            return []
+        lines = [
+            f"  ⏱ Ciclo {total.last:.0f} ms │ p50 {total.p50:.0f} │ "
+            f"p95 {total.p95:.0f} │ p99 {total.p99:.0f} ms ({total.count} ciclos)"
+        ]
+        parts = []
+        for name in self.stages():
+            p = self.percentiles(name)
+            parts.append(f"{name} {self.last_cycle.get(name, p.last):.0f}/{p.p95:.0f}")
+        if parts:
+            lines.append("  ⏱ Estágios (último/p95 ms): " + " │ ".join(parts))
+        return lines
+
+    def metrics_rows(self, cycle_ts: datetime) -> list[tuple]:
+        """Linhas para ``micro_cycle_metrics`` referentes ao último ciclo.
+
+        Estágios externos (``record``) entram com a amostra mais recente.
+        """
+        rows = []
+        session_date = cycle_ts.date().isoformat()
+        with self._lock:
+            latest = dict(self.last_cycle)
+            external = [n for n in self._external if n not in latest]
+        for name in external:
+            latest[name] = self.percentiles(name).last
+        for name, elapsed in latest.items():
+            p = self.percentiles(name)
+            rows.append((
+                cycle_ts.isoformat(), session_date, name,
+                round(elapsed, 3), round(p.p50, 3), round(p.p95, 3), round(p.p99, 3),
+            ))
+        return rows
+
+    # ────────────────────────────────────────────────────────────
+    # cProfile do ciclo mais lento do dia
+    # ────────────────────────────────────────────────────────────
+
+    def _maybe_dump_slowest(self, prof: cProfile.Profile, total_ms: float) -> None:
+        today = date.today()
+        if self._slowest_date != today:
+            self._slowest_date = today
+            self.slowest_ms = 0.0
+            self.slowest_profile_path = None
+        if total_ms <= self.slowest_ms:
+            return
+        self.slowest_ms = total_ms
+        os.makedirs(self.profile_dir, exist_ok=True)
+        path = os.path.join(self.profile_dir, f"micro_cycle_{today.isoformat()}.prof")
+        prof.dump_stats(path)
+        buf = io.StringIO()
+        buf.write(f"Ciclo mais lento de {today.isoformat()}: {total_ms:.1f} ms\n\n")
+        pstats.Stats(prof, stream=buf).sort_stats("cumulative").print_stats(40)
+        with open(path[:-5] + ".txt", "w", encoding="utf-8") as f:
+            f.write(buf.getvalue())
+        self.slowest_profile_path = path
+
+
+# ────────────────────────────────────────────────────────────────
+# Persistência SQLite
+# ────────────────────────────────────────────────────────────────
+
+def create_cycle_metrics_table(db_path: str) -> None:
+    """Cria a tabela de latência por estágio do ciclo."""
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS micro_cycle_metrics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp DATETIME NOT NULL,
+            session_date DATE NOT NULL,
+            stage TEXT NOT NULL,
+            elapsed_ms REAL NOT NULL,
+            p50_ms REAL,
+            p95_ms REAL,
+            p99_ms REAL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_mcm_session_stage"
+        " ON micro_cycle_metrics(session_date, stage)"
+    )
+    conn.commit()
+    conn.close()
+
+
+def persist_cycle_metrics(db_path: str, rows: list[tuple]) -> None:
+    """Grava as linhas de ``CycleProfiler.metrics_rows`` num único commit."""
+    if not rows:
+        return
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        """
+        INSERT INTO micro_cycle_metrics (
+            timestamp, session_date, stage, elapsed_ms, p50_ms, p95_ms, p99_ms
+        ) VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        rows,
+    )
+    conn.commit()
+    conn.close()
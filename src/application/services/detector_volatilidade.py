@@ -1,13 +1,13 @@
 """Detector de volatilidade extrema com desvio padrão móvel."""
 
 import logging
-from collections import deque
 from datetime import datetime
 from decimal import Decimal
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import numpy as np
 
+from src.application.services.estatisticas_moveis import EstatisticasMoveis
 from src.domain.entities.alerta import AlertaOportunidade
 from src.domain.enums.alerta_enums import NivelAlerta, PatraoAlerta
 from src.domain.value_objects import Price, Symbol
@@ -42,17 +42,14 @@ class DetectorVolatilidade:
         Args:
             window: Número de períodos para cálculo de σ móvel
             threshold_sigma: Quantos σ acima da média para gatilhar alerta
-            lookback_bars: Máximo de barras a manter em cache
+            lookback_bars: Máximo de barras históricas aceitas na inicialização
         """
         self.window = window
         self.threshold_sigma = threshold_sigma
         self.lookback_bars = lookback_bars
 
-        # Cache por símbolo
-        self.cache_precos = {}  # {symbol: deque de preços}
-        self.cache_sigma = {}  # {symbol: último σ calculado}
-        self.cache_media = {}  # {symbol: última μ calculada}
-        self.cache_z_score_anterior = {}  # {symbol: z_score da vela anterior}
+        # Média/σ móveis de todos os símbolos (Welford deslizante, em lote)
+        self.estatisticas = EstatisticasMoveis(window=window)
         self.alertas_previos_timestamp = {}  # {symbol: timestamp último alerta}
 
     def analisar_vela(
@@ -74,71 +71,113 @@ class DetectorVolatilidade:
         Returns:
             AlertaOportunidade se detectado, None caso contrário
         """
-
         # Inicializa cache se primeira chamada
-        if symbol not in self.cache_precos:
+        if symbol not in self.estatisticas:
             self._inicializar_cache(symbol, barras_historicas or [])
 
-        # Adiciona novo preço ao cache
-        self.cache_precos[symbol].append(float(close))
+        close_float = float(close)
+        est = self.estatisticas.atualizar(symbol, close_float)
 
-        # Precisa de mínimo de 'window' barras para calcular σ
-        precos = list(self.cache_precos[symbol])
-        if len(precos) < self.window:
+        if logger.isEnabledFor(logging.DEBUG):
             logger.debug(
-                f"{symbol}: historico insuficiente ({len(precos)}/{self.window})"
+                f"{symbol}: close={close_float:.2f}, μ={est.media:.2f}, "
+                f"σ={est.sigma:.4f}, z={est.z:.2f}, threshold={self.threshold_sigma}"
             )
-            return None
 
-        # Calcula estatísticas
-        precos_janela = precos[-self.window :]
-        media = float(np.mean(precos_janela))
-        sigma = float(np.std(precos_janela))
+        # Critério de confirmação: 2 velas consecutivas >threshold
+        # (z é NaN com histórico insuficiente ou σ ~ 0: comparação falsa)
+        if est.z > self.threshold_sigma and est.z_anterior > self.threshold_sigma:
+            return self._disparar(symbol, close, est.media, est.sigma, est.z, timestamp)
+        return None
 
-        # Evita divisão por zero
-        if sigma < 1e-6:
-            logger.debug(f"{symbol}: sigma próximo a zero, ignorando")
-            return None
+    def analisar_lote(
+        self,
+        velas: Iterable[Tuple[str, Decimal]],
+        timestamp: datetime,
+        barras_historicas: Optional[Dict[str, List[float]]] = None,
+    ) -> List[AlertaOportunidade]:
+        """
+        Analisa de uma vez o fechamento de vários símbolos.
 
-        # Calcula z-score
-        close_float = float(close)
-        z_score = (close_float - media) / sigma
+        As estatísticas de todos os símbolos são atualizadas numa única
+        passada vetorizada; só os que disparam viram AlertaOportunidade.
+        Permite vigiar o universo inteiro do macro score, não só o WIN$N.
 
-        logger.debug(
-            f"{symbol}: close={close_float:.2f}, μ={media:.2f}, "
-            f"σ={sigma:.4f}, z={z_score:.2f}, threshold={self.threshold_sigma}"
+        Args:
+            velas: Pares (símbolo, fechamento) da mesma rodada
+            timestamp: Quando as velas fecharam
+            barras_historicas: Histórico por símbolo, usado só na primeira
+                vez que o símbolo aparece
+
+        Returns:
+            Alertas detectados, na ordem das velas
+        """
+        velas = list(velas)
+        if not velas:
+            return []
+        simbolos = [symbol for symbol, _ in velas]
+
+        for symbol in simbolos:
+            if symbol not in self.estatisticas:
+                historico = (barras_historicas or {}).get(symbol) or []
+                self._inicializar_cache(symbol, historico)
+
+        lote = self.estatisticas.atualizar_lote(
+            simbolos, [float(close) for _, close in velas]
         )
 
         # Critério de confirmação: 2 velas consecutivas >threshold
-        z_score_anterior = self.cache_z_score_anterior.get(symbol, 0)
-        foi_extremo_anterior = z_score_anterior > self.threshold_sigma
-
-        # Atualiza cache para próxima vela
-        self.cache_z_score_anterior[symbol] = z_score
-        self.cache_media[symbol] = media
-        self.cache_sigma[symbol] = sigma
-
-        # Detecta alerta se AMBAS as velas foram extremas
-        if z_score > self.threshold_sigma and foi_extremo_anterior:
-            logger.info(
-                f"{symbol}: ALERTA DETECTED z={z_score:.2f} > {self.threshold_sigma}"
-            )
+        disparos = np.flatnonzero(
+            (lote.z > self.threshold_sigma) & (lote.z_anterior > self.threshold_sigma)
+        )
 
-            alerta = self._criar_alerta(
-                symbol=symbol,
-                preco_atual=close,
-                media=media,
-                sigma=sigma,
-                z_score=z_score,
+        if logger.isEnabledFor(logging.DEBUG):
+            for i, symbol in enumerate(simbolos):
+                logger.debug(
+                    f"{symbol}: close={float(velas[i][1]):.2f}, μ={lote.media[i]:.2f}, "
+                    f"σ={lote.sigma[i]:.4f}, z={lote.z[i]:.2f}, "
+                    f"threshold={self.threshold_sigma}"
+                )
+
+        return [
+            self._disparar(
+                symbol=velas[i][0],
+                close=velas[i][1],
+                media=float(lote.media[i]),
+                sigma=float(lote.sigma[i]),
+                z_score=float(lote.z[i]),
                 timestamp=timestamp,
             )
+            for i in disparos
+        ]
 
-            # Registra timestamp para rate limiting
-            self.alertas_previos_timestamp[symbol] = timestamp
+    def _disparar(
+        self,
+        symbol: str,
+        close: Decimal,
+        media: float,
+        sigma: float,
+        z_score: float,
+        timestamp: datetime,
+    ) -> AlertaOportunidade:
+        """Cria o alerta de uma vela confirmada e registra o disparo."""
+        logger.info(
+            f"{symbol}: ALERTA DETECTED z={z_score:.2f} > {self.threshold_sigma}"
+        )
+
+        alerta = self._criar_alerta(
+            symbol=symbol,
+            preco_atual=close,
+            media=media,
+            sigma=sigma,
+            z_score=z_score,
+            timestamp=timestamp,
+        )
 
-            return alerta
+        # Registra timestamp para rate limiting
+        self.alertas_previos_timestamp[symbol] = timestamp
 
-        return None
+        return alerta
 
     def _criar_alerta(
         self,
@@ -225,19 +264,13 @@ class DetectorVolatilidade:
             symbol: Código do ativo
             historico: Lista de preços históricos
         """
-        # Deque mantém máximo de lookback_bars elementos
-        self.cache_precos[symbol] = deque(
-            historico[-self.lookback_bars :], maxlen=self.lookback_bars
-        )
-
-        self.cache_sigma[symbol] = 0.0
-        self.cache_media[symbol] = 0.0
-        self.cache_z_score_anterior[symbol] = 0.0
+        # Só a janela entra no cálculo; lookback_bars limita o que é aceito
+        self.estatisticas.semear(symbol, historico[-self.lookback_bars :])
         self.alertas_previos_timestamp[symbol] = None
 
         logger.info(
             f"Cache inicializado para {symbol}: "
-            f"{len(self.cache_precos[symbol])} barras"
+            f"{min(len(historico), self.lookback_bars)} barras"
         )
 
     def resetar_cache(self, symbol: str) -> None:
@@ -247,12 +280,9 @@ class DetectorVolatilidade:
         Args:
             symbol: Código do ativo
         """
-        if symbol in self.cache_precos:
-            del self.cache_precos[symbol]
-            del self.cache_sigma[symbol]
-            del self.cache_media[symbol]
-            del self.cache_z_score_anterior[symbol]
-            del self.alertas_previos_timestamp[symbol]
+        if symbol in self.estatisticas:
+            self.estatisticas.remover(symbol)
+            self.alertas_previos_timestamp.pop(symbol, None)
             logger.info(f"Cache resetado para {symbol}")
 
     def obter_status(self, symbol: str) -> dict:
@@ -265,14 +295,19 @@ class DetectorVolatilidade:
         Returns:
             Dict com informações de debug
         """
-        if symbol not in self.cache_precos:
+        estado = self.estatisticas.estatisticas(symbol)
+        if estado is None:
             return {"status": "não inicializado"}
 
         return {
             "symbol": symbol,
-            "barras_loaded": len(self.cache_precos[symbol]),
-            "media_movel": self.cache_media.get(symbol, 0),
-            "sigma_movel": self.cache_sigma.get(symbol, 0),
-            "z_score_ultima": self.cache_z_score_anterior.get(symbol, 0),
+            "barras_loaded": estado["barras"],
+            "media_movel": estado["media"],
+            "sigma_movel": estado["sigma"],
+            "z_score_ultima": estado["z"],
             "ultimo_alerta": self.alertas_previos_timestamp.get(symbol),
         }
+
+    def obter_z_scores(self) -> Dict[str, float]:
+        """Último z-score de todos os símbolos acompanhados."""
+        return self.estatisticas.z_scores()
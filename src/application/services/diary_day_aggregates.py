@@ -0,0 +1,237 @@
+"""
+Agregados correntes do dia para as análises dos diários.
+
+As análises de ``start_journals_full_display.py`` (coerência do agente,
+comportamento e crítica das regiões, evolução intra-dia do direcional)
+varriam o dia inteiro a cada versão nova do snapshot. ``DayAggregates``
+mantém contagens, somas, extremos e o estado de cada região, alimentados
+pelo ``DiaryDayCache`` só com as linhas novas de cada refresh:
+
+  - Episódios: contagem por macro_bias, ação, SMC e VWAP; macro_score_final
+  - Decisões: ADX, RSI, micro score/tendência e preço (primeiro, último,
+    mínimo, máximo), na ordem de timestamp
+  - Regiões: deduplicação por preço (±30 pts) com o toque e os extremos
+    depois do primeiro toque; a região mais recente por faixa de 50 pts
+  - Items macro: score total por timestamp de ciclo
+
+O estado depende da ordem por timestamp. Se chega uma linha retroativa
+(o cache precisa reordenar a lista), os agregados são reconstruídos a
+partir das listas do dia — caso raro.
+
+``freeze()`` devolve um ``DayAggregatesView`` imutável, publicado no
+snapshot; o custo é proporcional ao número de categorias, regiões
+únicas e ciclos, não ao número de linhas.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Iterable, Mapping, Optional
+
+Row = Mapping[str, Any]
+
+REGION_DEDUP_TOLERANCE = 30.0   # pts — mesma região
+REGION_TOUCH_ZONE = 50.0        # pts — considera "chegou na região"
+REGION_RECENT_BUCKET = 50       # pts — faixa das regiões mais recentes
+
+
+@dataclass
+class RunningStat:
+    """Contagem, soma, extremos e último valor de uma série."""
+
+    n: int = 0
+    total: float = 0.0
+    first: Optional[float] = None
+    last: Optional[float] = None
+    min: Optional[float] = None
+    max: Optional[float] = None
+
+    def add(self, value: float) -> None:
+        self.n += 1
+        self.total += value
+        if self.first is None:
+            self.first = value
+        self.last = value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.n if self.n else 0.0
+
+    def copy(self) -> "RunningStat":
+        return RunningStat(self.n, self.total, self.first, self.last, self.min, self.max)
+
+
+@dataclass(frozen=True)
+class RegionTrack:
+    """Região única do dia e o que o preço fez depois do primeiro toque."""
+
+    region: Row
+    price: float
+    n_touches: int = 0
+    first_touch_ts: str = ""
+    after_len: int = 0                  # preços a partir do primeiro toque
+    after_min: Optional[float] = None
+    after_max: Optional[float] = None
+    rest_min: Optional[float] = None    # idem, sem o próprio toque
+    rest_max: Optional[float] = None
+
+    def with_price(self, ts: str, price: float) -> "RegionTrack":
+        touched = abs(price - self.price) <= REGION_TOUCH_ZONE
+        if self.after_len == 0:
+            if not touched:
+                return self
+            return RegionTrack(self.region, self.price, 1, ts, 1, price, price)
+        return RegionTrack(
+            self.region, self.price,
+            self.n_touches + touched,
+            self.first_touch_ts,
+            self.after_len + 1,
+            min(self.after_min, price),
+            max(self.after_max, price),
+            price if self.rest_min is None else min(self.rest_min, price),
+            price if self.rest_max is None else max(self.rest_max, price),
+        )
+
+
+@dataclass(frozen=True)
+class DayAggregatesView:
+    """Fotografia imutável dos agregados (publicada no snapshot)."""
+
+    n_episodes: int = 0
+    episode_counts: Mapping[str, Mapping[Any, int]] = field(
+        default_factory=lambda: MappingProxyType({})
+    )
+    macro_score: RunningStat = field(default_factory=RunningStat)
+    n_decisions: int = 0
+    adx: RunningStat = field(default_factory=RunningStat)
+    adx_nonzero: RunningStat = field(default_factory=RunningStat)
+    rsi: RunningStat = field(default_factory=RunningStat)
+    micro_score: RunningStat = field(default_factory=RunningStat)
+    micro_trends: Mapping[Any, int] = field(default_factory=lambda: MappingProxyType({}))
+    price: RunningStat = field(default_factory=RunningStat)
+    regions: tuple[RegionTrack, ...] = ()
+    recent_regions: Mapping[int, Row] = field(default_factory=lambda: MappingProxyType({}))
+    cycle_totals: tuple[tuple[str, int], ...] = ()
+
+    def counts(self, column: str) -> Mapping[Any, int]:
+        return self.episode_counts.get(column, MappingProxyType({}))
+
+
+EPISODE_COUNT_COLUMNS = (
+    "macro_bias", "action", "smc_equilibrium", "smc_direction", "vwap_position",
+)
+
+
+class DayAggregates:
+    """Agregados mutáveis do dia (sempre sob o lock do cache)."""
+
+    def __init__(self) -> None:
+        self.n_episodes = 0
+        self.episode_counts: dict[str, dict[Any, int]] = {c: {} for c in EPISODE_COUNT_COLUMNS}
+        self.macro_score = RunningStat()
+        self.n_decisions = 0
+        self.adx = RunningStat()
+        self.adx_nonzero = RunningStat()
+        self.rsi = RunningStat()
+        self.micro_score = RunningStat()
+        self.micro_trends: dict[Any, int] = {}
+        self.price = RunningStat()
+        self.price_history: list[tuple[str, float]] = []
+        self.regions: list[RegionTrack] = []
+        self.recent_regions: dict[int, Row] = {}
+        self.cycle_totals: dict[str, int] = {}
+
+    # ────────────────────────────────────────────────────────────
+    # Alimentação (linhas novas, em ordem de timestamp)
+    # ────────────────────────────────────────────────────────────
+
+    def add_episodes(self, episodes: Iterable[Row]) -> None:
+        for ep in episodes:
+            self.n_episodes += 1
+            for column, counts in self.episode_counts.items():
+                key = ep.get(column, "UNKNOWN")
+                counts[key] = counts.get(key, 0) + 1
+            ms = ep.get("macro_score_final")
+            if ms is not None:
+                self.macro_score.add(float(ms))
+
+    def add_decisions(self, decisions: Iterable[Row]) -> None:
+        for d in decisions:
+            self.n_decisions += 1
+            adx = d.get("adx")
+            if adx is not None:
+                self.adx.add(float(adx))
+                if adx:
+                    self.adx_nonzero.add(float(adx))
+            rsi = d.get("rsi")
+            if rsi is not None:
+                self.rsi.add(float(rsi))
+            ms = d.get("micro_score")
+            if ms is not None:
+                self.micro_score.add(float(ms))
+            mt = d.get("micro_trend", "UNKNOWN")
+            self.micro_trends[mt] = self.micro_trends.get(mt, 0) + 1
+
+            p = d.get("price_current")
+            if p:
+                ts = d.get("timestamp", "")
+                price = float(p)
+                self.price.add(price)
+                self.price_history.append((ts, price))
+                self.regions = [track.with_price(ts, price) for track in self.regions]
+
+    def add_regions(self, regions: Iterable[Row]) -> None:
+        for reg in regions:
+            price = float(reg["price"])
+            self.recent_regions[round(price / REGION_RECENT_BUCKET) * REGION_RECENT_BUCKET] = reg
+            if any(abs(price - t.price) <= REGION_DEDUP_TOLERANCE for t in self.regions):
+                continue
+            # Região nova: percorre o histórico de preços uma única vez
+            track = RegionTrack(reg, price)
+            for ts, p in self.price_history:
+                track = track.with_price(ts, p)
+            self.regions.append(track)
+
+    def add_items(self, items: Iterable[Row]) -> None:
+        for item in items:
+            ts = item["timestamp"]
+            self.cycle_totals[ts] = self.cycle_totals.get(ts, 0) + item["score"]
+
+    def freeze(self) -> DayAggregatesView:
+        return DayAggregatesView(
+            n_episodes=self.n_episodes,
+            episode_counts=MappingProxyType({
+                c: MappingProxyType(dict(counts)) for c, counts in self.episode_counts.items()
+            }),
+            macro_score=self.macro_score.copy(),
+            n_decisions=self.n_decisions,
+            adx=self.adx.copy(),
+            adx_nonzero=self.adx_nonzero.copy(),
+            rsi=self.rsi.copy(),
+            micro_score=self.micro_score.copy(),
+            micro_trends=MappingProxyType(dict(self.micro_trends)),
+            price=self.price.copy(),
+            regions=tuple(self.regions),
+            recent_regions=MappingProxyType(dict(self.recent_regions)),
+            cycle_totals=tuple(sorted(self.cycle_totals.items())),
+        )
+
+
+def build_day_aggregates(
+    episodes: Iterable[Row],
+    decisions: Iterable[Row],
+    regions: Iterable[Row],
+    items: Iterable[Row],
+) -> DayAggregates:
+    """Reconstrói os agregados a partir das listas completas do dia."""
+    agg = DayAggregates()
+    agg.add_episodes(episodes)
+    # A ordem entre decisões e regiões não muda o resultado: preço novo
+    # atualiza as regiões já vistas e região nova percorre todos os preços
+    agg.add_decisions(decisions)
+    agg.add_regions(regions)
+    agg.add_items(items)
+    return agg
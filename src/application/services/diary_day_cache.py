@@ -0,0 +1,509 @@
+"""
+Cache em memória do dia para os diários automáticos.
+
+Os quatro threads de ``start_journals_full_display.py`` (Trading Journal,
+AI Reflection, RL Diary e Macro Guardian) liam do SQLite, cada um no seu
+timer, os mesmos episódios, rewards, decisões, regiões e items macro do
+dia. Este módulo mantém UMA cópia do dia por processo:
+
+  1. Cada tabela é lida de forma incremental por marca d'água de ``id``
+     (``WHERE id > ?``), então o custo do refresh é proporcional às
+     linhas novas e não ao tamanho do dia.
+  2. Rewards pendentes (``is_evaluated = 0``) cujo horizonte já venceu são
+     relidos pelo ``id`` para capturar a avaliação feita depois do insert.
+  3. O histórico de score por categoria é agregado incrementalmente, ciclo
+     a ciclo, em vez de refazer o JOIN do dia inteiro.
+  4. Contagens, somas e o estado das regiões usados pelas análises são
+     mantidos em ``DayAggregates`` com as mesmas linhas novas (ver
+     ``diary_day_aggregates``) e publicados em ``snapshot.aggregates``.
+  5. Os threads recebem um ``DiaryDaySnapshot`` imutável e podem memoizar
+     análises pela ``version`` do snapshot — se nada mudou, a análise não
+     é recalculada. As listas do dia são publicadas como ``DayRowsView``
+     (lista + tamanho no momento do snapshot), sem copiar o dia: as listas
+     só crescem no fim; uma linha fora de ordem gera uma lista nova.
+
+Virada de dia: ao detectar nova data, o cache é zerado automaticamente.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from bisect import insort
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from types import MappingProxyType
+from itertools import islice
+from typing import Any, Callable, Mapping, Optional
+
+from src.application.services.diary_day_aggregates import (
+    DayAggregates,
+    DayAggregatesView,
+    build_day_aggregates,
+)
+
+Row = Mapping[str, Any]
+
+# Intervalo mínimo entre dois refreshes — threads que pedem snapshot em
+# sequência compartilham a mesma leitura.
+DEFAULT_MIN_REFRESH_SEC = 5.0
+
+# Limite de parâmetros por IN (...) no SQLite
+_IN_CHUNK = 500
+
+_EPISODE_COLUMNS = """
+    id, episode_id, timestamp, source, action,
+    win_price, win_open_price, win_high_of_day, win_low_of_day,
+    macro_score_final, micro_score, micro_trend,
+    alignment_score, overall_confidence,
+    market_regime, session_phase,
+    smc_direction, smc_equilibrium,
+    vwap_position, probability_up, probability_down,
+    macro_bias, technical_bias, sentiment_bias,
+    entry_price, stop_loss, take_profit, risk_reward_ratio,
+    reasoning
+"""
+
+_REWARD_COLUMNS = """
+    id, episode_id, timestamp_decision, horizon_minutes, action_at_decision,
+    win_price_at_decision, win_price_at_evaluation,
+    price_change_points, price_change_pct,
+    reward_direction, was_correct,
+    reward_normalized, reward_continuous,
+    max_favorable_points, max_adverse_points,
+    is_evaluated
+"""
+
+_DECISION_COLUMNS = """
+    id, timestamp, macro_score, macro_signal, macro_confidence,
+    micro_score, micro_trend, price_current, price_open,
+    vwap, pivot_pp, smc_direction, smc_equilibrium,
+    adx, rsi, num_opportunities,
+    macro_score_raw, directive_suspended
+"""
+
+_OPPORTUNITY_COLUMNS = """
+    id, direction, entry, stop_loss, take_profit,
+    risk_reward, confidence, reason, region, timestamp
+"""
+
+_REGION_COLUMNS = """
+    id, price, label, tipo, confluences,
+    distance_pct, timestamp, decision_id
+"""
+
+
+class DayRowsView(Sequence):
+    """Prefixo de ``rows`` com ``size`` linhas (o tamanho na publicação).
+
+    O cache só acrescenta no fim de ``rows`` ou troca a lista inteira, então
+    o prefixo não muda depois de publicado. Exceção: um reward pendente
+    relido como avaliado é trocado na mesma posição (transição única
+    pendente → avaliado).
+    """
+
+    __slots__ = ("_rows", "_size")
+
+    def __init__(self, rows: list[Row] | tuple = (), size: Optional[int] = None) -> None:
+        self._rows = rows
+        self._size = len(rows) if size is None else size
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self._rows[i] for i in range(*index.indices(self._size)))
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("DayRowsView index out of range")
+        return self._rows[index]
+
+    def __iter__(self):
+        return islice(self._rows, self._size)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (DayRowsView, tuple, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"DayRowsView({self._size} linhas)"
+
+
+@dataclass(frozen=True)
+class DiaryDaySnapshot:
+    """Fotografia imutável do dia, compartilhada entre os threads.
+
+    ``version`` só muda quando alguma linha nova (ou reavaliada) entrou
+    no cache — serve de chave para memoizar análises.
+    """
+
+    session_date: str = ""
+    version: int = 0
+    episodes: Sequence[Row] = field(default_factory=DayRowsView)
+    rewards: Sequence[Row] = field(default_factory=DayRowsView)  # (timestamp_decision, horizonte)
+    decisions: Sequence[Row] = field(default_factory=DayRowsView)
+    opportunities: Sequence[Row] = field(default_factory=DayRowsView)
+    regions: Sequence[Row] = field(default_factory=DayRowsView)
+    macro_items: tuple[Row, ...] = ()  # items do último ciclo do dia
+    category_history: Mapping[str, tuple[tuple[str, int, int], ...]] = field(
+        default_factory=lambda: MappingProxyType({})
+    )
+    aggregates: DayAggregatesView = field(default_factory=DayAggregatesView)
+
+
+class _DayState:
+    """Estado mutável do dia (acesso sempre sob o lock do cache)."""
+
+    def __init__(self, session_date: str) -> None:
+        self.session_date = session_date
+        self.episodes: list[Row] = []
+        self.rewards: list[Row] = []  # ordenados por _reward_key (bisect)
+        self.reward_pos: dict[int, int] = {}  # id → posição em rewards
+        self.pending_rewards: dict[int, Row] = {}  # id → reward não avaliado
+        self.decisions: list[Row] = []
+        self.opportunities: list[Row] = []
+        self.regions: list[Row] = []
+        # decision_id → lista de items do ciclo
+        self.items_by_decision: dict[int, list[Row]] = {}
+        # categoria → [(decision_id, timestamp, score_sum, n_items)]
+        self.category_history: dict[str, list[list[Any]]] = {}
+        self.aggregates = DayAggregates()
+        self.watermarks: dict[str, int] = {
+            "rl_episodes": 0,
+            "rl_rewards": 0,
+            "micro_trend_decisions": 0,
+            "micro_trend_opportunities": 0,
+            "micro_trend_regions": 0,
+            "micro_trend_items": 0,
+        }
+
+
+class DiaryDayCache:
+    """Cache do dia com leitura incremental por marca d'água.
+
+    Uso:
+        cache = get_diary_day_cache(db_path)
+        snap = cache.snapshot()
+        for ep in snap.episodes: ...
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        min_refresh_sec: float = DEFAULT_MIN_REFRESH_SEC,
+    ) -> None:
+        self.db_path = db_path
+        self.min_refresh_sec = min_refresh_sec
+        self._lock = threading.Lock()
+        self._state = _DayState(date.today().isoformat())
+        self._snapshot = DiaryDaySnapshot(session_date=self._state.session_date)
+        self._last_refresh = 0.0
+        self._memo: dict[str, tuple[int, Any]] = {}
+        # Métricas simples para o display
+        self.n_refreshes = 0
+        self.last_new_rows = 0
+
+    # ────────────────────────────────────────────────────────────
+    # API pública
+    # ────────────────────────────────────────────────────────────
+
+    def snapshot(self, force: bool = False) -> DiaryDaySnapshot:
+        """Retorna o snapshot do dia, atualizando se estiver velho."""
+        with self._lock:
+            now = time.monotonic()
+            if force or now - self._last_refresh >= self.min_refresh_sec:
+                self._refresh_locked()
+                self._last_refresh = now
+            return self._snapshot
+
+    def memoize(
+        self,
+        key: str,
+        snapshot: DiaryDaySnapshot,
+        compute: Callable[[], Any],
+    ) -> Any:
+        """Reaproveita o resultado de ``compute`` enquanto o dia não mudar.
+
+        O resultado é compartilhado entre threads — não deve ser alterado
+        por quem o recebe.
+        """
+        with self._lock:
+            cached = self._memo.get(key)
+            if cached is not None and cached[0] == snapshot.version:
+                return cached[1]
+        value = compute()
+        with self._lock:
+            self._memo[key] = (snapshot.version, value)
+        return value
+
+    # ────────────────────────────────────────────────────────────
+    # Refresh incremental
+    # ────────────────────────────────────────────────────────────
+
+    def _refresh_locked(self) -> None:
+        today = date.today().isoformat()
+        if today != self._state.session_date:
+            self._state = _DayState(today)
+            self._memo.clear()
+            self._snapshot = DiaryDaySnapshot(session_date=today)
+
+        try:
+            conn = sqlite3.connect(self.db_path)
+        except sqlite3.Error:
+            return
+        conn.row_factory = sqlite3.Row
+        try:
+            st = self._state
+            new_episodes = self._tail(
+                conn, "rl_episodes", _EPISODE_COLUMNS,
+                "(session_date = ? OR date(timestamp) = ?)", (today, today),
+            )
+            new_rewards = self._tail(
+                conn, "rl_rewards", _REWARD_COLUMNS,
+                "date(timestamp_decision) = ?", (today,),
+            )
+            reevaluated = self._reload_due_rewards(conn)
+            new_decisions = self._tail(
+                conn, "micro_trend_decisions", _DECISION_COLUMNS,
+                "date(timestamp) = ?", (today,),
+            )
+            new_opps = self._tail(
+                conn, "micro_trend_opportunities", _OPPORTUNITY_COLUMNS,
+                "date(timestamp) = ?", (today,),
+            )
+            new_regions = self._tail(
+                conn, "micro_trend_regions", _REGION_COLUMNS,
+                "date(timestamp) = ?", (today,),
+            )
+            new_items = self._tail_items(conn, today)
+        finally:
+            conn.close()
+
+        st.episodes, resorted = _extend_ordered(st.episodes, new_episodes, "timestamp")
+        self._add_rewards(new_rewards, reevaluated)
+        st.decisions, moved = _extend_ordered(st.decisions, new_decisions, "timestamp")
+        resorted |= moved
+        st.opportunities, _ = _extend_ordered(st.opportunities, new_opps, "timestamp")
+        st.regions, moved = _extend_ordered(st.regions, new_regions, "timestamp")
+        resorted |= moved
+        touched = self._apply_items(new_items)
+        if resorted:
+            # Linha retroativa: os agregados dependem da ordem do dia
+            st.aggregates = build_day_aggregates(
+                st.episodes, st.decisions, st.regions,
+                [i for items in st.items_by_decision.values() for i in items],
+            )
+        else:
+            st.aggregates.add_episodes(new_episodes)
+            st.aggregates.add_decisions(new_decisions)
+            st.aggregates.add_regions(new_regions)
+            st.aggregates.add_items(new_items)
+
+        n_new = (
+            len(new_episodes) + len(new_rewards) + len(reevaluated)
+            + len(new_decisions) + len(new_opps) + len(new_regions)
+            + len(new_items)
+        )
+        self.n_refreshes += 1
+        self.last_new_rows = n_new
+        if n_new == 0:
+            return
+
+        prev = self._snapshot
+        history = prev.category_history
+        if touched:
+            history = MappingProxyType({
+                cat: tuple((ts, score, n) for _, ts, score, n in entries)
+                for cat, entries in st.category_history.items()
+            })
+        macro_items = prev.macro_items
+        if st.items_by_decision:
+            last_id = max(st.items_by_decision)
+            macro_items = tuple(sorted(
+                st.items_by_decision[last_id],
+                key=lambda i: (i["category"] or "", i["item_number"] or 0),
+            ))
+
+        self._snapshot = DiaryDaySnapshot(
+            session_date=today,
+            version=prev.version + 1,
+            episodes=DayRowsView(st.episodes) if new_episodes else prev.episodes,
+            rewards=DayRowsView(st.rewards) if new_rewards or reevaluated else prev.rewards,
+            decisions=DayRowsView(st.decisions) if new_decisions else prev.decisions,
+            opportunities=DayRowsView(st.opportunities) if new_opps else prev.opportunities,
+            regions=DayRowsView(st.regions) if new_regions else prev.regions,
+            macro_items=macro_items,
+            category_history=history,
+            aggregates=st.aggregates.freeze(),
+        )
+
+    def _tail(
+        self,
+        conn: sqlite3.Connection,
+        table: str,
+        columns: str,
+        where: str,
+        params: tuple,
+    ) -> list[Row]:
+        """Lê só as linhas com ``id`` acima da marca d'água da tabela."""
+        mark = self._state.watermarks[table]
+        try:
+            rows = conn.execute(
+                f"SELECT {columns} FROM {table} "
+                f"WHERE id > ? AND {where} ORDER BY id ASC",
+                (mark, *params),
+            ).fetchall()
+        except sqlite3.Error:
+            return []
+        if rows:
+            self._state.watermarks[table] = rows[-1]["id"]
+        return [MappingProxyType(dict(r)) for r in rows]
+
+    def _add_rewards(self, new_rewards: list[Row], reevaluated: list[Row]) -> None:
+        """Insere os rewards novos na ordem (bisect) e aplica as reavaliações."""
+        st = self._state
+        for r in new_rewards:
+            if st.rewards and _reward_key(r) < _reward_key(st.rewards[-1]):
+                # Fora de ordem: lista nova, as views publicadas ficam intactas
+                st.rewards = list(st.rewards)
+                insort(st.rewards, r, key=_reward_key)
+                st.reward_pos = {row["id"]: i for i, row in enumerate(st.rewards)}
+            else:
+                st.reward_pos[r["id"]] = len(st.rewards)
+                st.rewards.append(r)
+            if not r["is_evaluated"]:
+                st.pending_rewards[r["id"]] = r
+        for r in reevaluated:
+            pos = st.reward_pos.get(r["id"])
+            if pos is not None:
+                st.rewards[pos] = r
+            st.pending_rewards.pop(r["id"], None)
+
+    def _reload_due_rewards(self, conn: sqlite3.Connection) -> list[Row]:
+        """Relê rewards pendentes cujo horizonte já passou."""
+        now = datetime.now()
+        due_ids = [
+            rid for rid, r in self._state.pending_rewards.items() if _reward_due(r, now)
+        ]
+        fresh: list[Row] = []
+        for start in range(0, len(due_ids), _IN_CHUNK):
+            chunk = due_ids[start:start + _IN_CHUNK]
+            marks = ",".join("?" * len(chunk))
+            try:
+                rows = conn.execute(
+                    f"SELECT {_REWARD_COLUMNS} FROM rl_rewards "
+                    f"WHERE id IN ({marks}) AND is_evaluated = 1",
+                    chunk,
+                ).fetchall()
+            except sqlite3.Error:
+                return fresh
+            fresh.extend(MappingProxyType(dict(r)) for r in rows)
+        return fresh
+
+    def _tail_items(self, conn: sqlite3.Connection, today: str) -> list[Row]:
+        mark = self._state.watermarks["micro_trend_items"]
+        try:
+            rows = conn.execute(
+                """
+                SELECT i.id, i.decision_id, d.timestamp, i.item_number,
+                       i.symbol, i.category, i.score,
+                       i.price_current, i.price_open
+                FROM micro_trend_items i
+                JOIN micro_trend_decisions d ON d.id = i.decision_id
+                WHERE i.id > ? AND date(d.timestamp) = ?
+                ORDER BY i.id ASC
+                """,
+                (mark, today),
+            ).fetchall()
+        except sqlite3.Error:
+            return []
+        if rows:
+            self._state.watermarks["micro_trend_items"] = rows[-1]["id"]
+        return [MappingProxyType(dict(r)) for r in rows]
+
+    def _apply_items(self, new_items: list[Row]) -> bool:
+        """Agrega os items novos no histórico por categoria."""
+        st = self._state
+        touched: dict[int, set[str]] = {}
+        for item in new_items:
+            did = item["decision_id"]
+            st.items_by_decision.setdefault(did, []).append(item)
+            touched.setdefault(did, set()).add(item["category"])
+
+        for did in sorted(touched):
+            items = st.items_by_decision[did]
+            for cat in touched[did]:
+                cat_items = [i for i in items if i["category"] == cat]
+                entry = [
+                    did,
+                    cat_items[0]["timestamp"],
+                    sum(i["score"] for i in cat_items),
+                    len(cat_items),
+                ]
+                entries = st.category_history.setdefault(cat, [])
+                # Ciclo novo entra no fim; ciclo já visto é reescrito
+                if entries and entries[-1][0] == did:
+                    entries[-1] = entry
+                else:
+                    entries.append(entry)
+                    if len(entries) > 1 and entries[-2][0] > did:
+                        entries.sort(key=lambda e: e[0])
+        return bool(touched)
+
+
+def _extend_ordered(
+    target: list[Row], new_rows: list[Row], key: str,
+) -> tuple[list[Row], bool]:
+    """Anexa linhas mantendo a ordem por ``key``.
+
+    Em ordem, anexa no próprio ``target``. Com linha retroativa devolve uma
+    lista nova reordenada (as views já publicadas continuam válidas) e
+    True.
+    """
+    if not new_rows:
+        return target, False
+    in_order = not target or (target[-1][key] or "") <= (new_rows[0][key] or "")
+    if in_order and not any(
+        (a[key] or "") > (b[key] or "") for a, b in zip(new_rows, new_rows[1:])
+    ):
+        target.extend(new_rows)
+        return target, False
+    return sorted(target + new_rows, key=lambda r: r[key] or ""), True
+
+
+def _reward_key(reward: Row) -> tuple[str, int]:
+    return (reward["timestamp_decision"] or "", reward["horizon_minutes"] or 0)
+
+
+def _reward_due(reward: Row, now: datetime) -> bool:
+    """True se o horizonte do reward já venceu (pode ter sido avaliado)."""
+    try:
+        ts = datetime.fromisoformat(str(reward["timestamp_decision"]))
+    except ValueError:
+        return True
+    return ts + timedelta(minutes=reward["horizon_minutes"] or 0) <= now
+
+
+# ────────────────────────────────────────────────────────────────
+# Instância por processo
+# ────────────────────────────────────────────────────────────────
+
+_caches: dict[str, DiaryDayCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_diary_day_cache(db_path: str) -> DiaryDayCache:
+    """Retorna o cache compartilhado do processo para ``db_path``."""
+    with _caches_lock:
+        cache = _caches.get(db_path)
+        if cache is None:
+            cache = DiaryDayCache(db_path)
+            _caches[db_path] = cache
+        return cache
@@ -0,0 +1,332 @@
+"""
+Estatísticas móveis (média, σ e z-score) para muitos símbolos de uma vez.
+
+Cada símbolo ocupa uma linha de arrays numpy: um buffer circular com as
+últimas ``window`` cotações, a média e a soma dos quadrados dos desvios
+(M2) da janela. Uma atualização é a variante deslizante de Welford —
+entra a cotação nova, sai a mais antiga — em O(1) por símbolo, sem
+copiar a janela nem recalcular média/σ do zero:
+
+    cheia:     μ' = μ + (x - x_velho) / n
+               M2' = M2 + (x - x_velho) * (x - μ' + x_velho - μ)
+    enchendo:  n' = n + 1;  μ' = μ + (x - μ) / n';  M2' = M2 + (x - μ) * (x - μ')
+
+``atualizar_lote`` aplica um lote inteiro de (símbolo, fechamento) com
+operações vetorizadas sobre as linhas envolvidas. Um símbolo repetido
+no mesmo lote é aplicado em rodadas, na ordem em que aparece.
+
+Como a atualização é incremental, o erro de arredondamento se acumula;
+a cada ``recalibrar_a_cada`` lotes, média e M2 das janelas cheias são
+recalculados a partir do buffer.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import NamedTuple, Optional, Sequence
+
+import numpy as np
+
+# σ abaixo disso é tratado como janela sem variação (z indefinido)
+SIGMA_MINIMO = 1e-6
+
+
+class ZScore(NamedTuple):
+    """Resultado de uma atualização avulsa (campos como em LoteZScores)."""
+
+    z: float
+    z_anterior: float
+    media: float
+    sigma: float
+
+
+@dataclass(frozen=True)
+class LoteZScores:
+    """Resultado de um lote, alinhado à entrada (uma posição por atualização)."""
+
+    simbolos: list[str]
+    z: np.ndarray           # NaN: histórico insuficiente ou σ ~ 0
+    z_anterior: np.ndarray  # Último z válido do símbolo antes desta atualização
+    media: np.ndarray
+    sigma: np.ndarray
+
+
+class EstatisticasMoveis:
+    """Média/σ móveis por símbolo com atualização em lote (Welford deslizante)."""
+
+    def __init__(
+        self,
+        window: int = 20,
+        capacidade_inicial: int = 64,
+        recalibrar_a_cada: int = 1000,
+    ) -> None:
+        """
+        Args:
+            window: Tamanho da janela móvel
+            capacidade_inicial: Símbolos pré-alocados (dobra quando enche)
+            recalibrar_a_cada: Lotes entre recálculos exatos a partir do buffer
+        """
+        if window < 2:
+            raise ValueError("window deve ser >= 2")
+        self.window = window
+        self.recalibrar_a_cada = recalibrar_a_cada
+        self._indices: dict[str, int] = {}
+        self._livres: list[int] = []
+        self._proximo = 0
+        self._lotes = 0
+        self._alocar(capacidade_inicial)
+
+    def __len__(self) -> int:
+        return len(self._indices)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._indices
+
+    @property
+    def simbolos(self) -> list[str]:
+        return list(self._indices)
+
+    # ────────────────────────────────────────────────────────────
+    # Registro de símbolos
+    # ────────────────────────────────────────────────────────────
+
+    def indice(self, symbol: str) -> int:
+        """Linha do símbolo nos arrays (registra se for novo)."""
+        idx = self._indices.get(symbol)
+        if idx is not None:
+            return idx
+        if self._livres:
+            idx = self._livres.pop()
+        else:
+            if self._proximo == len(self._media):
+                self._alocar(2 * len(self._media))
+            idx = self._proximo
+            self._proximo += 1
+        self._indices[symbol] = idx
+        return idx
+
+    def semear(self, symbol: str, historico: Sequence[float]) -> None:
+        """Carrega as últimas ``window`` cotações do histórico (estado exato)."""
+        idx = self.indice(symbol)
+        self._zerar(idx)
+        valores = np.asarray(historico[-self.window:], dtype=np.float64)
+        n = len(valores)
+        if n == 0:
+            return
+        self._buffer[idx, :n] = valores
+        self._n[idx] = n
+        self._pos[idx] = n % self.window
+        self._media[idx] = valores.mean()
+        self._m2[idx] = ((valores - self._media[idx]) ** 2).sum()
+
+    def remover(self, symbol: str) -> None:
+        """Esquece o símbolo; a linha é reaproveitada por um próximo registro."""
+        idx = self._indices.pop(symbol, None)
+        if idx is not None:
+            self._zerar(idx)
+            self._livres.append(idx)
+
+    # ────────────────────────────────────────────────────────────
+    # Atualização
+    # ────────────────────────────────────────────────────────────
+
+    def atualizar(self, symbol: str, close: float) -> ZScore:
+        """
+        Atualiza um único símbolo.
+
+        Mesma conta de ``atualizar_lote``, em floats do Python: para uma
+        linha só, o custo fixo das operações numpy domina.
+        """
+        idx = self.indice(symbol)
+        x = float(close)
+        n = int(self._n[idx])
+        pos = int(self._pos[idx])
+        media = float(self._media[idx])
+        m2 = float(self._m2[idx])
+        z_anterior = float(self._z[idx])
+
+        if n == self.window:
+            velho = float(self._buffer[idx, pos])
+            delta = x - velho
+            media_nova = media + delta / n
+            m2 = m2 + delta * (x - media_nova + velho - media)
+        else:
+            n += 1
+            delta = x - media
+            media_nova = media + delta / n
+            m2 = m2 + delta * (x - media_nova)
+        m2 = max(m2, 0.0)
+
+        self._buffer[idx, pos] = x
+        self._pos[idx] = (pos + 1) % self.window
+        self._n[idx] = n
+        self._media[idx] = media_nova
+        self._m2[idx] = m2
+
+        sigma = math.sqrt(m2 / n)
+        z = math.nan
+        if n >= self.window and sigma >= SIGMA_MINIMO:
+            z = (x - media_nova) / sigma
+            self._z[idx] = z
+
+        self._contar_lote()
+        return ZScore(z=z, z_anterior=z_anterior, media=media_nova, sigma=sigma)
+
+    def atualizar_lote(
+        self, simbolos: Sequence[str], closes: Sequence[float]
+    ) -> LoteZScores:
+        """
+        Aplica um lote de fechamentos e devolve os z-scores de todos.
+
+        Args:
+            simbolos: Símbolo de cada atualização (pode repetir)
+            closes: Fechamento de cada atualização
+
+        Returns:
+            LoteZScores alinhado à entrada
+        """
+        if len(simbolos) != len(closes):
+            raise ValueError("simbolos e closes com tamanhos diferentes")
+        simbolos = list(simbolos)
+        idx = np.fromiter(
+            (self.indice(s) for s in simbolos), dtype=np.intp, count=len(simbolos)
+        )
+        x = np.asarray(closes, dtype=np.float64)
+        total = len(idx)
+        z = np.full(total, np.nan)
+        z_anterior = np.empty(total)
+        media = np.empty(total)
+        sigma = np.empty(total)
+
+        for posicoes in self._rodadas(idx):
+            linhas = idx[posicoes]
+            z_anterior[posicoes] = self._z[linhas]
+            self._aplicar(linhas, x[posicoes])
+            media[posicoes], sigma[posicoes], z[posicoes] = self._estado(
+                linhas, x[posicoes]
+            )
+
+        self._contar_lote()
+        return LoteZScores(
+            simbolos=simbolos, z=z, z_anterior=z_anterior, media=media, sigma=sigma,
+        )
+
+    def recalibrar(self) -> None:
+        """Recalcula média/M2 das janelas cheias a partir do buffer."""
+        cheias = np.flatnonzero(self._n[: self._proximo] == self.window)
+        if len(cheias) == 0:
+            return
+        janelas = self._buffer[cheias]
+        medias = janelas.mean(axis=1)
+        self._media[cheias] = medias
+        self._m2[cheias] = ((janelas - medias[:, None]) ** 2).sum(axis=1)
+
+    # ────────────────────────────────────────────────────────────
+    # Consulta
+    # ────────────────────────────────────────────────────────────
+
+    def estatisticas(self, symbol: str) -> Optional[dict]:
+        """Estado atual do símbolo (None se não registrado)."""
+        idx = self._indices.get(symbol)
+        if idx is None:
+            return None
+        n = int(self._n[idx])
+        return {
+            "barras": n,
+            "media": float(self._media[idx]),
+            "sigma": float(np.sqrt(max(self._m2[idx], 0.0) / n)) if n else 0.0,
+            "z": float(self._z[idx]),
+        }
+
+    def z_scores(self) -> dict[str, float]:
+        """Último z válido de todos os símbolos registrados."""
+        return {s: float(self._z[i]) for s, i in self._indices.items()}
+
+    # ────────────────────────────────────────────────────────────
+    # Internos
+    # ────────────────────────────────────────────────────────────
+
+    def _alocar(self, capacidade: int) -> None:
+        """Aloca (ou aumenta) os arrays por símbolo, preservando o conteúdo."""
+        campos = {
+            "_buffer": ((capacidade, self.window), np.float64),
+            "_n": (capacidade, np.int64),
+            "_pos": (capacidade, np.int64),
+            "_media": (capacidade, np.float64),
+            "_m2": (capacidade, np.float64),
+            "_z": (capacidade, np.float64),
+        }
+        for nome, (shape, dtype) in campos.items():
+            novo = np.zeros(shape, dtype=dtype)
+            antigo = getattr(self, nome, None)
+            if antigo is not None:
+                novo[: len(antigo)] = antigo
+            setattr(self, nome, novo)
+
+    def _contar_lote(self) -> None:
+        self._lotes += 1
+        if self.recalibrar_a_cada and self._lotes % self.recalibrar_a_cada == 0:
+            self.recalibrar()
+
+    def _zerar(self, idx: int) -> None:
+        self._buffer[idx] = 0.0
+        self._n[idx] = 0
+        self._pos[idx] = 0
+        self._media[idx] = 0.0
+        self._m2[idx] = 0.0
+        self._z[idx] = 0.0
+
+    @staticmethod
+    def _rodadas(idx: np.ndarray) -> list[np.ndarray]:
+        """Divide o lote em rodadas sem símbolo repetido, preservando a ordem."""
+        if len(np.unique(idx)) == len(idx):
+            return [np.arange(len(idx))]
+        ocorrencia: dict[int, int] = {}
+        rodadas: list[list[int]] = []
+        for posicao, linha in enumerate(idx.tolist()):
+            k = ocorrencia.get(linha, 0)
+            ocorrencia[linha] = k + 1
+            if k == len(rodadas):
+                rodadas.append([])
+            rodadas[k].append(posicao)
+        return [np.asarray(r, dtype=np.intp) for r in rodadas]
+
+    def _aplicar(self, linhas: np.ndarray, x: np.ndarray) -> None:
+        """Welford deslizante nas linhas (sem repetição)."""
+        n = self._n[linhas]
+        pos = self._pos[linhas]
+        media = self._media[linhas]
+        m2 = self._m2[linhas]
+
+        cheia = n == self.window
+        velho = self._buffer[linhas, pos]
+
+        # Cheia: x substitui o mais antigo; enchendo: só entra x
+        n_novo = np.where(cheia, n, n + 1)
+        delta = np.where(cheia, x - velho, x - media)
+        media_nova = media + delta / n_novo
+        m2_novo = np.where(
+            cheia,
+            m2 + delta * (x - media_nova + velho - media),
+            m2 + delta * (x - media_nova),
+        )
+
+        self._buffer[linhas, pos] = x
+        self._pos[linhas] = (pos + 1) % self.window
+        self._n[linhas] = n_novo
+        self._media[linhas] = media_nova
+        self._m2[linhas] = np.maximum(m2_novo, 0.0)
+
+    def _estado(
+        self, linhas: np.ndarray, x: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Média, σ populacional e z das linhas; guarda o z onde é válido."""
+        n = self._n[linhas]
+        media = self._media[linhas]
+        sigma = np.sqrt(self._m2[linhas] / n)
+        valido = (n >= self.window) & (sigma >= SIGMA_MINIMO)
+        z = np.full(len(linhas), np.nan)
+        z[valido] = (x[valido] - media[valido]) / sigma[valido]
+        self._z[linhas[valido]] = z[valido]
+        return media, sigma, z
@@ -1,5 +1,8 @@
 """Macro Score Engine - Sistema de pontuacao macro para WIN."""
 
+from src.application.services.macro_score.async_engine import (
+    AsyncMacroScoreEngine,
+)
 from src.application.services.macro_score.engine import (
     ItemScoreResult,
     MacroScoreEngine,
@@ -18,6 +21,7 @@ from src.application.services.macro_score.technical_scorer import (
 )
 
 __all__ = [
+    "AsyncMacroScoreEngine",
     "MacroScoreEngine",
     "MacroScoreResult",
     "ItemScoreResult",
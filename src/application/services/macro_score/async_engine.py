@@ -0,0 +1,318 @@
+"""AsyncMacroScoreEngine - variante assincrona do MacroScoreEngine.
+
+Mesmo pipeline e mesmo ``MacroScoreResult`` do engine sincrono (as regras
+de score, correlacao e agregacao sao herdadas); muda so o transporte:
+
+- MT5: chamadas em um executor dedicado de 1 thread (a API do terminal
+  nao e thread-safe), enfileiradas em ordem de registry
+- HTTP: forex fallback via ``AsyncForexAPIProvider`` com
+  ``httpx.AsyncClient`` compartilhado; uma unica requisicao por analise,
+  com prazo ``http_timeout_s`` contado do inicio da analise
+- DB: leituras/escritas de ``market_data`` em executor proprio, fora da
+  thread do MT5 e do event loop
+
+Itens de fontes lentas (forex via API) aguardam em corrotinas proprias e
+nunca atrasam os itens MT5. Se a API estourar o prazo, o item sai como
+indisponivel (mesmo resultado do engine sincrono com a API fora do ar).
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from functools import partial
+from typing import Any, Callable, Optional
+
+from src.application.services.macro_score.engine import (
+    ItemScoreResult,
+    MacroScoreEngine,
+    MacroScoreResult,
+)
+from src.application.services.macro_score.item_registry import (
+    MacroScoreItemConfig,
+    get_item_registry,
+)
+from src.domain.enums.macro_score_enums import AssetCategory, ScoringType
+from src.infrastructure.adapters.mt5_adapter import MT5Adapter
+from src.infrastructure.providers.forex_api_provider import (
+    AsyncForexAPIProvider,
+    ForexQuote,
+)
+from src.infrastructure.repositories.macro_score_repository import (
+    IMacroScoreRepository,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _AnalysisRun:
+    """Estado compartilhado pelos itens de uma mesma analise."""
+
+    deadline: float
+    win_candles: Optional[asyncio.Future] = None
+    forex_quotes: Optional[asyncio.Future] = None
+    timings_ms: dict[str, float] = field(default_factory=dict)
+
+
+class AsyncMacroScoreEngine(MacroScoreEngine):
+    """Engine macro score com fontes de dados assincronas.
+
+    Uso:
+        async with httpx.AsyncClient() as client:
+            engine = AsyncMacroScoreEngine(mt5, repository, http_client=client)
+            result = await engine.analyze_async()
+            await engine.aclose()
+    """
+
+    def __init__(
+        self,
+        mt5_adapter: MT5Adapter,
+        repository: Optional[IMacroScoreRepository] = None,
+        neutral_threshold: Decimal = Decimal("0"),
+        stale_tick_seconds: int = 4 * 60 * 60,
+        http_client=None,
+        http_timeout_s: float = 5.0,
+        db_workers: int = 2,
+    ) -> None:
+        super().__init__(
+            mt5_adapter,
+            repository=repository,
+            neutral_threshold=neutral_threshold,
+            stale_tick_seconds=stale_tick_seconds,
+        )
+        self._http_timeout_s = http_timeout_s
+        self._forex_api_async = AsyncForexAPIProvider(
+            client=http_client, cache_ttl_seconds=60, timeout_seconds=http_timeout_s
+        )
+        self._mt5_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="macro-mt5"
+        )
+        self._db_executor = ThreadPoolExecutor(
+            max_workers=db_workers, thread_name_prefix="macro-db"
+        )
+        # Busca forex em voo: se estourar o prazo de uma analise, segue
+        # rodando e aquece o cache da proxima (sem abrir outra requisicao)
+        self._forex_inflight: Optional[asyncio.Future] = None
+        # Tempos da ultima analise por fonte (ms)
+        self.last_timings_ms: dict[str, float] = {}
+
+    # ────────────────────────────────────────────────────────────
+    # Ciclo de vida
+    # ────────────────────────────────────────────────────────────
+
+    async def __aenter__(self) -> "AsyncMacroScoreEngine":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Encerra executores e o cliente HTTP (se criado pelo engine)."""
+        if self._forex_inflight is not None and not self._forex_inflight.done():
+            self._forex_inflight.cancel()
+        await self._forex_api_async.aclose()
+        self._mt5_executor.shutdown(wait=True)
+        self._db_executor.shutdown(wait=True)
+
+    # ────────────────────────────────────────────────────────────
+    # Analise
+    # ────────────────────────────────────────────────────────────
+
+    async def analyze_async(self) -> MacroScoreResult:
+        """Executa a analise completa com os itens processados em paralelo.
+
+        Returns:
+            MacroScoreResult identico ao de ``analyze()`` para os mesmos dados.
+        """
+        session_id = str(uuid.uuid4())
+        timestamp = datetime.now()
+        registry = get_item_registry()
+        started = time.perf_counter()
+        run = _AnalysisRun(deadline=time.monotonic() + self._http_timeout_s)
+
+        logger.info(
+            "Iniciando analise macro score (async) - sessao %s - %d itens",
+            session_id[:8],
+            len(registry),
+        )
+
+        # gather preserva a ordem do registry no resultado
+        item_results: list[ItemScoreResult] = list(
+            await asyncio.gather(
+                *(self._process_item_async(config, run) for config in registry)
+            )
+        )
+
+        # Agregacao consulta o tick do WIN: roda na thread do MT5
+        macro_result = await self._mt5_call(
+            self._aggregate_results,
+            session_id=session_id,
+            timestamp=timestamp,
+            items=item_results,
+        )
+        self._last_result = macro_result
+
+        if self._repository:
+            await self._db_call(self._persist_result, macro_result)
+
+        run.timings_ms["total"] = (time.perf_counter() - started) * 1000
+        self.last_timings_ms = run.timings_ms
+
+        logger.info(
+            "Analise macro score (async) concluida - Score: %s | Sinal: %s | "
+            "Disponiveis: %d/%d | %.0f ms",
+            macro_result.score_final,
+            macro_result.signal,
+            macro_result.items_available,
+            macro_result.total_items,
+            run.timings_ms["total"],
+        )
+
+        return macro_result
+
+    async def _process_item_async(
+        self, config: MacroScoreItemConfig, run: _AnalysisRun
+    ) -> ItemScoreResult:
+        """Equivalente assincrono de ``_process_item``."""
+        if config.scoring_type == ScoringType.TECHNICAL_INDICATOR:
+            candles = await self._shared_win_candles(run)
+            return self._process_technical_item(config, candles)
+
+        if config.scoring_type == ScoringType.SPREAD_CURVE:
+            return await self._process_spread_curve_item_async(config)
+
+        if config.scoring_type == ScoringType.FLOW_INDICATOR:
+            candles = await self._shared_win_candles(run)
+            return self._process_flow_item(config, candles)
+
+        resolved_symbol = await self._mt5_call(self._resolve_symbol, config)
+
+        if resolved_symbol is None and config.category == AssetCategory.FOREX:
+            quote = await self._forex_quote(config.symbol, run)
+            return self._forex_item_result(config, quote)
+
+        if resolved_symbol is None:
+            return self._unavailable_result(config, "Simbolo nao disponivel")
+
+        opening_price, current_price, reason = await self._get_prices_async(
+            resolved_symbol, config
+        )
+        return self._price_item_result(
+            config, resolved_symbol, opening_price, current_price, reason
+        )
+
+    async def _process_spread_curve_item_async(
+        self, config: MacroScoreItemConfig
+    ) -> ItemScoreResult:
+        ic = config.indicator_config or {}
+        short_sym = ic.get("short_vertex", "DI1H")
+        long_sym = ic.get("long_vertex", "DI1F29")
+
+        try:
+            short_resolved = await self._mt5_call(
+                self._futures_resolver.resolve, short_sym
+            )
+            long_resolved = await self._mt5_call(
+                self._futures_resolver.resolve, long_sym
+            )
+            if not short_resolved or not long_resolved:
+                return self._unavailable_result(
+                    config, f"Vertices indisponiveis: {short_sym}/{long_sym}"
+                )
+
+            short_prices = await self._get_prices_async(short_resolved)
+            long_prices = await self._get_prices_async(long_resolved)
+            return self._spread_item_result(
+                config, short_resolved, long_resolved, short_prices, long_prices
+            )
+
+        except Exception as e:
+            logger.error(
+                "Erro ao processar spread de curva %s: %s",
+                config.symbol, e,
+            )
+            return self._unavailable_result(
+                config, f"Erro no spread: {e}"
+            )
+
+    # ────────────────────────────────────────────────────────────
+    # Fontes de dados
+    # ────────────────────────────────────────────────────────────
+
+    async def _get_prices_async(
+        self,
+        symbol: str,
+        config: Optional[MacroScoreItemConfig] = None,
+    ) -> tuple:
+        """``_get_prices`` com MT5 e DB em executores separados."""
+        try:
+            daily, tick, candle = await self._mt5_call(
+                self._fetch_price_inputs, symbol
+            )
+            return await self._db_call(
+                self._prices_from_inputs, symbol, config, daily, tick, candle
+            )
+        except Exception as e:
+            logger.warning(
+                "Erro ao obter precos de %s: %s", symbol, e
+            )
+            return None, None, "Erro ao obter precos"
+
+    async def _shared_win_candles(self, run: _AnalysisRun) -> list:
+        """Candles M5 do WIN buscados uma vez por analise (itens 78+)."""
+        if run.win_candles is None:
+            run.win_candles = asyncio.ensure_future(
+                self._mt5_call(self._get_win_candles)
+            )
+        return await run.win_candles
+
+    async def _forex_quote(
+        self, currency_code: str, run: _AnalysisRun
+    ) -> Optional[ForexQuote]:
+        """Cotacao via API com prazo fixo a partir do inicio da analise."""
+        if run.forex_quotes is None:
+            if self._forex_inflight is None or self._forex_inflight.done():
+                self._forex_inflight = asyncio.ensure_future(
+                    self._timed_forex_fetch(run)
+                )
+            run.forex_quotes = self._forex_inflight
+        remaining = run.deadline - time.monotonic()
+        try:
+            # shield: um item que desiste nao cancela a busca dos demais
+            quotes = await asyncio.wait_for(
+                asyncio.shield(run.forex_quotes), max(remaining, 0)
+            )
+        except asyncio.TimeoutError:
+            logger.warning(
+                "Forex API excedeu %.1fs - %s indisponivel",
+                self._http_timeout_s, currency_code,
+            )
+            return None
+        except Exception as e:
+            logger.warning("Erro na Forex API (%s): %s", currency_code, e)
+            return None
+        return quotes.get(currency_code)
+
+    async def _timed_forex_fetch(self, run: _AnalysisRun) -> dict[str, ForexQuote]:
+        t0 = time.perf_counter()
+        try:
+            return await self._forex_api_async.get_all_quotes()
+        finally:
+            run.timings_ms["forex_api"] = (time.perf_counter() - t0) * 1000
+
+    async def _mt5_call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._mt5_executor, partial(fn, *args, **kwargs)
+        )
+
+    async def _db_call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._db_executor, partial(fn, *args, **kwargs)
+        )
@@ -2,16 +2,19 @@
 
 import logging
 import uuid
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from decimal import Decimal
-from typing import Optional
+from typing import Optional, Union
 
 from src.application.services.macro_score.forex_handler import ForexScoreHandler
 from src.application.services.macro_score.futures_resolver import (
     FuturesContractResolver,
 )
-from src.infrastructure.providers.forex_api_provider import ForexAPIProvider
+from src.infrastructure.providers.forex_api_provider import (
+    ForexAPIProvider,
+    ForexQuote,
+)
 from src.application.services.macro_score.item_registry import (
     MacroScoreItemConfig,
     get_item_registry,
@@ -37,9 +40,142 @@ from src.infrastructure.repositories.macro_score_repository import (
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+# ────────────────────────────────────────────────────────────────
+# Textos sob demanda (detail / summary)
+# ────────────────────────────────────────────────────────────────
+#
+# Formatar o detalhe de cada item (Decimal + f-string) custa mais que o
+# proprio score e quase ninguem le: so exibicao e persistencia. Os campos
+# marcados com ``lazy_text`` continuam campos comuns do dataclass, mas
+# aceitam (renderizador, *numeros) e montam o texto na primeira leitura;
+# o texto fica memoizado. Como ``==``, ``repr``, ``asdict``, ``replace``
+# e o pickle leem o campo pelo atributo, todos veem o texto pronto.
+
+LazyText = Union[str, tuple]  # Texto pronto ou (renderizador, *args)
+
+
+class _LazyTextField(property):
+    """Property sobre o armazenamento do campo (slot ou ``__dict__``)."""
+
+    def __init__(self, cls: type, name: str) -> None:
+        slot = cls.__dict__.get(name)
+        if hasattr(slot, "__set__"):  # member descriptor de dataclass(slots=True)
+            load, store = slot.__get__, slot.__set__
+        else:
+            def load(obj, _owner=None):
+                return obj.__dict__[name]
+
+            def store(obj, value):
+                obj.__dict__[name] = value
+
+        def get(obj) -> str:
+            value = load(obj)
+            if value.__class__ is tuple:
+                value = value[0](*value[1:])
+                store(obj, value)
+            return value
+
+        super().__init__(get, store)
+        self.raw = load
+
+
+def lazy_text(*names: str):
+    """Decorador (acima do ``@dataclass``): campos texto montados sob demanda."""
+
+    def wrap(cls: type) -> type:
+        for name in names:
+            setattr(cls, name, _LazyTextField(cls, name))
+        return cls
+
+    return wrap
+
+
+def raw_text(obj, name: str) -> LazyText:
+    """Valor do campo ``lazy_text`` sem montar o texto (para repassar adiante)."""
+    return type(obj).__dict__[name].raw(obj)
+
+
+def render_price_detail(
+    opening_price: Decimal,
+    current_price: Decimal,
+    correlation: CorrelationType,
+    final_score: int,
+) -> str:
+    price_change = current_price - opening_price
+    pct_change = (
+        (price_change / opening_price * 100) if opening_price != 0 else Decimal("0")
+    )
+    return (
+        f"Abertura: {opening_price} | Atual: {current_price} | "
+        f"Var: {price_change:+} ({pct_change:+.2f}%) | "
+        f"Correl: {correlation} | Score: {final_score:+d}"
+    )
+
+
+def render_forex_detail(
+    opening: Decimal,
+    bid: Decimal,
+    pct_change: Decimal,
+    correlation: CorrelationType,
+    final_score: int,
+) -> str:
+    return (
+        f"API Forex | Abertura: {opening} | Atual: {bid} | "
+        f"Var: {bid - opening:+} ({pct_change:+}%) | "
+        f"Correl: {correlation} | Score: {final_score:+d}"
+    )
+
+
+def render_indicator_detail(prefix: str, indicator_type: str, final_score: int) -> str:
+    return f"{prefix}: {indicator_type} | Score: {final_score:+d}"
+
+
+def render_spread_detail(
+    short_sym: str,
+    long_sym: str,
+    spread_open: Decimal,
+    spread_now: Decimal,
+    final_score: int,
+) -> str:
+    return (
+        f"Spread curva [{short_sym}/{long_sym}]: "
+        f"Abertura={spread_open:.4f} | Atual={spread_now:.4f} | "
+        f"Var={spread_now - spread_open:+.4f} | Score={final_score:+d}"
+    )
+
+
+_SIGNAL_TEXT = {
+    MacroSignal.COMPRA: "COMPRA (Score Positivo)",
+    MacroSignal.VENDA: "VENDA (Score Negativo)",
+    MacroSignal.NEUTRO: "NEUTRO (Score Zero/Proximo)",
+}
+
+
+def render_summary(
+    score_final: Decimal,
+    signal: MacroSignal,
+    items_available: int,
+    total_items: int,
+    score_bullish: Decimal,
+    score_bearish: Decimal,
+    score_neutral: int,
+) -> str:
+    return (
+        f"Macro Score: {score_final:+.2f} | Sinal: {_SIGNAL_TEXT[signal]} | "
+        f"Itens: {items_available}/{total_items} | "
+        f"Alta: +{score_bullish:.1f} | Baixa: -{score_bearish:.1f} | "
+        f"Neutros: {score_neutral}"
+    )
+
+
+@lazy_text("detail")
+@dataclass(slots=True)
 class ItemScoreResult:
-    """Resultado de pontuacao de um item individual."""
+    """Resultado de pontuacao de um item individual.
+
+    ``detail`` aceita o texto pronto ou ``(renderizador, *args)``; nesse
+    caso o texto e montado na primeira leitura.
+    """
 
     item_number: int
     symbol: str
@@ -54,9 +190,10 @@ class ItemScoreResult:
     weight: Decimal
     weighted_score: Decimal  # final_score * weight
     available: bool
-    detail: str
+    detail: LazyText
 
 
+@lazy_text("summary")
 @dataclass
 class MacroScoreResult:
     """Resultado completo da analise macro score."""
@@ -74,7 +211,7 @@ class MacroScoreResult:
     signal: MacroSignal
     confidence: Decimal
     win_price: Optional[Decimal]
-    summary: str
+    summary: LazyText
 
     def get_trading_bias(self) -> str:
         """Retorna bias compativel com QuantumOperatorEngine."""
@@ -85,6 +222,7 @@ class MacroScoreResult:
         return "NEUTRAL"
 
 
+
 class MacroScoreEngine:
     """Engine principal do sistema macro score.
 
@@ -215,6 +353,19 @@ class MacroScoreEngine:
         opening_price, current_price, reason = self._get_prices(
             resolved_symbol, config
         )
+        return self._price_item_result(
+            config, resolved_symbol, opening_price, current_price, reason
+        )
+
+    def _price_item_result(
+        self,
+        config: MacroScoreItemConfig,
+        resolved_symbol: str,
+        opening_price: Optional[Decimal],
+        current_price: Optional[Decimal],
+        reason: Optional[str],
+    ) -> ItemScoreResult:
+        """Monta o resultado de um item price-vs-open a partir dos precos."""
         if opening_price is None or current_price is None:
             reason_text = reason or f"Dados indisponiveis para {resolved_symbol}"
             return self._unavailable_result(config, reason_text)
@@ -233,15 +384,10 @@ class MacroScoreEngine:
             weight=Weight(config.weight),
         )
 
-        # Montar detalhe
-        price_change = current_price - opening_price
-        pct_change = (
-            (price_change / opening_price * 100) if opening_price != 0 else Decimal("0")
-        )
+        # Detalhe montado sob demanda
         detail = (
-            f"Abertura: {opening_price} | Atual: {current_price} | "
-            f"Var: {price_change:+} ({pct_change:+.2f}%) | "
-            f"Correl: {config.correlation} | Score: {final_score:+d}"
+            render_price_detail, opening_price, current_price,
+            config.correlation, final_score,
         )
 
         return ItemScoreResult(
@@ -270,6 +416,12 @@ class MacroScoreEngine:
         a convenção do par (XXX_USD vs USD_XXX).
         """
         quote = self._forex_api.get_quote(config.symbol)
+        return self._forex_item_result(config, quote)
+
+    def _forex_item_result(
+        self, config: MacroScoreItemConfig, quote: Optional[ForexQuote]
+    ) -> ItemScoreResult:
+        """Monta o resultado de um item forex a partir da cotacao da API."""
         if quote is None:
             return self._unavailable_result(
                 config, f"Forex {config.symbol} indisponivel (MT5 e API)"
@@ -288,11 +440,9 @@ class MacroScoreEngine:
             weight=Weight(config.weight),
         )
 
-        price_change = quote.bid - quote.opening
         detail = (
-            f"API Forex | Abertura: {quote.opening} | Atual: {quote.bid} | "
-            f"Var: {price_change:+} ({quote.pct_change:+}%) | "
-            f"Correl: {config.correlation} | Score: {final_score:+d}"
+            render_forex_detail, quote.opening, quote.bid, quote.pct_change,
+            config.correlation, final_score,
         )
 
         return ItemScoreResult(
@@ -313,9 +463,12 @@ class MacroScoreEngine:
         )
 
     def _process_technical_item(
-        self, config: MacroScoreItemConfig
+        self, config: MacroScoreItemConfig, candles: Optional[list] = None
     ) -> ItemScoreResult:
-        """Processa um item de indicador tecnico (itens 78-85)."""
+        """Processa um item de indicador tecnico (itens 78-85).
+
+        ``candles`` permite reaproveitar os candles do WIN ja buscados.
+        """
         indicator_type = (
             config.indicator_config.get("type", "unknown")
             if config.indicator_config
@@ -324,7 +477,8 @@ class MacroScoreEngine:
 
         try:
             # Buscar candles do WIN para calculos
-            candles = self._get_win_candles()
+            if candles is None:
+                candles = self._get_win_candles()
             if not candles or len(candles) < 30:
                 return self._unavailable_result(
                     config, "Candles insuficientes para indicador"
@@ -346,7 +500,7 @@ class MacroScoreEngine:
                 weight=Weight(config.weight),
             )
 
-            detail = f"Indicador: {indicator_type} | Score: {final_score:+d}"
+            detail = (render_indicator_detail, "Indicador", indicator_type, final_score)
 
             return ItemScoreResult(
                 item_number=config.number,
@@ -397,8 +551,37 @@ class MacroScoreEngine:
                 )
 
             # Buscar precos de cada vertice
-            short_open, short_current, _ = self._get_prices(short_resolved)
-            long_open, long_current, _ = self._get_prices(long_resolved)
+            short_prices = self._get_prices(short_resolved)
+            long_prices = self._get_prices(long_resolved)
+            return self._spread_item_result(
+                config, short_resolved, long_resolved, short_prices, long_prices
+            )
+
+        except Exception as e:
+            logger.error(
+                "Erro ao processar spread de curva %s: %s",
+                config.symbol, e,
+            )
+            return self._unavailable_result(
+                config, f"Erro no spread: {e}"
+            )
+
+    def _spread_item_result(
+        self,
+        config: MacroScoreItemConfig,
+        short_resolved: str,
+        long_resolved: str,
+        short_prices: tuple,
+        long_prices: tuple,
+    ) -> ItemScoreResult:
+        """Monta o resultado do spread de curva a partir dos precos dos vertices."""
+        ic = config.indicator_config or {}
+        short_sym = ic.get("short_vertex", "DI1H")
+        long_sym = ic.get("long_vertex", "DI1F29")
+
+        try:
+            short_open, short_current, _ = short_prices
+            long_open, long_current, _ = long_prices
 
             if None in (short_open, short_current, long_open, long_current):
                 return self._unavailable_result(
@@ -429,9 +612,8 @@ class MacroScoreEngine:
             )
 
             detail = (
-                f"Spread curva [{short_sym}/{long_sym}]: "
-                f"Abertura={spread_open:.4f} | Atual={spread_now:.4f} | "
-                f"Var={spread_change:+.4f} | Score={final_score:+d}"
+                render_spread_detail, short_sym, long_sym,
+                spread_open, spread_now, final_score,
             )
 
             return ItemScoreResult(
@@ -461,7 +643,7 @@ class MacroScoreEngine:
             )
 
     def _process_flow_item(
-        self, config: MacroScoreItemConfig
+        self, config: MacroScoreItemConfig, candles: Optional[list] = None
     ) -> ItemScoreResult:
         """Processa item do tipo FLOW_INDICATOR (microestrutura).
 
@@ -474,7 +656,8 @@ class MacroScoreEngine:
         )
 
         try:
-            candles = self._get_win_candles()
+            if candles is None:
+                candles = self._get_win_candles()
             if not candles or len(candles) < 10:
                 return self._unavailable_result(
                     config, "Candles insuficientes para indicador de fluxo"
@@ -493,7 +676,7 @@ class MacroScoreEngine:
                 weight=Weight(config.weight),
             )
 
-            detail = f"Flow: {indicator_type} | Score: {final_score:+d}"
+            detail = (render_indicator_detail, "Flow", indicator_type, final_score)
 
             return ItemScoreResult(
                 item_number=config.number,
@@ -559,47 +742,8 @@ class MacroScoreEngine:
     ) -> tuple[Optional[Decimal], Optional[Decimal], Optional[str]]:
         """Obtem preco de abertura e preco atual."""
         try:
-            daily = self._mt5.get_daily_candle(symbol)
-            tick = self._mt5.get_symbol_info_tick(symbol)
-
-            # Persistir candle atual (M1) para backtesting quando disponivel
-            candle = self._get_current_m1_candle(symbol)
-            if candle is not None:
-                self._save_candle_to_db(symbol, candle)
-
-            if tick is None:
-                return None, None, "Tick indisponivel"
-
-            now_brt = datetime.utcnow() + timedelta(hours=-3)
-            tick_age = (now_brt - tick.timestamp).total_seconds()
-            if tick_age > self._stale_tick_seconds:
-                return None, None, f"Tick desatualizado ({int(tick_age)}s)"
-
-            # Persistir o tick com timestamp de captura para backtesting
-            self._save_tick_to_db(symbol, tick, timestamp_override=now_brt)
-
-            if daily is None and config and config.symbol in self._live_only_symbols:
-                db_symbol = config.symbol
-                opening_price = self._get_open_from_db(db_symbol)
-                current_price = self._get_latest_from_db(db_symbol)
-                if opening_price is None:
-                    opening_price = tick.last.value
-                if current_price is None:
-                    current_price = tick.last.value
-                return opening_price, current_price, None
-
-            if daily is None:
-                opening_price = self._get_open_from_db(symbol)
-                current_price = self._get_latest_from_db(symbol)
-                if opening_price is None:
-                    opening_price = tick.last.value
-                if current_price is None:
-                    current_price = tick.last.value
-                return opening_price, current_price, None
-
-            opening_price = self._get_open_from_db(symbol) or daily.open.value
-            current_price = self._get_latest_from_db(symbol) or tick.last.value
-            return opening_price, current_price, None
+            daily, tick, candle = self._fetch_price_inputs(symbol)
+            return self._prices_from_inputs(symbol, config, daily, tick, candle)
 
         except Exception as e:
             logger.warning(
@@ -607,6 +751,60 @@ class MacroScoreEngine:
             )
             return None, None, "Erro ao obter precos"
 
+    def _fetch_price_inputs(self, symbol: str) -> tuple:
+        """Chamadas MT5 de ``_get_prices``: candle diario, tick e M1 atual."""
+        daily = self._mt5.get_daily_candle(symbol)
+        tick = self._mt5.get_symbol_info_tick(symbol)
+        candle = self._get_current_m1_candle(symbol)
+        return daily, tick, candle
+
+    def _prices_from_inputs(
+        self,
+        symbol: str,
+        config: Optional[MacroScoreItemConfig],
+        daily,
+        tick,
+        candle,
+    ) -> tuple[Optional[Decimal], Optional[Decimal], Optional[str]]:
+        """Parte de banco de ``_get_prices``: persiste candle/tick e le abertura/ultimo."""
+        # Persistir candle atual (M1) para backtesting quando disponivel
+        if candle is not None:
+            self._save_candle_to_db(symbol, candle)
+
+        if tick is None:
+            return None, None, "Tick indisponivel"
+
+        now_brt = datetime.utcnow() + timedelta(hours=-3)
+        tick_age = (now_brt - tick.timestamp).total_seconds()
+        if tick_age > self._stale_tick_seconds:
+            return None, None, f"Tick desatualizado ({int(tick_age)}s)"
+
+        # Persistir o tick com timestamp de captura para backtesting
+        self._save_tick_to_db(symbol, tick, timestamp_override=now_brt)
+
+        if daily is None and config and config.symbol in self._live_only_symbols:
+            db_symbol = config.symbol
+            opening_price = self._get_open_from_db(db_symbol)
+            current_price = self._get_latest_from_db(db_symbol)
+            if opening_price is None:
+                opening_price = tick.last.value
+            if current_price is None:
+                current_price = tick.last.value
+            return opening_price, current_price, None
+
+        if daily is None:
+            opening_price = self._get_open_from_db(symbol)
+            current_price = self._get_latest_from_db(symbol)
+            if opening_price is None:
+                opening_price = tick.last.value
+            if current_price is None:
+                current_price = tick.last.value
+            return opening_price, current_price, None
+
+        opening_price = self._get_open_from_db(symbol) or daily.open.value
+        current_price = self._get_latest_from_db(symbol) or tick.last.value
+        return opening_price, current_price, None
+
     def _save_tick_to_db(
         self,
         symbol: str,
@@ -966,19 +1164,11 @@ class MacroScoreEngine:
         score_bullish: Decimal,
         score_bearish: Decimal,
         score_neutral: int,
-    ) -> str:
-        """Gera resumo textual da analise."""
-        signal_text = {
-            MacroSignal.COMPRA: "COMPRA (Score Positivo)",
-            MacroSignal.VENDA: "VENDA (Score Negativo)",
-            MacroSignal.NEUTRO: "NEUTRO (Score Zero/Proximo)",
-        }
-
+    ) -> LazyText:
+        """Gera resumo textual da analise (montado na primeira leitura)."""
         return (
-            f"Macro Score: {score_final:+.2f} | Sinal: {signal_text[signal]} | "
-            f"Itens: {items_available}/{total_items} | "
-            f"Alta: +{score_bullish:.1f} | Baixa: -{score_bearish:.1f} | "
-            f"Neutros: {score_neutral}"
+            render_summary, score_final, signal, items_available, total_items,
+            score_bullish, score_bearish, score_neutral,
         )
 
     def _persist_result(self, result: MacroScoreResult) -> None:
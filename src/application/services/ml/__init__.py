@@ -1,17 +1,15 @@
 """Machine Learning module para WINFUT.
 
 Componentes:
-- winfut_dataset: Dataset builder (consume RL tables)
+- winfut_dataset: Dataset builder (funções build_dataset / build_latest_features)
 - winfut_feature_engineer: Feature engineering (Tier-1, Tier-2)
 - winfut_model_trainer: XGBoost training (walk-forward validation)
 """
 
-from src.application.services.ml.winfut_dataset import WinFutDatasetBuilder
 from src.application.services.ml.winfut_feature_engineer import WinFutFeatureEngineer
 from src.application.services.ml.winfut_model_trainer import WinFutModelTrainer
 
 __all__ = [
-    "WinFutDatasetBuilder",
     "WinFutFeatureEngineer",
     "WinFutModelTrainer",
 ]
@@ -2,14 +2,29 @@
 
 from __future__ import annotations
 
-import json
 from dataclasses import dataclass
+from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
 import numpy as np
 import pandas as pd
 
+from src.infrastructure.database.reflection_log import ReflectionLog
+
+REFLECTION_COLUMNS = [
+    "timestamp",
+    "current_price",
+    "price_change_since_open",
+    "price_change_last_10min",
+    "my_decision",
+    "my_confidence",
+    "my_alignment",
+    "human_makes_sense",
+    "my_data_correlation",
+    "mood",
+]
+
 
 @dataclass
 class DatasetMeta:
@@ -29,74 +44,56 @@ def _read_sqlite_table(db_path: Path, query: str) -> pd.DataFrame:
         return pd.read_sql(query, con, parse_dates=["timestamp"])
 
 
+# Source table and columns for each frame (shared with the inference service)
+SQLITE_SOURCES = {
+    "reflections": (
+        "ai_reflection_logs",
+        "timestamp, current_price, price_change_since_open, "
+        "price_change_last_10min, my_decision, my_confidence, my_alignment, "
+        "human_makes_sense, my_data_correlation, mood",
+    ),
+    "journals": (
+        "trading_journal_logs",
+        "timestamp, decision, confidence, market_feeling, "
+        "macro_bias, fundamental_bias, sentiment_bias, technical_bias, "
+        "alignment_score, market_regime",
+    ),
+    "macro": (
+        "simple_macro_score_decisions",
+        "timestamp, total_items, items_available, total_raw, signal",
+    ),
+    "alignment": (
+        "simple_score_alignment",
+        "timestamp, price_dir, score_dir, total_raw",
+    ),
+}
+
+
 def load_sqlite_tables(db_path: Path) -> dict[str, pd.DataFrame]:
     """Load core tables from SQLite."""
-    tables = {
-        "reflections": _read_sqlite_table(
-            db_path,
-            "SELECT timestamp, current_price, price_change_since_open, "
-            "price_change_last_10min, my_decision, my_confidence, my_alignment, "
-            "human_makes_sense, my_data_correlation, mood "
-            "FROM ai_reflection_logs",
-        ),
-        "journals": _read_sqlite_table(
-            db_path,
-            "SELECT timestamp, decision, confidence, market_feeling, "
-            "macro_bias, fundamental_bias, sentiment_bias, technical_bias, "
-            "alignment_score, market_regime "
-            "FROM trading_journal_logs",
-        ),
-        "macro": _read_sqlite_table(
-            db_path,
-            "SELECT timestamp, total_items, items_available, total_raw, signal "
-            "FROM simple_macro_score_decisions",
-        ),
-        "alignment": _read_sqlite_table(
-            db_path,
-            "SELECT timestamp, price_dir, score_dir, total_raw "
-            "FROM simple_score_alignment",
-        ),
+    return {
+        name: _read_sqlite_table(db_path, f"SELECT {columns} FROM {table}")
+        for name, (table, columns) in SQLITE_SOURCES.items()
     }
 
-    return tables
 
+def reflection_log_for(jsonl_path: Path) -> ReflectionLog:
+    """Log de reflexões a partir do caminho do JSONL legado ou do diretório raiz."""
+    if jsonl_path.is_dir():
+        return ReflectionLog(jsonl_path)
+    return ReflectionLog(jsonl_path.parent, legacy_file=jsonl_path)
 
-def load_jsonl_reflections(jsonl_path: Path) -> pd.DataFrame:
-    """Load reflections from JSONL as a fallback or complement."""
-    if not jsonl_path.exists():
-        return pd.DataFrame()
 
-    rows: list[dict] = []
-    with jsonl_path.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                rec = json.loads(line)
-            except Exception:
-                continue
-            rows.append(
-                {
-                    "timestamp": rec.get("timestamp"),
-                    "current_price": rec.get("current_price"),
-                    "price_change_since_open": rec.get("price_change_since_open"),
-                    "price_change_last_10min": rec.get("price_change_last_10min"),
-                    "my_decision": rec.get("my_decision"),
-                    "my_confidence": rec.get("my_confidence"),
-                    "my_alignment": rec.get("my_alignment"),
-                    "human_makes_sense": rec.get("human_makes_sense"),
-                    "my_data_correlation": rec.get("my_data_correlation"),
-                    "mood": rec.get("mood"),
-                }
-            )
-
-    if not rows:
-        return pd.DataFrame()
+def load_jsonl_reflections(
+    jsonl_path: Path,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> pd.DataFrame:
+    """Load reflections (daily segments, Parquet and legacy JSONL) in a time window.
 
-    df = pd.DataFrame(rows)
-    df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce")
-    return df
+    Only the days inside ``[start, end]`` are opened (see ReflectionLog).
+    """
+    return reflection_log_for(jsonl_path).read(start, end, columns=REFLECTION_COLUMNS)
 
 
 def _normalize_reflections(df: pd.DataFrame) -> pd.DataFrame:
@@ -109,6 +106,17 @@ def _normalize_reflections(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
+def combine_reflections(sqlite_df: pd.DataFrame, jsonl_df: pd.DataFrame) -> pd.DataFrame:
+    """SQLite reflections plus JSONL ones (SQLite wins on equal timestamps)."""
+    if jsonl_df.empty:
+        return sqlite_df
+    return (
+        pd.concat([sqlite_df, jsonl_df], ignore_index=True)
+        .drop_duplicates(subset=["timestamp"])
+        .sort_values("timestamp")
+    )
+
+
 def _merge_asof(
     base: pd.DataFrame,
     other: pd.DataFrame,
@@ -206,12 +214,7 @@ def build_dataset(
 
     if include_jsonl:
         jsonl_df = _normalize_reflections(load_jsonl_reflections(jsonl_path))
-        if not jsonl_df.empty:
-            reflections = (
-                pd.concat([reflections, jsonl_df], ignore_index=True)
-                .drop_duplicates(subset=["timestamp"])
-                .sort_values("timestamp")
-            )
+        reflections = combine_reflections(reflections, jsonl_df)
 
     feature_df = build_feature_frame(
         reflections,
@@ -246,18 +249,16 @@ def build_latest_features(
     jsonl_path: Path,
     include_jsonl: bool = True,
     tolerance_minutes: int = 5,
+    lookback_days: int = 1,
 ) -> pd.DataFrame:
     tables = load_sqlite_tables(db_path)
     reflections = _normalize_reflections(tables["reflections"])
 
     if include_jsonl:
-        jsonl_df = _normalize_reflections(load_jsonl_reflections(jsonl_path))
-        if not jsonl_df.empty:
-            reflections = (
-                pd.concat([reflections, jsonl_df], ignore_index=True)
-                .drop_duplicates(subset=["timestamp"])
-                .sort_values("timestamp")
-            )
+        # Só o(s) último(s) dia(s) do log: o custo não cresce com o histórico
+        log = reflection_log_for(jsonl_path)
+        jsonl_df = _normalize_reflections(log.latest(lookback_days, columns=REFLECTION_COLUMNS))
+        reflections = combine_reflections(reflections, jsonl_df)
 
     feature_df = build_feature_frame(
         reflections,
@@ -0,0 +1,292 @@
+"""Serviço de inferência residente para o modelo WINFUT.
+
+Mantém o pipeline carregado e a última linha de features atualizada a
+partir só das linhas novas dos logs:
+
+  - SQLite: cada fonte de SQLITE_SOURCES é lida por ``id > último id``;
+    na partida, só as últimas ``buffer_rows`` linhas de cada tabela
+  - JSONL: segmentos diários do ReflectionLog lidos a partir do cursor
+
+Os buffers guardam só as linhas recentes (janela de tolerância do
+merge_asof), e a linha de features sai de ``build_feature_frame`` sobre
+eles — as mesmas colunas e tipos de ``build_latest_features``.
+
+O arquivo do modelo é verificado a cada ``reload_check_seconds``; se o
+mtime mudou, o pipeline é recarregado (falha de leitura, ex.: arquivo
+ainda sendo gravado, mantém o modelo anterior e tenta de novo depois).
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+import joblib
+import pandas as pd
+
+from src.application.services.ml.winfut_dataset import (
+    REFLECTION_COLUMNS,
+    SQLITE_SOURCES,
+    _normalize_reflections,
+    build_feature_frame,
+    combine_reflections,
+    reflection_log_for,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WinFutPrediction:
+    """Resultado de uma inferência."""
+
+    timestamp: pd.Timestamp
+    price: float
+    signal: str
+    probabilities: dict[str, float] = field(default_factory=dict)
+    latency_ms: float = 0.0
+    model_mtime_ns: Optional[int] = None
+
+
+class WinFutInferenceService:
+    """Modelo WINFUT residente com features incrementais."""
+
+    def __init__(
+        self,
+        model_path: Path,
+        db_path: Path,
+        jsonl_path: Path,
+        include_jsonl: bool = True,
+        tolerance_minutes: int = 5,
+        buffer_rows: int = 500,
+        reload_check_seconds: float = 1.0,
+    ):
+        """
+        Args:
+            model_path: Pickle do treino (``winfut_model_latest.pkl``)
+            db_path: SQLite com as tabelas de SQLITE_SOURCES
+            jsonl_path: JSONL legado ou diretório do log de reflections
+            include_jsonl: Também usa as reflections do log JSONL
+            tolerance_minutes: Tolerância do merge_asof (como no treino)
+            buffer_rows: Máximo de linhas recentes mantidas por fonte
+            reload_check_seconds: Intervalo mínimo entre checagens do mtime
+        """
+        self.model_path = Path(model_path)
+        self.db_path = Path(db_path)
+        self.include_jsonl = include_jsonl
+        self.tolerance = pd.Timedelta(minutes=tolerance_minutes)
+        self.tolerance_minutes = tolerance_minutes
+        self.buffer_rows = buffer_rows
+        self.reload_check_seconds = reload_check_seconds
+
+        self.reflection_log = reflection_log_for(Path(jsonl_path))
+        self._jsonl_cursor = None
+        self._jsonl_buffer = pd.DataFrame()
+
+        self._buffers: dict[str, pd.DataFrame] = {}
+        self._last_ids: dict[str, int] = {}
+        self._features: Optional[pd.DataFrame] = None
+        self._bootstrapped = False
+
+        self._payload: Optional[dict] = None
+        self._model_mtime_ns: Optional[int] = None
+        self._next_reload_check = 0.0
+        self._last_prediction: Optional[WinFutPrediction] = None
+
+    # ════════════════════════════════════════════════════════════
+    # Modelo
+    # ════════════════════════════════════════════════════════════
+
+    def reload_model_if_changed(self, force: bool = False) -> bool:
+        """Recarrega o pipeline se o arquivo mudou. True se recarregou."""
+        now = time.monotonic()
+        if not force and now < self._next_reload_check:
+            return False
+        self._next_reload_check = now + self.reload_check_seconds
+
+        try:
+            mtime_ns = self.model_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            if self._payload is None:
+                raise
+            return False
+        if mtime_ns == self._model_mtime_ns:
+            return False
+
+        try:
+            payload = joblib.load(self.model_path)
+        except Exception as exc:
+            if self._payload is None:
+                raise
+            logger.warning("Falha ao recarregar %s (mantendo modelo anterior): %s",
+                           self.model_path, exc)
+            return False
+
+        self._payload = payload
+        self._model_mtime_ns = mtime_ns
+        self._last_prediction = None
+        logger.info("Modelo WINFUT carregado: %s", self.model_path)
+        return True
+
+    # ════════════════════════════════════════════════════════════
+    # Features
+    # ════════════════════════════════════════════════════════════
+
+    def _read(self, query: str, params: tuple = ()) -> pd.DataFrame:
+        with sqlite3.connect(str(self.db_path)) as con:
+            return pd.read_sql(query, con, params=params, parse_dates=["timestamp"])
+
+    def _bootstrap(self) -> None:
+        for name, (table, columns) in SQLITE_SOURCES.items():
+            df = self._read(
+                f"SELECT * FROM (SELECT id, {columns} FROM {table} "
+                f"ORDER BY id DESC LIMIT ?) ORDER BY id",
+                (self.buffer_rows,),
+            )
+            self._last_ids[name] = int(df["id"].max()) if not df.empty else 0
+            self._buffers[name] = df.drop(columns="id")
+
+        if self.include_jsonl:
+            self._jsonl_buffer = self.reflection_log.latest(columns=REFLECTION_COLUMNS)
+            self._jsonl_cursor = self.reflection_log.end_cursor()
+        self._bootstrapped = True
+
+    def _sources_with_new_rows(self) -> list[str]:
+        """Fontes com ``max(id)`` acima do último lido (uma consulta só)."""
+        names = list(SQLITE_SOURCES)
+        query = "SELECT " + ", ".join(
+            f"(SELECT MAX(id) FROM {SQLITE_SOURCES[name][0]})" for name in names
+        )
+        with sqlite3.connect(str(self.db_path)) as con:
+            max_ids = con.execute(query).fetchone()
+        return [
+            name for name, max_id in zip(names, max_ids)
+            if max_id is not None and max_id > self._last_ids[name]
+        ]
+
+    def refresh(self) -> bool:
+        """Lê só as linhas novas de cada fonte. True se alguma chegou."""
+        if not self._bootstrapped:
+            self._bootstrap()
+            self._features = None
+            return True
+
+        changed = False
+        for name in self._sources_with_new_rows():
+            table, columns = SQLITE_SOURCES[name]
+            new = self._read(
+                f"SELECT id, {columns} FROM {table} WHERE id > ? ORDER BY id",
+                (self._last_ids[name],),
+            )
+            if new.empty:
+                continue
+            self._last_ids[name] = int(new["id"].max())
+            new = new.drop(columns="id")
+            buffer = self._buffers[name]
+            self._buffers[name] = pd.concat([buffer, new], ignore_index=True) if not buffer.empty else new
+            changed = True
+
+        if self.include_jsonl:
+            records, self._jsonl_cursor = self.reflection_log.tail(self._jsonl_cursor)
+            if records:
+                new = pd.DataFrame([{c: rec.get(c) for c in REFLECTION_COLUMNS} for rec in records])
+                new["timestamp"] = pd.to_datetime(new["timestamp"], errors="coerce", format="ISO8601")
+                buffer = self._jsonl_buffer
+                self._jsonl_buffer = pd.concat([buffer, new], ignore_index=True) if not buffer.empty else new
+                changed = True
+
+        if changed:
+            self._features = None
+            self._prune()
+        return changed
+
+    def _prune(self) -> None:
+        """Descarta linhas que não alcançam mais a última reflection."""
+        latest = self._latest_reflection_time()
+        for name, df in self._buffers.items():
+            if name != "reflections" and latest is not None and not df.empty:
+                df = df[df["timestamp"] >= latest - self.tolerance]
+            self._buffers[name] = df.tail(self.buffer_rows)
+        if not self._jsonl_buffer.empty:
+            self._jsonl_buffer = self._jsonl_buffer.tail(self.buffer_rows)
+
+    def _latest_reflection_time(self) -> Optional[pd.Timestamp]:
+        stamps = [
+            df["timestamp"].max()
+            for df in (self._buffers.get("reflections"), self._jsonl_buffer)
+            if df is not None and not df.empty
+        ]
+        return max(stamps) if stamps else None
+
+    def latest_features(self) -> pd.DataFrame:
+        """Última linha de features (mesmo formato de ``build_latest_features``)."""
+        if not self._bootstrapped:
+            self.refresh()
+        if self._features is None:
+            reflections = _normalize_reflections(self._buffers["reflections"])
+            if self.include_jsonl:
+                reflections = combine_reflections(
+                    reflections, _normalize_reflections(self._jsonl_buffer)
+                )
+            # Só a última reflection entra no merge_asof: as linhas das
+            # outras fontes que ela alcança são as mesmas do frame completo
+            feature_df = build_feature_frame(
+                reflections.sort_values("timestamp", kind="stable").tail(1),
+                self._buffers["journals"],
+                self._buffers["macro"],
+                self._buffers["alignment"],
+                tolerance_minutes=self.tolerance_minutes,
+            )
+            self._features = feature_df
+        return self._features
+
+    # ════════════════════════════════════════════════════════════
+    # Inferência
+    # ════════════════════════════════════════════════════════════
+
+    def predict(self) -> Optional[WinFutPrediction]:
+        """Sinal para a última linha de features (None sem dados).
+
+        Sem linhas novas e sem troca de modelo, devolve a última previsão.
+        """
+        start = time.perf_counter()
+        reloaded = self.reload_model_if_changed(force=self._payload is None)
+        changed = self.refresh()
+        if not (changed or reloaded) and self._last_prediction is not None:
+            return self._last_prediction
+
+        latest = self.latest_features()
+        if latest.empty:
+            return None
+
+        pipeline = self._payload["pipeline"]
+        label_classes = self._payload.get("label_classes")
+
+        raw_pred = pipeline.predict(latest)
+        if hasattr(raw_pred, "ndim") and raw_pred.ndim > 1:
+            pred_idx = int(raw_pred.argmax(axis=1)[0])
+        else:
+            pred_idx = int(raw_pred[0])
+        proba = pipeline.predict_proba(latest)[0]
+        classes = pipeline.named_steps["model"].classes_
+
+        if label_classes:
+            signal = label_classes[pred_idx]
+            proba_map = {label_classes[int(cls)]: float(p) for cls, p in zip(classes, proba)}
+        else:
+            signal = str(pred_idx)
+            proba_map = {str(cls): float(p) for cls, p in zip(classes, proba)}
+
+        self._last_prediction = WinFutPrediction(
+            timestamp=latest["timestamp"].iloc[0],
+            price=float(latest["current_price"].iloc[0]),
+            signal=signal,
+            probabilities=proba_map,
+            latency_ms=(time.perf_counter() - start) * 1000,
+            model_mtime_ns=self._model_mtime_ns,
+        )
+        return self._last_prediction
@@ -0,0 +1,261 @@
+"""
+Serviço de barras multi-timeframe derivadas do M1.
+
+O agente de micro tendências precisa de M1, M5, M15, H1, H4 e D1 a cada
+ciclo. Em vez de uma ida ao broker por timeframe, o serviço:
+
+  1. Faz backfill nativo (uma chamada por timeframe) na primeira vez,
+     depois de um buraco no M1 e a cada ``resync_interval_s``
+  2. Nos demais ciclos busca apenas os M1 novos (sobrepondo a última
+     barra, que pode estar em formação) e atualiza os timeframes
+     superiores por reamostragem incremental
+
+O alinhamento dos buckets segue a fase da última barra nativa de cada
+timeframe (ex.: H4 do servidor não começa necessariamente à meia-noite).
+"""
+
+from __future__ import annotations
+
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+from src.domain.enums.trading_enums import TimeFrame
+from src.domain.value_objects import Symbol
+from src.infrastructure.adapters.mt5_adapter import Candle, MT5Adapter
+
+# Quantidade de barras mantidas por timeframe (mesmas do _run_cycle)
+DEFAULT_BAR_COUNTS: dict[TimeFrame, int] = {
+    TimeFrame.M1: 200,
+    TimeFrame.M5: 100,
+    TimeFrame.M15: 100,
+    TimeFrame.H1: 50,
+    TimeFrame.H4: 50,
+    TimeFrame.D1: 2,
+}
+
+_PERIODS: dict[TimeFrame, timedelta] = {
+    TimeFrame.M5: timedelta(minutes=5),
+    TimeFrame.M15: timedelta(minutes=15),
+    TimeFrame.H1: timedelta(hours=1),
+    TimeFrame.H4: timedelta(hours=4),
+    TimeFrame.D1: timedelta(days=1),
+}
+
+
+@dataclass(frozen=True)
+class MultiTimeframeBars:
+    """Barras de todos os timeframes num mesmo instante."""
+
+    m1: list[Candle]
+    m5: list[Candle]
+    m15: list[Candle]
+    h1: list[Candle]
+    h4: list[Candle]
+    d1: list[Candle]
+
+
+@dataclass
+class BarServiceMetrics:
+    """Contadores de idas ao broker."""
+
+    native_calls: int = 0         # get_candles de backfill (1 por timeframe)
+    incremental_calls: int = 0    # get_candles só de M1 novos
+    backfills: int = 0
+    last_new_m1: int = 0
+    last_source: str = ""         # "backfill" | "incremental" | "stale"
+
+
+def _fold(base: Optional[Candle], m1: Candle, timeframe: TimeFrame, bucket: datetime) -> Candle:
+    """Agrega uma barra M1 a um bucket do timeframe superior."""
+    if base is None:
+        return Candle(
+            symbol=m1.symbol, timeframe=timeframe,
+            open=m1.open, high=m1.high, low=m1.low, close=m1.close,
+            volume=m1.volume, timestamp=bucket,
+        )
+    return Candle(
+        symbol=m1.symbol, timeframe=timeframe,
+        open=base.open,
+        high=m1.high if m1.high.value > base.high.value else base.high,
+        low=m1.low if m1.low.value < base.low.value else base.low,
+        close=m1.close,
+        volume=base.volume + m1.volume,
+        timestamp=bucket,
+    )
+
+
+class _Resampler:
+    """Reamostragem incremental M1 → timeframe superior.
+
+    O bucket corrente é ``base ⊕ pending``: ``base`` agrega as barras M1
+    já fechadas do bucket e ``pending`` é a última barra M1, que pode
+    voltar atualizada no próximo fetch (barra em formação).
+    """
+
+    def __init__(self, timeframe: TimeFrame, maxlen: int) -> None:
+        self.timeframe = timeframe
+        self.period = _PERIODS[timeframe]
+        self.bars: deque[Candle] = deque(maxlen=maxlen)
+        self._anchor: Optional[datetime] = None
+        self._bucket_start: Optional[datetime] = None
+        self._base: Optional[Candle] = None
+        self._pending: Optional[Candle] = None
+
+    def _bucket(self, ts: datetime) -> datetime:
+        if self._anchor is None:
+            self._anchor = datetime.combine(ts.date(), datetime.min.time())
+        return self._anchor + ((ts - self._anchor) // self.period) * self.period
+
+    def seed(self, native: list[Candle], m1_last: Optional[Candle]) -> None:
+        """Carrega o histórico nativo; a última barra M1 vira ``pending``."""
+        self.bars.clear()
+        self.bars.extend(native)
+        self._anchor = native[-1].timestamp if native else None
+        self._bucket_start = None
+        self._base = None
+        self._pending = None
+        if m1_last is None:
+            return
+        bucket = self._bucket(m1_last.timestamp)
+        if native and native[-1].timestamp == bucket:
+            # Desconta a parcial do M1 em formação: ela volta em ``apply``.
+            # Máx/mín podem incluí-la sem erro (só se expandem na formação).
+            last = native[-1]
+            self._base = Candle(
+                symbol=last.symbol, timeframe=self.timeframe,
+                open=last.open, high=last.high, low=last.low, close=last.close,
+                volume=max(0, last.volume - m1_last.volume), timestamp=bucket,
+            )
+        self._bucket_start = bucket
+        self._pending = m1_last
+        self._emit()
+
+    def apply(self, m1: Candle) -> None:
+        pending = self._pending
+        if pending is not None and m1.timestamp < pending.timestamp:
+            return  # Já agregada
+        if pending is not None and m1.timestamp == pending.timestamp:
+            self._pending = m1
+        else:
+            bucket = self._bucket(m1.timestamp)
+            if pending is not None and bucket == self._bucket_start:
+                self._base = _fold(self._base, pending, self.timeframe, bucket)
+            elif bucket != self._bucket_start:
+                self._base = None
+            self._bucket_start = bucket
+            self._pending = m1
+        self._emit()
+
+    def _emit(self) -> None:
+        candle = _fold(self._base, self._pending, self.timeframe, self._bucket_start)
+        if self.bars and self.bars[-1].timestamp == self._bucket_start:
+            self.bars[-1] = candle
+        else:
+            self.bars.append(candle)
+
+
+class MultiTimeframeBarService:
+    """Mantém M1..D1 de um símbolo com uma única busca de M1 por ciclo.
+
+    Uso:
+        service = MultiTimeframeBarService("WIN$N")
+        bars = service.refresh(mt5)   # a cada ciclo
+        bars.m5, bars.h4, bars.d1 ...
+    """
+
+    def __init__(
+        self,
+        symbol_code: str,
+        counts: Optional[dict[TimeFrame, int]] = None,
+        resync_interval_s: Optional[float] = 3600.0,
+        clock=time.monotonic,
+    ) -> None:
+        self.symbol = Symbol(symbol_code)
+        self.counts = dict(DEFAULT_BAR_COUNTS, **(counts or {}))
+        self.resync_interval_s = resync_interval_s
+        self._clock = clock
+        self.metrics = BarServiceMetrics()
+        self._m1: deque[Candle] = deque(maxlen=self.counts[TimeFrame.M1])
+        self._resamplers = {
+            tf: _Resampler(tf, self.counts[tf]) for tf in _PERIODS
+        }
+        self._last_fetch: float = 0.0
+        self._last_backfill: float = 0.0
+
+    def refresh(self, mt5: MT5Adapter) -> MultiTimeframeBars:
+        """Atualiza as barras e retorna o estado corrente."""
+        now = self._clock()
+        resync_due = (
+            self.resync_interval_s is not None
+            and now - self._last_backfill >= self.resync_interval_s
+        )
+        if not self._m1 or resync_due:
+            return self._backfill(mt5, now)
+
+        # M1 desde o último fetch + sobreposição da barra em formação
+        count = int((now - self._last_fetch) // 60) + 3
+        if count > self.counts[TimeFrame.M1]:
+            return self._backfill(mt5, now)
+        fetched = self._fetch(mt5, TimeFrame.M1, count)
+        self.metrics.incremental_calls += 1
+        if not fetched:
+            self.metrics.last_source = "stale"
+            return self.bars()
+
+        last_ts = self._m1[-1].timestamp
+        if fetched[0].timestamp > last_ts:
+            return self._backfill(mt5, now)  # Buraco: M1 perdidos entre fetches
+
+        new = 0
+        for c in fetched:
+            if c.timestamp < last_ts:
+                continue
+            if c.timestamp == self._m1[-1].timestamp:
+                self._m1[-1] = c
+            else:
+                self._m1.append(c)
+                new += 1
+            for resampler in self._resamplers.values():
+                resampler.apply(c)
+        self._last_fetch = now
+        self.metrics.last_new_m1 = new
+        self.metrics.last_source = "incremental"
+        return self.bars()
+
+    def bars(self) -> MultiTimeframeBars:
+        r = self._resamplers
+        return MultiTimeframeBars(
+            m1=list(self._m1),
+            m5=list(r[TimeFrame.M5].bars),
+            m15=list(r[TimeFrame.M15].bars),
+            h1=list(r[TimeFrame.H1].bars),
+            h4=list(r[TimeFrame.H4].bars),
+            d1=list(r[TimeFrame.D1].bars),
+        )
+
+    def _backfill(self, mt5: MT5Adapter, now: float) -> MultiTimeframeBars:
+        m1 = self._fetch(mt5, TimeFrame.M1, self.counts[TimeFrame.M1])
+        self.metrics.native_calls += 1
+        self._m1.clear()
+        self._m1.extend(m1)
+        m1_last = m1[-1] if m1 else None
+        for tf, resampler in self._resamplers.items():
+            native = self._fetch(mt5, tf, self.counts[tf])
+            self.metrics.native_calls += 1
+            resampler.seed(native, m1_last)
+        self.metrics.backfills += 1
+        self.metrics.last_new_m1 = len(m1)
+        self.metrics.last_source = "backfill"
+        if m1:
+            self._last_fetch = now
+            self._last_backfill = now
+        return self.bars()
+
+    def _fetch(self, mt5: MT5Adapter, timeframe: TimeFrame, count: int) -> list[Candle]:
+        try:
+            return mt5.get_candles(self.symbol, timeframe, count)
+        except Exception:
+            return []
@@ -0,0 +1,188 @@
+"""
+Índice ordenado de níveis de preço (regiões de interesse).
+
+Os níveis são mantidos ordenados pela chave em ticks do WIN (5 pontos),
+com busca binária (``bisect``). Substitui as varreduras par-a-par do
+agente de micro tendências:
+
+  - ``within``: níveis a menos de ``radius`` de um preço — O(log n + m)
+  - ``nearest``: k níveis mais próximos do preço corrente — O(log n + k)
+  - ``above`` / ``below``: níveis de um lado do preço, do mais próximo
+    para o mais distante
+  - ``cluster``: fusão gulosa de níveis próximos (mesma ordem e mesmo
+    resultado da varredura quadrática em ordem de inserção)
+
+Empates de preço preservam a ordem de inserção, então as consultas são
+determinísticas e reproduzem as listas ordenadas com ``sort`` estável.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Callable, Generic, Iterable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+WIN_TICK = Decimal("5")
+
+
+class PriceLevelIndex(Generic[T]):
+    """Níveis de preço ordenados por tick, com o item associado a cada um.
+
+    Uso:
+        index = PriceLevelIndex.from_items(regions, key=lambda r: r.price)
+        index.within(price, price * Decimal("0.003"))   # regiões a < 0,3%
+        index.nearest(price, k=5)
+    """
+
+    def __init__(self, tick: Decimal = WIN_TICK) -> None:
+        self.tick = tick
+        self._keys: list[int] = []      # Chaves em ticks, ordenadas
+        self._order: list[int] = []     # Seq. de inserção de cada chave
+        self._items: list[T] = []       # Por seq. de inserção
+        self._prices: list[Decimal] = []
+
+    @classmethod
+    def from_items(
+        cls,
+        items: Iterable[T],
+        key: Callable[[T], Decimal],
+        tick: Decimal = WIN_TICK,
+    ) -> "PriceLevelIndex[T]":
+        index = cls(tick)
+        for item in items:
+            index.add(key(item), item)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[T]:
+        """Itens em ordem crescente de preço."""
+        return (self._items[s] for s in self._order)
+
+    def _to_key(self, price: Decimal) -> int:
+        return int((price / self.tick).quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+
+    # ────────────────────────────────────────────────────────────
+    # Inserção
+    # ────────────────────────────────────────────────────────────
+
+    def add(self, price: Decimal, item: T) -> Decimal:
+        """Insere ``item`` no nível de ``price`` (arredondado ao tick).
+
+        Returns:
+            O preço do nível (múltiplo do tick).
+        """
+        key = self._to_key(price)
+        seq = len(self._items)
+        pos = bisect_right(self._keys, key)  # Após os iguais: ordem de inserção
+        self._keys.insert(pos, key)
+        self._order.insert(pos, seq)
+        self._items.append(item)
+        level = key * self.tick
+        self._prices.append(level)
+        return level
+
+    def price_of(self, seq: int) -> Decimal:
+        return self._prices[seq]
+
+    # ────────────────────────────────────────────────────────────
+    # Consultas
+    # ────────────────────────────────────────────────────────────
+
+    def _span(self, price: Decimal, radius: Decimal, inclusive: bool) -> tuple[int, int]:
+        """Posições [lo, hi) dos níveis com |nível - price| < radius (ou <=)."""
+        lo_bound = (price - radius) / self.tick
+        hi_bound = (price + radius) / self.tick
+        if inclusive:
+            return bisect_left(self._keys, lo_bound), bisect_right(self._keys, hi_bound)
+        return bisect_right(self._keys, lo_bound), bisect_left(self._keys, hi_bound)
+
+    def within_seqs(
+        self, price: Decimal, radius: Decimal, inclusive: bool = False,
+    ) -> list[int]:
+        """Sequências de inserção dos níveis no raio, em ordem de preço."""
+        lo, hi = self._span(price, radius, inclusive)
+        return self._order[lo:hi]
+
+    def within(self, price: Decimal, radius: Decimal, inclusive: bool = False) -> list[T]:
+        """Itens a menos de ``radius`` de ``price``, em ordem de preço."""
+        return [self._items[s] for s in self.within_seqs(price, radius, inclusive)]
+
+    def count_within(self, price: Decimal, radius: Decimal, inclusive: bool = False) -> int:
+        lo, hi = self._span(price, radius, inclusive)
+        return hi - lo
+
+    def above(self, price: Decimal, k: Optional[int] = None, inclusive: bool = False) -> list[T]:
+        """Itens acima de ``price``, do mais próximo ao mais distante."""
+        bound = price / self.tick
+        start = bisect_left(self._keys, bound) if inclusive else bisect_right(self._keys, bound)
+        stop = len(self._keys) if k is None else min(len(self._keys), start + k)
+        return [self._items[s] for s in self._order[start:stop]]
+
+    def below(self, price: Decimal, k: Optional[int] = None, inclusive: bool = False) -> list[T]:
+        """Itens abaixo de ``price``, do mais próximo ao mais distante.
+
+        Empates de preço saem em ordem de inserção (como ``sort`` estável
+        com ``reverse=True``).
+        """
+        bound = price / self.tick
+        end = bisect_right(self._keys, bound) if inclusive else bisect_left(self._keys, bound)
+        out: list[T] = []
+        i = end - 1
+        while i >= 0 and (k is None or len(out) < k):
+            j = i
+            while j > 0 and self._keys[j - 1] == self._keys[i]:
+                j -= 1
+            out.extend(self._items[s] for s in self._order[j:i + 1])
+            i = j - 1
+        return out if k is None else out[:k]
+
+    def nearest(self, price: Decimal, k: int = 1) -> list[T]:
+        """Os ``k`` itens mais próximos de ``price`` (empate: o de baixo primeiro)."""
+        right = bisect_left(self._keys, price / self.tick)
+        left = right - 1
+        out: list[T] = []
+        while len(out) < k and (left >= 0 or right < len(self._keys)):
+            if right >= len(self._keys):
+                take_left = True
+            elif left < 0:
+                take_left = False
+            else:
+                d_left = price - self._keys[left] * self.tick
+                d_right = self._keys[right] * self.tick - price
+                take_left = d_left <= d_right
+            if take_left:
+                out.append(self._items[self._order[left]])
+                left -= 1
+            else:
+                out.append(self._items[self._order[right]])
+                right += 1
+        return out
+
+    # ────────────────────────────────────────────────────────────
+    # Fusão de níveis próximos
+    # ────────────────────────────────────────────────────────────
+
+    def cluster(self, rel_tol: Decimal) -> list[list[T]]:
+        """Agrupa níveis a menos de ``nível * rel_tol`` do líder do grupo.
+
+        Mesma semântica da fusão gulosa em ordem de inserção: cada item
+        ainda livre vira líder e absorve os itens livres inseridos depois
+        dele dentro do raio. Cada grupo sai em ordem de inserção.
+        """
+        taken = [False] * len(self._items)
+        groups: list[list[T]] = []
+        for seq, level in enumerate(self._prices):
+            if taken[seq]:
+                continue
+            taken[seq] = True
+            members = [seq]
+            for other in sorted(self.within_seqs(level, level * rel_tol)):
+                if other > seq and not taken[other]:
+                    taken[other] = True
+                    members.append(other)
+            groups.append([self._items[s] for s in members])
+        return groups
@@ -39,8 +39,12 @@ class RLPersistenceService:
         self.repo = rl_repository
         self._initialized = False
 
-    def initialize(self) -> None:
-        """Inicializa tabelas de dimensão se necessário."""
+    def initialize(self) -> bool:
+        """Inicializa tabelas de dimensão se necessário.
+
+        Returns:
+            True se as dimensões estão inicializadas.
+        """
         if not self._initialized:
             try:
                 self.repo.seed_dimension_tables()
@@ -48,6 +52,7 @@ class RLPersistenceService:
                 logger.info("[RL] Tabelas de dimensão inicializadas.")
             except Exception as e:
                 logger.warning(f"[RL] Erro ao inicializar dimensões: {e}")
+        return self._initialized
 
     # ================================================================
     # QUANTUM OPERATOR → Episódio RL
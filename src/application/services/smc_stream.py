@@ -0,0 +1,309 @@
+"""
+Detector incremental de swings, Order Blocks e FVGs (SMC).
+
+Equivalente em streaming às varreduras em lote do agente de micro
+tendências (``_detect_swing_points``, ``_detect_swing_with_volume``,
+``_detect_smc_for_timeframe`` e ``_detect_smc_regions``): em vez de
+reexaminar a janela inteira a cada ciclo, o detector mantém o estado
+entre barras e só confirma um candidato quando as barras de que ele
+depende fecham.
+
+  - Swing em ``i``: depende de ``i ± lookback`` → confirmado quando a
+    barra ``i + lookback`` fecha
+  - Order Block em ``i``: depende de ``i .. i + 3``
+  - FVG em ``i``: depende de ``i`` e ``i + 2``
+
+Candidatos que dependem da barra em formação (a última) são avaliados
+na consulta, em O(lookback). Os resultados são recalculados uma vez por
+``sync`` e as consultas só leem o cache.
+
+A janela é sempre a última lista passada a ``sync`` (mesma semântica das
+funções em lote). Só a última barra pode mudar entre ``sync``; se o
+histórico for reescrito (ex.: backfill nativo), chame ``reset()``.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+from decimal import Decimal
+from itertools import islice
+from typing import Optional
+
+from src.infrastructure.adapters.mt5_adapter import Candle
+
+OB_FORWARD_BARS = 3     # Barras após o OB que confirmam o movimento
+OB_MIN_MOVES = 2        # Fechamentos a favor exigidos nessas barras
+OB_SCAN_BARS = 30       # Alcance da busca de OB (barras)
+FVG_SCAN_BARS = 20      # Alcance da busca de FVG (barras)
+VOLUME_AVG_BARS = 50    # Janela da média de volume
+
+
+@dataclass(frozen=True)
+class SwingPoint:
+    """Topo (``kind="H"``) ou fundo (``kind="L"``) confirmado."""
+
+    index: int          # Índice absoluto da barra
+    kind: str
+    price: Decimal
+    volume: int
+
+
+@dataclass(frozen=True)
+class SMCStreamState:
+    """Resultado do detector para a janela corrente."""
+
+    bars: int
+    close: Decimal
+    avg_volume: float
+    swings: tuple[SwingPoint, ...]              # Ordem do lote (índice, H antes de L)
+    swing_highs: tuple[tuple[int, Decimal], ...]
+    swing_lows: tuple[tuple[int, Decimal], ...]
+    bull_ob: Optional[tuple[Decimal, int]]      # (low, volume) do OB de alta
+    bear_ob: Optional[tuple[Decimal, int]]      # (high, volume) do OB de baixa
+    fvg_bull: Optional[Decimal]                 # Meio do FVG de alta mais recente
+    fvg_bear: Optional[Decimal]                 # Meio do FVG de baixa mais recente
+    fvg_last: Optional[tuple[str, Decimal]]     # FVG mais recente de qualquer tipo
+
+
+_EMPTY = SMCStreamState(
+    bars=0, close=Decimal("0"), avg_volume=1, swings=(), swing_highs=(),
+    swing_lows=(), bull_ob=None, bear_ob=None, fvg_bull=None, fvg_bear=None,
+    fvg_last=None,
+)
+
+
+class StreamingSMCDetector:
+    """Estado incremental de swings/OB/FVG de um timeframe."""
+
+    def __init__(self, lookback: int = 3) -> None:
+        self.lookback = lookback
+        self.rebuilds = 0
+        self.reset()
+
+    def reset(self) -> None:
+        self._bars: deque[Candle] = deque()
+        self._base = 0                                  # Índice absoluto de _bars[0]
+        self._swings: deque[SwingPoint] = deque()       # Confirmados
+        self._bull_obs: deque[int] = deque()
+        self._bear_obs: deque[int] = deque()
+        self._fvg_bull: deque[int] = deque()
+        self._fvg_bear: deque[int] = deque()
+        self._state = _EMPTY
+
+    def __len__(self) -> int:
+        return len(self._bars)
+
+    @property
+    def state(self) -> SMCStreamState:
+        """Estado da janela corrente (O(1))."""
+        return self._state
+
+    # ────────────────────────────────────────────────────────────
+    # Alimentação
+    # ────────────────────────────────────────────────────────────
+
+    def sync(self, candles: list[Candle]) -> SMCStreamState:
+        """Alinha o detector à janela ``candles`` processando só o que mudou."""
+        if not candles:
+            self.reset()
+            return self._state
+        if not self._bars or candles[-1].timestamp < self._bars[-1].timestamp:
+            return self._rebuild(candles)
+
+        last_ts = self._bars[-1].timestamp
+        k = len(candles) - 1
+        while k >= 0 and candles[k].timestamp > last_ts:
+            k -= 1
+        if k < 0 or candles[k].timestamp != last_ts:
+            return self._rebuild(candles)  # Buraco maior que a janela
+
+        self._bars[-1] = candles[k]
+        for c in islice(candles, k + 1, None):
+            self._append(c)
+        first_ts = candles[0].timestamp
+        while self._bars and self._bars[0].timestamp < first_ts:
+            self._bars.popleft()
+            self._base += 1
+        if len(self._bars) != len(candles):
+            return self._rebuild(candles)
+        self._prune()
+        self._state = self._compute()
+        return self._state
+
+    def _rebuild(self, candles: list[Candle]) -> SMCStreamState:
+        self.reset()
+        self.rebuilds += 1
+        for c in candles:
+            self._append(c)
+        self._state = self._compute()
+        return self._state
+
+    def _bar(self, index: int) -> Candle:
+        return self._bars[index - self._base]
+
+    def _append(self, candle: Candle) -> None:
+        self._bars.append(candle)
+        n = self._base + len(self._bars) - 1
+        # A barra n - 1 acabou de fechar: confirma os candidatos que dependiam dela
+        self._finalize_swing(n - 1 - self.lookback)
+        self._finalize_ob(n - 1 - OB_FORWARD_BARS)
+        self._finalize_fvg(n - 3)
+
+    def _finalize_swing(self, i: int) -> None:
+        for point in self._swing_at(i):
+            self._swings.append(point)
+
+    def _finalize_ob(self, i: int) -> None:
+        kind = self._ob_at(i, i + OB_FORWARD_BARS)
+        if kind == "BULL":
+            self._bull_obs.append(i)
+        elif kind == "BEAR":
+            self._bear_obs.append(i)
+
+    def _finalize_fvg(self, i: int) -> None:
+        bull, bear = self._fvg_at(i)
+        if bull:
+            self._fvg_bull.append(i)
+        if bear:
+            self._fvg_bear.append(i)
+
+    def _prune(self) -> None:
+        """Descarta confirmados que saíram da janela."""
+        for queue in (self._bull_obs, self._bear_obs, self._fvg_bull, self._fvg_bear):
+            while queue and queue[0] < self._base:
+                queue.popleft()
+        limit = self._base + self.lookback
+        while self._swings and self._swings[0].index < limit:
+            self._swings.popleft()
+
+    # ────────────────────────────────────────────────────────────
+    # Regras (as mesmas das varreduras em lote)
+    # ────────────────────────────────────────────────────────────
+
+    def _swing_at(self, i: int) -> list[SwingPoint]:
+        lb = self.lookback
+        first = self._base
+        last = self._base + len(self._bars) - 1
+        if i - lb < first or i + lb > last:
+            return []
+        bar = self._bar(i)
+        h, l = bar.high.value, bar.low.value
+        is_high = is_low = True
+        for j in range(1, lb + 1):
+            left, right = self._bar(i - j), self._bar(i + j)
+            if is_high and (h < left.high.value or h < right.high.value):
+                is_high = False
+            if is_low and (l > left.low.value or l > right.low.value):
+                is_low = False
+            if not (is_high or is_low):
+                return []
+        points = []
+        if is_high:
+            points.append(SwingPoint(i, "H", h, bar.volume))
+        if is_low:
+            points.append(SwingPoint(i, "L", l, bar.volume))
+        return points
+
+    def _ob_at(self, i: int, end: int) -> Optional[str]:
+        """OB em ``i`` usando fechamentos até ``end`` (inclusive)."""
+        if i < self._base or end > self._base + len(self._bars) - 1:
+            return None
+        bar = self._bar(i)
+        o, c = bar.open.value, bar.close.value
+        if o == c:
+            return None
+        ups = downs = 0
+        prev = c
+        for j in range(i + 1, end + 1):
+            cj = self._bar(j).close.value
+            if cj > prev:
+                ups += 1
+            elif cj < prev:
+                downs += 1
+            prev = cj
+        if o > c and ups >= OB_MIN_MOVES:
+            return "BULL"
+        if c > o and downs >= OB_MIN_MOVES:
+            return "BEAR"
+        return None
+
+    def _fvg_at(self, i: int) -> tuple[bool, bool]:
+        if i < self._base or i + 2 > self._base + len(self._bars) - 1:
+            return False, False
+        a, b = self._bar(i), self._bar(i + 2)
+        return b.low.value > a.high.value, b.high.value < a.low.value
+
+    def _fvg_mid(self, i: int, kind: str) -> Decimal:
+        a, b = self._bar(i), self._bar(i + 2)
+        if kind == "FVG_ALTA":
+            return (b.low.value + a.high.value) / Decimal("2")
+        return (b.high.value + a.low.value) / Decimal("2")
+
+    # ────────────────────────────────────────────────────────────
+    # Consolidação da janela
+    # ────────────────────────────────────────────────────────────
+
+    def _compute(self) -> SMCStreamState:
+        size = len(self._bars)
+        last = self._base + size - 1
+
+        swings = list(self._swings)
+        swings.extend(self._swing_at(last - self.lookback))  # Provisório
+
+        # OB: posição p em [max(L - 31, 1), L - 2] da janela
+        ob_min = self._base + max(size - OB_SCAN_BARS - 1, 1)
+        bull_ob = bear_ob = None
+        for i in (last - 2, last - 3):  # Provisórios (dependem da barra em formação)
+            if i < ob_min:
+                continue
+            kind = self._ob_at(i, min(i + OB_FORWARD_BARS, last))
+            if kind == "BULL" and bull_ob is None:
+                bull_ob = i
+            elif kind == "BEAR" and bear_ob is None:
+                bear_ob = i
+        if bull_ob is None and self._bull_obs and self._bull_obs[-1] >= ob_min:
+            bull_ob = self._bull_obs[-1]
+        if bear_ob is None and self._bear_obs and self._bear_obs[-1] >= ob_min:
+            bear_ob = self._bear_obs[-1]
+
+        # FVG: posição p em [max(L - 19, 1), L - 3] da janela
+        fvg_min = self._base + max(size - FVG_SCAN_BARS + 1, 1)
+        fvg_bull = fvg_bear = None
+        bull_now, bear_now = self._fvg_at(last - 2)  # Provisório
+        if last - 2 >= fvg_min:
+            fvg_bull = last - 2 if bull_now else None
+            fvg_bear = last - 2 if bear_now else None
+        if fvg_bull is None and self._fvg_bull and self._fvg_bull[-1] >= fvg_min:
+            fvg_bull = self._fvg_bull[-1]
+        if fvg_bear is None and self._fvg_bear and self._fvg_bear[-1] >= fvg_min:
+            fvg_bear = self._fvg_bear[-1]
+        fvg_last = None
+        if fvg_bull is not None and (fvg_bear is None or fvg_bull >= fvg_bear):
+            fvg_last = ("FVG_ALTA", self._fvg_mid(fvg_bull, "FVG_ALTA"))
+        elif fvg_bear is not None:
+            fvg_last = ("FVG_BAIXA", self._fvg_mid(fvg_bear, "FVG_BAIXA"))
+
+        if size >= 10:
+            n_vol = min(VOLUME_AVG_BARS, size)
+            avg_volume = sum(
+                self._bars[p].volume for p in range(size - n_vol, size)
+            ) / n_vol
+        else:
+            avg_volume = 1
+
+        return SMCStreamState(
+            bars=size,
+            close=self._bars[-1].close.value,
+            avg_volume=avg_volume,
+            swings=tuple(swings),
+            swing_highs=tuple((s.index, s.price) for s in swings if s.kind == "H"),
+            swing_lows=tuple((s.index, s.price) for s in swings if s.kind == "L"),
+            bull_ob=(self._bar(bull_ob).low.value, self._bar(bull_ob).volume)
+            if bull_ob is not None else None,
+            bear_ob=(self._bar(bear_ob).high.value, self._bar(bear_ob).volume)
+            if bear_ob is not None else None,
+            fvg_bull=self._fvg_mid(fvg_bull, "FVG_ALTA") if fvg_bull is not None else None,
+            fvg_bear=self._fvg_mid(fvg_bear, "FVG_BAIXA") if fvg_bear is not None else None,
+            fvg_last=fvg_last,
+        )
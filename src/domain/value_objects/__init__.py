@@ -6,6 +6,7 @@ from src.domain.value_objects.financial import (
     Price,
     Quantity,
     Symbol,
+    TickPrice,
 )
 from src.domain.value_objects.macro_score import Score, Weight, WeightedScore
 
@@ -15,6 +16,7 @@ __all__ = [
     "Quantity",
     "Percentage",
     "Symbol",
+    "TickPrice",
     "Score",
     "Weight",
     "WeightedScore",
@@ -1,13 +1,14 @@
 """Value Objects - objetos imutaveis representando conceitos de dominio."""
 
+import math
 from dataclasses import dataclass
-from decimal import Decimal
+from decimal import ROUND_HALF_UP, Decimal
 from typing import Self
 
 from src.domain.exceptions import InvalidPriceError, InvalidQuantityError
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Price:
     """
     Value Object representando um preco.
@@ -84,6 +85,169 @@ class Price:
         return f"Price({self.value})"
 
 
+WIN_TICK_SIZE = Decimal("5")  # Mini-indice: move de 5 em 5 pontos
+_HALF_TICK = 0.5 + 1e-9       # Meio tick + folga p/ erro binario (1.005 / 0.01)
+_TICK_AS_FLOAT: dict[Decimal, float] = {}
+
+
+class TickPrice:
+    """
+    Preco compacto em ticks inteiros do instrumento (ponto fixo).
+
+    Alternativa opcional ao ``Price`` para caminhos quentes (backtests,
+    indicadores): guarda ``ticks`` (int) e o ``tick_size`` (Decimal
+    compartilhado entre instancias), sem ``__dict__`` e sem revalidar
+    via ``str``. Soma, subtracao e comparacao operam so sobre inteiros.
+
+    Conversao na fronteira do dominio: ``from_decimal``/``from_float``
+    arredondam ao tick (ROUND_HALF_UP, igual a ``_round_tick``);
+    ``to_decimal``/``to_price`` devolvem o valor exato em Decimal.
+    """
+
+    __slots__ = ("ticks", "tick_size")
+
+    ticks: int
+    tick_size: Decimal
+
+    def __init__(self, ticks: int, tick_size: Decimal = WIN_TICK_SIZE) -> None:
+        if ticks < 0:
+            raise InvalidPriceError(f"Price cannot be negative: {ticks} ticks")
+        if tick_size <= 0:
+            raise ValueError(f"Tick size must be positive: {tick_size}")
+        _set_ticks(self, int(ticks))
+        _set_tick_size(self, tick_size)
+
+    @classmethod
+    def _make(cls, ticks: int, tick_size: Decimal) -> "TickPrice":
+        """Construtor sem validacao (valores ja conferidos pelo chamador)."""
+        obj = object.__new__(cls)
+        _set_ticks(obj, ticks)
+        _set_tick_size(obj, tick_size)
+        return obj
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise AttributeError("TickPrice is immutable")
+
+    # ── Conversao na fronteira ──
+
+    @classmethod
+    def from_decimal(
+        cls, value: Decimal, tick_size: Decimal = WIN_TICK_SIZE
+    ) -> "TickPrice":
+        """Arredonda ``value`` ao multiplo mais proximo do tick."""
+        ticks = (value / tick_size).quantize(Decimal("1"), rounding=ROUND_HALF_UP)
+        return cls(int(ticks), tick_size)
+
+    @classmethod
+    def from_float(
+        cls, value: float, tick_size: Decimal = WIN_TICK_SIZE
+    ) -> "TickPrice":
+        """Converte o float do terminal (MT5) sem passar por ``str``."""
+        step = _TICK_AS_FLOAT.get(tick_size)
+        if step is None:
+            if tick_size <= 0:
+                raise ValueError(f"Tick size must be positive: {tick_size}")
+            step = _TICK_AS_FLOAT[tick_size] = float(tick_size)
+        ticks = math.floor(value / step + _HALF_TICK)
+        if ticks < 0:
+            raise InvalidPriceError(f"Price cannot be negative: {value}")
+        return cls._make(ticks, tick_size)
+
+    @classmethod
+    def from_price(
+        cls, price: Price, tick_size: Decimal = WIN_TICK_SIZE
+    ) -> "TickPrice":
+        return cls.from_decimal(price.value, tick_size)
+
+    def to_decimal(self) -> Decimal:
+        return self.ticks * self.tick_size
+
+    def to_price(self) -> Price:
+        return Price(self.ticks * self.tick_size)
+
+    def __float__(self) -> float:
+        return self.ticks * float(self.tick_size)
+
+    # ── Aritmetica ──
+
+    def _check_same_tick(self, other: "TickPrice") -> None:
+        if self.tick_size != other.tick_size:
+            raise ValueError(
+                f"Cannot operate with different tick sizes: "
+                f"{self.tick_size} != {other.tick_size}"
+            )
+
+    def add(self, other: "TickPrice") -> "TickPrice":
+        """Soma dois precos."""
+        self._check_same_tick(other)
+        return TickPrice._make(self.ticks + other.ticks, self.tick_size)
+
+    def subtract(self, other: "TickPrice") -> "TickPrice":
+        """Subtrai outro preco deste."""
+        self._check_same_tick(other)
+        result = self.ticks - other.ticks
+        if result < 0:
+            raise InvalidPriceError(f"Price cannot be negative: {result} ticks")
+        return TickPrice._make(result, self.tick_size)
+
+    def offset(self, ticks: int) -> "TickPrice":
+        """Desloca o preco em ``ticks`` (ex.: stop a 30 ticks da entrada)."""
+        return TickPrice(self.ticks + ticks, self.tick_size)
+
+    def distance(self, other: "TickPrice") -> int:
+        """Distancia com sinal, em ticks (``self - other``)."""
+        self._check_same_tick(other)
+        return self.ticks - other.ticks
+
+    # ── Comparacao ──
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, TickPrice):
+            return NotImplemented
+        return self.ticks == other.ticks and self.tick_size == other.tick_size
+
+    def __hash__(self) -> int:
+        return hash((self.ticks, self.tick_size))
+
+    def __lt__(self, other: "TickPrice") -> bool:
+        if not isinstance(other, TickPrice):
+            return NotImplemented
+        self._check_same_tick(other)
+        return self.ticks < other.ticks
+
+    def __le__(self, other: "TickPrice") -> bool:
+        if not isinstance(other, TickPrice):
+            return NotImplemented
+        self._check_same_tick(other)
+        return self.ticks <= other.ticks
+
+    def __gt__(self, other: "TickPrice") -> bool:
+        if not isinstance(other, TickPrice):
+            return NotImplemented
+        self._check_same_tick(other)
+        return self.ticks > other.ticks
+
+    def __ge__(self, other: "TickPrice") -> bool:
+        if not isinstance(other, TickPrice):
+            return NotImplemented
+        self._check_same_tick(other)
+        return self.ticks >= other.ticks
+
+    def __reduce__(self):
+        return (TickPrice, (self.ticks, self.tick_size))
+
+    def __str__(self) -> str:
+        return f"R$ {self.to_decimal():.2f}"
+
+    def __repr__(self) -> str:
+        return f"TickPrice({self.ticks} x {self.tick_size})"
+
+
+# Escrita direta nos slots (contorna o __setattr__ imutavel)
+_set_ticks = TickPrice.ticks.__set__
+_set_tick_size = TickPrice.tick_size.__set__
+
+
 @dataclass(frozen=True)
 class Money:
     """
@@ -1,18 +1,21 @@
 """Adaptador MetaTrader 5 para Broker."""
 
+import time
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
 from datetime import datetime
 from decimal import Decimal
 from typing import Optional
 
+import numpy as np
+
 from src.domain.entities import Order
 from src.domain.enums.trading_enums import OrderSide, TimeFrame
 from src.domain.exceptions import BrokerConnectionError, OrderExecutionError
 from src.domain.value_objects import Price, Symbol
 
 
-@dataclass
+@dataclass(slots=True)
 class TickData:
     """Representa um tick do mercado."""
 
@@ -24,7 +27,7 @@ class TickData:
     timestamp: datetime
 
 
-@dataclass
+@dataclass(slots=True)
 class Candle:
     """Representa um candlestick (vela)."""
 
@@ -38,6 +41,114 @@ class Candle:
     timestamp: datetime
 
 
+@dataclass
+class TickBatch:
+    """Ticks de varios simbolos em colunas (um indice por simbolo).
+
+    ``valid[i]`` e False quando o terminal nao retornou tick para
+    ``symbols[i]`` (as demais colunas ficam zeradas nessa posicao).
+    ``time`` ja esta normalizado para Brasilia (epoch em segundos).
+    """
+
+    symbols: list[str]
+    bid: np.ndarray
+    ask: np.ndarray
+    last: np.ndarray
+    volume: np.ndarray
+    time: np.ndarray
+    valid: np.ndarray
+    _pos: dict[str, int] = field(default_factory=dict, repr=False)
+
+    def __post_init__(self) -> None:
+        if not self._pos:
+            self._pos = {s: i for i, s in enumerate(self.symbols)}
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def index(self, symbol_code: str) -> Optional[int]:
+        return self._pos.get(symbol_code)
+
+    def timestamp(self, i: int) -> datetime:
+        return datetime.utcfromtimestamp(int(self.time[i]))
+
+    def to_tick(self, symbol_code: str) -> Optional[TickData]:
+        """Materializa um ``TickData`` (mesma conversao de get_symbol_info_tick)."""
+        i = self._pos.get(symbol_code)
+        if i is None or not self.valid[i]:
+            return None
+        return TickData(
+            symbol=Symbol(symbol_code),
+            bid=Price(Decimal(str(float(self.bid[i])))),
+            ask=Price(Decimal(str(float(self.ask[i])))),
+            last=Price(Decimal(str(float(self.last[i])))),
+            volume=int(self.volume[i]),
+            timestamp=self.timestamp(i),
+        )
+
+
+@dataclass
+class DailyBarBatch:
+    """Barra D1 corrente de varios simbolos em colunas."""
+
+    symbols: list[str]
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    time: np.ndarray
+    valid: np.ndarray
+    _pos: dict[str, int] = field(default_factory=dict, repr=False)
+
+    def __post_init__(self) -> None:
+        if not self._pos:
+            self._pos = {s: i for i, s in enumerate(self.symbols)}
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def index(self, symbol_code: str) -> Optional[int]:
+        return self._pos.get(symbol_code)
+
+    def timestamp(self, i: int) -> datetime:
+        return datetime.utcfromtimestamp(int(self.time[i]))
+
+    def to_candle(self, symbol_code: str) -> Optional[Candle]:
+        """Materializa um ``Candle`` (mesma conversao de get_daily_candle)."""
+        i = self._pos.get(symbol_code)
+        if i is None or not self.valid[i]:
+            return None
+        return Candle(
+            symbol=Symbol(symbol_code),
+            timeframe=TimeFrame.D1,
+            open=Price(Decimal(str(float(self.open[i])))),
+            high=Price(Decimal(str(float(self.high[i])))),
+            low=Price(Decimal(str(float(self.low[i])))),
+            close=Price(Decimal(str(float(self.close[i])))),
+            volume=int(self.volume[i]),
+            timestamp=self.timestamp(i),
+        )
+
+
+@dataclass
+class ConnectionCheckStats:
+    """Contadores das checagens de conexao (``terminal_info``)."""
+
+    checks: int = 0     # terminal_info() efetivamente chamados
+    skipped: int = 0    # Checagens poupadas pela janela de confianca
+    strict: int = 0     # Checagens obrigatorias (caminhos de ordem)
+    failures: int = 0   # Checagens que encontraram o terminal desconectado
+
+    def __sub__(self, other: "ConnectionCheckStats") -> "ConnectionCheckStats":
+        return ConnectionCheckStats(
+            checks=self.checks - other.checks,
+            skipped=self.skipped - other.skipped,
+            strict=self.strict - other.strict,
+            failures=self.failures - other.failures,
+        )
+
+
 class IBrokerAdapter(ABC):
     """Interface para adaptadores de broker (abstracao para diferentes brokers)."""
 
@@ -110,6 +221,7 @@ class MT5Adapter(IBrokerAdapter):
         password: str,
         server: str,
         timeout: int = 60000,
+        connection_trust_s: float = 2.0,
     ):
         """
         Inicializa o adaptador MT5.
@@ -119,6 +231,8 @@ class MT5Adapter(IBrokerAdapter):
             password: Senha da conta MT5
             server: Nome do servidor MT5
             timeout: Timeout de conexao em milissegundos
+            connection_trust_s: Janela (s) em que uma chamada bem-sucedida
+                dispensa o terminal_info() das chamadas seguintes (0 = sempre checar)
         """
         self.login = login
         self.password = password
@@ -126,6 +240,10 @@ class MT5Adapter(IBrokerAdapter):
         self.timeout = timeout
         self._mt5 = None
         self._time_offset_seconds: Optional[int] = -3 * 3600
+        self.connection_trust_s = connection_trust_s
+        self._trusted_until = 0.0
+        self.connection_stats = ConnectionCheckStats()
+        self._stats_taken = ConnectionCheckStats()
 
     def _normalize_timestamp(self, epoch_seconds: int) -> datetime:
         """Normaliza timestamps do MT5 para horario de Brasilia (UTC-3)."""
@@ -158,6 +276,7 @@ class MT5Adapter(IBrokerAdapter):
                     f"MT5 login failed: {mt5.last_error()}"
                 )
 
+            self._mark_alive()
             return True
 
         except ImportError:
@@ -169,6 +288,7 @@ class MT5Adapter(IBrokerAdapter):
 
     def disconnect(self) -> None:
         """Desconecta do MetaTrader 5."""
+        self._invalidate_connection()
         if self._mt5:
             self._mt5.shutdown()
 
@@ -187,10 +307,12 @@ class MT5Adapter(IBrokerAdapter):
         tick = self._mt5.symbol_info_tick(symbol.code)
 
         if tick is None:
+            self._invalidate_connection()
             raise OrderExecutionError(
                 f"Failed to get tick for {symbol}: {self._mt5.last_error()}"
             )
 
+        self._mark_alive()
         return TickData(
             symbol=symbol,
             bid=Price(Decimal(str(tick.bid))),
@@ -236,9 +358,11 @@ class MT5Adapter(IBrokerAdapter):
             )
 
         if rates is None:
+            self._invalidate_connection()
             raise OrderExecutionError(
                 f"Failed to get candles for {symbol}: {self._mt5.last_error()}"
             )
+        self._mark_alive()
 
         # Converte para objetos Candle
         candles = []
@@ -358,7 +482,7 @@ class MT5Adapter(IBrokerAdapter):
 
     def send_order(self, order: Order) -> str:
         """Envia ordem ao MT5."""
-        self._ensure_connected()
+        self._ensure_connected(strict=True)
 
         # Resolve símbolo negociável (WIN$N → WINJ26, etc.)
         tradable_symbol = self._resolve_tradable_symbol(order.symbol.code)
@@ -448,7 +572,7 @@ class MT5Adapter(IBrokerAdapter):
 
     def close_position(self, symbol: Symbol) -> bool:
         """Fecha todas as posicoes de um simbolo."""
-        self._ensure_connected()
+        self._ensure_connected(strict=True)
 
         # Tenta com símbolo original e também com o negociável
         tradable = self._resolve_tradable_symbol(symbol.code)
@@ -512,7 +636,7 @@ class MT5Adapter(IBrokerAdapter):
 
     def close_position_by_ticket(self, position_ticket: int) -> bool:
         """Fecha uma posição específica pelo ticket (seguro para conta hedge)."""
-        self._ensure_connected()
+        self._ensure_connected(strict=True)
 
         positions = self._mt5.positions_get()
         if not positions:
@@ -574,6 +698,7 @@ class MT5Adapter(IBrokerAdapter):
 
         account_info = self._mt5.account_info()
         if account_info is None:
+            self._invalidate_connection()
             raise BrokerConnectionError("Failed to get account info")
 
         return Decimal(str(account_info.balance))
@@ -584,14 +709,46 @@ class MT5Adapter(IBrokerAdapter):
 
         account_info = self._mt5.account_info()
         if account_info is None:
+            self._invalidate_connection()
             raise BrokerConnectionError("Failed to get account info")
 
         return Decimal(str(account_info.equity))
 
-    def _ensure_connected(self) -> None:
-        """Garante que estamos conectados ao MT5."""
+    def _ensure_connected(self, strict: bool = False) -> None:
+        """Garante que estamos conectados ao MT5.
+
+        Fora dos caminhos de ordem (``strict``), uma chamada bem-sucedida ao
+        terminal nos ultimos ``connection_trust_s`` segundos dispensa o
+        ``terminal_info()``. Falhas invalidam a janela, e a proxima chamada
+        volta a checar.
+        """
+        stats = self.connection_stats
+        if not strict and time.monotonic() < self._trusted_until:
+            stats.skipped += 1
+            return
+        stats.checks += 1
+        if strict:
+            stats.strict += 1
         if not self.is_connected():
+            stats.failures += 1
+            self._invalidate_connection()
             raise BrokerConnectionError("Not connected to MT5")
+        self._mark_alive()
+
+    def _mark_alive(self) -> None:
+        """Renova a janela de confianca apos uma resposta valida do terminal."""
+        if self.connection_trust_s > 0:
+            self._trusted_until = time.monotonic() + self.connection_trust_s
+
+    def _invalidate_connection(self) -> None:
+        self._trusted_until = 0.0
+
+    def take_connection_stats(self) -> ConnectionCheckStats:
+        """Contadores desde a chamada anterior (ex.: por ciclo do agente)."""
+        current = replace(self.connection_stats)
+        delta = current - self._stats_taken
+        self._stats_taken = current
+        return delta
 
     def get_available_symbols(self, prefix: str = "") -> list[str]:
         """Lista simbolos disponiveis no MT5, opcionalmente filtrados por prefixo."""
@@ -631,6 +788,7 @@ class MT5Adapter(IBrokerAdapter):
         if tick is None:
             return None
 
+        self._mark_alive()
         return TickData(
             symbol=Symbol(symbol_code),
             bid=Price(Decimal(str(tick.bid))),
@@ -651,6 +809,7 @@ class MT5Adapter(IBrokerAdapter):
         if rates is None or len(rates) == 0:
             return None
 
+        self._mark_alive()
         rate = rates[0]
         return Candle(
             symbol=Symbol(symbol_code),
@@ -662,3 +821,73 @@ class MT5Adapter(IBrokerAdapter):
             volume=int(rate["tick_volume"]),
             timestamp=self._normalize_timestamp(rate["time"]),
         )
+
+    def get_ticks(self, symbols: list[str]) -> TickBatch:
+        """Obtem o tick de varios simbolos em colunas (bid/ask/last/volume/time).
+
+        Uma unica checagem de conexao para o lote; as chamadas ao terminal
+        rodam em loop direto, sem montar ``TickData``/``Decimal`` por simbolo.
+        """
+        self._ensure_connected()
+
+        n = len(symbols)
+        bid = np.zeros(n, dtype=np.float64)
+        ask = np.zeros(n, dtype=np.float64)
+        last = np.zeros(n, dtype=np.float64)
+        volume = np.zeros(n, dtype=np.int64)
+        ts = np.zeros(n, dtype=np.int64)
+        valid = np.zeros(n, dtype=bool)
+
+        symbol_info_tick = self._mt5.symbol_info_tick
+        offset = self._time_offset_seconds
+        for i, code in enumerate(symbols):
+            tick = symbol_info_tick(code)
+            if tick is None:
+                continue
+            bid[i] = tick.bid
+            ask[i] = tick.ask
+            last[i] = tick.last
+            volume[i] = tick.volume
+            ts[i] = int(tick.time) + offset
+            valid[i] = True
+
+        if valid.any():
+            self._mark_alive()
+        return TickBatch(list(symbols), bid, ask, last, volume, ts, valid)
+
+    def get_daily_bars(self, symbols: list[str]) -> DailyBarBatch:
+        """Obtem a barra D1 corrente de varios simbolos em colunas.
+
+        Mesmo dado de ``get_daily_candle`` (OHLC, tick_volume, time), com uma
+        unica checagem de conexao para o lote.
+        """
+        self._ensure_connected()
+
+        n = len(symbols)
+        cols = {k: np.zeros(n, dtype=np.float64) for k in ("open", "high", "low", "close")}
+        volume = np.zeros(n, dtype=np.int64)
+        ts = np.zeros(n, dtype=np.int64)
+        valid = np.zeros(n, dtype=bool)
+
+        copy_rates_from_pos = self._mt5.copy_rates_from_pos
+        d1 = self._mt5.TIMEFRAME_D1
+        offset = self._time_offset_seconds
+        for i, code in enumerate(symbols):
+            rates = copy_rates_from_pos(code, d1, 0, 1)
+            if rates is None or len(rates) == 0:
+                continue
+            rate = rates[0]
+            cols["open"][i] = rate["open"]
+            cols["high"][i] = rate["high"]
+            cols["low"][i] = rate["low"]
+            cols["close"][i] = rate["close"]
+            volume[i] = rate["tick_volume"]
+            ts[i] = int(rate["time"]) + offset
+            valid[i] = True
+
+        if valid.any():
+            self._mark_alive()
+        return DailyBarBatch(
+            list(symbols), cols["open"], cols["high"], cols["low"], cols["close"],
+            volume, ts, valid,
+        )
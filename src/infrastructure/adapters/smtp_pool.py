@@ -0,0 +1,237 @@
+"""Pool de sessões SMTP persistentes (keep-alive) para envio de alertas.
+
+Cada worker do pool é uma thread com a sua própria sessão ``smtplib``
+(conexão, STARTTLS e login feitos uma vez). As mensagens entram numa
+fila comum; o worker que acorda leva junto o que mais estiver na fila
+(até ``max_batch``) e envia tudo na mesma sessão — uma rajada de alertas
+vira poucas sessões, não uma conexão por e-mail.
+
+Manutenção da sessão:
+    - Ociosa por mais de ``noop_after_s``: ``NOOP`` antes de reutilizar;
+      se o servidor já derrubou, reconecta.
+    - Ociosa por mais de ``idle_timeout_s``: ``QUIT`` (não segura
+      conexão aberta à toa).
+    - Servidor desconectou no meio do envio: reconecta uma vez e reenvia
+      a mensagem.
+
+Uso a partir do event loop:
+    pool = SmtpSessionPool(host="smtp.exemplo.com", port=587, user=..., password=...)
+    latencia_ms = await pool.enviar(mensagem)   # EmailMessage / MIMEMultipart
+    pool.close()
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import queue
+import smtplib
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from email.message import Message
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+_PARAR = object()
+
+
+@dataclass
+class SmtpPoolMetrics:
+    """Métricas do pool (sessões abertas vs. mensagens enviadas)."""
+
+    submitted: int = 0
+    sent: int = 0
+    failed: int = 0
+    sessions_opened: int = 0
+    reconnects: int = 0
+    batches: int = 0
+    max_batch: int = 0
+
+
+class SmtpSessionPool:
+    """Envia e-mails por sessões SMTP reaproveitadas em um pool de threads."""
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 587,
+        user: Optional[str] = None,
+        password: Optional[str] = None,
+        starttls: bool = True,
+        pool_size: int = 2,
+        max_batch: int = 20,
+        noop_after_s: float = 30.0,
+        idle_timeout_s: float = 120.0,
+        timeout_s: float = 10.0,
+    ) -> None:
+        """
+        Args:
+            host: Servidor SMTP
+            port: Porta SMTP
+            user: Usuário para login (sem usuário, não autentica)
+            password: Senha do login
+            starttls: Negocia TLS após conectar
+            pool_size: Número de workers (sessões simultâneas)
+            max_batch: Máximo de mensagens enviadas por vez numa sessão
+            noop_after_s: Ociosidade a partir da qual a sessão é testada
+                com NOOP antes do reuso
+            idle_timeout_s: Ociosidade a partir da qual a sessão é fechada
+            timeout_s: Timeout de socket do smtplib
+        """
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.starttls = starttls
+        self.pool_size = pool_size
+        self.max_batch = max_batch
+        self.noop_after_s = noop_after_s
+        self.idle_timeout_s = idle_timeout_s
+        self.timeout_s = timeout_s
+        self.metrics = SmtpPoolMetrics()
+        self._fila: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._workers: list[threading.Thread] = []
+        self._fechado = False
+
+    # ────────────────────────────────────────────────────────────
+    # Produtor
+    # ────────────────────────────────────────────────────────────
+
+    def submit(self, mensagem: Message) -> Future:
+        """Enfileira a mensagem; o Future resolve com a latência de envio (ms)."""
+        future: Future = Future()
+        with self._lock:
+            if self._fechado:
+                raise RuntimeError("SmtpSessionPool fechado")
+            self.metrics.submitted += 1
+            if len(self._workers) < self.pool_size and self._fila.qsize() >= len(self._workers):
+                self._iniciar_worker()
+        self._fila.put((mensagem, future, time.perf_counter()))
+        return future
+
+    async def enviar(self, mensagem: Message) -> float:
+        """Envia sem bloquear o event loop. Retorna a latência até o servidor aceitar (ms)."""
+        return await asyncio.wrap_future(self.submit(mensagem))
+
+    def close(self, timeout: Optional[float] = 10.0) -> None:
+        """Envia o que está na fila, fecha as sessões e encerra os workers."""
+        with self._lock:
+            if self._fechado:
+                return
+            self._fechado = True
+            workers = list(self._workers)
+        for _ in workers:
+            self._fila.put(_PARAR)
+        for worker in workers:
+            worker.join(timeout)
+
+    # ────────────────────────────────────────────────────────────
+    # Workers
+    # ────────────────────────────────────────────────────────────
+
+    def _iniciar_worker(self) -> None:
+        worker = threading.Thread(
+            target=self._run, name=f"SmtpSessionPool-{len(self._workers)}", daemon=True,
+        )
+        self._workers.append(worker)
+        worker.start()
+
+    def _run(self) -> None:
+        sessao: Optional[smtplib.SMTP] = None
+        ultimo_uso = 0.0
+        try:
+            while True:
+                try:
+                    item = self._fila.get(timeout=self.idle_timeout_s if sessao else None)
+                except queue.Empty:
+                    self._fechar_sessao(sessao)
+                    sessao = None
+                    continue
+                if item is _PARAR:
+                    return
+
+                lote = [item]
+                while len(lote) < self.max_batch:
+                    try:
+                        proximo = self._fila.get_nowait()
+                    except queue.Empty:
+                        break
+                    if proximo is _PARAR:
+                        self._fila.put(_PARAR)  # devolve: encerra depois deste lote
+                        break
+                    lote.append(proximo)
+
+                if sessao is not None and time.monotonic() - ultimo_uso > self.noop_after_s:
+                    sessao = self._testar_sessao(sessao)
+                sessao = self._enviar_lote(sessao, lote)
+                ultimo_uso = time.monotonic()
+        finally:
+            self._fechar_sessao(sessao)
+
+    def _enviar_lote(self, sessao: Optional[smtplib.SMTP], lote: list) -> Optional[smtplib.SMTP]:
+        with self._lock:
+            self.metrics.batches += 1
+            self.metrics.max_batch = max(self.metrics.max_batch, len(lote))
+        for mensagem, future, t0 in lote:
+            if not future.set_running_or_notify_cancel():
+                continue  # Desistiram (timeout do chamador) antes do envio
+            try:
+                if sessao is None:
+                    sessao = self._abrir_sessao()
+                try:
+                    sessao.send_message(mensagem)
+                except smtplib.SMTPServerDisconnected:
+                    # Sessão caiu desde o último uso: uma nova tentativa
+                    with self._lock:
+                        self.metrics.reconnects += 1
+                    sessao = self._abrir_sessao()
+                    sessao.send_message(mensagem)
+            except Exception as e:
+                with self._lock:
+                    self.metrics.failed += 1
+                if isinstance(e, (smtplib.SMTPServerDisconnected, OSError)):
+                    self._fechar_sessao(sessao)
+                    sessao = None
+                future.set_exception(e)
+                continue
+            with self._lock:
+                self.metrics.sent += 1
+            future.set_result((time.perf_counter() - t0) * 1000)
+        return sessao
+
+    def _abrir_sessao(self) -> smtplib.SMTP:
+        sessao = smtplib.SMTP(self.host, self.port, timeout=self.timeout_s)
+        try:
+            if self.starttls:
+                sessao.starttls()
+            if self.user:
+                sessao.login(self.user, self.password or "")
+        except Exception:
+            self._fechar_sessao(sessao)
+            raise
+        with self._lock:
+            self.metrics.sessions_opened += 1
+        logger.debug(f"Sessão SMTP aberta: {self.host}:{self.port}")
+        return sessao
+
+    def _testar_sessao(self, sessao: smtplib.SMTP) -> Optional[smtplib.SMTP]:
+        try:
+            if sessao.noop()[0] == 250:
+                return sessao
+        except (smtplib.SMTPException, OSError):
+            pass
+        self._fechar_sessao(sessao)
+        return None
+
+    @staticmethod
+    def _fechar_sessao(sessao: Optional[smtplib.SMTP]) -> None:
+        if sessao is None:
+            return
+        try:
+            sessao.quit()
+        except (smtplib.SMTPException, OSError):
+            sessao.close()
@@ -0,0 +1,334 @@
+"""Escritor de auditoria em lote (thread dedicada, SQLite em WAL).
+
+Tira os commits da auditoria do event loop: ``registrar`` só acrescenta o
+registro (SQL + parâmetros) a um buffer em memória e retorna. A thread do
+escritor junta o que estiver pendente (até ``batch_size`` registros, ou o
+que acumulou em ``flush_interval_s``) e grava tudo em uma única transação,
+agrupando registros consecutivos do mesmo SQL em ``executemany``.
+
+Garantias:
+    - Append-only: nenhum registro é descartado. O buffer não tem limite
+      (a profundidade máxima fica em ``metrics.max_pending``); se a
+      transação falhar, o lote volta para a frente do buffer e é
+      regravado após ``retry_delay_s``. Um registro inválido (constraint,
+      parâmetros, erro em ``on_batch``) não trava os demais: o lote é
+      regravado registro a registro e só o inválido é rejeitado (logado e
+      contado em ``metrics.rejected``).
+    - Se a thread do escritor morrer mesmo assim, ``registrar``,
+      ``flush`` e ``close`` detectam e gravam o buffer de forma síncrona.
+    - Ordem: registros são gravados na ordem de chegada.
+    - Shutdown: ``close()`` para de aceitar registros no buffer, grava o
+      que está pendente e encerra a thread — registrado em ``atexit``.
+      Depois de fechado, ``registrar`` grava de forma síncrona.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import sqlite3
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from itertools import groupby
+from typing import Callable, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+Registro = tuple[str, Sequence]
+
+
+def _erro_do_banco(e: Exception) -> bool:
+    """Erro de disco/lock/arquivo (regravar o lote) e não de um registro."""
+    return isinstance(e, sqlite3.OperationalError) or type(e) is sqlite3.DatabaseError
+
+
+@dataclass
+class AuditWriterMetrics:
+    """Métricas do escritor (buffer, lotes e atraso de gravação)."""
+
+    submitted: int = 0
+    written: int = 0
+    batches: int = 0
+    errors: int = 0
+    rejected: int = 0
+    pending: int = 0
+    max_pending: int = 0
+    max_batch: int = 0
+    last_commit_ms: float = 0.0
+    max_lag_ms: float = 0.0
+    last_error: str = ""
+
+
+class AuditBatchWriter:
+    """Grava registros de auditoria em transações em lote numa thread própria.
+
+    Uso:
+        writer = AuditBatchWriter("data/alertas_audit.db").start()
+        writer.registrar("INSERT INTO t (a, b) VALUES (?, ?)", (1, 2))
+        ...
+        writer.close()
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        batch_size: int = 500,
+        flush_interval_s: float = 0.05,
+        retry_delay_s: float = 1.0,
+        on_batch: Optional[Callable[[sqlite3.Connection, list[Registro]], None]] = None,
+        name: str = "AuditBatchWriter",
+    ) -> None:
+        """
+        Args:
+            db_path: Arquivo SQLite (o schema já deve existir)
+            batch_size: Máximo de registros por transação
+            flush_interval_s: Espera por mais registros antes de gravar um
+                lote incompleto
+            retry_delay_s: Pausa antes de regravar um lote que falhou
+            on_batch: Chamado dentro da mesma transação, após os inserts
+            name: Nome da thread
+        """
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self.retry_delay_s = retry_delay_s
+        self.on_batch = on_batch
+        self.name = name
+        self.metrics = AuditWriterMetrics()
+        self._pending: deque[tuple[Registro, float]] = deque()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closing = False
+        self._busy = False
+        self._flushers = 0  # flush() em espera: grava sem aguardar o lote encher
+
+    # ────────────────────────────────────────────────────────────
+    # Ciclo de vida
+    # ────────────────────────────────────────────────────────────
+
+    def start(self) -> "AuditBatchWriter":
+        """Inicia a thread do escritor (idempotente)."""
+        with self._cond:
+            if self._thread is not None:
+                return self
+            self._closing = False
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+        atexit.register(self.close)
+        return self
+
+    def _alive(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def close(self, timeout: Optional[float] = 30.0) -> bool:
+        """Grava o que está pendente e encerra a thread.
+
+        Returns:
+            True se o buffer foi totalmente gravado dentro do prazo.
+        """
+        with self._cond:
+            thread = self._thread
+            if thread is None:
+                return not self._pending
+            self._closing = True
+            self._cond.notify_all()
+            morta = not thread.is_alive()
+            if morta:
+                self._thread = None
+        if morta:
+            atexit.unregister(self.close)
+            return self._drain_sync()
+        thread.join(timeout)
+        with self._cond:
+            drained = not thread.is_alive() and not self._pending
+            if drained:
+                self._thread = None
+        atexit.unregister(self.close)
+        return drained
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Aguarda o buffer ser gravado (sem encerrar o escritor)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._flushers += 1
+            self._cond.notify_all()
+            try:
+                while (self._pending or self._busy) and self._alive():
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._cond.wait(remaining)
+            finally:
+                self._flushers -= 1
+            if not self._pending or self._alive():
+                return not self._pending
+        return self._drain_sync()  # thread morta com registros no buffer
+
+    # ────────────────────────────────────────────────────────────
+    # Produtor
+    # ────────────────────────────────────────────────────────────
+
+    def registrar(self, sql: str, params: Sequence) -> None:
+        """Acrescenta um registro ao buffer (não toca no disco).
+
+        Se o escritor não estiver rodando (não iniciado, encerrando ou com
+        a thread morta), o registro — e o que a thread deixou no buffer —
+        é gravado de forma síncrona; nunca se perde por isso.
+        """
+        with self._cond:
+            if self._alive() and not self._closing:
+                self._pending.append(((sql, params), time.monotonic()))
+                m = self.metrics
+                m.submitted += 1
+                m.pending = len(self._pending)
+                m.max_pending = max(m.max_pending, m.pending)
+                if m.pending == 1 or m.pending >= self.batch_size:
+                    self._cond.notify_all()
+                return
+            if self._pending:
+                # Thread morta com buffer: grava na ordem de chegada
+                self._pending.append(((sql, params), time.monotonic()))
+                self.metrics.submitted += 1
+        if self._pending:
+            self._drain_sync()
+            return
+        conn = self._connect()
+        try:
+            self._write(conn, [(sql, params)])
+        finally:
+            conn.close()
+
+    def _drain_sync(self) -> bool:
+        """Grava no chamador o buffer deixado por uma thread que morreu."""
+        with self._cond:
+            lote = list(self._pending)
+            self._pending.clear()
+            self.metrics.pending = 0
+        if not lote:
+            return True
+        logger.error(f"[{self.name}] Escritor parado; gravando {len(lote)} registros de forma síncrona")
+        conn = self._connect()
+        try:
+            self._write_lote(conn, lote)
+        except Exception as e:
+            # Disco/lock: o que sobrou volta ao buffer para a próxima chamada
+            logger.error(f"[{self.name}] Falha na gravação síncrona: {e!r}")
+            with self._cond:
+                self._pending.extendleft(reversed(lote))
+                self.metrics.errors += 1
+                self.metrics.last_error = str(e)
+                self.metrics.pending = len(self._pending)
+            return False
+        finally:
+            conn.close()
+        return True
+
+    # ────────────────────────────────────────────────────────────
+    # Consumidor
+    # ────────────────────────────────────────────────────────────
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=FULL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    def _run(self) -> None:
+        conn = self._connect()
+        try:
+            while True:
+                with self._cond:
+                    while not self._pending and not self._closing:
+                        self._cond.wait()
+                    if not self._pending:  # closing e buffer vazio
+                        return
+                    if (len(self._pending) < self.batch_size
+                            and not self._closing and not self._flushers):
+                        # Junta mais registros antes de pagar um commit
+                        self._cond.wait_for(
+                            lambda: len(self._pending) >= self.batch_size
+                            or self._closing or self._flushers,
+                            self.flush_interval_s,
+                        )
+                    n = min(self.batch_size, len(self._pending))
+                    lote = [self._pending.popleft() for _ in range(n)]
+                    self.metrics.pending = len(self._pending)
+                    self._busy = True
+                try:
+                    self._write_lote(conn, lote)
+                except Exception as e:
+                    # Disco/lock (ou falha inesperada): o que não foi gravado
+                    # do lote volta para a frente do buffer
+                    logger.error(f"[{self.name}] Falha ao gravar lote de {n}: {e!r}")
+                    with self._cond:
+                        self._pending.extendleft(reversed(lote))
+                        self.metrics.errors += 1
+                        self.metrics.last_error = str(e)
+                        self.metrics.pending = len(self._pending)
+                    time.sleep(self.retry_delay_s)
+                finally:
+                    with self._cond:
+                        self._busy = False
+                        self._cond.notify_all()
+        finally:
+            conn.close()
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+    def _write_lote(self, conn: sqlite3.Connection, lote: list[tuple[Registro, float]]) -> None:
+        """Grava o lote, removendo de ``lote`` o que já foi gravado ou rejeitado.
+
+        Erros de disco/lock sobem com ``lote`` contendo só o que falta gravar.
+        """
+        try:
+            self._write(conn, [registro for registro, _ in lote], lote[0][1])
+            lote.clear()
+            return
+        except Exception as e:
+            if _erro_do_banco(e):
+                raise
+            # Registro inválido: regrava um a um para isolar o culpado
+            logger.error(f"[{self.name}] Lote rejeitado ({e!r}); gravando registro a registro")
+        while lote:
+            registro, enqueued_at = lote[0]
+            try:
+                self._write(conn, [registro], enqueued_at)
+            except Exception as erro:
+                if _erro_do_banco(erro):
+                    raise
+                logger.error(f"[{self.name}] Registro rejeitado: {registro!r} ({erro!r})")
+                with self._cond:
+                    self.metrics.rejected += 1
+                    self.metrics.last_error = str(erro)
+            del lote[0]
+
+    def _write(
+        self,
+        conn: sqlite3.Connection,
+        registros: list[Registro],
+        enqueued_at: Optional[float] = None,
+    ) -> None:
+        t0 = time.perf_counter()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for sql, grupo in groupby(registros, key=lambda r: r[0]):
+                conn.executemany(sql, [params for _, params in grupo])
+            if self.on_batch is not None:
+                self.on_batch(conn, registros)
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        with self._cond:
+            m = self.metrics
+            m.written += len(registros)
+            m.batches += 1
+            m.max_batch = max(m.max_batch, len(registros))
+            m.last_commit_ms = (time.perf_counter() - t0) * 1000
+            if enqueued_at is not None:
+                m.max_lag_ms = max(m.max_lag_ms, (time.monotonic() - enqueued_at) * 1000)
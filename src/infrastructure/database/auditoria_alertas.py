@@ -2,10 +2,12 @@
 
 import logging
 import sqlite3
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import List, Optional
 
+from src.infrastructure.database.audit_writer import AuditBatchWriter
+
 logger = logging.getLogger(__name__)
 
 
@@ -18,11 +20,21 @@ class AuditoriaAlertas:
     - Integridade: append-only (sem update/delete)
     - Rastreabilidade: todos fluxos registrados
     - Performance: índices para queries rápidas
+    - Não bloqueante: os ``registrar_*`` só entregam o registro ao
+      ``AuditBatchWriter``, que grava em lote numa thread própria (WAL).
+      Consultas gravam o pendente antes de ler; ``fechar()`` grava tudo
+      antes de fechar.
 
     Tabelas:
     - alertas_audit: log de alertas gerados
     - entrega_audit: log de entregas (canais, status)
     - acao_operador_audit: log de ações do operador
+
+    Rollups diários (mantidos por triggers na mesma transação do insert
+    bruto; ``obter_estatisticas`` lê só deles):
+    - alertas_diario: alertas por dia, nível e padrão
+    - entrega_diario: tentativas por dia, canal e status (+ latência somada)
+    - acao_diario: ações do operador por dia e tipo
     """
 
     SCHEMA_ALERTAS = """
@@ -31,7 +43,7 @@ class AuditoriaAlertas:
 
         -- Identificação
         ativo TEXT NOT NULL,
-        padr ao TEXT NOT NULL,
+        padrao TEXT NOT NULL,
         nivel TEXT NOT NULL,
 
         -- Detecção
@@ -49,9 +61,7 @@ class AuditoriaAlertas:
         risk_reward REAL,
 
         -- Registro
-        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-
-        CONSTRAINT alertas_audit_pk PRIMARY KEY (id)
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
     )
     """
 
@@ -66,8 +76,7 @@ class AuditoriaAlertas:
         erro_descricao TEXT,
 
         CONSTRAINT entrega_audit_fk FOREIGN KEY (alerta_id)
-            REFERENCES alertas_audit(id),
-        CONSTRAINT entrega_audit_pk PRIMARY KEY (id)
+            REFERENCES alertas_audit(id)
     )
     """
 
@@ -85,8 +94,7 @@ class AuditoriaAlertas:
         created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
 
         CONSTRAINT acao_operador_fk FOREIGN KEY (alerta_id)
-            REFERENCES alertas_audit(id),
-        CONSTRAINT acao_operador_pk PRIMARY KEY (id)
+            REFERENCES alertas_audit(id)
     )
     """
 
@@ -111,22 +119,153 @@ class AuditoriaAlertas:
         "ON acao_operador_audit(timestamp_acao DESC)",
     ]
 
-    def __init__(self, db_path: str = "data/alertas_audit.db"):
+    SCHEMA_ROLLUPS = [
+        """
+        CREATE TABLE IF NOT EXISTS alertas_diario (
+            dia TEXT NOT NULL,
+            nivel TEXT NOT NULL,
+            padrao TEXT NOT NULL,
+            total INTEGER NOT NULL,
+            PRIMARY KEY (dia, nivel, padrao)
+        ) WITHOUT ROWID
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS entrega_diario (
+            dia TEXT NOT NULL,
+            canal TEXT NOT NULL,
+            status TEXT NOT NULL,
+            total INTEGER NOT NULL,
+            latencia_total_ms INTEGER NOT NULL,
+            PRIMARY KEY (dia, canal, status)
+        ) WITHOUT ROWID
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS acao_diario (
+            dia TEXT NOT NULL,
+            acao TEXT NOT NULL,
+            total INTEGER NOT NULL,
+            PRIMARY KEY (dia, acao)
+        ) WITHOUT ROWID
+        """,
+    ]
+
+    # Só disparam para linhas de fato inseridas (INSERT OR IGNORE não conta)
+    TRIGGERS_ROLLUP = [
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_alertas_diario
+        AFTER INSERT ON alertas_audit
+        BEGIN
+            INSERT INTO alertas_diario (dia, nivel, padrao, total)
+            VALUES (date(NEW.timestamp_deteccao), NEW.nivel, NEW.padrao, 1)
+            ON CONFLICT (dia, nivel, padrao) DO UPDATE SET total = total + 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_entrega_diario
+        AFTER INSERT ON entrega_audit
+        BEGIN
+            INSERT INTO entrega_diario (dia, canal, status, total, latencia_total_ms)
+            VALUES (
+                date(NEW.timestamp_tentativa), NEW.canal, NEW.status, 1,
+                MAX(COALESCE(NEW.latencia_ms, 0), 0)
+            )
+            ON CONFLICT (dia, canal, status) DO UPDATE SET
+                total = total + 1,
+                latencia_total_ms = latencia_total_ms + excluded.latencia_total_ms;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_acao_diario
+        AFTER INSERT ON acao_operador_audit
+        BEGIN
+            INSERT INTO acao_diario (dia, acao, total)
+            VALUES (date(NEW.timestamp_acao), NEW.acao, 1)
+            ON CONFLICT (dia, acao) DO UPDATE SET total = total + 1;
+        END
+        """,
+    ]
+
+    # Recalcula os rollups a partir do log bruto (banco anterior aos rollups)
+    RECONSTRUIR_ROLLUPS = [
+        "DELETE FROM alertas_diario",
+        "DELETE FROM entrega_diario",
+        "DELETE FROM acao_diario",
+        """
+        INSERT INTO alertas_diario (dia, nivel, padrao, total)
+        SELECT date(timestamp_deteccao), nivel, padrao, COUNT(*)
+        FROM alertas_audit GROUP BY 1, 2, 3
+        """,
+        """
+        INSERT INTO entrega_diario (dia, canal, status, total, latencia_total_ms)
+        SELECT date(timestamp_tentativa), canal, status, COUNT(*),
+               SUM(MAX(COALESCE(latencia_ms, 0), 0))
+        FROM entrega_audit GROUP BY 1, 2, 3
+        """,
+        """
+        INSERT INTO acao_diario (dia, acao, total)
+        SELECT date(timestamp_acao), acao, COUNT(*)
+        FROM acao_operador_audit GROUP BY 1, 2
+        """,
+    ]
+
+    # Alerta repetido (mesmo id) é ignorado: não é erro fatal
+    INSERT_ALERTA = """
+    INSERT OR IGNORE INTO alertas_audit (
+        id, ativo, padrao, nivel, timestamp_deteccao,
+        preco_atual, entrada_min, entrada_max, stop_loss,
+        take_profit, confianca, risk_reward
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+
+    INSERT_ENTREGA = """
+    INSERT INTO entrega_audit (
+        alerta_id, canal, status, latencia_ms, timestamp_tentativa, erro_descricao
+    ) VALUES (?, ?, ?, ?, ?, ?)
+    """
+
+    INSERT_ACAO = """
+    INSERT INTO acao_operador_audit (
+        alerta_id, operador_username, acao, timestamp_acao,
+        ordem_mt5_id, resultado_trade, pnl, timestamp_fechamento
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """
+
+    def __init__(
+        self,
+        db_path: str = "data/alertas_audit.db",
+        batch_size: int = 500,
+        flush_interval_s: float = 0.05,
+        consulta_flush_timeout_s: float = 2.0,
+    ):
         """
         Inicializa auditoria com database SQLite.
 
         Args:
             db_path: Caminho do arquivo SQLite
+            batch_size: Máximo de registros por transação do escritor
+            flush_interval_s: Espera do escritor por mais registros antes
+                de gravar um lote incompleto
+            consulta_flush_timeout_s: Espera máxima das consultas pelos
+                registros pendentes (depois disso leem o que já foi gravado)
         """
         self.db_path = Path(db_path)
+        self.consulta_flush_timeout_s = consulta_flush_timeout_s
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
 
         self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
         self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")  # Leituras não esperam o escritor
 
         # Cria schema
         self._criar_schema()
 
+        self.writer = AuditBatchWriter(
+            str(self.db_path),
+            batch_size=batch_size,
+            flush_interval_s=flush_interval_s,
+            name="AuditoriaAlertasWriter",
+        ).start()
+
         logger.info(f"✅ Auditoria inicializada: {self.db_path}")
 
     def _criar_schema(self) -> None:
@@ -142,6 +281,17 @@ class AuditoriaAlertas:
         for indice in self.INDICES:
             cursor.execute(indice)
 
+        # Rollups diários
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'alertas_diario'"
+        )
+        rollups_existiam = cursor.fetchone() is not None
+        for ddl in self.SCHEMA_ROLLUPS + self.TRIGGERS_ROLLUP:
+            cursor.execute(ddl)
+        if not rollups_existiam:
+            for sql in self.RECONSTRUIR_ROLLUPS:
+                cursor.execute(sql)
+
         self.conn.commit()
         logger.debug("Schema criado/validado com sucesso")
 
@@ -177,41 +327,24 @@ class AuditoriaAlertas:
             confianca: Confiança 0-1
             risk_reward: Ratio R:R
         """
-        cursor = self.conn.cursor()
-
-        try:
-            cursor.execute(
-                """
-                INSERT INTO alertas_audit (
-                    id, ativo, padrão, nivel, timestamp_deteccao,
-                    preco_atual, entrada_min, entrada_max, stop_loss,
-                    take_profit, confianca, risk_reward
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    alerta_id,
-                    ativo,
-                    padrao,
-                    nivel,
-                    timestamp_deteccao,
-                    preco_atual,
-                    entrada_min,
-                    entrada_max,
-                    stop_loss,
-                    take_profit,
-                    confianca,
-                    risk_reward,
-                ),
-            )
-            self.conn.commit()
-            logger.debug(f"Alerta registrado: {alerta_id}")
-
-        except sqlite3.IntegrityError as e:
-            logger.warning(f"Alerta já existe: {alerta_id} ({e})")
-            # Não é erro fatal, apenas duplicado
-        except Exception as e:
-            logger.error(f"Erro ao registrar alerta: {e}")
-            raise
+        self.writer.registrar(
+            self.INSERT_ALERTA,
+            (
+                alerta_id,
+                ativo,
+                padrao,
+                nivel,
+                timestamp_deteccao,
+                preco_atual,
+                entrada_min,
+                entrada_max,
+                stop_loss,
+                take_profit,
+                confianca,
+                risk_reward,
+            ),
+        )
+        logger.debug(f"Alerta registrado: {alerta_id}")
 
     def registrar_entrega(
         self,
@@ -231,23 +364,11 @@ class AuditoriaAlertas:
             latencia_ms: Latência em ms
             erro_descricao: Descrição de erro se houver
         """
-        cursor = self.conn.cursor()
-
-        try:
-            cursor.execute(
-                """
-                INSERT INTO entrega_audit (
-                    alerta_id, canal, status, latencia_ms, erro_descricao
-                ) VALUES (?, ?, ?, ?, ?)
-                """,
-                (alerta_id, canal, status, latencia_ms, erro_descricao),
-            )
-            self.conn.commit()
-            logger.debug(f"Entrega registrada: {alerta_id} / {canal} / {status}")
-
-        except Exception as e:
-            logger.error(f"Erro ao registrar entrega: {e}")
-            raise
+        self.writer.registrar(
+            self.INSERT_ENTREGA,
+            (alerta_id, canal, status, latencia_ms, datetime.now(), erro_descricao),
+        )
+        logger.debug(f"Entrega registrada: {alerta_id} / {canal} / {status}")
 
     def registrar_acao_operador(
         self,
@@ -273,40 +394,27 @@ class AuditoriaAlertas:
             pnl: P&L realizado
             timestamp_fechamento: Quando trade foi fechado
         """
-        cursor = self.conn.cursor()
-
-        try:
-            cursor.execute(
-                """
-                INSERT INTO acao_operador_audit (
-                    alerta_id, operador_username, acao, timestamp_acao,
-                    ordem_mt5_id, resultado_trade, pnl, timestamp_fechamento
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    alerta_id,
-                    operador_username,
-                    acao,
-                    timestamp_acao,
-                    ordem_mt5_id,
-                    resultado_trade,
-                    pnl,
-                    timestamp_fechamento,
-                ),
-            )
-            self.conn.commit()
-            logger.info(f"Ação registrada: {alerta_id} / {acao} por {operador_username}")
-
-        except Exception as e:
-            logger.error(f"Erro ao registrar ação: {e}")
-            raise
+        self.writer.registrar(
+            self.INSERT_ACAO,
+            (
+                alerta_id,
+                operador_username,
+                acao,
+                timestamp_acao,
+                ordem_mt5_id,
+                resultado_trade,
+                pnl,
+                timestamp_fechamento,
+            ),
+        )
+        logger.info(f"Ação registrada: {alerta_id} / {acao} por {operador_username}")
 
     def consultar_alertas(
         self,
         data_inicio: Optional[datetime] = None,
         data_fim: Optional[datetime] = None,
         ativo: Optional[str] = None,
-        padr ao: Optional[str] = None,
+        padrao: Optional[str] = None,
         limit: int = 100,
     ) -> List[dict]:
         """
@@ -316,12 +424,13 @@ class AuditoriaAlertas:
             data_inicio: Data inicial (padrão: últimas 24h)
             data_fim: Data final (padrão: agora)
             ativo: Filtrar por ativo
-            padrão: Filtrar por padrão
+            padrao: Filtrar por padrão
             limit: Máximo de resultados
 
         Returns:
             Lista de dicts com alertas
         """
+        self._aguardar_gravacao()
         cursor = self.conn.cursor()
 
         # Default: últimas 24h
@@ -338,7 +447,7 @@ class AuditoriaAlertas:
             params.append(ativo)
 
         if padrao:
-            query += " AND padrão = ?"
+            query += " AND padrao = ?"
             params.append(padrao)
 
         query += " ORDER BY timestamp_deteccao DESC LIMIT ?"
@@ -351,7 +460,11 @@ class AuditoriaAlertas:
 
     def obter_estatisticas(self, dias: int = 30) -> dict:
         """
-        Retorna estatísticas dos últimos N dias.
+        Retorna estatísticas dos últimos N dias (lidas dos rollups diários).
+
+        O custo depende só de ``dias`` (e da variedade de níveis, padrões
+        e canais), não do tamanho do histórico bruto. A janela é por dia
+        de calendário: inclui o dia inteiro de ``hoje - dias``.
 
         Args:
             dias: Período para análise
@@ -359,71 +472,118 @@ class AuditoriaAlertas:
         Returns:
             Dict com estatísticas
         """
+        self._aguardar_gravacao()
         cursor = self.conn.cursor()
-        data_inicio = datetime.now() - timedelta(days=dias)
+        dia_inicio = (datetime.now() - timedelta(days=dias)).date().isoformat()
 
-        # Total de alertas
+        # Alertas por nível e padrão
         cursor.execute(
-            "SELECT COUNT(*) as total FROM alertas_audit WHERE timestamp_deteccao > ?",
-            (data_inicio,),
+            "SELECT nivel, padrao, SUM(total) AS total FROM alertas_diario "
+            "WHERE dia >= ? GROUP BY nivel, padrao",
+            (dia_inicio,),
         )
-        total_alertas = cursor.fetchone()["total"]
-
-        # Por nível
+        por_nivel: dict = {}
+        por_padrao: dict = {}
+        for row in cursor.fetchall():
+            por_nivel[row["nivel"]] = por_nivel.get(row["nivel"], 0) + row["total"]
+            por_padrao[row["padrao"]] = por_padrao.get(row["padrao"], 0) + row["total"]
+        total_alertas = sum(por_nivel.values())
+
+        # Entregas por canal e status
         cursor.execute(
-            """
-            SELECT nivel, COUNT(*) as count FROM alertas_audit
-            WHERE timestamp_deteccao > ?
-            GROUP BY nivel
-            """,
-            (data_inicio,),
+            "SELECT canal, status, SUM(total) AS total, "
+            "SUM(latencia_total_ms) AS latencia_total_ms FROM entrega_diario "
+            "WHERE dia >= ? GROUP BY canal, status",
+            (dia_inicio,),
         )
-        por_nivel = {row["nivel"]: row["count"] for row in cursor.fetchall()}
-
-        # Taxa de entrega
+        por_canal: dict = {}
+        entregues = tentativas = 0
+        for row in cursor.fetchall():
+            canal = por_canal.setdefault(row["canal"], {"latencia_media_ms": 0.0})
+            canal[row["status"]] = row["total"]
+            tentativas += row["total"]
+            if row["status"] == "entregue":
+                entregues += row["total"]
+                canal["latencia_media_ms"] = row["latencia_total_ms"] / row["total"]
+        taxa_entrega = entregues / tentativas if tentativas > 0 else 0
+
+        # Ações do operador
         cursor.execute(
-            """
-            SELECT COUNT(CASE WHEN status = 'entregue' THEN 1 END) as entregues,
-                   COUNT(*) as total
-            FROM entrega_audit
-            WHERE timestamp_tentativa > ?
-            """,
-            (data_inicio,),
-        )
-        entrega_row = cursor.fetchone()
-        taxa_entrega = (
-            entrega_row["entregues"] / entrega_row["total"]
-            if entrega_row["total"] > 0
-            else 0
-        )
-
-        # Taxa de execução
-        cursor.execute(
-            """
-            SELECT COUNT(CASE WHEN acao = 'EXECUTOU' THEN 1 END) as executados,
-                   COUNT(*) as total
-            FROM acao_operador_audit
-            WHERE timestamp_acao > ?
-            """,
-            (data_inicio,),
-        )
-        acao_row = cursor.fetchone()
-        taxa_execucao = (
-            acao_row["executados"] / acao_row["total"]
-            if acao_row["total"] > 0
-            else 0
+            "SELECT acao, SUM(total) AS total FROM acao_diario "
+            "WHERE dia >= ? GROUP BY acao",
+            (dia_inicio,),
         )
+        por_acao = {row["acao"]: row["total"] for row in cursor.fetchall()}
+        total_acoes = sum(por_acao.values())
+        taxa_execucao = por_acao.get("EXECUTOU", 0) / total_acoes if total_acoes > 0 else 0
 
         return {
             "periodo_dias": dias,
             "total_alertas": total_alertas,
             "alertas_por_nivel": por_nivel,
+            "alertas_por_padrao": por_padrao,
+            "entregas_por_canal": por_canal,
+            "acoes_por_tipo": por_acao,
             "taxa_entrega": taxa_entrega,
             "taxa_execucao": taxa_execucao,
         }
 
+    def obter_serie_diaria(self, dias: int = 30) -> List[dict]:
+        """
+        Série por dia (alertas, entregas, ações) para gráficos do dashboard.
+
+        Args:
+            dias: Período para análise
+
+        Returns:
+            Lista de dicts ``{dia, alertas, entregas, entregues, acoes,
+            executados}`` em ordem cronológica (só dias com movimento)
+        """
+        self._aguardar_gravacao()
+        dia_inicio = (datetime.now() - timedelta(days=dias)).date().isoformat()
+        cursor = self.conn.cursor()
+        cursor.execute(
+            """
+            SELECT dia,
+                   SUM(alertas) AS alertas, SUM(entregas) AS entregas,
+                   SUM(entregues) AS entregues, SUM(acoes) AS acoes,
+                   SUM(executados) AS executados
+            FROM (
+                SELECT dia, total AS alertas, 0 AS entregas, 0 AS entregues,
+                       0 AS acoes, 0 AS executados
+                FROM alertas_diario WHERE dia >= :inicio
+                UNION ALL
+                SELECT dia, 0, total, CASE WHEN status = 'entregue' THEN total ELSE 0 END,
+                       0, 0
+                FROM entrega_diario WHERE dia >= :inicio
+                UNION ALL
+                SELECT dia, 0, 0, 0, total, CASE WHEN acao = 'EXECUTOU' THEN total ELSE 0 END
+                FROM acao_diario WHERE dia >= :inicio
+            )
+            GROUP BY dia ORDER BY dia
+            """,
+            {"inicio": dia_inicio},
+        )
+        return [dict(row) for row in cursor.fetchall()]
+
+    def _aguardar_gravacao(self) -> None:
+        """Espera (com prazo) os pendentes antes de uma consulta."""
+        if not self.writer.flush(self.consulta_flush_timeout_s):
+            logger.warning(
+                f"Consulta sem aguardar {self.writer.metrics.pending} registros pendentes "
+                f"(prazo de {self.consulta_flush_timeout_s}s)"
+            )
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Aguarda os registros pendentes serem gravados."""
+        return self.writer.flush(timeout)
+
     def fechar(self) -> None:
-        """Fecha conexão com database."""
+        """Grava os registros pendentes e fecha a conexão com database."""
+        if not self.writer.close():
+            logger.error(
+                f"Auditoria fechada com {self.writer.metrics.pending} registros pendentes"
+            )
         if self.conn:
             self.conn.close()
             logger.info("Auditoria fechada")
@@ -0,0 +1,180 @@
+"""Histórico tipado das métricas do BDI (SQLite, uma linha por data e métrica)."""
+
+import logging
+import sqlite3
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class DesvioMetrica(NamedTuple):
+    """Valor do dia contra a média das sessões anteriores."""
+
+    data: str
+    valor: float
+    media: Optional[float]  # None sem sessões anteriores
+    amostras: int  # Sessões anteriores na média
+    desvio_pct: Optional[float]
+
+
+class HistoricoBDI:
+    """
+    Métricas extraídas dos boletins (bdi_*_key_data.txt), gravadas uma vez.
+
+    Tabelas:
+    - bdi_metricas: (data, métrica) -> valor numérico; datas em ISO
+      (AAAA-MM-DD), então a ordem do texto é a cronológica
+    - bdi_arquivos: boletins já carregados (tamanho e mtime), para o
+      carregamento incremental só ler arquivos novos ou alterados
+    """
+
+    SCHEMA_METRICAS = """
+    CREATE TABLE IF NOT EXISTS bdi_metricas (
+        data TEXT NOT NULL,
+        metrica TEXT NOT NULL,
+        valor REAL NOT NULL,
+        arquivo TEXT NOT NULL,
+        PRIMARY KEY (data, metrica)
+    ) WITHOUT ROWID
+    """
+
+    SCHEMA_ARQUIVOS = """
+    CREATE TABLE IF NOT EXISTS bdi_arquivos (
+        arquivo TEXT PRIMARY KEY,
+        data TEXT NOT NULL,
+        tamanho INTEGER NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        carregado_em DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+    """
+
+    # Séries por métrica (tendências, médias móveis)
+    INDICES = [
+        "CREATE INDEX IF NOT EXISTS idx_bdi_metricas_metrica_data "
+        "ON bdi_metricas(metrica, data)",
+    ]
+
+    def __init__(self, db_path: str = "data/db/bdi_historico.db"):
+        """
+        Inicializa o histórico.
+
+        Args:
+            db_path: Caminho do arquivo SQLite
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.execute(self.SCHEMA_METRICAS)
+        self.conn.execute(self.SCHEMA_ARQUIVOS)
+        for indice in self.INDICES:
+            self.conn.execute(indice)
+        self.conn.commit()
+
+    # ════════════════════════════════════════════════════════════
+    # Carga
+    # ════════════════════════════════════════════════════════════
+
+    def arquivo_carregado(self, arquivo: Path) -> bool:
+        """True se o arquivo já foi carregado e não mudou desde então."""
+        stat = Path(arquivo).stat()
+        row = self.conn.execute(
+            "SELECT tamanho, mtime_ns FROM bdi_arquivos WHERE arquivo = ?",
+            (Path(arquivo).name,),
+        ).fetchone()
+        return row is not None and row == (stat.st_size, stat.st_mtime_ns)
+
+    def registrar(self, arquivo: Path, data: date, metricas: Dict[str, float]) -> None:
+        """
+        Grava as métricas de um boletim e marca o arquivo como carregado.
+
+        Recarregar o mesmo boletim substitui as métricas daquela data.
+
+        Args:
+            arquivo: Arquivo de origem (bdi_AAAAMMDD_key_data.txt)
+            data: Data do pregão
+            metricas: {nome: valor} já convertidos para número
+        """
+        arquivo = Path(arquivo)
+        stat = arquivo.stat()
+        data_iso = data.isoformat()
+        with self.conn:
+            self.conn.execute("DELETE FROM bdi_metricas WHERE data = ?", (data_iso,))
+            self.conn.executemany(
+                "INSERT INTO bdi_metricas (data, metrica, valor, arquivo) VALUES (?, ?, ?, ?)",
+                [(data_iso, nome, float(valor), arquivo.name) for nome, valor in metricas.items()],
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO bdi_arquivos (arquivo, data, tamanho, mtime_ns) "
+                "VALUES (?, ?, ?, ?)",
+                (arquivo.name, data_iso, stat.st_size, stat.st_mtime_ns),
+            )
+        logger.debug("BDI %s: %d métricas gravadas", data_iso, len(metricas))
+
+    # ════════════════════════════════════════════════════════════
+    # Consultas
+    # ════════════════════════════════════════════════════════════
+
+    def datas(self, ultimas: Optional[int] = None) -> List[str]:
+        """Datas com métricas, da mais recente para a mais antiga."""
+        query = "SELECT DISTINCT data FROM bdi_metricas ORDER BY data DESC"
+        params: tuple = ()
+        if ultimas is not None:
+            query += " LIMIT ?"
+            params = (ultimas,)
+        return [row[0] for row in self.conn.execute(query, params)]
+
+    def metricas_do_dia(self, data: str) -> Dict[str, float]:
+        """Todas as métricas de uma data (ISO)."""
+        return dict(
+            self.conn.execute(
+                "SELECT metrica, valor FROM bdi_metricas WHERE data = ?", (data,)
+            )
+        )
+
+    def serie(self, metrica: str, ultimas: Optional[int] = None) -> List[tuple]:
+        """[(data, valor)] da métrica, da mais recente para a mais antiga."""
+        query = "SELECT data, valor FROM bdi_metricas WHERE metrica = ? ORDER BY data DESC"
+        params: tuple = (metrica,)
+        if ultimas is not None:
+            query += " LIMIT ?"
+            params += (ultimas,)
+        return self.conn.execute(query, params).fetchall()
+
+    def desvio_da_media(
+        self, metrica: str, janela: int = 20, ultimas: Optional[int] = None
+    ) -> List[DesvioMetrica]:
+        """
+        Valor de cada sessão contra a média das ``janela`` sessões anteriores.
+
+        A média móvel é calculada pelo SQLite (função de janela) sobre todo
+        o histórico da métrica; ``ultimas`` só limita as sessões devolvidas.
+
+        Returns:
+            Lista de DesvioMetrica, da sessão mais recente para a mais antiga
+        """
+        query = """
+        SELECT data, valor, media, amostras,
+               CASE WHEN media IS NULL OR media = 0 THEN NULL
+                    ELSE (valor - media) / media * 100 END
+        FROM (
+            SELECT data, valor,
+                   AVG(valor) OVER anteriores AS media,
+                   COUNT(valor) OVER anteriores AS amostras
+            FROM bdi_metricas
+            WHERE metrica = ?
+            WINDOW anteriores AS (
+                ORDER BY data ROWS BETWEEN ? PRECEDING AND 1 PRECEDING
+            )
+        )
+        ORDER BY data DESC
+        """
+        params: tuple = (metrica, janela)
+        if ultimas is not None:
+            query += " LIMIT ?"
+            params += (ultimas,)
+        return [DesvioMetrica(*row) for row in self.conn.execute(query, params)]
+
+    def fechar(self) -> None:
+        self.conn.close()
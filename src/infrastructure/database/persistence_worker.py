@@ -0,0 +1,252 @@
+"""Worker de persistência assíncrona (thread dedicada + fila limitada).
+
+Tira as escritas no SQLite do caminho de decisão: o ciclo do agente só
+enfileira a tarefa (``submit``) e segue; a thread do worker executa as
+escritas em ordem FIFO.
+
+Política de backpressure (fila cheia):
+    - Tarefa com ``coalesce_key`` já pendente → substitui a pendente
+      (ex.: KPI recalculado — só o valor mais recente importa).
+    - Prioridade LOW → descartada (contabilizada em ``dropped``).
+    - Prioridade HIGH → descarta a tarefa LOW mais antiga pendente; se não
+      houver, espera até ``block_timeout_s`` por espaço e, esgotado o
+      prazo, descarta (contabilizado em ``dropped_high``).
+
+Durabilidade: ``close()`` para de aceitar tarefas, drena a fila e aguarda
+a thread — registrado em ``atexit`` para rodar também em saídas normais.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_HIGH = "HIGH"
+PRIORITY_LOW = "LOW"
+
+
+@dataclass
+class PersistenceWorkerMetrics:
+    """Métricas do worker (profundidade da fila e atraso de escrita)."""
+
+    submitted: int = 0
+    processed: int = 0
+    errors: int = 0
+    dropped: int = 0
+    dropped_high: int = 0
+    coalesced: int = 0
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+    last_lag_ms: float = 0.0
+    max_lag_ms: float = 0.0
+    total_lag_ms: float = 0.0
+    last_write_ms: float = 0.0
+    last_error: str = ""
+
+    @property
+    def avg_lag_ms(self) -> float:
+        return self.total_lag_ms / self.processed if self.processed else 0.0
+
+
+@dataclass
+class _Task:
+    name: str
+    fn: Callable[[], Any]
+    priority: str
+    coalesce_key: Optional[str]
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class PersistenceWorker:
+    """Executa escritas em uma thread dedicada, alimentada por fila limitada.
+
+    Uso:
+        worker = PersistenceWorker(max_queue_size=50)
+        worker.start()
+        worker.submit("ciclo", lambda: _persist_cycle(db, result))
+        ...
+        worker.close()
+    """
+
+    def __init__(
+        self,
+        max_queue_size: int = 100,
+        block_timeout_s: float = 0.5,
+        name: str = "PersistenceWorker",
+    ) -> None:
+        self.max_queue_size = max_queue_size
+        self.block_timeout_s = block_timeout_s
+        self.name = name
+        self.metrics = PersistenceWorkerMetrics()
+        self._queue: deque[_Task] = deque()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closing = False
+        self._busy = False
+
+    # ────────────────────────────────────────────────────────────
+    # Ciclo de vida
+    # ────────────────────────────────────────────────────────────
+
+    def start(self) -> "PersistenceWorker":
+        """Inicia a thread do worker (idempotente)."""
+        with self._cond:
+            if self._thread is not None:
+                return self
+            self._closing = False
+            self._thread = threading.Thread(
+                target=self._run, name=self.name, daemon=True,
+            )
+            self._thread.start()
+        atexit.register(self.close)
+        return self
+
+    def close(self, timeout: Optional[float] = 30.0) -> bool:
+        """Para de aceitar tarefas, drena a fila e encerra a thread.
+
+        Returns:
+            True se a fila foi totalmente drenada dentro do prazo.
+        """
+        with self._cond:
+            thread = self._thread
+            if thread is None:
+                return not self._queue
+            self._closing = True
+            self._cond.notify_all()
+        thread.join(timeout)
+        with self._cond:
+            drained = not thread.is_alive() and not self._queue
+            if drained:
+                self._thread = None
+        atexit.unregister(self.close)
+        return drained
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Aguarda a fila esvaziar (sem encerrar o worker)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._queue or self._busy:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    # ────────────────────────────────────────────────────────────
+    # Produtor
+    # ────────────────────────────────────────────────────────────
+
+    def submit(
+        self,
+        name: str,
+        fn: Callable[[], Any],
+        priority: str = PRIORITY_HIGH,
+        coalesce_key: Optional[str] = None,
+    ) -> bool:
+        """Enfileira uma escrita. Retorna False se a tarefa foi descartada.
+
+        Se o worker não estiver rodando (ou já estiver encerrando), a
+        escrita é executada de forma síncrona — nunca se perde por isso.
+        """
+        task = _Task(name, fn, priority, coalesce_key)
+        with self._cond:
+            running = self._thread is not None and not self._closing
+            if running:
+                self.metrics.submitted += 1
+                accepted = self._enqueue_locked(task)
+                self._cond.notify_all()
+                return accepted
+        self._execute(task)
+        return True
+
+    def _enqueue_locked(self, task: _Task) -> bool:
+        m = self.metrics
+        if task.coalesce_key is not None:
+            for i, pending in enumerate(self._queue):
+                if pending.coalesce_key == task.coalesce_key:
+                    # Mantém a posição original, mas com o conteúdo novo
+                    task.enqueued_at = pending.enqueued_at
+                    self._queue[i] = task
+                    m.coalesced += 1
+                    return True
+
+        if len(self._queue) >= self.max_queue_size:
+            if task.priority != PRIORITY_HIGH:
+                m.dropped += 1
+                logger.warning(f"[{self.name}] Fila cheia — descartada: {task.name}")
+                return False
+            if not self._evict_low_locked():
+                deadline = time.monotonic() + self.block_timeout_s
+                while len(self._queue) >= self.max_queue_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        m.dropped_high += 1
+                        logger.error(
+                            f"[{self.name}] Fila cheia há {self.block_timeout_s}s — "
+                            f"descartada (HIGH): {task.name}"
+                        )
+                        return False
+                    self._cond.wait(remaining)
+
+        self._queue.append(task)
+        m.queue_depth = len(self._queue)
+        m.max_queue_depth = max(m.max_queue_depth, m.queue_depth)
+        return True
+
+    def _evict_low_locked(self) -> bool:
+        for i, pending in enumerate(self._queue):
+            if pending.priority != PRIORITY_HIGH:
+                del self._queue[i]
+                self.metrics.dropped += 1
+                logger.warning(f"[{self.name}] Fila cheia — descartada: {pending.name}")
+                return True
+        return False
+
+    # ────────────────────────────────────────────────────────────
+    # Consumidor
+    # ────────────────────────────────────────────────────────────
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue and not self._closing:
+                    self._cond.wait()
+                if not self._queue:  # closing e fila vazia
+                    return
+                task = self._queue.popleft()
+                self.metrics.queue_depth = len(self._queue)
+                self._busy = True
+                self._cond.notify_all()
+            lag_ms = (time.monotonic() - task.enqueued_at) * 1000
+            self._execute(task, lag_ms)
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+    def _execute(self, task: _Task, lag_ms: float = 0.0) -> None:
+        t0 = time.perf_counter()
+        try:
+            task.fn()
+            ok = True
+        except Exception as e:
+            ok = False
+            logger.error(f"[{self.name}] Erro em {task.name}: {e}")
+            error = f"{task.name}: {e}"
+        write_ms = (time.perf_counter() - t0) * 1000
+        with self._cond:
+            m = self.metrics
+            m.processed += 1
+            m.last_lag_ms = lag_ms
+            m.max_lag_ms = max(m.max_lag_ms, lag_ms)
+            m.total_lag_ms += lag_ms
+            m.last_write_ms = write_ms
+            if not ok:
+                m.errors += 1
+                m.last_error = error
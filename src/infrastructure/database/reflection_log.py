@@ -0,0 +1,330 @@
+"""Log de reflexoes da IA em segmentos diarios JSONL, com indice de tempo.
+
+Layout (raiz padrao: data/db/reflections):
+
+    segments/reflections_AAAAMMDD.jsonl      um segmento por dia (data do timestamp)
+    segments/reflections_AAAAMMDD.jsonl.idx  "timestamp<TAB>offset" por registro
+    parquet/reflections_AAAAMMDD.parquet     dias compactados
+    reflections_log.jsonl                    arquivo unico legado (so leitura)
+
+A leitura por janela so abre os dias da janela e, dentro de um segmento,
+usa o indice para pular direto ao primeiro registro da janela; o custo
+depende do tamanho da janela, nao do historico. orjson e usado quando
+instalado; a compactacao em Parquet precisa de pyarrow (ou fastparquet).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime
+from pathlib import Path
+from typing import Iterator, Optional
+
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependência opcional (leitura mais rápida)
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_PREFIX = "reflections_"
+LEGACY_FILE = "reflections_log.jsonl"
+
+
+def _dumps(record: dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(record) + b"\n"
+    return (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _loads(line: bytes) -> Optional[dict]:
+    try:
+        return orjson.loads(line) if orjson is not None else json.loads(line)
+    except ValueError:  # JSONDecodeError (json e orjson) herda de ValueError
+        return None
+
+
+def _iso(moment: Optional[datetime]) -> Optional[str]:
+    return moment.isoformat() if moment is not None else None
+
+
+# (caminho, tamanho, mtime) do legado -> (menor, maior) timestamp; calculado
+# uma vez por versao do arquivo, para a janela pular o legado sem parsea-lo
+_legacy_spans: dict[tuple[str, int, int], Optional[tuple[str, str]]] = {}
+
+
+def _legacy_span(path: Path) -> Optional[tuple[str, str]]:
+    stat = path.stat()
+    key = (str(path), stat.st_size, stat.st_mtime_ns)
+    if key not in _legacy_spans:
+        stamps = [
+            rec["timestamp"] for rec in ReflectionLog._scan(path.read_bytes().splitlines(), None, None)
+        ]
+        _legacy_spans[key] = (min(stamps), max(stamps)) if stamps else None
+    return _legacy_spans[key]
+
+
+def _day_of(path: Path) -> date:
+    return datetime.strptime(path.name[len(SEGMENT_PREFIX):len(SEGMENT_PREFIX) + 8], "%Y%m%d").date()
+
+
+class ReflectionLog:
+    """Reflexoes em segmentos diarios, lidas por janela de tempo."""
+
+    def __init__(self, root: Path, legacy_file: Optional[Path] = None):
+        self.root = Path(root)
+        self.segments_dir = self.root / "segments"
+        self.parquet_dir = self.root / "parquet"
+        self.legacy_file = Path(legacy_file) if legacy_file else self.root / LEGACY_FILE
+
+    # ════════════════════════════════════════════════════════════
+    # Escrita
+    # ════════════════════════════════════════════════════════════
+
+    def segment_path(self, day: date) -> Path:
+        return self.segments_dir / f"{SEGMENT_PREFIX}{day:%Y%m%d}.jsonl"
+
+    def append(self, record: dict) -> None:
+        """Acrescenta um registro ao segmento do dia do seu ``timestamp`` (ISO)."""
+        timestamp = record["timestamp"]
+        segment = self.segment_path(datetime.fromisoformat(timestamp).date())
+        self.segments_dir.mkdir(parents=True, exist_ok=True)
+        with open(segment, "ab") as f:
+            offset = f.tell()
+            f.write(_dumps(record))
+        with open(f"{segment}.idx", "a", encoding="utf-8") as f:
+            f.write(f"{timestamp}\t{offset}\n")
+
+    # ════════════════════════════════════════════════════════════
+    # Leitura
+    # ════════════════════════════════════════════════════════════
+
+    def days(self) -> list[date]:
+        """Dias com registros (segmentos JSONL ou Parquet), em ordem."""
+        found = {_day_of(p) for p in self.segments_dir.glob(f"{SEGMENT_PREFIX}*.jsonl")}
+        if self.parquet_dir.exists():
+            found.update(_day_of(p) for p in self.parquet_dir.glob(f"{SEGMENT_PREFIX}*.parquet"))
+        return sorted(found)
+
+    def iter_records(
+        self, start: Optional[datetime] = None, end: Optional[datetime] = None
+    ) -> Iterator[dict]:
+        """Registros JSONL (segmentos e legado) com ``start <= timestamp <= end``.
+
+        Nao inclui os dias ja compactados em Parquet (ver ``read``). O legado
+        so e lido quando a janela cruza o intervalo de timestamps dele.
+        """
+        lo, hi = _iso(start), _iso(end)
+        if self.legacy_file.exists():
+            span = _legacy_span(self.legacy_file)
+            if span is not None and not ((lo and lo > span[1]) or (hi and hi < span[0])):
+                yield from self._scan(self.legacy_file.read_bytes().splitlines(), lo, hi)
+
+        for day in self.days():
+            if (start and day < start.date()) or (end and day > end.date()):
+                continue
+            segment = self.segment_path(day)
+            if segment.exists():
+                yield from self._read_segment(segment, lo, hi)
+
+    def _read_segment(self, segment: Path, lo: Optional[str], hi: Optional[str]) -> Iterator[dict]:
+        index_path = Path(f"{segment}.idx")
+        if not index_path.exists():
+            yield from self._scan(segment.read_bytes().splitlines(), lo, hi)
+            return
+
+        stamps, offsets = [], []
+        with open(index_path, encoding="utf-8") as f:
+            for line in f:
+                stamp, _, offset = line.rstrip("\n").partition("\t")
+                stamps.append(stamp)
+                offsets.append(int(offset))
+
+        if any(b < a for a, b in zip(stamps, stamps[1:])):
+            # Fora de ordem (timestamp retroativo): sem busca binaria
+            yield from self._scan(segment.read_bytes().splitlines(), lo, hi)
+            return
+
+        first = bisect_left(stamps, lo) if lo else 0
+        last = bisect_right(stamps, hi) if hi else len(stamps)
+        if first >= last:
+            return
+        with open(segment, "rb") as f:
+            f.seek(offsets[first])
+            size = offsets[last] - offsets[first] if last < len(offsets) else -1
+            chunk = f.read(size)
+        for line in chunk.splitlines():
+            record = _loads(line)
+            if record is not None:
+                yield record
+
+    @staticmethod
+    def _scan(lines: list[bytes], lo: Optional[str], hi: Optional[str]) -> Iterator[dict]:
+        for line in lines:
+            if not line.strip():
+                continue
+            record = _loads(line)
+            if record is None:
+                continue
+            stamp = record.get("timestamp")
+            if stamp is None or (lo and stamp < lo) or (hi and stamp > hi):
+                continue
+            yield record
+
+    def read(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        columns: Optional[list[str]] = None,
+    ) -> pd.DataFrame:
+        """DataFrame dos registros da janela (Parquet + JSONL), ordenado por timestamp.
+
+        Args:
+            start: Inicio da janela (inclusive); None desde o primeiro registro
+            end: Fim da janela (inclusive); None ate o ultimo
+            columns: Campos desejados (``timestamp`` sempre incluido)
+        """
+        if columns is not None and "timestamp" not in columns:
+            columns = ["timestamp", *columns]
+
+        frames = []
+        for day in self.days():
+            if (start and day < start.date()) or (end and day > end.date()):
+                continue
+            parquet = self.parquet_dir / f"{SEGMENT_PREFIX}{day:%Y%m%d}.parquet"
+            if parquet.exists():
+                frames.append(self._read_parquet(parquet, columns))
+
+        records = list(self.iter_records(start, end))
+        if records:
+            if columns is not None:
+                records = [{c: rec.get(c) for c in columns} for rec in records]
+            frames.append(pd.DataFrame(records))
+
+        frames = [f for f in frames if not f.empty]
+        if not frames:
+            return pd.DataFrame()
+
+        df = pd.concat(frames, ignore_index=True)
+        df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce", format="ISO8601")
+        if start is not None:
+            df = df[df["timestamp"] >= start]
+        if end is not None:
+            df = df[df["timestamp"] <= end]
+        return df.sort_values("timestamp", kind="stable").reset_index(drop=True)
+
+    @staticmethod
+    def _read_parquet(path: Path, columns: Optional[list[str]]) -> pd.DataFrame:
+        df = pd.read_parquet(path)
+        # Campo ausente num dia (registros de outro tipo) vira coluna vazia
+        return df if columns is None else df.reindex(columns=columns)
+
+    def latest(self, lookback_days: int = 1, columns: Optional[list[str]] = None) -> pd.DataFrame:
+        """Registros dos ultimos ``lookback_days`` dias com dados (inclui o legado)."""
+        days = self.days()
+        if not days:
+            return self.read(columns=columns)
+        start = datetime.combine(days[-lookback_days:][0], datetime.min.time())
+        return self.read(start=start, columns=columns)
+
+    def end_cursor(self) -> Optional[tuple[date, int]]:
+        """Posicao do fim do log (ultimo segmento, tamanho) para ``tail``."""
+        days = [d for d in self.days() if self.segment_path(d).exists()]
+        if not days:
+            return None
+        return days[-1], self.segment_path(days[-1]).stat().st_size
+
+    def tail(self, cursor: Optional[tuple[date, int]]) -> tuple[list[dict], Optional[tuple[date, int]]]:
+        """Registros acrescentados depois de ``cursor`` (ver ``end_cursor``).
+
+        Le so os bytes novos do segmento do cursor e os segmentos de dias
+        seguintes; uma linha ainda sem ``\\n`` (escrita em andamento) fica
+        para a proxima chamada. Registros retroativos em dias anteriores
+        ao cursor nao aparecem.
+
+        Returns:
+            (registros novos, cursor atualizado)
+        """
+        records = []
+        for day in self.days():
+            if cursor is not None and day < cursor[0]:
+                continue
+            segment = self.segment_path(day)
+            if not segment.exists():
+                continue
+            offset = cursor[1] if cursor is not None and day == cursor[0] else 0
+            with open(segment, "rb") as f:
+                f.seek(offset)
+                chunk = f.read()
+            complete = chunk.rfind(b"\n") + 1
+            for line in chunk[:complete].splitlines():
+                record = _loads(line) if line.strip() else None
+                if record is not None:
+                    records.append(record)
+            cursor = (day, offset + complete)
+        return records, cursor
+
+    # ════════════════════════════════════════════════════════════
+    # Manutencao
+    # ════════════════════════════════════════════════════════════
+
+    def migrate_legacy(self) -> int:
+        """Distribui o arquivo unico legado em segmentos diarios e o renomeia.
+
+        Returns:
+            Registros migrados
+        """
+        if not self.legacy_file.exists():
+            return 0
+        migrated = 0
+        for line in self.legacy_file.read_bytes().splitlines():
+            record = _loads(line) if line.strip() else None
+            if record is None or "timestamp" not in record:
+                continue
+            self.append(record)
+            migrated += 1
+        self.legacy_file.rename(self.legacy_file.with_suffix(".jsonl.migrated"))
+        logger.info("Reflexoes legadas migradas: %d registros", migrated)
+        return migrated
+
+    def compact(self, before: Optional[date] = None) -> list[Path]:
+        """Converte em Parquet os segmentos de dias anteriores a ``before`` (padrao: hoje).
+
+        Campos aninhados (listas/dicts) viram texto JSON. Se o dia ja tem
+        Parquet (registros retroativos), os dois sao fundidos. O segmento
+        JSONL so e removido depois que o Parquet foi gravado.
+
+        Returns:
+            Arquivos Parquet gravados
+        """
+        before = before or date.today()
+        self.parquet_dir.mkdir(parents=True, exist_ok=True)
+        written = []
+        for day in self.days():
+            segment = self.segment_path(day)
+            if day >= before or not segment.exists():
+                continue
+
+            df = pd.DataFrame(list(self._read_segment(segment, None, None)))
+            for column in df.columns[df.dtypes == object]:
+                df[column] = df[column].map(
+                    lambda v: json.dumps(v, ensure_ascii=False) if isinstance(v, (list, dict)) else v
+                )
+            target = self.parquet_dir / f"{SEGMENT_PREFIX}{day:%Y%m%d}.parquet"
+            if target.exists():
+                df = pd.concat([pd.read_parquet(target), df], ignore_index=True)
+            df = df.sort_values("timestamp", kind="stable").reset_index(drop=True)
+
+            tmp = target.with_suffix(".parquet.tmp")
+            df.to_parquet(tmp, index=False)
+            os.replace(tmp, target)
+            segment.unlink()
+            Path(f"{segment}.idx").unlink(missing_ok=True)
+            written.append(target)
+            logger.info("Segmento %s compactado (%d registros)", segment.name, len(df))
+        return written
@@ -1,16 +1,79 @@
 """Fila de alertas com deduplicação e rate limiting."""
 
 import asyncio
-import hashlib
 import logging
-from datetime import datetime, timedelta
-from typing import Optional
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Hashable, Optional
 
 from src.domain.entities.alerta import AlertaOportunidade
 
 logger = logging.getLogger(__name__)
 
 
+class _CacheExpiravel:
+    """
+    Mapa chave → instante da última ocorrência, com TTL fixo e tamanho limitado.
+
+    Como o TTL é o mesmo para todas as entradas, a ordem de inserção já é
+    a ordem de expiração: um OrderedDict (reinserir move para o fim) faz
+    o papel da roda de tempo/heap. Expirar é tirar do começo enquanto a
+    entrada mais antiga estiver vencida — O(1) amortizado, sem varrer o
+    cache. Acima de ``max_entradas`` a mais antiga sai antes de vencer
+    (contada em ``evictos_capacidade``), o que limita a memória em
+    tempestades de alertas.
+    """
+
+    __slots__ = ("ttl_s", "max_entradas", "evictos_capacidade", "_dados")
+
+    def __init__(self, ttl_s: float, max_entradas: int) -> None:
+        self.ttl_s = ttl_s
+        self.max_entradas = max_entradas
+        self.evictos_capacidade = 0
+        self._dados: OrderedDict[Hashable, float] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._dados)
+
+    def expurgar(self, agora: float) -> int:
+        """Remove as entradas vencidas (só as do começo). Retorna quantas saíram."""
+        dados = self._dados
+        removidas = 0
+        while dados:
+            chave, instante = next(iter(dados.items()))
+            if agora - instante < self.ttl_s:
+                break
+            del dados[chave]
+            removidas += 1
+        return removidas
+
+    def idade(self, chave: Hashable, agora: float) -> Optional[float]:
+        """Segundos desde a última ocorrência ainda válida (None se não há)."""
+        instante = self._dados.get(chave)
+        if instante is None or agora - instante >= self.ttl_s:
+            return None
+        return agora - instante
+
+    def registrar(self, chave: Hashable, agora: float) -> None:
+        self._dados.pop(chave, None)
+        self._dados[chave] = agora
+        if len(self._dados) > self.max_entradas:
+            self._dados.popitem(last=False)
+            self.evictos_capacidade += 1
+
+
+class _ShardPadrao:
+    """Estado de rate limit e dedup de um padrão (cada padrão tem o seu lock)."""
+
+    __slots__ = ("lock", "ultimo_aceite", "dedup")
+
+    def __init__(self, dedup_ttl_seconds: float, max_dedup: int) -> None:
+        self.lock = asyncio.Lock()
+        self.ultimo_aceite: Optional[float] = None
+        self.dedup = _CacheExpiravel(dedup_ttl_seconds, max_dedup)
+
+
 class FilaAlertas:
     """
     Queue de alertas com garantias de entrega e deduplicação.
@@ -24,8 +87,11 @@ class FilaAlertas:
 
     Internamente:
     - asyncio.Queue para ordenação
-    - Dict para dedup cache com TTL
-    - Lock para thread-safety
+    - Um shard por padrão (lock próprio, último aceite do rate limit e
+      cache de dedup), então padrões diferentes não disputam o mesmo lock
+    - Cache de dedup com expiração O(1) amortizada a cada enfileiramento
+      e tamanho máximo por padrão (``max_dedup_por_padrao``)
+    - Relógio monotônico nas janelas (imune a ajuste de hora do sistema)
     """
 
     def __init__(
@@ -33,6 +99,7 @@ class FilaAlertas:
         max_queue_size: int = 100,
         rate_limit_seconds: int = 60,
         dedup_ttl_seconds: int = 120,
+        max_dedup_por_padrao: int = 10_000,
     ):
         """
         Inicializa fila.
@@ -41,22 +108,20 @@ class FilaAlertas:
             max_queue_size: Máximo de alertas na fila
             rate_limit_seconds: Segundos entre alertas do mesmo padrão
             dedup_ttl_seconds: TTL do cache de deduplicação
+            max_dedup_por_padrao: Entradas de dedup retidas por padrão
+                (acima disso a mais antiga sai antes do TTL)
         """
         self.fila = asyncio.Queue(maxsize=max_queue_size)
-        self.lock = asyncio.Lock()
 
-        # Rate limiting: {padrão: timestamp_último_alerta}
-        self.rate_limiter = {}
-
-        # Dedup cache: {hash: timestamp}
-        # Entradas expiram após dedup_ttl_seconds
-        self.dedup_cache = {}
+        # Shards por padrão: {padrão: _ShardPadrao}
+        self._shards: dict[str, _ShardPadrao] = {}
 
         # Alertas em processamento (para backpressure)
         self.em_processamento = set()
 
         self.rate_limit_seconds = rate_limit_seconds
         self.dedup_ttl_seconds = dedup_ttl_seconds
+        self.max_dedup_por_padrao = max_dedup_por_padrao
 
         self.metrics = {
             "total_enfileirados": 0,
@@ -66,13 +131,21 @@ class FilaAlertas:
             "falhas": 0,
         }
 
+    def _shard(self, padrao: str) -> _ShardPadrao:
+        shard = self._shards.get(padrao)
+        if shard is None:
+            shard = self._shards[padrao] = _ShardPadrao(
+                self.dedup_ttl_seconds, self.max_dedup_por_padrao
+            )
+        return shard
+
     async def enfileirar(self, alerta: AlertaOportunidade) -> bool:
         """
         Enfileira alerta com deduplicação e rate limiting.
 
         Lógica STRICT:
         1. Verifica rate limit (máx 1/padrão/minuto)
-        2. Verifica deduplicação (hash do alerta)
+        2. Verifica deduplicação (chave do alerta)
         3. Se passa: enfileira
         4. Se falha rate limit ou dedup: retorna False (não enfileira)
 
@@ -84,39 +157,34 @@ class FilaAlertas:
             False se duplicado/rate-limited
         """
 
-        async with self.lock:
-            agora = datetime.now()
+        padrao = alerta.padrao.value
+        chave = self._chave_dedup(alerta)  # Fora do lock
+        shard = self._shard(padrao)
 
-            # PASSO 1: Verifica rate limiting
-            ultima_vez = self.rate_limiter.get(alerta.padrao.value)
+        async with shard.lock:
+            agora = time.monotonic()
+            shard.dedup.expurgar(agora)
 
-            if ultima_vez:
-                elapsed = (agora - ultima_vez).total_seconds()
+            # PASSO 1: Verifica rate limiting
+            if shard.ultimo_aceite is not None:
+                elapsed = agora - shard.ultimo_aceite
                 if elapsed < self.rate_limit_seconds:
                     logger.debug(
-                        f"Rate limit: {alerta.padrao.value} ainda em cooldown "
-                        f"({elapsed:.1f}s < {self.rate_limit_seconds}s)"
+                        "Rate limit: %s ainda em cooldown (%.1fs < %ss)",
+                        padrao, elapsed, self.rate_limit_seconds,
                     )
                     self.metrics["total_rate_limited"] += 1
                     return False
 
-            # PASSO 2: Verifica deduplicação (hash do alerta)
-            hash_alerta = self._calcular_hash(alerta)
-
-            if hash_alerta in self.dedup_cache:
-                timestamp_cache = self.dedup_cache[hash_alerta]
-                idade = (agora - timestamp_cache).total_seconds()
-
-                if idade < self.dedup_ttl_seconds:
-                    logger.debug(
-                        f"Dedup: alerta {alerta.id} é duplicado "
-                        f"(idade {idade:.1f}s, TTL {self.dedup_ttl_seconds}s)"
-                    )
-                    self.metrics["total_duplicados"] += 1
-                    return False
-                else:
-                    # Cache expirou, remove
-                    del self.dedup_cache[hash_alerta]
+            # PASSO 2: Verifica deduplicação
+            idade = shard.dedup.idade(chave, agora)
+            if idade is not None:
+                logger.debug(
+                    "Dedup: alerta %s é duplicado (idade %.1fs, TTL %ss)",
+                    alerta.id, idade, self.dedup_ttl_seconds,
+                )
+                self.metrics["total_duplicados"] += 1
+                return False
 
             # PASSO 3: Backpressure check (máx 3 simultâneos)
             if len(self.em_processamento) > 3:
@@ -128,16 +196,15 @@ class FilaAlertas:
 
             # PASSO 4: Enfileira
             try:
-                self.fila.put_nowait((alerta, agora))
+                self.fila.put_nowait((alerta, datetime.now()))
 
                 # Atualiza rate limiter e dedup
-                self.rate_limiter[alerta.padrao.value] = agora
-                self.dedup_cache[hash_alerta] = agora
+                shard.ultimo_aceite = agora
+                shard.dedup.registrar(chave, agora)
 
-                logger.info(
-                    f"✅ Alerta enfileirado: {alerta.id} "
-                    f"(padrão: {alerta.padrao.value})"
-                )
+                # Formatação adiada: numa tempestade, montar a mensagem
+                # com o nível desligado custava mais que o próprio dedup
+                logger.info("✅ Alerta enfileirado: %s (padrão: %s)", alerta.id, padrao)
                 self.metrics["total_enfileirados"] += 1
                 alerta.marcar_enfileirado()
 
@@ -190,9 +257,10 @@ class FilaAlertas:
                 self.metrics["falhas"] += 1
                 await asyncio.sleep(1)  # Backoff on error
 
-    def _calcular_hash(self, alerta: AlertaOportunidade) -> str:
+    @staticmethod
+    def _chave_dedup(alerta: AlertaOportunidade) -> tuple:
         """
-        Calcula hash do alerta para deduplicação.
+        Chave do alerta para deduplicação.
 
         Ignora:
         - Timestamp (alertas próximos são "iguais")
@@ -203,27 +271,22 @@ class FilaAlertas:
         - Padrão
         - Preço atual (com tolerância 0.5% = mesma vela)
 
+        A tupla já serve de chave de dict — sem hash criptográfico no
+        caminho do enfileiramento.
+
         Args:
             alerta: AlertaOportunidade
 
         Returns:
-            Hash SHA256 (primeiros 16 chars)
+            Tupla (ativo, padrão, preço arredondado)
         """
 
         # Arredonda preço pra 0.5% (detecção de mesma vela)
-        preco_tolerance = float(alerta.preco_atual) * 0.005
-        preco_rounded = (
-            int(float(alerta.preco_atual) / preco_tolerance) * preco_tolerance
-        )
+        preco = float(getattr(alerta.preco_atual, "value", alerta.preco_atual))
+        preco_tolerance = preco * 0.005
+        preco_rounded = int(preco / preco_tolerance) * preco_tolerance
 
-        dados = (
-            f"{alerta.ativo}|"
-            f"{alerta.padrao.value}|"
-            f"{preco_rounded:.2f}"
-        )
-
-        hash_completo = hashlib.sha256(dados.encode()).hexdigest()
-        return hash_completo[:16]  # Primeiros 16 chars
+        return (str(alerta.ativo), alerta.padrao.value, round(preco_rounded, 2))
 
     def obter_metricas(self) -> dict:
         """
@@ -232,18 +295,24 @@ class FilaAlertas:
         Returns:
             Dict com métricas de performance
         """
+        shards = self._shards.values()
         return {
             **self.metrics,
             "tamanho_fila_atual": self.fila.qsize(),
             "em_processamento": len(self.em_processamento),
-            "rate_limiter_size": len(self.rate_limiter),
-            "dedup_cache_size": len(self.dedup_cache),
+            "rate_limiter_size": sum(1 for s in shards if s.ultimo_aceite is not None),
+            "dedup_cache_size": sum(len(s.dedup) for s in shards),
+            "dedup_evictos_capacidade": sum(s.dedup.evictos_capacidade for s in shards),
         }
 
     async def limpar_cache_expirado(self) -> None:
         """
         Limpa cache de deduplicação expirado periodicamente.
 
+        O enfileiramento já expira as entradas vencidas do seu padrão; este
+        laço só devolve a memória de padrões que pararam de receber
+        alertas. Cada passada custa O(entradas vencidas), não O(cache).
+
         Pode ser executado em background a cada 60 segundos.
         """
 
@@ -251,23 +320,16 @@ class FilaAlertas:
             try:
                 await asyncio.sleep(60)  # Executa a cada 60 segundos
 
-                agora = datetime.now()
-                chaves_expiradas = []
-
-                async with self.lock:
-                    for hash_alerta, timestamp in self.dedup_cache.items():
-                        idade = (agora - timestamp).total_seconds()
-                        if idade > self.dedup_ttl_seconds:
-                            chaves_expiradas.append(hash_alerta)
+                removidas = 0
+                for shard in list(self._shards.values()):
+                    async with shard.lock:
+                        removidas += shard.dedup.expurgar(time.monotonic())
 
-                    for chave in chaves_expiradas:
-                        del self.dedup_cache[chave]
-
-                    if chaves_expiradas:
-                        logger.debug(
-                            f"Limpeza de cache: {len(chaves_expiradas)} "
-                            f"entradas expiradas removidas"
-                        )
+                if removidas:
+                    logger.debug(
+                        f"Limpeza de cache: {removidas} "
+                        f"entradas expiradas removidas"
+                    )
 
             except Exception as e:
                 logger.error(f"Erro ao limpar cache: {e}")
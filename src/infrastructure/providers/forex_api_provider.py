@@ -2,8 +2,12 @@
 
 API gratuita, sem chave, com cotações em tempo real de 150+ moedas.
 Usada como fallback quando o broker MT5 não oferece pares forex.
+
+``AsyncForexAPIProvider`` é a variante assíncrona (httpx), para uso com
+um ``httpx.AsyncClient`` compartilhado pelo processo.
 """
 
+import asyncio
 import logging
 import time
 from dataclasses import dataclass
@@ -12,6 +16,11 @@ from typing import Optional
 
 import requests
 
+try:
+    import httpx
+except ImportError:  # pragma: no cover - dependência opcional (modo async)
+    httpx = None
+
 logger = logging.getLogger(__name__)
 
 # Pares no formato AwesomeAPI (XXX-USD)
@@ -22,6 +31,7 @@ _API_PAIRS = [
 ]
 
 _BASE_URL = "https://economia.awesomeapi.com.br/json/last"
+_BATCH_URL = f"{_BASE_URL}/{','.join(_API_PAIRS)}"
 _DEFAULT_TTL_SECONDS = 60
 _REQUEST_TIMEOUT = 10
 
@@ -81,9 +91,8 @@ class ForexAPIProvider:
 
     def _fetch_all(self) -> None:
         """Faz chamada batch à AwesomeAPI para todos os pares."""
-        url = f"{_BASE_URL}/{','.join(_API_PAIRS)}"
         try:
-            response = requests.get(url, timeout=_REQUEST_TIMEOUT)
+            response = requests.get(_BATCH_URL, timeout=_REQUEST_TIMEOUT)
             response.raise_for_status()
             data = response.json()
         except requests.RequestException as e:
@@ -93,34 +102,117 @@ class ForexAPIProvider:
             logger.warning("Erro ao parsear JSON da API forex: %s", e)
             return
 
-        new_cache: dict[str, ForexQuote] = {}
-
-        for key, val in data.items():
-            try:
-                currency = val.get("code", "")
-                bid = Decimal(str(val.get("bid", "0")))
-                var_bid = Decimal(str(val.get("varBid", "0")))
-                pct_change = Decimal(str(val.get("pctChange", "0")))
-                timestamp = val.get("create_date", "")
-
-                # Abertura = bid - varBid
-                opening = bid - var_bid
-
-                quote = ForexQuote(
-                    currency=currency,
-                    bid=bid,
-                    opening=opening,
-                    pct_change=pct_change,
-                    timestamp=timestamp,
-                )
-                new_cache[currency] = quote
-
-            except (ValueError, TypeError, ArithmeticError) as e:
-                logger.warning(
-                    "Erro ao processar cotação %s: %s", key, e
-                )
-                continue
+        new_cache = _parse_quotes(data)
+        if new_cache:
+            self._cache = new_cache
+            self._cache_timestamp = time.time()
+            logger.info(
+                "Forex API: %d pares atualizados", len(new_cache)
+            )
+        else:
+            logger.warning("Forex API: nenhum par retornado")
+
+    def clear_cache(self) -> None:
+        """Limpa o cache (forçar re-fetch na próxima chamada)."""
+        self._cache.clear()
+        self._cache_timestamp = 0.0
+
+
+def _parse_quotes(data: dict) -> dict[str, ForexQuote]:
+    """Converte a resposta batch da AwesomeAPI em cotações por moeda."""
+    quotes: dict[str, ForexQuote] = {}
+
+    for key, val in data.items():
+        try:
+            currency = val.get("code", "")
+            bid = Decimal(str(val.get("bid", "0")))
+            var_bid = Decimal(str(val.get("varBid", "0")))
+            pct_change = Decimal(str(val.get("pctChange", "0")))
+            timestamp = val.get("create_date", "")
+
+            # Abertura = bid - varBid
+            opening = bid - var_bid
+
+            quotes[currency] = ForexQuote(
+                currency=currency,
+                bid=bid,
+                opening=opening,
+                pct_change=pct_change,
+                timestamp=timestamp,
+            )
+
+        except (ValueError, TypeError, ArithmeticError) as e:
+            logger.warning(
+                "Erro ao processar cotação %s: %s", key, e
+            )
+            continue
+
+    return quotes
+
+
+class AsyncForexAPIProvider:
+    """Variante assíncrona do ``ForexAPIProvider`` (mesmo cache e parsing).
 
+    Usa um ``httpx.AsyncClient`` compartilhado (injetado ou criado sob
+    demanda). Refreshes concorrentes são coalescidos: só uma requisição
+    fica em voo e as demais corrotinas aguardam o mesmo resultado.
+
+    Uso:
+        async with httpx.AsyncClient() as client:
+            provider = AsyncForexAPIProvider(client)
+            quote = await provider.get_quote("EUR")
+    """
+
+    def __init__(
+        self,
+        client: Optional["httpx.AsyncClient"] = None,
+        cache_ttl_seconds: int = _DEFAULT_TTL_SECONDS,
+        timeout_seconds: float = _REQUEST_TIMEOUT,
+    ) -> None:
+        if httpx is None:
+            raise ImportError("httpx é necessário para AsyncForexAPIProvider")
+        self._client = client
+        self._owns_client = client is None
+        self._cache: dict[str, ForexQuote] = {}
+        self._cache_timestamp: float = 0.0
+        self._cache_ttl = cache_ttl_seconds
+        self._timeout = timeout_seconds
+        self._lock = asyncio.Lock()
+
+    async def get_quote(self, currency_code: str) -> Optional[ForexQuote]:
+        """Obtém cotação de uma moeda vs USD (None se indisponível)."""
+        await self._refresh_if_stale()
+        return self._cache.get(currency_code)
+
+    async def get_all_quotes(self) -> dict[str, ForexQuote]:
+        """Retorna todas as cotações cacheadas (12 pares)."""
+        await self._refresh_if_stale()
+        return dict(self._cache)
+
+    async def _refresh_if_stale(self) -> None:
+        if time.time() - self._cache_timestamp < self._cache_ttl:
+            return
+        async with self._lock:
+            # Outra corrotina pode ter atualizado enquanto esperávamos
+            if time.time() - self._cache_timestamp < self._cache_ttl:
+                return
+            await self._fetch_all()
+
+    async def _fetch_all(self) -> None:
+        if self._client is None:
+            self._client = httpx.AsyncClient()
+        try:
+            response = await self._client.get(_BATCH_URL, timeout=self._timeout)
+            response.raise_for_status()
+            data = response.json()
+        except httpx.HTTPError as e:
+            logger.warning("Erro ao buscar cotações forex: %s", e)
+            return
+        except ValueError as e:
+            logger.warning("Erro ao parsear JSON da API forex: %s", e)
+            return
+
+        new_cache = _parse_quotes(data)
         if new_cache:
             self._cache = new_cache
             self._cache_timestamp = time.time()
@@ -134,3 +226,9 @@ class ForexAPIProvider:
         """Limpa o cache (forçar re-fetch na próxima chamada)."""
         self._cache.clear()
         self._cache_timestamp = 0.0
+
+    async def aclose(self) -> None:
+        """Fecha o cliente HTTP se ele foi criado pelo provider."""
+        if self._owns_client and self._client is not None:
+            await self._client.aclose()
+            self._client = None
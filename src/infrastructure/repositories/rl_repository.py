@@ -82,8 +82,23 @@ class SqliteRLRepository(IRLRepository):
     # Horizontes de avaliação de recompensa em minutos
     REWARD_HORIZONS = [5, 15, 30, 60, 120]
 
-    def __init__(self, session: Session) -> None:
+    def __init__(self, session: Session, autocommit: bool = True) -> None:
+        """
+        Args:
+            session: Sessão SQLAlchemy.
+            autocommit: Se False, as escritas só fazem flush e quem criou a
+                sessão decide quando commitar (unidade de persistência do
+                ciclo — um único commit para várias tabelas).
+        """
         self.session = session
+        self.autocommit = autocommit
+
+    def _commit(self) -> None:
+        """Commita (modo padrão) ou apenas envia as escritas pendentes."""
+        if self.autocommit:
+            self.session.commit()
+        else:
+            self.session.flush()
 
     def save_episode(self, episode: dict) -> None:
         """Persiste um episódio completo."""
@@ -172,7 +187,7 @@ class SqliteRLRepository(IRLRepository):
             session_date=episode.get("session_date"),
         )
         self.session.add(model)
-        self.session.commit()
+        self._commit()
 
     def save_correlation_scores(
         self, episode_id: str, scores: list[dict]
@@ -199,7 +214,7 @@ class SqliteRLRepository(IRLRepository):
             )
             self.session.add(model)
 
-        self.session.commit()
+        self._commit()
 
     def save_indicator_values(
         self, episode_id: str, indicators: list[dict]
@@ -220,7 +235,7 @@ class SqliteRLRepository(IRLRepository):
             )
             self.session.add(model)
 
-        self.session.commit()
+        self._commit()
 
     def create_pending_rewards(
         self, episode_id: str, decision_data: dict
@@ -237,7 +252,7 @@ class SqliteRLRepository(IRLRepository):
             )
             self.session.add(model)
 
-        self.session.commit()
+        self._commit()
 
     def evaluate_reward(
         self, episode_id: str, horizon_minutes: int, evaluation: dict
@@ -268,7 +283,7 @@ class SqliteRLRepository(IRLRepository):
         reward.volatility_in_horizon = evaluation.get("volatility_in_horizon")
         reward.is_evaluated = 1
 
-        self.session.commit()
+        self._commit()
 
     def get_pending_rewards(self, horizon_minutes: int) -> list[dict]:
         """Retorna recompensas pendentes de avaliação para um horizonte."""
@@ -590,7 +605,7 @@ class SqliteRLRepository(IRLRepository):
             notes=metrics.get("notes"),
         )
         self.session.add(model)
-        self.session.commit()
+        self._commit()
 
     def seed_dimension_tables(self) -> None:
         """Popula tabelas de dimensão com dados do item_registry.
@@ -691,4 +706,4 @@ class SqliteRLRepository(IRLRepository):
             )
             self.session.add(model)
 
-        self.session.commit()
+        self._commit()
@@ -6,7 +6,10 @@ FastAPI + WebSockets para real-time delivery de alertas.
 
 import asyncio
 import logging
-from typing import Set
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional, Set
 import json
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
@@ -17,38 +20,218 @@ logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Alertas Automáticos - WebSocket Server")
 
+# Envio por cliente: fila limitada + task escritora. Um operador lento
+# nunca atrasa os demais; quem não acompanha é desconectado (reconecta
+# e recupera o histórico) em vez de acumular memória no servidor.
+CLIENT_QUEUE_SIZE = 100        # Mensagens pendentes por cliente antes de evictar
+SEND_TIMEOUT_S = 5.0           # Envio individual mais lento que isso = cliente lento
+LATENCY_WINDOW = 1000          # Amostras para os percentis de /metrics
+CLOSE_CODE_SLOW_CONSUMER = 1013  # "Try Again Later" (RFC 6455)
+
+
+def serializar_payload(message: dict) -> str:
+    """JSON idêntico ao de ``WebSocket.send_json`` (serializado uma vez)."""
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+
+@dataclass
+class _ClientChannel:
+    """Fila de saída e task escritora de um cliente."""
+
+    websocket: WebSocket
+    queue: asyncio.Queue
+    task: Optional[asyncio.Task] = None
+    sent: int = 0
+
+    def discard_pending(self) -> int:
+        """Descarta mensagens ainda na fila (mantém ``join()`` consistente)."""
+        dropped = 0
+        while True:
+            try:
+                self.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return dropped
+            self.queue.task_done()
+            dropped += 1
+
+
+@dataclass
+class BroadcastMetrics:
+    """Contadores de envio expostos em /metrics."""
+
+    broadcasts: int = 0
+    messages_sent: int = 0
+    drops: int = 0            # Mensagens descartadas (fila cheia/cliente evictado)
+    evictions: int = 0        # Clientes lentos desconectados
+    send_errors: int = 0
+    # (envio em ms, enfileirado→entregue em ms)
+    latencies_ms: deque = field(default_factory=lambda: deque(maxlen=LATENCY_WINDOW))
+
+
+def _percentil(valores: list[float], p: float) -> float:
+    if not valores:
+        return 0.0
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p))]
+
+
 # Connection manager (broadcast para múltiplos operadores)
 class ConnectionManager:
-    def __init__(self):
+    def __init__(
+        self,
+        queue_size: int = CLIENT_QUEUE_SIZE,
+        send_timeout_s: float = SEND_TIMEOUT_S,
+    ):
         self.active_connections: Set[WebSocket] = set()
+        self.queue_size = queue_size
+        self.send_timeout_s = send_timeout_s
+        self.metrics = BroadcastMetrics()
+        self._channels: dict[WebSocket, _ClientChannel] = {}
+        self._closing: Set[asyncio.Task] = set()
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
         self.active_connections.add(websocket)
+        self._channel(websocket)
         logger.info(f"Cliente conectado. Total: {len(self.active_connections)}")
 
     def disconnect(self, websocket: WebSocket):
         self.active_connections.discard(websocket)
+        channel = self._channels.pop(websocket, None)
+        if channel is not None:
+            self.metrics.drops += channel.discard_pending()
+            task = channel.task
+            if task is not None and task is not asyncio.current_task():
+                task.cancel()
         logger.info(f"Cliente desconectado. Total: {len(self.active_connections)}")
 
-    async def broadcast(self, message: dict):
-        """Envia alerta para todos os clientes conectados."""
-        failed_connections = []
+    async def broadcast(self, message: dict) -> int:
+        """Enfileira o alerta para todos os clientes conectados.
 
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.error(f"Erro ao enviar para cliente: {e}")
-                failed_connections.append(connection)
+        Serializa uma única vez e retorna sem esperar pelos envios (cada
+        cliente tem sua task escritora). Cliente com a fila cheia é
+        evictado como consumidor lento.
+
+        Returns:
+            Número de clientes para os quais o alerta foi enfileirado.
+        """
+        payload = serializar_payload(message)
+        enqueued_at = time.perf_counter()
+        self.metrics.broadcasts += 1
+        delivered = 0
 
-        # Remove conexões que falharam
-        for conn in failed_connections:
+        for connection in list(self.active_connections):
+            channel = self._channel(connection)
+            try:
+                channel.queue.put_nowait((payload, enqueued_at))
+                delivered += 1
+            except asyncio.QueueFull:
+                self.metrics.drops += 1
+                self._evict(channel, f"fila cheia ({self.queue_size} pendentes)")
+
+        return delivered
+
+    async def drain(self, timeout: Optional[float] = None) -> None:
+        """Aguarda as filas de todos os clientes esvaziarem (testes/shutdown)."""
+        joins = [c.queue.join() for c in list(self._channels.values())]
+        if joins:
+            await asyncio.wait_for(asyncio.gather(*joins), timeout)
+
+    async def close_all(self) -> None:
+        """Desconecta todos os clientes e encerra as tasks escritoras."""
+        tasks = [c.task for c in self._channels.values() if c.task is not None]
+        for conn in list(self.active_connections):
             self.disconnect(conn)
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
 
     def get_active_count(self) -> int:
         return len(self.active_connections)
 
+    def snapshot_metrics(self) -> dict:
+        """Profundidade das filas, latência de envio e descartes."""
+        depths = [c.queue.qsize() for c in self._channels.values()]
+        samples = list(self.metrics.latencies_ms)
+        send_ms = [s for s, _ in samples]
+        delivery_ms = [d for _, d in samples]
+        return {
+            "active_connections": self.get_active_count(),
+            "status": "running",
+            "broadcasts": self.metrics.broadcasts,
+            "messages_sent": self.metrics.messages_sent,
+            "drops": self.metrics.drops,
+            "evictions": self.metrics.evictions,
+            "send_errors": self.metrics.send_errors,
+            "queue_depth": {
+                "total": sum(depths),
+                "max": max(depths, default=0),
+                "capacity": self.queue_size,
+            },
+            "send_latency_ms": {
+                "p50": round(_percentil(send_ms, 0.50), 3),
+                "p95": round(_percentil(send_ms, 0.95), 3),
+                "max": round(max(send_ms, default=0.0), 3),
+            },
+            "delivery_latency_ms": {
+                "p50": round(_percentil(delivery_ms, 0.50), 3),
+                "p95": round(_percentil(delivery_ms, 0.95), 3),
+                "max": round(max(delivery_ms, default=0.0), 3),
+            },
+        }
+
+    # ── Internos ──
+
+    def _channel(self, websocket: WebSocket) -> _ClientChannel:
+        channel = self._channels.get(websocket)
+        if channel is None:
+            channel = _ClientChannel(websocket, asyncio.Queue(maxsize=self.queue_size))
+            channel.task = asyncio.create_task(self._writer(channel))
+            self._channels[websocket] = channel
+        return channel
+
+    async def _writer(self, channel: _ClientChannel) -> None:
+        """Envia a fila de um cliente em ordem; falha ou lentidão desconecta."""
+        ws = channel.websocket
+        metrics = self.metrics
+        while True:
+            payload, enqueued_at = await channel.queue.get()
+            try:
+                t0 = time.perf_counter()
+                # asyncio.timeout (e nao wait_for): o envio roda na propria task
+                async with asyncio.timeout(self.send_timeout_s):
+                    await ws.send_text(payload)
+                done = time.perf_counter()
+            except asyncio.TimeoutError:
+                metrics.drops += 1
+                self._evict(channel, f"envio > {self.send_timeout_s:.1f}s")
+                return
+            except Exception as e:
+                logger.error(f"Erro ao enviar para cliente: {e}")
+                metrics.send_errors += 1
+                metrics.drops += 1
+                self.disconnect(ws)
+                return
+            finally:
+                channel.queue.task_done()
+            channel.sent += 1
+            metrics.messages_sent += 1
+            metrics.latencies_ms.append(((done - t0) * 1000, (done - enqueued_at) * 1000))
+
+    def _evict(self, channel: _ClientChannel, motivo: str) -> None:
+        """Desconecta um consumidor lento e fecha o socket em background."""
+        logger.warning(f"Cliente lento desconectado: {motivo}")
+        self.metrics.evictions += 1
+        self.disconnect(channel.websocket)
+        task = asyncio.create_task(self._close_quietly(channel.websocket))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def _close_quietly(self, websocket: WebSocket) -> None:
+        try:
+            await websocket.close(code=CLOSE_CODE_SLOW_CONSUMER)
+        except Exception:
+            pass
+
 
 manager = ConnectionManager()
 
@@ -66,11 +249,8 @@ async def health_check():
 
 @app.get("/metrics")
 async def metrics():
-    """Métricas do servidor."""
-    return {
-        "active_connections": manager.get_active_count(),
-        "status": "running"
-    }
+    """Métricas do servidor (conexões, filas de envio, latência e descartes)."""
+    return manager.snapshot_metrics()
 
 
 @app.websocket("/alertas")
@@ -394,8 +574,11 @@ async def startup():
 async def shutdown():
     """Shutdown event."""
     logger.info("🛑 WebSocket Server desligando...")
-    for conn in list(manager.active_connections):
-        manager.disconnect(conn)
+    try:
+        await manager.drain(timeout=2.0)
+    except asyncio.TimeoutError:
+        logger.warning("Filas de envio não esvaziaram no shutdown")
+    await manager.close_all()
 
 
 app.add_event_handler("startup", startup)
@@ -14,7 +14,7 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent / ".." / "src"))
 
-from interfaces.websocket_server import app, ConnectionManager
+from interfaces.websocket_server import app, ConnectionManager, serializar_payload
 
 
 class TestConnectionManager:
@@ -57,17 +57,18 @@ class TestConnectionManager:
         for _ in range(3):
             mock_ws = AsyncMock()
             mock_ws.accept = AsyncMock()
-            mock_ws.send_json = AsyncMock()
+            mock_ws.send_text = AsyncMock()
             clientes.append(mock_ws)
             await manager.connect(mock_ws)
 
-        # Broadcast
+        # Broadcast (enfileira; cada cliente tem sua task escritora)
         mensagem = {"alerta": "test"}
-        await manager.broadcast(mensagem)
+        assert await manager.broadcast(mensagem) == 3
+        await manager.drain(timeout=1)
 
-        # Verificar que todos receberam
+        # Verificar que todos receberam o mesmo payload pré-serializado
         for cliente in clientes:
-            cliente.send_json.assert_called_once_with(mensagem)
+            cliente.send_text.assert_called_once_with(serializar_payload(mensagem))
 
     @pytest.mark.asyncio
     async def test_manager_broadcast_remove_cliente_falhado(self):
@@ -77,12 +78,12 @@ class TestConnectionManager:
         # Cliente que falha
         mock_ws_fail = AsyncMock()
         mock_ws_fail.accept = AsyncMock()
-        mock_ws_fail.send_json = AsyncMock(side_effect=Exception("Erro envio"))
+        mock_ws_fail.send_text = AsyncMock(side_effect=Exception("Erro envio"))
 
         # Cliente que funciona
         mock_ws_ok = AsyncMock()
         mock_ws_ok.accept = AsyncMock()
-        mock_ws_ok.send_json = AsyncMock()
+        mock_ws_ok.send_text = AsyncMock()
 
         await manager.connect(mock_ws_fail)
         await manager.connect(mock_ws_ok)
@@ -90,6 +91,7 @@ class TestConnectionManager:
         # Broadcast com falha
         mensagem = {"alerta": "test"}
         await manager.broadcast(mensagem)
+        await manager.drain(timeout=1)
 
         # Cliente falhado deve ser removido
         assert manager.get_active_count() == 1
@@ -97,6 +99,88 @@ class TestConnectionManager:
         assert mock_ws_fail not in manager.active_connections
 
 
+class TestBroadcastFilasPorCliente:
+    """Filas de saída por cliente: cliente lento não atrasa os demais."""
+
+    class _Cliente:
+        """WebSocket falso leve (registra o que recebeu)."""
+
+        def __init__(self, atraso_s: float = 0.0):
+            self.atraso_s = atraso_s
+            self.recebidos = []
+            self.fechado_com = None
+
+        async def accept(self):
+            pass
+
+        async def send_text(self, payload):
+            if self.atraso_s:
+                await asyncio.sleep(self.atraso_s)
+            self.recebidos.append(payload)
+
+        async def close(self, code=1000):
+            self.fechado_com = code
+
+    @pytest.mark.asyncio
+    async def test_cliente_lento_nao_atrasa_os_demais(self):
+        manager = ConnectionManager(send_timeout_s=0.3)
+        lento, rapido = self._Cliente(atraso_s=5), self._Cliente()
+        await manager.connect(lento)
+        await manager.connect(rapido)
+
+        await manager.broadcast({"id": 1})
+        await asyncio.sleep(0.05)
+        assert rapido.recebidos == [serializar_payload({"id": 1})]
+        assert lento.recebidos == []
+
+        # Envio acima do timeout: consumidor lento é desconectado
+        await asyncio.sleep(0.4)
+        assert lento not in manager.active_connections
+        assert manager.metrics.evictions == 1
+        assert lento.fechado_com == 1013
+        await manager.close_all()
+
+    @pytest.mark.asyncio
+    async def test_fila_cheia_evicta_e_conta_descartes(self):
+        manager = ConnectionManager(queue_size=2, send_timeout_s=10)
+        lento, rapido = self._Cliente(atraso_s=10), self._Cliente()
+        await manager.connect(lento)
+        await manager.connect(rapido)
+
+        for i in range(5):
+            await manager.broadcast({"id": i})
+            await asyncio.sleep(0)
+        await manager.drain(timeout=1)
+
+        assert len(rapido.recebidos) == 5
+        assert lento not in manager.active_connections
+        metricas = manager.snapshot_metrics()
+        assert metricas["evictions"] == 1
+        assert metricas["drops"] >= 3
+        assert metricas["messages_sent"] == 5
+        assert metricas["queue_depth"]["total"] == 0
+        await manager.close_all()
+
+    @pytest.mark.asyncio
+    async def test_payload_serializado_uma_vez(self):
+        manager = ConnectionManager()
+        clientes = [self._Cliente() for _ in range(10)]
+        for c in clientes:
+            await manager.connect(c)
+
+        await manager.broadcast({"ativo": "WIN$N", "nível": "CRÍTICO"})
+        await manager.drain(timeout=1)
+
+        # Mesmo objeto str para todos: serializado uma única vez
+        enviados = [c.recebidos[0] for c in clientes]
+        assert all(p is enviados[0] for p in enviados)
+        assert enviados[0] == json.dumps(
+            {"ativo": "WIN$N", "nível": "CRÍTICO"}, separators=(",", ":"), ensure_ascii=False
+        )
+        assert manager.snapshot_metrics()["send_latency_ms"]["max"] >= 0
+        await manager.close_all()
+
+
 class TestWebSocketAPI:
     """Testes para API REST do WebSocket server."""
 
@@ -120,6 +204,9 @@ class TestWebSocketAPI:
         data = response.json()
         assert "active_connections" in data
         assert data["status"] == "running"
+        assert "queue_depth" in data
+        assert "send_latency_ms" in data
+        assert "drops" in data
 
     def test_config_endpoint(self):
         """Testa endpoint /config."""
@@ -168,7 +255,7 @@ async def test_broadcast_alert_funcao():
     # Adicionar cliente mock
     mock_ws = AsyncMock()
     mock_ws.accept = AsyncMock()
-    mock_ws.send_json = AsyncMock()
+    mock_ws.send_text = AsyncMock()
 
     await manager.connect(mock_ws)
 
@@ -182,9 +269,10 @@ async def test_broadcast_alert_funcao():
     }
 
     await broadcast_alert(alerta)
+    await manager.drain(timeout=1)
 
     # Verificar envio
-    mock_ws.send_json.assert_called_once_with(alerta)
+    mock_ws.send_text.assert_called_once_with(serializar_payload(alerta))
 
     # Cleanup
     manager.disconnect(mock_ws)
@@ -0,0 +1,40 @@
+"""Lições do BDI — anotação no log de reflections uma vez por BDI/pregão alvo."""
+
+import os
+import sys
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from src.infrastructure.database.reflection_log import ReflectionLog
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "scripts"))
+
+from aplicar_licoes_bdi import LessonContext, _append_reflection_once  # noqa: E402
+
+
+@pytest.fixture
+def ctx(tmp_path, monkeypatch):
+    log = ReflectionLog(tmp_path / "reflections")
+    monkeypatch.setattr(LessonContext, "reflections_log", property(lambda self: log))
+    return LessonContext(bdi_date_code="20260210", target_date="2026-02-11")
+
+
+def test_anotacao_nao_duplica(ctx):
+    assert _append_reflection_once(ctx, "1.000", "900") is True
+    assert _append_reflection_once(ctx, "1.000", "900") is False
+    outro = LessonContext(bdi_date_code="20260210", target_date="2026-02-12")
+    assert _append_reflection_once(outro, "1.000", "900") is True
+    assert len(list(ctx.reflections_log.iter_records())) == 2
+
+
+def test_anotacao_em_dia_compactado_nao_duplica(ctx):
+    pytest.importorskip("pyarrow")
+    log = ctx.reflections_log
+    assert _append_reflection_once(ctx, "1.000", "900") is True
+    # Outro registro no dia seguinte para a compactação levar o dia da anotação
+    log.append({"timestamp": (datetime.now() + timedelta(days=1)).isoformat(), "mood": "Atento"})
+    log.compact(before=date.today() + timedelta(days=1))
+    assert list(log.iter_records(end=datetime.now())) == []
+
+    assert _append_reflection_once(ctx, "1.000", "900") is False
@@ -0,0 +1,180 @@
+"""Testes do AsyncMacroScoreEngine (paridade com o engine sincrono)."""
+
+import asyncio
+import json
+import random
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from src.application.services.macro_score.async_engine import AsyncMacroScoreEngine
+from src.application.services.macro_score.engine import MacroScoreEngine
+from src.domain.enums.trading_enums import TimeFrame
+from src.domain.value_objects import Price, Symbol
+from src.infrastructure.adapters.mt5_adapter import Candle, TickData
+from src.infrastructure.providers.forex_api_provider import _parse_quotes
+
+_FOREX_PAYLOAD = {
+    f"{c}USD": {"code": c, "bid": str(1 + i / 10), "varBid": str((-1) ** i * 0.01),
+                "pctChange": "0.5", "create_date": "2026-02-16 10:00:00"}
+    for i, c in enumerate(["EUR", "GBP", "AUD", "NZD", "CAD", "CNY",
+                           "MXN", "ZAR", "TRY", "CLP", "CHF", "JPY"])
+}
+
+
+def _seed(symbol: str) -> int:
+    return zlib.crc32(symbol.encode())
+
+
+class FakeMT5:
+    """Terminal deterministico: ~2/3 dos simbolos existem, forex nunca."""
+
+    def __init__(self) -> None:
+        self.threads: set[str] = set()
+
+    def _known(self, symbol: str) -> bool:
+        if "USD" in symbol:
+            return False  # Pares forex: vao para a API
+        return _seed(symbol) % 3 != 0 or symbol.startswith("WIN")
+
+    def _touch(self) -> None:
+        self.threads.add(threading.current_thread().name)
+
+    def select_symbol(self, symbol: str) -> bool:
+        self._touch()
+        return self._known(symbol)
+
+    def get_available_symbols(self, prefix: str) -> list[str]:
+        return []
+
+    def get_symbol_info_tick(self, symbol: str):
+        self._touch()
+        if not self._known(symbol):
+            return None
+        last = Decimal(1000 + _seed(symbol) % 500)
+        return TickData(
+            symbol=Symbol("WIN$N"), bid=Price(last), ask=Price(last + 1),
+            last=Price(last), volume=10,
+            timestamp=datetime.utcnow() - timedelta(hours=3),
+        )
+
+    def get_daily_candle(self, symbol: str):
+        self._touch()
+        if not self._known(symbol) or _seed(symbol) % 5 == 0:
+            return None
+        base = Decimal(1000 + _seed(symbol) % 500)
+        opening = base + (_seed(symbol) % 7 - 3)
+        return Candle(
+            symbol=Symbol("WIN$N"), timeframe=TimeFrame.D1,
+            open=Price(opening), high=Price(base + 10), low=Price(base - 10),
+            close=Price(base), volume=100, timestamp=datetime(2026, 2, 16),
+        )
+
+    def get_candles(self, symbol, timeframe, count):
+        self._touch()
+        rng = random.Random(_seed(str(symbol)) + count)
+        price = 130000
+        ts = datetime(2026, 2, 16, 9, 0)
+        out = []
+        for _ in range(count):
+            o = price
+            c = price + 5 * rng.randint(-10, 10)
+            out.append(Candle(
+                symbol=Symbol("WIN$N"), timeframe=timeframe,
+                open=Price(Decimal(o)), high=Price(Decimal(max(o, c) + 15)),
+                low=Price(Decimal(min(o, c) - 15)), close=Price(Decimal(c)),
+                volume=rng.randint(100, 900), timestamp=ts,
+            ))
+            price = c
+            ts += timedelta(minutes=5)
+        return out
+
+
+@pytest.fixture(autouse=True)
+def _sem_banco():
+    """Isola o teste do SQLite (leituras sem historico, escritas no-op)."""
+    with patch.object(MacroScoreEngine, "_save_tick_to_db"), \
+            patch.object(MacroScoreEngine, "_save_candle_to_db"), \
+            patch.object(MacroScoreEngine, "_get_open_from_db", return_value=None), \
+            patch.object(MacroScoreEngine, "_get_latest_from_db", return_value=None):
+        yield
+
+
+def _http_client(delay_s: float = 0.0) -> "httpx.AsyncClient":
+    async def handler(request):
+        if delay_s:
+            await asyncio.sleep(delay_s)
+        return httpx.Response(200, content=json.dumps(_FOREX_PAYLOAD))
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def _sync_result():
+    engine = MacroScoreEngine(FakeMT5())
+    engine._forex_api._cache = _parse_quotes(_FOREX_PAYLOAD)
+    engine._forex_api._cache_timestamp = time.time()
+    return engine.analyze()
+
+
+def _key(result):
+    items = [
+        (i.item_number, i.resolved_symbol, i.opening_price, i.current_price,
+         i.raw_score, i.final_score, i.weighted_score, i.available, i.detail)
+        for i in result.items
+    ]
+    return (items, result.score_final, result.signal, result.confidence,
+            result.win_price, result.summary)
+
+
+def test_resultado_igual_ao_engine_sincrono():
+    expected = _sync_result()
+
+    async def run():
+        async with _http_client() as client:
+            engine = AsyncMacroScoreEngine(FakeMT5(), http_client=client)
+            try:
+                return await engine.analyze_async()
+            finally:
+                await engine.aclose()
+
+    result = asyncio.run(run())
+    assert _key(result) == _key(expected)
+    assert any(i.resolved_symbol == "API:EUR/USD" for i in result.items)
+
+
+def test_mt5_roda_em_thread_dedicada():
+    mt5 = FakeMT5()
+
+    async def run():
+        async with _http_client() as client:
+            engine = AsyncMacroScoreEngine(mt5, http_client=client)
+            await engine.analyze_async()
+            await engine.aclose()
+
+    asyncio.run(run())
+    assert mt5.threads and all(t.startswith("macro-mt5") for t in mt5.threads)
+
+
+def test_api_lenta_nao_atrasa_itens_mt5():
+    async def run():
+        async with _http_client(delay_s=2.0) as client:
+            engine = AsyncMacroScoreEngine(
+                FakeMT5(), http_client=client, http_timeout_s=0.2,
+            )
+            t0 = time.perf_counter()
+            result = await engine.analyze_async()
+            elapsed = time.perf_counter() - t0
+            await engine.aclose()
+            return result, elapsed
+
+    result, elapsed = asyncio.run(run())
+    assert elapsed < 1.5
+    forex_api = [i for i in result.items if i.category == "FOREX"]
+    assert forex_api and not any(i.available for i in forex_api)
+    assert result.items_available > 0
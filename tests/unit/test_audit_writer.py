@@ -0,0 +1,149 @@
+"""Escritor de auditoria em lote (AuditBatchWriter / AuditoriaAlertas)."""
+
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from src.infrastructure.database.audit_writer import AuditBatchWriter
+from src.infrastructure.database.auditoria_alertas import AuditoriaAlertas
+
+INSERT = "INSERT INTO t (n) VALUES (?)"
+
+
+def _db(tmp_path) -> str:
+    path = str(tmp_path / "audit.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE t (n INTEGER NOT NULL)")
+    return path
+
+
+def _valores(path) -> list[int]:
+    with sqlite3.connect(path) as conn:
+        return [n for (n,) in conn.execute("SELECT n FROM t ORDER BY rowid")]
+
+
+def test_grava_em_lotes_na_ordem(tmp_path):
+    path = _db(tmp_path)
+    writer = AuditBatchWriter(path, batch_size=100, flush_interval_s=0.2).start()
+    for i in range(250):
+        writer.registrar(INSERT, (i,))
+    assert writer.flush(timeout=5)
+
+    assert _valores(path) == list(range(250))
+    assert writer.metrics.written == 250
+    assert writer.metrics.batches <= 5
+    assert writer.metrics.max_batch == 100
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    writer.close()
+
+
+def test_registrar_nao_espera_o_disco(tmp_path):
+    path = _db(tmp_path)
+    liberado = threading.Event()
+    writer = AuditBatchWriter(
+        path, flush_interval_s=0, on_batch=lambda conn, regs: liberado.wait(5),
+    ).start()
+    writer.registrar(INSERT, (0,))
+    time.sleep(0.05)  # escritor preso na transação
+
+    t0 = time.perf_counter()
+    for i in range(1, 1001):
+        writer.registrar(INSERT, (i,))
+    assert time.perf_counter() - t0 < 0.5
+    assert writer.metrics.pending == 1000
+
+    liberado.set()
+    writer.close()
+    assert _valores(path) == list(range(1001))
+
+
+def test_close_grava_pendentes_e_depois_grava_sincrono(tmp_path):
+    path = _db(tmp_path)
+    writer = AuditBatchWriter(path, flush_interval_s=10).start()
+    for i in range(10):
+        writer.registrar(INSERT, (i,))
+    assert writer.close(timeout=5)
+    assert _valores(path) == list(range(10))
+
+    writer.registrar(INSERT, (10,))
+    assert _valores(path)[-1] == 10
+
+
+def test_registro_invalido_nao_derruba_o_lote(tmp_path):
+    path = _db(tmp_path)
+    writer = AuditBatchWriter(path, flush_interval_s=0.2).start()
+    writer.registrar(INSERT, (1,))
+    writer.registrar(INSERT, (None,))  # viola NOT NULL
+    writer.registrar(INSERT, (3,))
+    writer.close(timeout=5)
+
+    assert _valores(path) == [1, 3]
+    assert writer.metrics.rejected == 1
+
+
+def test_erro_inesperado_isola_o_registro_e_mantem_a_thread(tmp_path):
+    path = _db(tmp_path)
+
+    def on_batch(conn, regs):
+        if any(params == (3,) for _, params in regs):
+            raise RuntimeError("falha no hook")
+
+    writer = AuditBatchWriter(path, flush_interval_s=0.2, on_batch=on_batch).start()
+    writer.registrar(INSERT, (1,))
+    writer.registrar(INSERT, (2**70,))  # OverflowError ao vincular o parâmetro
+    writer.registrar(INSERT, (3,))
+    writer.registrar(INSERT, (4,))
+    assert writer.flush(timeout=5)
+
+    assert _valores(path) == [1, 4]
+    assert writer.metrics.rejected == 2
+    assert writer._thread.is_alive()
+    writer.registrar(INSERT, (5,))
+    writer.close(timeout=5)
+    assert _valores(path) == [1, 4, 5]
+
+
+def test_thread_morta_cai_para_gravacao_sincrona(tmp_path):
+    path = _db(tmp_path)
+    writer = AuditBatchWriter(path, flush_interval_s=10)
+    writer._thread = threading.Thread(target=lambda: None)  # "morreu" sem drenar
+    writer._thread.start()
+    writer._thread.join()
+    writer._pending.append(((INSERT, (1,)), time.monotonic()))
+
+    assert writer.flush()  # não fica esperando para sempre
+    assert _valores(path) == [1]
+    writer.registrar(INSERT, (2,))
+    assert _valores(path) == [1, 2]
+    assert writer.close()
+
+
+def test_auditoria_le_o_que_registrou_e_persiste_no_fechar(tmp_path):
+    db_file = str(tmp_path / "alertas.db")
+    auditoria = AuditoriaAlertas(db_path=db_file, flush_interval_s=10)
+    agora = datetime.now()
+    for i in range(3):
+        auditoria.registrar_alerta(
+            alerta_id=f"a{i}", ativo="WIN$N", padrao="volatilidade_extrema",
+            nivel="ALTO", timestamp_deteccao=agora, preco_atual=130000.0,
+            entrada_min=129950.0, entrada_max=130050.0, stop_loss=129700.0,
+        )
+        auditoria.registrar_entrega(alerta_id=f"a{i}", canal="websocket",
+                                    status="entregue", latencia_ms=3)
+    auditoria.registrar_alerta(  # id repetido é ignorado
+        alerta_id="a0", ativo="WIN$N", padrao="volatilidade_extrema", nivel="ALTO",
+        timestamp_deteccao=agora, preco_atual=1.0, entrada_min=1.0,
+        entrada_max=2.0, stop_loss=0.5,
+    )
+
+    assert len(auditoria.consultar_alertas(padrao="volatilidade_extrema")) == 3
+    assert auditoria.obter_estatisticas(dias=1)["taxa_entrega"] == 1.0
+
+    auditoria.registrar_acao_operador(
+        alerta_id="a0", operador_username="op", acao="EXECUTOU", timestamp_acao=agora,
+    )
+    auditoria.fechar()
+    with sqlite3.connect(db_file) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM acao_operador_audit").fetchone()[0] == 1
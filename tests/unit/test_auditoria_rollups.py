@@ -0,0 +1,99 @@
+"""Rollups diários da auditoria de alertas (estatísticas sem varrer o log bruto)."""
+
+import sqlite3
+from datetime import datetime, timedelta
+
+from src.infrastructure.database.auditoria_alertas import AuditoriaAlertas
+
+
+def _alerta(auditoria, alerta_id, quando, nivel="ALTO", padrao="volatilidade_extrema"):
+    auditoria.registrar_alerta(
+        alerta_id=alerta_id, ativo="WIN$N", padrao=padrao, nivel=nivel,
+        timestamp_deteccao=quando, preco_atual=130000.0, entrada_min=129950.0,
+        entrada_max=130050.0, stop_loss=129700.0,
+    )
+
+
+def _popular(auditoria, agora):
+    antigo = agora - timedelta(days=40)
+    _alerta(auditoria, "velho", antigo)
+    for i in range(6):
+        _alerta(auditoria, f"a{i}", agora, nivel="CRÍTICO" if i % 3 == 0 else "ALTO",
+                padrao="break_suporte" if i % 2 else "volatilidade_extrema")
+    _alerta(auditoria, "a0", agora)  # duplicado: não conta
+    for i, status in enumerate(["entregue", "entregue", "entregue", "falha"]):
+        auditoria.registrar_entrega(alerta_id=f"a{i}", canal="websocket",
+                                    status=status, latencia_ms=10 * (i + 1))
+    auditoria.registrar_entrega(alerta_id="a0", canal="email", status="entregue",
+                                latencia_ms=2000)
+    for acao in ("EXECUTOU", "REJEITOU", "EXECUTOU", "TIMEOUT"):
+        auditoria.registrar_acao_operador(alerta_id="a1", operador_username="op",
+                                          acao=acao, timestamp_acao=agora)
+
+
+def test_estatisticas_vem_dos_rollups(tmp_path):
+    auditoria = AuditoriaAlertas(db_path=str(tmp_path / "a.db"))
+    _popular(auditoria, datetime.now())
+
+    stats = auditoria.obter_estatisticas(dias=30)
+    assert stats["total_alertas"] == 6
+    assert stats["alertas_por_nivel"] == {"CRÍTICO": 2, "ALTO": 4}
+    assert stats["alertas_por_padrao"] == {"break_suporte": 3, "volatilidade_extrema": 3}
+    assert stats["taxa_entrega"] == 4 / 5
+    assert stats["entregas_por_canal"]["websocket"] == {
+        "latencia_media_ms": 20.0, "entregue": 3, "falha": 1,
+    }
+    assert stats["acoes_por_tipo"] == {"EXECUTOU": 2, "REJEITOU": 1, "TIMEOUT": 1}
+    assert stats["taxa_execucao"] == 0.5
+
+    assert auditoria.obter_estatisticas(dias=60)["total_alertas"] == 7
+    auditoria.fechar()
+
+
+def test_rollups_batem_com_contagem_do_log_bruto(tmp_path):
+    auditoria = AuditoriaAlertas(db_path=str(tmp_path / "a.db"))
+    _popular(auditoria, datetime.now())
+    auditoria.flush()
+    conn = auditoria.conn
+    for bruto, rollup in (
+        ("SELECT date(timestamp_deteccao), nivel, padrao, COUNT(*) FROM alertas_audit "
+         "GROUP BY 1, 2, 3", "SELECT dia, nivel, padrao, total FROM alertas_diario"),
+        ("SELECT date(timestamp_tentativa), canal, status, COUNT(*) FROM entrega_audit "
+         "GROUP BY 1, 2, 3", "SELECT dia, canal, status, total FROM entrega_diario"),
+        ("SELECT date(timestamp_acao), acao, COUNT(*) FROM acao_operador_audit "
+         "GROUP BY 1, 2", "SELECT dia, acao, total FROM acao_diario"),
+    ):
+        assert sorted(map(tuple, conn.execute(bruto))) == sorted(map(tuple, conn.execute(rollup)))
+    auditoria.fechar()
+
+
+def test_banco_antigo_ganha_rollups_reconstruidos(tmp_path):
+    db_file = str(tmp_path / "a.db")
+    auditoria = AuditoriaAlertas(db_path=db_file)
+    _popular(auditoria, datetime.now())
+    esperado = auditoria.obter_estatisticas(dias=30)
+    auditoria.fechar()
+
+    with sqlite3.connect(db_file) as conn:  # como era antes dos rollups
+        for tabela in ("alertas_diario", "entrega_diario", "acao_diario"):
+            conn.execute(f"DROP TABLE {tabela}")
+
+    auditoria = AuditoriaAlertas(db_path=db_file)
+    assert auditoria.obter_estatisticas(dias=30) == esperado
+    auditoria.fechar()
+
+
+def test_serie_diaria(tmp_path):
+    auditoria = AuditoriaAlertas(db_path=str(tmp_path / "a.db"))
+    agora = datetime.now()
+    _popular(auditoria, agora)
+
+    serie = auditoria.obter_serie_diaria(dias=60)
+    assert [d["dia"] for d in serie] == [
+        (agora - timedelta(days=40)).date().isoformat(), agora.date().isoformat(),
+    ]
+    assert serie[-1] == {
+        "dia": agora.date().isoformat(), "alertas": 6, "entregas": 5,
+        "entregues": 4, "acoes": 4, "executados": 2,
+    }
+    auditoria.fechar()
@@ -0,0 +1,44 @@
+"""Faixa de preço do horizonte de reward (MFE/MAE) a partir dos candles do ciclo."""
+
+import os
+import sys
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from src.domain.enums.trading_enums import TimeFrame
+from src.domain.value_objects import Price, Symbol
+from src.infrastructure.adapters.mt5_adapter import Candle
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "scripts"))
+agente = pytest.importorskip("agente_micro_tendencia_winfut")
+
+INICIO = datetime(2026, 2, 16, 10, 0)
+
+
+def _candles(n: int = 200) -> list[Candle]:
+    out = []
+    for i in range(n):
+        base = Decimal(130000 + 5 * i)
+        out.append(Candle(
+            symbol=Symbol("WIN$N"), timeframe=TimeFrame.M1,
+            open=Price(base), high=Price(base + 20), low=Price(base - 20),
+            close=Price(base), volume=10, timestamp=INICIO + timedelta(minutes=i),
+        ))
+    return out
+
+
+def test_horizonte_dentro_do_ciclo_usa_os_candles():
+    faixa = agente._CandlePriceRange(_candles())
+    assert faixa(INICIO + timedelta(minutes=10), INICIO + timedelta(minutes=12)) == (130080.0, 130030.0)
+    assert faixa.truncated == 0
+
+
+def test_horizonte_anterior_ao_ciclo_conta_truncado():
+    faixa = agente._CandlePriceRange(_candles())
+    # Sem MFE/MAE parcial: o início do horizonte não está nos candles do ciclo
+    assert faixa(INICIO - timedelta(minutes=30), INICIO + timedelta(minutes=5)) == (None, None)
+    assert faixa(INICIO - timedelta(days=1), INICIO - timedelta(hours=20)) == (None, None)
+    assert faixa.truncated == 2
+    assert agente._CandlePriceRange([])(INICIO, INICIO) == (None, None)
@@ -0,0 +1,108 @@
+"""Testes do profiler por estágio do ciclo do agente micro."""
+
+import os
+import sqlite3
+from datetime import datetime
+
+from src.application.services.cycle_profiler import (
+    TOTAL_STAGE,
+    CycleProfiler,
+    _percentile,
+    create_cycle_metrics_table,
+    persist_cycle_metrics,
+)
+
+
+class TestPercentis:
+
+    def test_nearest_rank(self):
+        values = [float(v) for v in range(1, 101)]
+        assert _percentile(values, 50) == 50.0
+        assert _percentile(values, 95) == 95.0
+        assert _percentile(values, 99) == 99.0
+
+    def test_janela_movel_descarta_antigas(self):
+        profiler = CycleProfiler(window=3)
+        for ms in (1000.0, 1.0, 2.0, 3.0):
+            profiler.record("x", ms)
+        p = profiler.percentiles("x")
+        assert p.count == 3
+        assert p.p99 == 3.0
+        assert p.last == 3.0
+
+
+class TestCycleProfiler:
+
+    def test_estagios_somados_no_ciclo(self):
+        profiler = CycleProfiler()
+        with profiler.cycle():
+            with profiler.stage("macro"):
+                pass
+            with profiler.stage("indicadores"):
+                pass
+            with profiler.stage("indicadores"):
+                pass
+        assert set(profiler.last_cycle) == {"macro", "indicadores", TOTAL_STAGE}
+        # Uma amostra por ciclo, igual à soma exibida em last_cycle
+        p = profiler.percentiles("indicadores")
+        assert p.count == 1
+        assert p.last == profiler.last_cycle["indicadores"]
+        assert profiler.last_cycle[TOTAL_STAGE] >= profiler.last_cycle["macro"]
+        assert profiler.stages() == ["macro", "indicadores"]
+
+    def test_percentis_usam_a_soma_por_ciclo(self):
+        profiler = CycleProfiler()
+        for _ in range(5):
+            with profiler.cycle():
+                profiler._add("indicadores", 10.0)
+                profiler._add("indicadores", 30.0)
+        p = profiler.percentiles("indicadores")
+        assert (p.count, p.p50, p.p95) == (5, 40.0, 40.0)
+        assert profiler.last_cycle["indicadores"] == 40.0
+
+    def test_record_externo_fora_do_total(self):
+        profiler = CycleProfiler()
+        profiler.record("persistencia", 12.5)
+        with profiler.cycle():
+            pass
+        assert "persistencia" not in profiler.last_cycle
+        rows = profiler.metrics_rows(datetime(2026, 2, 20, 10, 0))
+        by_stage = {r[2]: r for r in rows}
+        assert by_stage["persistencia"][3] == 12.5
+        assert by_stage[TOTAL_STAGE][1] == "2026-02-20"
+
+    def test_footer(self):
+        profiler = CycleProfiler()
+        assert profiler.format_footer() == []
+        with profiler.cycle():
+            with profiler.stage("macro"):
+                pass
+        lines = profiler.format_footer()
+        assert "p95" in lines[0]
+        assert "macro" in lines[1]
+
+    def test_dump_do_ciclo_mais_lento(self, tmp_path):
+        profiler = CycleProfiler(profile_dir=str(tmp_path))
+        with profiler.cycle():
+            sum(range(1000))
+        path = profiler.slowest_profile_path
+        assert path and os.path.exists(path)
+        assert os.path.exists(path[:-5] + ".txt")
+        assert profiler.slowest_ms > 0
+
+
+class TestCycleMetricsTable:
+
+    def test_persiste_linhas(self, tmp_path):
+        db_path = str(tmp_path / "trading.db")
+        create_cycle_metrics_table(db_path)
+        profiler = CycleProfiler()
+        with profiler.cycle():
+            with profiler.stage("macro"):
+                pass
+        persist_cycle_metrics(db_path, profiler.metrics_rows(datetime.now()))
+
+        conn = sqlite3.connect(db_path)
+        stages = {r[0] for r in conn.execute("SELECT stage FROM micro_cycle_metrics")}
+        conn.close()
+        assert stages == {"macro", TOTAL_STAGE}
@@ -0,0 +1,148 @@
+"""Replay histórico dos detectores (market_data / export CSV, rótulos e varredura)."""
+
+import argparse
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from src.application.services.backtest.detector_replay import (
+    BarrasHistoricas,
+    carregar_export_csv,
+    carregar_market_data,
+    executar_replay,
+    retornos_futuros,
+    rsi_serie,
+    varrer_parametros,
+)
+from src.application.services.detector_volatilidade import DetectorVolatilidade
+from src.infrastructure.database.schema import MarketDataModel, create_database, get_session
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "scripts"))
+from backtest_detector import adicionar_argumentos_fonte, carregar_barras  # noqa: E402
+
+
+def _sessao(n: int = 400, seed: int = 9) -> list[tuple]:
+    rng = random.Random(seed)
+    ts = datetime(2026, 2, 2, 9, 0)
+    preco, linhas = 130000.0, []
+    for _ in range(n):
+        o = preco
+        c = o + rng.choice([-60, -30, -15, 0, 15, 30, 60]) + (rng.random() < 0.04) * 600
+        linhas.append((ts, o, max(o, c) + 20, min(o, c) - 20, c, rng.randint(100, 900)))
+        preco = c
+        ts += timedelta(minutes=5)
+    return linhas
+
+
+@pytest.fixture
+def db_market_data(tmp_path):
+    db_path = str(tmp_path / "trading.db")
+    create_database(db_path)
+    session = get_session(db_path)
+    for ts, o, h, l, c, v in _sessao():
+        session.add(MarketDataModel(symbol="WIN$N", timeframe="M5", timestamp=ts,
+                                    open=o, high=h, low=l, close=c, volume=v))
+    session.add(MarketDataModel(symbol="WDO$N", timeframe="M5", timestamp=datetime(2026, 2, 2),
+                                open=5, high=5, low=5, close=5, volume=1))
+    session.commit()
+    session.close()
+    return db_path
+
+
+def test_carrega_market_data_gravado_pelo_orm(db_market_data):
+    barras = carregar_market_data("WIN$N", db_path=db_market_data)
+    esperado = _sessao()
+    assert len(barras) == 400
+    assert barras.timestamps[0] == esperado[0][0]
+    assert barras.close.tolist() == [row[4] for row in esperado]
+
+    parcial = carregar_market_data(
+        "WIN$N", db_path=db_market_data,
+        inicio=datetime(2026, 2, 2, 10, 0), fim=datetime(2026, 2, 2, 10, 55),
+    )
+    assert len(parcial) == 12
+
+
+def test_carrega_export_csv(tmp_path):
+    arquivo = tmp_path / "WIN_N_5min.csv"
+    arquivo.write_bytes(
+        "Data;Hora;Abertura;Máximo;Mínimo;Fechamento;Volume\n"
+        "02/02/26;09:05:00;128.500,00;128.600,00;128.400,00;128.550,00;1.200\n"
+        "02/02/26;09:00:00;128.450,00;128.520,00;128.300,00;128.500,00;900\n"
+        "linha;quebrada\n".encode("latin-1")
+    )
+    barras = carregar_export_csv(arquivo)
+    assert barras.symbol == "WIN"
+    assert barras.timestamps == [datetime(2026, 2, 2, 9, 0), datetime(2026, 2, 2, 9, 5)]
+    assert barras.close.tolist() == [128500.0, 128550.0]
+    assert barras.volume.tolist() == [900, 1200]
+
+
+def test_rotulos_e_rsi():
+    close = np.array([100.0, 101.0, 99.0, 102.0])
+    assert retornos_futuros(close, 2)[:2] == pytest.approx([-0.01, 0.0099009901])
+    assert np.isnan(retornos_futuros(close, 2)[2:]).all()
+
+    serie = np.array([row[4] for row in _sessao(60)])
+    rsi = rsi_serie(serie)
+    deltas = np.diff(serie[-15:])
+    ganho = np.where(deltas > 0, deltas, 0).mean()
+    perda = np.where(deltas < 0, -deltas, 0).mean()
+    assert rsi[-1] == pytest.approx(100 - 100 / (1 + ganho / perda))
+    assert np.isnan(rsi[:14]).all()
+
+
+def test_replay_rotula_alertas_do_detector():
+    barras = BarrasHistoricas.de_linhas("WIN$N", "M5", _sessao())
+    resultado = executar_replay(barras, threshold_sigma=1.5, window=10, horizonte=3,
+                                alvo_pct=0.002)
+
+    # Os alertas de volatilidade são os mesmos do detector usado direto
+    detector = DetectorVolatilidade(window=10, threshold_sigma=1.5)
+    esperados = [
+        t for t, c in enumerate(barras.close.tolist())
+        if detector.analisar_vela("WIN$N", Decimal(repr(c)), barras.timestamps[t])
+    ]
+    vol = [a for a in resultado.alertas if a.padrao == "volatilidade_extrema"]
+    assert [a.barra for a in vol] == esperados and esperados
+
+    futuros = retornos_futuros(barras.close, 3)
+    for a in resultado.alertas:
+        if a.barra < len(barras) - 3:
+            assert a.retorno_futuro == pytest.approx(futuros[a.barra])
+            assert a.acerto == (a.direcao * futuros[a.barra] > 0)
+            assert a.oportunidade == (abs(futuros[a.barra]) >= 0.002)
+
+    resumo = resultado.resumo()
+    assert resumo["oportunidades"] == int(np.count_nonzero(np.abs(futuros) >= 0.002))
+    assert 0 < resumo["captura_pct"] <= 100
+    assert resumo["volatilidade"]["alertas"] == len(vol)
+
+
+def test_varredura_paralela_igual_a_serial():
+    barras = BarrasHistoricas.de_linhas("WIN$N", "M5", _sessao(300))
+    serial = varrer_parametros(barras, [1.5, 2.0], [10, 20], workers=1)
+    paralelo = varrer_parametros(barras, [1.5, 2.0], [10, 20], workers=2)
+    chaves = [(r["threshold_sigma"], r["window"]) for r in paralelo]
+    assert chaves == [(1.5, 10), (1.5, 20), (2.0, 10), (2.0, 20)]
+    for a, b in zip(serial, paralelo):
+        a.pop("barras_por_segundo"), b.pop("barras_por_segundo")
+        assert a == b
+
+
+def test_fim_so_com_data_inclui_o_dia_inteiro(db_market_data):
+    parser = argparse.ArgumentParser()
+    adicionar_argumentos_fonte(parser)
+    args = parser.parse_args(["--db", db_market_data, "--fim", "2026-02-02"])
+    barras = carregar_barras(args)
+    # 09:00 a 23:55 do dia 02/02 em barras de 5 min
+    assert len(barras) == 180
+    assert barras.timestamps[-1] == datetime(2026, 2, 2, 23, 55)
+
+    args = parser.parse_args(["--db", db_market_data, "--fim", "2026-02-02T10:55"])
+    assert len(carregar_barras(args)) == 24
@@ -0,0 +1,85 @@
+"""Agregados correntes do dia (linhas novas vs. reconstrução completa)."""
+
+import random
+from dataclasses import fields
+from datetime import datetime, timedelta
+
+from src.application.services.diary_day_aggregates import (
+    DayAggregates,
+    build_day_aggregates,
+)
+
+INICIO = datetime(2026, 2, 20, 9, 0)
+
+
+def _dia(n: int = 200, seed: int = 5):
+    rng = random.Random(seed)
+    preco = 130000.0
+    episodes, decisions, regions, items = [], [], [], []
+    for i in range(n):
+        ts = (INICIO + timedelta(seconds=30 * i)).isoformat(" ")
+        preco += rng.gauss(0, 60)
+        decisions.append({
+            "timestamp": ts, "price_current": preco,
+            "adx": rng.choice([None, 0.0, rng.uniform(10, 50)]),
+            "rsi": rng.uniform(30, 80), "micro_score": rng.randint(-8, 8),
+            "micro_trend": rng.choice(["ALTA", "REVERSÃO"]),
+        })
+        episodes.append({
+            "timestamp": ts, "action": rng.choice(["HOLD", "BUY"]),
+            "macro_bias": rng.choice(["BULLISH", None]),
+            "macro_score_final": rng.choice([None, rng.uniform(-20, 60)]),
+        })
+        if i % 3 == 0:
+            regions.append({
+                "timestamp": ts, "price": round(preco + rng.uniform(-300, 300)),
+                "tipo": rng.choice(["SUPORTE", "RESISTENCIA"]),
+            })
+        items.append({"timestamp": ts, "score": rng.randint(-3, 3)})
+        items.append({"timestamp": ts, "score": rng.randint(-3, 3)})
+    return episodes, decisions, regions, items
+
+
+def _plano(view) -> dict:
+    plano = {}
+    for f in fields(view):
+        valor = getattr(view, f.name)
+        if f.name == "episode_counts":
+            valor = {c: dict(v) for c, v in valor.items()}
+        elif hasattr(valor, "items"):
+            valor = dict(valor)
+        plano[f.name] = valor
+    return plano
+
+
+def test_linhas_novas_igual_a_reconstrucao():
+    episodes, decisions, regions, items = _dia()
+    agg = DayAggregates()
+    for start in range(0, len(decisions), 7):
+        end = start + 7
+        # Regiões e items do lote chegam antes das decisões de propósito
+        agg.add_regions([r for r in regions if decisions[start]["timestamp"]
+                         <= r["timestamp"] <= decisions[min(end, len(decisions)) - 1]["timestamp"]])
+        agg.add_items(items[2 * start:2 * end])
+        agg.add_decisions(decisions[start:end])
+        agg.add_episodes(episodes[start:end])
+
+    assert _plano(agg.freeze()) == _plano(build_day_aggregates(episodes, decisions, regions, items).freeze())
+
+
+def test_regiao_acompanha_preco_depois_do_toque():
+    agg = DayAggregates()
+    agg.add_regions([{"timestamp": "t0", "price": 130000.0, "tipo": "SUPORTE"}])
+    agg.add_regions([{"timestamp": "t0", "price": 130020.0, "tipo": "SUPORTE"}])  # duplicada
+    agg.add_decisions([
+        {"timestamp": f"t{i}", "price_current": p}
+        for i, p in enumerate([130300.0, 130040.0, 130200.0, 129800.0])
+    ])
+
+    view = agg.freeze()
+    (track,) = view.regions
+    assert (track.n_touches, track.first_touch_ts, track.after_len) == (1, "t1", 3)
+    assert (track.after_min, track.after_max) == (129800.0, 130200.0)
+    assert (track.rest_min, track.rest_max) == (129800.0, 130200.0)
+    assert (view.price.first, view.price.last, view.price.max) == (130300.0, 129800.0, 130300.0)
+    assert view.recent_regions[130000]["price"] == 130020.0
@@ -0,0 +1,222 @@
+"""Testes do cache incremental do dia usado pelos diários."""
+
+import sqlite3
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+
+from src.application.services.diary_day_cache import DiaryDayCache
+from src.infrastructure.database.rl_schema import create_rl_tables
+
+
+_MICRO_DDL = [
+    """CREATE TABLE micro_trend_decisions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp DATETIME NOT NULL,
+        macro_score INTEGER, macro_signal TEXT, macro_confidence REAL,
+        micro_score INTEGER, micro_trend TEXT, price_current REAL,
+        price_open REAL, vwap REAL, pivot_pp REAL, smc_direction TEXT,
+        smc_equilibrium TEXT, adx REAL, rsi REAL, num_opportunities INTEGER,
+        macro_score_raw INTEGER, directive_suspended INTEGER DEFAULT 0)""",
+    """CREATE TABLE micro_trend_items (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, decision_id INTEGER,
+        timestamp DATETIME, item_number INTEGER, symbol TEXT,
+        category TEXT, score INTEGER, price_current REAL, price_open REAL)""",
+    """CREATE TABLE micro_trend_regions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, decision_id INTEGER,
+        timestamp DATETIME, price REAL, label TEXT, tipo TEXT,
+        confluences INTEGER, distance_pct REAL)""",
+    """CREATE TABLE micro_trend_opportunities (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, decision_id INTEGER,
+        timestamp DATETIME, direction TEXT, entry REAL, stop_loss REAL,
+        take_profit REAL, risk_reward REAL, confidence REAL, reason TEXT,
+        region TEXT)""",
+]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "trading.db")
+    create_rl_tables(create_engine(f"sqlite:///{path}"))
+    conn = sqlite3.connect(path)
+    for ddl in _MICRO_DDL:
+        conn.execute(ddl)
+    conn.commit()
+    conn.close()
+    return path
+
+
+def _ts(minutes_ago: int) -> str:
+    return (datetime.now() - timedelta(minutes=minutes_ago)).isoformat(" ")
+
+
+def _add_cycle(path: str, minutes_ago: int, items: dict[str, list[int]]) -> int:
+    conn = sqlite3.connect(path)
+    ts = _ts(minutes_ago)
+    cur = conn.execute(
+        "INSERT INTO micro_trend_decisions (timestamp, macro_score, micro_score,"
+        " price_current) VALUES (?, ?, ?, ?)",
+        (ts, 3, 1, 130000.0),
+    )
+    did = cur.lastrowid
+    n = 0
+    for cat, scores in items.items():
+        for score in scores:
+            n += 1
+            conn.execute(
+                "INSERT INTO micro_trend_items (decision_id, timestamp, item_number,"
+                " symbol, category, score) VALUES (?, ?, ?, ?, ?, ?)",
+                (did, ts, n, f"S{n}", cat, score),
+            )
+    conn.commit()
+    conn.close()
+    return did
+
+
+def _add_episode_with_reward(path: str, minutes_ago: int, episode_id: str) -> None:
+    conn = sqlite3.connect(path)
+    ts = _ts(minutes_ago)
+    conn.execute(
+        "INSERT INTO rl_episodes (episode_id, timestamp, source, action, session_date)"
+        " VALUES (?, ?, 'MICRO_AGENT', 'HOLD', ?)",
+        (episode_id, ts, date.today().isoformat()),
+    )
+    conn.execute(
+        "INSERT INTO rl_rewards (episode_id, timestamp_decision,"
+        " win_price_at_decision, action_at_decision, horizon_minutes, is_evaluated)"
+        " VALUES (?, ?, 130000, 'HOLD', 5, 0)",
+        (episode_id, ts),
+    )
+    conn.commit()
+    conn.close()
+
+
+class TestDiaryDayCache:
+    """Leitura incremental e snapshots imutáveis."""
+
+    def test_snapshot_vazio_sem_tabelas(self, tmp_path):
+        cache = DiaryDayCache(str(tmp_path / "vazio.db"), min_refresh_sec=0)
+        snap = cache.snapshot()
+        assert snap.episodes == ()
+        assert snap.version == 0
+
+    def test_le_apenas_linhas_novas(self, db_path):
+        cache = DiaryDayCache(db_path, min_refresh_sec=0)
+        _add_cycle(db_path, 20, {"DOLAR_CAMBIO": [1, -1]})
+        _add_episode_with_reward(db_path, 20, "ep-1")
+
+        snap1 = cache.snapshot()
+        assert len(snap1.decisions) == 1
+        assert len(snap1.episodes) == 1
+        assert cache.last_new_rows == 5
+
+        _add_cycle(db_path, 1, {"DOLAR_CAMBIO": [1, 1], "COMMODITIES": [-1]})
+        snap2 = cache.snapshot()
+        assert cache.last_new_rows == 4
+        assert len(snap2.decisions) == 2
+        assert snap2.version == snap1.version + 1
+        # Snapshot anterior permanece intacto
+        assert len(snap1.decisions) == 1
+
+    def test_sem_linhas_novas_mantem_versao(self, db_path):
+        cache = DiaryDayCache(db_path, min_refresh_sec=0)
+        _add_cycle(db_path, 5, {"DOLAR_CAMBIO": [1]})
+        v1 = cache.snapshot().version
+        assert cache.snapshot().version == v1
+        assert cache.last_new_rows == 0
+
+    def test_historico_categoria_e_ultimo_ciclo(self, db_path):
+        cache = DiaryDayCache(db_path, min_refresh_sec=0)
+        _add_cycle(db_path, 10, {"DOLAR_CAMBIO": [1, 1], "COMMODITIES": [-1]})
+        cache.snapshot()
+        _add_cycle(db_path, 5, {"DOLAR_CAMBIO": [-1, -1]})
+        snap = cache.snapshot()
+
+        assert [h[1:] for h in snap.category_history["DOLAR_CAMBIO"]] == [
+            (2, 2), (-2, 2),
+        ]
+        assert [h[1:] for h in snap.category_history["COMMODITIES"]] == [(-1, 1)]
+        assert {i["category"] for i in snap.macro_items} == {"DOLAR_CAMBIO"}
+
+    def test_reward_reavaliado_e_atualizado(self, db_path):
+        cache = DiaryDayCache(db_path, min_refresh_sec=0)
+        _add_episode_with_reward(db_path, 30, "ep-1")
+        assert cache.snapshot().rewards[0]["is_evaluated"] == 0
+
+        conn = sqlite3.connect(db_path)
+        conn.execute(
+            "UPDATE rl_rewards SET is_evaluated = 1, was_correct = 1"
+            " WHERE episode_id = 'ep-1'"
+        )
+        conn.commit()
+        conn.close()
+
+        reward = cache.snapshot().rewards[0]
+        assert reward["is_evaluated"] == 1
+        assert reward["was_correct"] == 1
+
+    def test_linhas_sao_imutaveis(self, db_path):
+        cache = DiaryDayCache(db_path, min_refresh_sec=0)
+        _add_cycle(db_path, 5, {"DOLAR_CAMBIO": [1]})
+        row = cache.snapshot().decisions[0]
+        with pytest.raises(TypeError):
+            row["macro_score"] = 99
+
+    def test_memoize_recalcula_so_com_versao_nova(self, db_path):
+        cache = DiaryDayCache(db_path, min_refresh_sec=0)
+        _add_cycle(db_path, 5, {"DOLAR_CAMBIO": [1]})
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return len(calls)
+
+        snap = cache.snapshot()
+        assert cache.memoize("k", snap, compute) == 1
+        assert cache.memoize("k", cache.snapshot(), compute) == 1
+
+        _add_cycle(db_path, 1, {"DOLAR_CAMBIO": [1]})
+        assert cache.memoize("k", cache.snapshot(), compute) == 2
+
+    def test_agregados_do_snapshot_incluem_linha_retroativa(self, db_path):
+        cache = DiaryDayCache(db_path, min_refresh_sec=0)
+        _add_cycle(db_path, 10, {"DOLAR_CAMBIO": [1, 2], "COMMODITIES": [-1]})
+        _add_cycle(db_path, 5, {"DOLAR_CAMBIO": [3]})
+        agg = cache.snapshot().aggregates
+        assert agg.n_decisions == 2
+        assert [total for _, total in agg.cycle_totals] == [2, 3]
+
+        _add_cycle(db_path, 8, {"DOLAR_CAMBIO": [-4]})  # entre os dois ciclos
+        agg = cache.snapshot().aggregates
+        assert agg.n_decisions == 3
+        assert [total for _, total in agg.cycle_totals] == [2, -4, 3]
+        assert agg.price.n == 3
+
+    def test_snapshot_publica_views_sem_copiar_o_dia(self, db_path):
+        cache = DiaryDayCache(db_path, min_refresh_sec=0)
+        _add_episode_with_reward(db_path, 30, "ep-1")
+        _add_episode_with_reward(db_path, 20, "ep-2")
+        snap1 = cache.snapshot()
+
+        _add_episode_with_reward(db_path, 10, "ep-3")
+        snap2 = cache.snapshot()
+        # Em ordem: a mesma lista, só o tamanho publicado cresce
+        assert snap2.episodes._rows is snap1.episodes._rows
+        assert snap2.rewards._rows is snap1.rewards._rows
+        assert [e["episode_id"] for e in snap1.episodes] == ["ep-1", "ep-2"]
+        assert [e["episode_id"] for e in snap2.episodes[-2:]] == ["ep-2", "ep-3"]
+
+        _add_episode_with_reward(db_path, 25, "ep-retro")
+        snap3 = cache.snapshot()
+        assert [r["episode_id"] for r in snap3.rewards] == ["ep-1", "ep-retro", "ep-2", "ep-3"]
+        assert [e["episode_id"] for e in snap3.episodes] == ["ep-1", "ep-retro", "ep-2", "ep-3"]
+        # Linha retroativa gera lista nova: os snapshots anteriores não mudam
+        assert [r["episode_id"] for r in snap2.rewards] == ["ep-1", "ep-2", "ep-3"]
+        assert snap2.episodes == tuple(snap2.episodes)
+
+        conn = sqlite3.connect(db_path)
+        conn.execute("UPDATE rl_rewards SET is_evaluated = 1 WHERE episode_id = 'ep-retro'")
+        conn.commit()
+        conn.close()
+        assert cache.snapshot().rewards[1]["is_evaluated"] == 1
+        assert len(cache._state.pending_rewards) == 3
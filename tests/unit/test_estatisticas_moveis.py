@@ -0,0 +1,99 @@
+"""Estatísticas móveis em lote (Welford deslizante) e o detector multi-símbolo."""
+
+import random
+from datetime import datetime
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from src.application.services.detector_volatilidade import DetectorVolatilidade
+from src.application.services.estatisticas_moveis import EstatisticasMoveis
+
+
+def _passeio(rng: random.Random, inicio: float, n: int) -> list[float]:
+    precos, preco = [], inicio
+    for _ in range(n):
+        preco += rng.choice([-15, -5, 0, 5, 15]) + (rng.random() < 0.03) * rng.choice([-400, 400])
+        precos.append(preco)
+    return precos
+
+
+def test_lote_bate_com_janela_recalculada_do_zero():
+    rng = random.Random(3)
+    simbolos = ["WIN$N", "WDO$N", "BOVA11", "PETR4", "VALE3"]
+    series = {s: _passeio(rng, 1000.0 * (i + 1) + 130000 * (s == "WIN$N"), 600)
+              for i, s in enumerate(simbolos)}
+    est = EstatisticasMoveis(window=20, capacidade_inicial=2, recalibrar_a_cada=0)
+    vistos = {s: [] for s in simbolos}
+
+    for t in range(600):
+        # Lotes com subconjuntos e símbolo repetido (duas velas do mesmo ativo)
+        lote = [s for s in simbolos if rng.random() < 0.8]
+        if lote and rng.random() < 0.2:
+            lote.append(lote[0])
+        closes = []
+        for s in lote:
+            closes.append(series[s][len(vistos[s])])
+            vistos[s].append(closes[-1])
+        resultado = est.atualizar_lote(lote, closes)
+
+        parcial = {s: [] for s in simbolos}
+        for i, s in enumerate(lote):
+            parcial[s].append(i)
+        for s, posicoes in parcial.items():
+            for k, i in enumerate(posicoes):
+                janela = np.array(vistos[s][: len(vistos[s]) - len(posicoes) + k + 1][-20:])
+                if len(janela) < 20:
+                    assert np.isnan(resultado.z[i])
+                    continue
+                assert resultado.media[i] == pytest.approx(janela.mean(), abs=1e-6)
+                assert resultado.sigma[i] == pytest.approx(janela.std(), rel=1e-6)
+                z = (janela[-1] - janela.mean()) / janela.std()
+                assert resultado.z[i] == pytest.approx(z, rel=1e-6, abs=1e-9)
+
+    assert est.z_scores().keys() == set(simbolos)
+
+
+def test_semear_remover_e_reaproveitar_linha():
+    est = EstatisticasMoveis(window=4)
+    est.semear("A", [1.0, 2.0, 3.0, 4.0, 5.0, 6.0])
+    assert est.estatisticas("A")["barras"] == 4
+    assert est.estatisticas("A")["media"] == pytest.approx(4.5)
+    assert est.atualizar("A", 10.0).z == pytest.approx((10 - 6.25) / np.std([4, 5, 6, 10]))
+
+    est.remover("A")
+    assert "A" not in est and est.estatisticas("A") is None
+    est.atualizar("B", 1.0)
+    assert est.estatisticas("B") == {"barras": 1, "media": 1.0, "sigma": 0.0, "z": 0.0}
+    assert len(est) == 1
+
+
+def test_janela_sem_variacao_nao_gera_z():
+    est = EstatisticasMoveis(window=3)
+    est.semear("A", [5.0, 5.0])
+    assert np.isnan(est.atualizar("A", 5.0).z)
+
+
+def test_detector_lote_equivale_a_velas_individuais():
+    rng = random.Random(11)
+    simbolos = [f"ATIVO{i}" for i in range(30)]
+    series = {s: _passeio(rng, 20000.0 + 100 * i, 300) for i, s in enumerate(simbolos)}
+    ts = datetime(2026, 3, 2, 10, 0)
+
+    individual = DetectorVolatilidade(window=20, threshold_sigma=2.0)
+    em_lote = DetectorVolatilidade(window=20, threshold_sigma=2.0)
+    disparos_individuais, disparos_lote = [], []
+    for t in range(300):
+        velas = [(s, Decimal(str(series[s][t]))) for s in simbolos]
+        for symbol, close in velas:
+            alerta = individual.analisar_vela(symbol, close, ts)
+            if alerta:
+                disparos_individuais.append((t, symbol, alerta.preco_atual))
+        disparos_lote += [
+            (t, str(a.ativo), a.preco_atual) for a in em_lote.analisar_lote(velas, ts)
+        ]
+
+    assert disparos_lote == disparos_individuais
+    assert len(disparos_lote) > 0
+    assert em_lote.obter_z_scores() == pytest.approx(individual.obter_z_scores())
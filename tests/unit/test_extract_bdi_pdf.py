@@ -0,0 +1,163 @@
+"""Extrator do BDI — índice de páginas pelo sumário e cache por hash/página."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "scripts"))
+
+import extract_bdi_pdf  # noqa: E402
+from extract_bdi_pdf import (  # noqa: E402
+    KEY_SECTIONS,
+    PageCache,
+    _is_summary_page,
+    build_page_index,
+    extract_bdi_full,
+    extract_bdi_key_data,
+    pdf_hash,
+    section_pages,
+)
+
+# Trecho do sumário do BDI de 10/02/2026 (páginas 2 e 3)
+SUMARIO_P2 = """Boletim Diário do Mercado
+Sumário
+Indicadores e informativos 2032
+DI over 2064
+Evolução dos índices 2066
+Histórico de taxas de câmbio (Resolução BCB nº 120) 2072
+Indicadores econômicos 2073
+Participação dos investidores 2078
+Participação dos investidores mensal 2078
+Maiores oscilações 2142
+Ações do IBOVESPA - maiores altas 2142
+Mercado à vista - maiores baixas 2143
+Informativos
+Derivativos
+Resumo 2144
+Médias diárias – volume em um ano (R$ em milhões) 1
+Derivativos – resumo das operações 2144
+Derivativos de balcão 2145
+Posições em aberto 2232
+Outros dados
+Posições em aberto 2702
+COE 2730
+2 REFERENTE A TERÇA-FEIRA - 10 DE FEVEREIRO DE 2026 - Nº 28"""
+
+SUMARIO_P3 = """Boletim Diário do Mercado
+Estoque 2730
+Registro 2730
+3 REFERENTE A TERÇA-FEIRA - 10 DE FEVEREIRO DE 2026 - Nº 28"""
+
+PAGINA_DADOS = """Boletim Diário do Mercado
+Renda fixa
+Estoque
+Instrumento financeiro Quantidade emitida Quantidade em mercado
+CCB 3.129.576.464 3.129.575.860 3.129.575.861
+CDAWA 475 475 475 - - 475
+4 REFERENTE A TERÇA-FEIRA - 10 DE FEVEREIRO DE 2026 - Nº 28"""
+
+
+def test_indice_le_titulos_e_paginas_do_sumario():
+    index = build_page_index([SUMARIO_P2, SUMARIO_P3])
+
+    assert ("di over", 2064) in index
+    assert ("historico de taxas de cambio (resolucao bcb no 120)", 2072) in index
+    assert index[-1] == ("registro", 2730)
+    # Títulos repetidos ficam na ordem do sumário
+    assert [p for t, p in index if t == "posicoes em aberto"] == [2232, 2702]
+    # Cabeçalho, grupos sem página e rodapé ficam de fora
+    assert all(not t.startswith(("boletim", "sumario", "2 referente")) for t, _ in index)
+
+
+def test_secao_vai_ate_a_proxima_que_comeca_depois():
+    index = build_page_index([SUMARIO_P2, SUMARIO_P3])
+
+    assert section_pages(index, "Indicadores econômicos", 2730) == (2073, 2078)
+    assert section_pages(index, "Evolução dos índices", 2730) == (2066, 2072)
+    assert section_pages(index, "Participação dos investidores", 2730) == (2078, 2142)
+    # Travessão e hífen são o mesmo título
+    assert section_pages(index, "Derivativos - resumo das operações", 2730) == (2144, 2145)
+    assert section_pages(index, "COE", 2730) == (2730, 2730)
+    assert section_pages(index, "Seção inexistente", 2730) is None
+
+
+def test_todas_as_secoes_chave_estao_no_sumario():
+    index = build_page_index([SUMARIO_P2])
+    for title, _ in KEY_SECTIONS.values():
+        assert section_pages(index, title, 2730) is not None, title
+
+
+def test_continuacao_do_sumario_nao_confunde_tabela_de_dados():
+    assert _is_summary_page(SUMARIO_P3)
+    assert not _is_summary_page(PAGINA_DADOS)
+
+
+def test_cache_por_hash_e_pagina(tmp_path):
+    pdf_a = tmp_path / "BDI_00_20260210.pdf"
+    pdf_b = tmp_path / "copia_renomeada.pdf"
+    pdf_c = tmp_path / "BDI_00_20260211.pdf"
+    pdf_a.write_bytes(b"%PDF-1.7 boletim 10/02")
+    pdf_b.write_bytes(b"%PDF-1.7 boletim 10/02")
+    pdf_c.write_bytes(b"%PDF-1.7 boletim 11/02")
+
+    # O hash é do conteúdo: renomear não invalida, outro boletim não colide
+    assert pdf_hash(str(pdf_a)) == pdf_hash(str(pdf_b)) != pdf_hash(str(pdf_c))
+
+    cache = PageCache(tmp_path / "cache.sqlite")
+    cache.put_many(pdf_hash(str(pdf_a)), {1: "capa", 2073: "Indicadores", 5: ""})
+    cache.put_many(pdf_hash(str(pdf_c)), {1: "outra capa"})
+    cache.close()
+
+    cache = PageCache(tmp_path / "cache.sqlite")
+    assert cache.get_many(pdf_hash(str(pdf_b)), [1, 5, 2073, 2074]) == {
+        1: "capa", 5: "", 2073: "Indicadores",
+    }
+    assert cache.get_many(pdf_hash(str(pdf_c)), range(1, 10)) == {1: "outra capa"}
+    cache.close()
+
+
+def test_pdf_hasheado_uma_vez_por_extracao(tmp_path, monkeypatch):
+    pdf = tmp_path / "BDI_00_20260210.pdf"
+    pdf.write_bytes(b"%PDF-1.7 boletim 10/02")
+    total = 2800
+    digest = pdf_hash(str(pdf))
+    cache = PageCache(tmp_path / "cache.sqlite")
+    paginas = {p: "" for p in range(1, total + 1)}
+    paginas.update({1: "IBOVESPA: 185.000 +1,2%", 2: SUMARIO_P2, 3: SUMARIO_P3, 4: PAGINA_DADOS})
+    cache.put_many(digest, paginas)
+
+    hashes = []
+
+    def _contar(path):
+        hashes.append(path)
+        return digest
+
+    monkeypatch.setattr(extract_bdi_pdf, "pdf_hash", _contar)
+    monkeypatch.setattr(extract_bdi_pdf, "count_pages", lambda path: total)
+
+    # Sem digest: um hash para página 1, sumário e seções
+    dados = extract_bdi_key_data(str(pdf), workers=1, cache=cache)
+    assert dados["ibovespa"] == {"fechamento": "185.000", "variacao": "+1,2%"}
+    assert len(hashes) == 1
+
+    # Com o digest do main: nenhum hash a mais
+    extract_bdi_key_data(str(pdf), workers=1, cache=cache, digest=digest)
+    assert "Total de páginas: 2800" in extract_bdi_full(str(pdf), workers=1, cache=cache,
+                                                       digest=digest)
+    assert len(hashes) == 1
+    cache.close()
+
+
+def test_cache_le_so_as_paginas_pedidas(tmp_path):
+    cache = PageCache(tmp_path / "cache.sqlite")
+    cache.put_many("abc", {p: f"pagina {p}" for p in range(1, 3001)})
+    consultas = []
+    cache.conn.set_trace_callback(consultas.append)
+
+    assert cache.get_many("abc", [1, *range(2072, 2079), 2144, 9999]) == {
+        p: f"pagina {p}" for p in [1, *range(2072, 2079), 2144]
+    }
+    # Uma consulta por faixa contígua, filtrada no SQLite
+    assert len(consultas) == 4
+    assert all("BETWEEN" in sql for sql in consultas)
+    assert cache.get_many("abc", []) == {}
+    cache.close()
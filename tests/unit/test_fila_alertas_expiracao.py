@@ -0,0 +1,94 @@
+"""Expiração O(1) e shards por padrão da FilaAlertas."""
+
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from src.domain.entities.alerta import AlertaOportunidade
+from src.domain.enums.alerta_enums import NivelAlerta, PatraoAlerta
+from src.domain.value_objects import Symbol
+from src.infrastructure.providers import fila_alertas
+from src.infrastructure.providers.fila_alertas import FilaAlertas, _CacheExpiravel
+
+
+class _Relogio:
+    def __init__(self) -> None:
+        self.t = 1000.0
+
+    def __call__(self) -> float:
+        return self.t
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    r = _Relogio()
+    monkeypatch.setattr(fila_alertas.time, "monotonic", r)
+    return r
+
+
+def _alerta(preco: int, padrao=PatraoAlerta.VOLATILIDADE_EXTREMA) -> AlertaOportunidade:
+    return AlertaOportunidade(
+        ativo=Symbol("WIN$N"), padrao=padrao, nivel=NivelAlerta.ALTO,
+        preco_atual=Decimal(preco), timestamp_deteccao=datetime.now(),
+        entrada_minima=Decimal(preco - 50), entrada_maxima=Decimal(preco + 50),
+        stop_loss=Decimal(preco - 300), confianca=Decimal("0.8"), risk_reward=Decimal("2"),
+    )
+
+
+def test_cache_expira_pelo_comeco_e_respeita_capacidade():
+    cache = _CacheExpiravel(ttl_s=10, max_entradas=3)
+    cache.registrar("a", 0)
+    cache.registrar("b", 5)
+    cache.registrar("a", 6)  # reinserir move para o fim
+
+    assert cache.expurgar(15) == 1  # só "b" venceu; "a" foi renovado
+    assert cache.idade("a", 15) == 9
+    assert cache.idade("b", 15) is None
+
+    for chave in "cde":
+        cache.registrar(chave, 16)
+    assert len(cache) == 3
+    assert cache.evictos_capacidade == 1
+    assert cache.idade("a", 16) is None
+
+
+@pytest.mark.asyncio
+async def test_dedup_volta_a_aceitar_depois_do_ttl(relogio):
+    fila = FilaAlertas(max_queue_size=10, rate_limit_seconds=0, dedup_ttl_seconds=120)
+    assert await fila.enfileirar(_alerta(130000)) is True
+    relogio.t += 119
+    assert await fila.enfileirar(_alerta(130000)) is False
+    relogio.t += 1
+    assert await fila.enfileirar(_alerta(130000)) is True
+    assert fila.obter_metricas()["total_duplicados"] == 1
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_isolado_por_padrao(relogio):
+    fila = FilaAlertas(max_queue_size=10, rate_limit_seconds=60)
+    assert await fila.enfileirar(_alerta(130000, PatraoAlerta.BREAK_SUPORTE)) is True
+    assert await fila.enfileirar(_alerta(131000, PatraoAlerta.BREAK_RESISTENCIA)) is True
+    assert await fila.enfileirar(_alerta(132000, PatraoAlerta.BREAK_SUPORTE)) is False
+    relogio.t += 60
+    assert await fila.enfileirar(_alerta(132000, PatraoAlerta.BREAK_SUPORTE)) is True
+    assert fila.obter_metricas()["rate_limiter_size"] == 2
+
+
+@pytest.mark.asyncio
+async def test_memoria_limitada_em_tempestade(relogio):
+    fila = FilaAlertas(
+        max_queue_size=10_000, rate_limit_seconds=0, dedup_ttl_seconds=3600,
+        max_dedup_por_padrao=100,
+    )
+    for i in range(1000):
+        relogio.t += 0.001
+        assert await fila.enfileirar(_alerta(100000 + 5 * i)) is True
+
+    metricas = fila.obter_metricas()
+    assert metricas["dedup_cache_size"] == 100
+    assert metricas["dedup_evictos_capacidade"] == 900
+
+    relogio.t += 3600  # tudo vencido: o próximo enfileiramento esvazia o shard
+    await fila.enfileirar(_alerta(99000))
+    assert fila.obter_metricas()["dedup_cache_size"] == 1
@@ -0,0 +1,118 @@
+"""Histórico tipado do BDI — carga incremental e consultas por métrica."""
+
+import os
+import sys
+from datetime import date, timedelta
+
+import pytest
+
+from src.infrastructure.database.historico_bdi import HistoricoBDI
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "scripts"))
+
+from processar_bdi import AnalistaBDI, _numero_bdi  # noqa: E402
+
+KEY_DATA = """BOLETIM DIÁRIO DE INFORMAÇÕES (BDI) - B3
+Fechamento do IBOVESPA: {ibov} {var}
+Derivativos Ações
+Total com minis {com} Volume negociado {vol}
+Total sem minis 53.438.419 Quantidade de negócios 3.764.594
+Total com minis Total sem minis Número de negócios Volume (R$) milhões
+"""
+
+
+@pytest.fixture
+def historico(tmp_path):
+    hist = HistoricoBDI(str(tmp_path / "bdi.db"))
+    yield hist
+    hist.fechar()
+
+
+def _arquivo(tmp_path, nome="bdi_20260210_key_data.txt", conteudo="x"):
+    arquivo = tmp_path / nome
+    arquivo.write_text(conteudo, encoding="utf-8")
+    return arquivo
+
+
+def test_numero_bdi_converte_formatos_do_boletim():
+    assert _numero_bdi("28.249.836.567") == 28249836567
+    assert _numero_bdi("-0,16%") == -0.16
+    assert _numero_bdi("185929.00") == 185929.0
+    assert _numero_bdi("185.929,00") == 185929.0
+    assert _numero_bdi("milhões") is None
+
+
+def test_registrar_substitui_metricas_da_data(tmp_path, historico):
+    arquivo = _arquivo(tmp_path)
+    historico.registrar(arquivo, date(2026, 2, 10), {"a": 1.0, "b": 2.0})
+    historico.registrar(arquivo, date(2026, 2, 10), {"a": 3.0})
+
+    assert historico.metricas_do_dia("2026-02-10") == {"a": 3.0}
+    assert historico.datas() == ["2026-02-10"]
+
+
+def test_arquivo_carregado_detecta_alteracao(tmp_path, historico):
+    arquivo = _arquivo(tmp_path)
+    assert not historico.arquivo_carregado(arquivo)
+
+    historico.registrar(arquivo, date(2026, 2, 10), {"a": 1.0})
+    assert historico.arquivo_carregado(arquivo)
+
+    arquivo.write_text("boletim reprocessado", encoding="utf-8")
+    assert not historico.arquivo_carregado(arquivo)
+
+
+def test_desvio_da_media_usa_so_sessoes_anteriores(tmp_path, historico):
+    arquivo = _arquivo(tmp_path)
+    volumes = [100.0, 110.0, 90.0, 100.0, 160.0, 80.0]
+    inicio = date(2026, 1, 5)
+    for i, vol in enumerate(volumes):
+        historico.registrar(arquivo, inicio + timedelta(days=i), {"volume_negociado": vol})
+
+    desvios = historico.desvio_da_media("volume_negociado", janela=3)
+
+    assert [d.data for d in desvios] == [
+        (inicio + timedelta(days=i)).isoformat() for i in reversed(range(len(volumes)))
+    ]
+    for i, d in enumerate(reversed(desvios)):
+        anteriores = volumes[max(0, i - 3):i]
+        assert d.amostras == len(anteriores)
+        if not anteriores:
+            assert d.media is None and d.desvio_pct is None
+            continue
+        media = sum(anteriores) / len(anteriores)
+        assert d.media == pytest.approx(media)
+        assert d.desvio_pct == pytest.approx((volumes[i] - media) / media * 100)
+
+    assert len(historico.desvio_da_media("volume_negociado", janela=3, ultimas=2)) == 2
+    assert historico.serie("volume_negociado", ultimas=2) == [
+        ((inicio + timedelta(days=5)).isoformat(), 80.0),
+        ((inicio + timedelta(days=4)).isoformat(), 160.0),
+    ]
+
+
+def test_analista_carrega_so_boletins_novos(tmp_path):
+    bdi = tmp_path / "data" / "BDI"
+    bdi.mkdir(parents=True)
+    _arquivo(bdi, "bdi_20260210_key_data.txt", KEY_DATA.format(
+        ibov="185.929,00", var="-0,16%", com="73.791.250", vol="28.249.836.567"))
+
+    analista = AnalistaBDI(str(tmp_path))
+    assert analista.carregar_historico() == 1
+    assert analista.carregar_historico() == 0
+
+    _arquivo(bdi, "bdi_20260211_key_data.txt", KEY_DATA.format(
+        ibov="187.100,50", var="0,63%", com="61.000.000", vol="30.000.000.000"))
+    assert analista.carregar_historico() == 1
+
+    analista.processar_multiplos_bdi(quantidade=5)
+    assert list(analista.dados_bdi) == ["2026-02-11", "2026-02-10"]
+    assert analista.dados_bdi["2026-02-11"]["metrics"] == {
+        "ibovespa_valor": 187100.5,
+        "ibovespa_variacao": 0.63,
+        "volume_negociado": 30000000000.0,
+        "qtd_negocios": 3764594.0,
+        "derivativos_com_minis": 61000000.0,
+        "derivativos_sem_minis": 53438419.0,
+    }
+    analista.historico.fechar()
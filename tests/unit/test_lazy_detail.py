@@ -0,0 +1,114 @@
+"""Textos sob demanda (detail/summary) dos resultados do macro score."""
+
+import pickle
+from dataclasses import asdict, fields, replace
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import Mock
+
+from src.application.services.macro_score.engine import (
+    ItemScoreResult,
+    MacroScoreEngine,
+    MacroScoreResult,
+    raw_text,
+    render_price_detail,
+)
+from src.application.services.macro_score.item_registry import get_item_registry
+from src.domain.enums.macro_score_enums import MacroSignal, ScoringType
+
+
+def _price_config():
+    return next(
+        c for c in get_item_registry() if c.scoring_type == ScoringType.PRICE_VS_OPEN
+    )
+
+
+def _item(detail) -> ItemScoreResult:
+    config = _price_config()
+    return ItemScoreResult(
+        item_number=config.number, symbol=config.symbol, name=config.name,
+        category=config.category, correlation=config.correlation,
+        resolved_symbol=config.symbol, opening_price=Decimal("100"),
+        current_price=Decimal("101.5"), raw_score=1, final_score=1,
+        weight=config.weight, weighted_score=config.weight, available=True,
+        detail=detail,
+    )
+
+
+def test_detail_renderizado_na_primeira_leitura():
+    calls = []
+
+    def render(*args):
+        calls.append(args)
+        return "texto"
+
+    item = _item((render, 1, 2))
+    assert calls == []
+    assert item.detail == "texto"
+    assert item.detail == "texto"
+    assert calls == [(1, 2)]
+
+
+def test_detail_igual_ao_formato_antigo():
+    engine = MacroScoreEngine(Mock())
+    config = _price_config()
+    item = engine._price_item_result(
+        config, config.symbol, Decimal("100"), Decimal("101.5"), None
+    )
+    assert item.detail == (
+        f"Abertura: 100 | Atual: 101.5 | Var: +1.5 (+1.50%) | "
+        f"Correl: {config.correlation} | Score: {item.final_score:+d}"
+    )
+
+
+def test_texto_pronto_e_pickle():
+    item = _item("Simbolo nao disponivel")
+    assert item.detail == "Simbolo nao disponivel"
+    lazy = _item((render_price_detail, Decimal("100"), Decimal("99"), "DIRETA", -1))
+    assert pickle.loads(pickle.dumps(lazy)).detail == lazy.detail
+
+
+def test_summary_sob_demanda():
+    engine = MacroScoreEngine(Mock())
+    summary = engine._generate_summary(
+        score_final=Decimal("3.5"), signal=MacroSignal.COMPRA, items_available=90,
+        total_items=104, score_bullish=Decimal("10"), score_bearish=Decimal("6.5"),
+        score_neutral=20,
+    )
+    assert isinstance(summary, tuple)
+    text = summary[0](*summary[1:])
+    assert text == (
+        "Macro Score: +3.50 | Sinal: COMPRA (Score Positivo) | Itens: 90/104 | "
+        "Alta: +10.0 | Baixa: -6.5 | Neutros: 20"
+    )
+
+
+def test_contrato_do_dataclass_ve_o_texto():
+    args = (render_price_detail, Decimal("100"), Decimal("99"), "DIRETA", -1)
+    texto = render_price_detail(*args[1:])
+
+    # == compara o texto: tupla e texto pronto equivalentes são iguais
+    assert _item(args) == _item(texto)
+    assert _item(args) != _item("outro")
+    assert f"detail={texto!r}" in repr(_item(args))
+    assert asdict(_item(args))["detail"] == texto
+    assert replace(_item(args), final_score=0).detail == texto
+    assert "_detail" not in {f.name for f in fields(ItemScoreResult)}
+
+    lazy = _item(args)
+    assert raw_text(lazy, "detail") == args  # repassa sem montar
+    assert lazy.detail == texto
+    assert raw_text(lazy, "detail") == texto
+
+
+def test_summary_e_campo_do_resultado():
+    resultado = MacroScoreResult(
+        session_id="s", timestamp=datetime(2026, 2, 16, 10, 0), items=[],
+        total_items=0, items_available=0, items_unavailable=0,
+        score_bullish=Decimal("0"), score_bearish=Decimal("0"), score_neutral=0,
+        score_final=Decimal("0"), signal=MacroSignal.NEUTRO, confidence=Decimal("0"),
+        win_price=None, summary=(lambda n: f"resumo {n}", 3),
+    )
+    assert resultado.summary == "resumo 3"
+    assert asdict(resultado)["summary"] == "resumo 3"
+    assert replace(resultado, score_neutral=1).summary == "resumo 3"
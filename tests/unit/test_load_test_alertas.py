@@ -0,0 +1,54 @@
+"""Auditoria de dedup/rate limit do teste de carga de alertas."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "scripts"))
+
+carga = pytest.importorskip("load_test_alertas")
+
+
+def _auditar(decisoes):
+    return carga._auditar_decisoes(decisoes, rate_limit_s=1.0, dedup_ttl_s=10.0, tolerancia_s=0.01)
+
+
+def test_decisoes_coerentes_com_as_janelas():
+    rel = _auditar([
+        (0.0, "a", "h1", True),
+        (0.5, "a", "h2", False),   # rate limit do padrao
+        (1.5, "a", "h1", False),   # duplicado (TTL 10s)
+        (2.0, "b", "h1", False),   # mesmo hash, outro padrao
+        (2.5, "a", "h3", True),
+        (12.0, "a", "h1", True),   # TTL expirou
+    ])
+    assert rel["corretas"] == 6
+    assert rel["precisao"] == 1.0
+
+
+def test_vazamento_e_rejeicao_indevida():
+    rel = _auditar([
+        (0.0, "a", "h1", True),
+        (0.2, "a", "h2", True),    # deveria cair no rate limit
+        (5.0, "b", "h3", False),   # nada o barrava
+    ])
+    assert rel["vazamentos"] == 1
+    assert rel["rejeicoes_indevidas"] == 1
+    assert rel["precisao"] == pytest.approx(1 / 3)
+
+
+def test_borda_da_janela_fica_ambigua():
+    rel = _auditar([
+        (0.0, "a", "h1", True),
+        (1.005, "a", "h2", False),  # 5 ms depois da janela: relogios diferentes
+    ])
+    assert rel["ambiguas"] == 1
+    assert rel["corretas"] == 1
+
+
+def test_percentis():
+    p = carga._percentis([float(x) for x in range(1, 101)])
+    assert p["n"] == 100
+    assert (p["p50"], p["p95"], p["max"]) == (51.0, 96.0, 100.0)
+    assert carga._percentis([])["n"] == 0
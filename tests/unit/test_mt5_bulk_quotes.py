@@ -0,0 +1,83 @@
+"""Testes de get_ticks/get_daily_bars do MT5Adapter (lote colunar)."""
+
+from collections import Counter
+from types import SimpleNamespace
+
+import numpy as np
+
+from src.infrastructure.adapters.mt5_adapter import MT5Adapter
+
+_RATE_DTYPE = np.dtype([
+    ("time", "<i8"), ("open", "<f8"), ("high", "<f8"), ("low", "<f8"),
+    ("close", "<f8"), ("tick_volume", "<u8"),
+])
+
+
+class FakeTerminal:
+    TIMEFRAME_D1 = 16408
+
+    def __init__(self) -> None:
+        self.calls: Counter = Counter()
+
+    def terminal_info(self):
+        self.calls["terminal_info"] += 1
+        return SimpleNamespace(trade_allowed=True)
+
+    def symbol_info_tick(self, symbol):
+        self.calls["symbol_info_tick"] += 1
+        if symbol == "NADA":
+            return None
+        base = 100.0 + len(symbol)
+        return SimpleNamespace(
+            bid=base - 0.25, ask=base + 0.25, last=base, volume=7, time=1771246800,
+        )
+
+    def copy_rates_from_pos(self, symbol, timeframe, start, count):
+        self.calls["copy_rates_from_pos"] += 1
+        if symbol == "NADA":
+            return None
+        base = 100.0 + len(symbol)
+        return np.array(
+            [(1771200000, base - 1.5, base + 2.1, base - 3.3, base, 4321)],
+            dtype=_RATE_DTYPE,
+        )
+
+
+def _adapter(trust_s: float = 2.0) -> tuple[MT5Adapter, FakeTerminal]:
+    adapter = MT5Adapter(0, "", "", connection_trust_s=trust_s)
+    terminal = FakeTerminal()
+    adapter._mt5 = terminal
+    return adapter, terminal
+
+
+def test_get_ticks_igual_a_get_symbol_info_tick():
+    adapter, _ = _adapter()
+    symbols = ["WIN$N", "PETR4", "NADA", "DI1F27"]
+    batch = adapter.get_ticks(symbols)
+
+    assert len(batch) == 4
+    assert batch.valid.tolist() == [True, True, False, True]
+    for code in symbols:
+        assert batch.to_tick(code) == adapter.get_symbol_info_tick(code)
+    assert batch.last[batch.index("PETR4")] == 105.0
+
+
+def test_get_daily_bars_igual_a_get_daily_candle():
+    adapter, _ = _adapter()
+    symbols = ["WIN$N", "NADA", "VALE3"]
+    batch = adapter.get_daily_bars(symbols)
+
+    assert batch.valid.tolist() == [True, False, True]
+    for code in symbols:
+        assert batch.to_candle(code) == adapter.get_daily_candle(code)
+
+
+def test_lote_faz_uma_checagem_de_conexao():
+    adapter, terminal = _adapter(trust_s=0)
+    symbols = [f"SYM{i}" for i in range(50)]
+    adapter.get_ticks(symbols)
+    adapter.get_daily_bars(symbols)
+
+    assert terminal.calls["terminal_info"] == 2
+    assert terminal.calls["symbol_info_tick"] == 50
+    assert terminal.calls["copy_rates_from_pos"] == 50
@@ -0,0 +1,113 @@
+"""Testes da janela de confiança de conexão do MT5Adapter."""
+
+from collections import Counter
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from src.domain.exceptions import BrokerConnectionError
+from src.domain.value_objects import Symbol
+from src.infrastructure.adapters.mt5_adapter import MT5Adapter
+
+
+class FakeTerminal:
+    ORDER_TYPE_BUY = 0
+    ORDER_TYPE_SELL = 1
+
+    def __init__(self) -> None:
+        self.calls: Counter = Counter()
+        self.online = True
+
+    def terminal_info(self):
+        self.calls["terminal_info"] += 1
+        return SimpleNamespace(trade_allowed=True) if self.online else None
+
+    def symbol_info_tick(self, symbol):
+        self.calls["symbol_info_tick"] += 1
+        if not self.online:
+            return None
+        return SimpleNamespace(bid=99.0, ask=101.0, last=100.0, volume=1, time=1771246800)
+
+    def symbol_info(self, symbol):
+        return None
+
+    def positions_get(self, symbol=None):
+        self.calls["positions_get"] += 1
+        return ()
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    c = Clock()
+    with patch("src.infrastructure.adapters.mt5_adapter.time.monotonic", c):
+        yield c
+
+
+def _adapter(trust_s: float = 2.0) -> tuple[MT5Adapter, FakeTerminal]:
+    adapter = MT5Adapter(0, "", "", connection_trust_s=trust_s)
+    terminal = FakeTerminal()
+    adapter._mt5 = terminal
+    return adapter, terminal
+
+
+def test_chamadas_na_janela_dispensam_terminal_info(clock):
+    adapter, terminal = _adapter()
+    for _ in range(10):
+        adapter.get_symbol_info_tick("WIN$N")
+        clock.now += 0.1
+
+    assert terminal.calls["terminal_info"] == 1
+    stats = adapter.take_connection_stats()
+    assert (stats.checks, stats.skipped) == (1, 9)
+    assert adapter.take_connection_stats().checks == 0  # delta por ciclo
+
+
+def test_janela_expirada_volta_a_checar(clock):
+    adapter, terminal = _adapter(trust_s=1.0)
+    adapter.get_symbol_info_tick("WIN$N")  # checa; janela ate 1001.0
+    clock.now += 0.5
+    adapter.get_symbol_info_tick("WIN$N")  # poupa; resposta renova ate 1001.5
+    clock.now += 0.8
+    adapter.get_symbol_info_tick("WIN$N")  # 1001.3: ainda na janela
+    clock.now += 1.2
+    adapter.get_symbol_info_tick("WIN$N")  # 1002.5: expirou, checa
+
+    assert terminal.calls["terminal_info"] == 2
+
+
+def test_ordens_sempre_checam(clock):
+    adapter, terminal = _adapter()
+    adapter.get_symbol_info_tick("WIN$N")
+    adapter.close_position(Symbol("WIN$N"))
+    adapter.close_position(Symbol("WIN$N"))
+
+    assert terminal.calls["terminal_info"] == 3
+    assert adapter.connection_stats.strict == 2
+
+
+def test_falha_invalida_a_janela(clock):
+    adapter, terminal = _adapter()
+    adapter.get_symbol_info_tick("WIN$N")
+    terminal.online = False
+
+    with pytest.raises(BrokerConnectionError):
+        adapter.close_position(Symbol("WIN$N"))
+    with pytest.raises(BrokerConnectionError):
+        adapter.get_symbol_info_tick("WIN$N")
+    assert adapter.connection_stats.failures == 2
+
+
+def test_trust_zero_checa_sempre(clock):
+    adapter, terminal = _adapter(trust_s=0)
+    for _ in range(5):
+        adapter.get_symbol_info_tick("WIN$N")
+    assert terminal.calls["terminal_info"] == 5
@@ -0,0 +1,166 @@
+"""Testes do serviço de barras multi-timeframe derivadas do M1."""
+
+import random
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from src.application.services.multi_timeframe_bars import MultiTimeframeBarService
+from src.domain.enums.trading_enums import TimeFrame
+from src.domain.value_objects import Price, Symbol
+from src.infrastructure.adapters.mt5_adapter import Candle
+
+_MINUTES = {TimeFrame.M5: 5, TimeFrame.M15: 15, TimeFrame.H1: 60, TimeFrame.H4: 240}
+
+
+def _candle(tf, o, h, l, c, v, ts):
+    return Candle(
+        symbol=Symbol("WIN$N"), timeframe=tf,
+        open=Price(Decimal(o)), high=Price(Decimal(h)),
+        low=Price(Decimal(l)), close=Price(Decimal(c)),
+        volume=v, timestamp=ts,
+    )
+
+
+class FakeBroker:
+    """Série M1 sintética; o último M1 visível está em formação."""
+
+    def __init__(self, days: int = 3, seed: int = 7):
+        rng = random.Random(seed)
+        self.m1 = []
+        price = 130000
+        start = datetime(2026, 2, 16, 9, 0)
+        for d in range(days):
+            t = start + timedelta(days=d)
+            for _ in range(9 * 60):
+                o = price
+                c = o + rng.choice([-15, -10, -5, 0, 5, 10, 15])
+                h = max(o, c) + rng.choice([0, 5, 10])
+                l = min(o, c) - rng.choice([0, 5, 10])
+                self.m1.append((t, o, h, l, c, rng.randint(50, 500)))
+                price = c
+                t += timedelta(minutes=1)
+        self.now = 0
+        self.calls = []
+
+    def visible_m1(self):
+        bars = [_candle(TimeFrame.M1, *b[1:], b[0]) for b in self.m1[: self.now + 1]]
+        t, o, h, l, c, v = self.m1[self.now]
+        bars[-1] = _candle(TimeFrame.M1, o, max(o, h - 5), min(o, l + 5), o, v // 2, t)
+        return bars
+
+    def aggregate(self, tf):
+        buckets = {}
+        for bar in self.visible_m1():
+            ts = bar.timestamp
+            if tf == TimeFrame.D1:
+                key = datetime(ts.year, ts.month, ts.day)
+            else:
+                mins = _MINUTES[tf]
+                midnight = datetime(ts.year, ts.month, ts.day)
+                key = midnight + timedelta(minutes=((ts - midnight).seconds // 60) // mins * mins)
+            cur = buckets.get(key)
+            if cur is None:
+                buckets[key] = [bar.open.value, bar.high.value, bar.low.value,
+                                bar.close.value, bar.volume]
+            else:
+                cur[1] = max(cur[1], bar.high.value)
+                cur[2] = min(cur[2], bar.low.value)
+                cur[3] = bar.close.value
+                cur[4] += bar.volume
+        return [_candle(tf, *v, k) for k, v in sorted(buckets.items())]
+
+    def get_candles(self, symbol, timeframe, count=100, start_time=None):
+        self.calls.append((timeframe, count))
+        bars = self.visible_m1() if timeframe == TimeFrame.M1 else self.aggregate(timeframe)
+        return bars[-count:]
+
+
+def _ohlcv(candles):
+    return [(c.timestamp, c.open.value, c.high.value, c.low.value,
+             c.close.value, c.volume) for c in candles]
+
+
+class Clock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+@pytest.fixture
+def setup():
+    broker = FakeBroker()
+    clock = Clock()
+    service = MultiTimeframeBarService("WIN$N", resync_interval_s=None, clock=clock)
+    return broker, clock, service
+
+
+class TestMultiTimeframeBarService:
+
+    def test_incremental_igual_ao_nativo(self, setup):
+        broker, clock, service = setup
+        broker.now = 300
+        service.refresh(broker)
+        assert service.metrics.backfills == 1
+
+        # Ciclos de 2 min atravessando fechamento de M5/M15/H1/H4 e do dia
+        for _ in range(200):
+            broker.now += 2
+            clock.t += 120
+            bars = service.refresh(broker)
+        assert service.metrics.backfills == 1
+        assert service.metrics.last_source == "incremental"
+
+        assert _ohlcv(bars.m1) == _ohlcv(broker.get_candles(None, TimeFrame.M1, 200))
+        for tf, got in ((TimeFrame.M5, bars.m5), (TimeFrame.M15, bars.m15),
+                        (TimeFrame.H1, bars.h1), (TimeFrame.H4, bars.h4),
+                        (TimeFrame.D1, bars.d1)):
+            native = broker.get_candles(None, tf, len(got))
+            assert _ohlcv(got) == _ohlcv(native), tf
+
+    def test_um_fetch_m1_por_ciclo(self, setup):
+        broker, clock, service = setup
+        broker.now = 300
+        service.refresh(broker)
+        assert len(broker.calls) == 6  # Backfill: M1 + 5 timeframes
+
+        broker.calls.clear()
+        broker.now += 2
+        clock.t += 120
+        service.refresh(broker)
+        assert broker.calls == [(TimeFrame.M1, 5)]
+
+    def test_buraco_no_m1_refaz_backfill(self, setup):
+        broker, clock, service = setup
+        broker.now = 300
+        service.refresh(broker)
+        broker.now += 30  # Broker avançou mais do que o relógio local indica
+        clock.t += 60
+        bars = service.refresh(broker)
+        assert service.metrics.backfills == 2
+        assert _ohlcv(bars.m5) == _ohlcv(broker.get_candles(None, TimeFrame.M5, 100))
+
+    def test_resync_periodico(self):
+        broker, clock = FakeBroker(), Clock()
+        service = MultiTimeframeBarService("WIN$N", resync_interval_s=600, clock=clock)
+        broker.now = 300
+        service.refresh(broker)
+        for _ in range(6):
+            broker.now += 2
+            clock.t += 120
+            service.refresh(broker)
+        assert service.metrics.backfills == 2
+
+    def test_broker_sem_dados(self, setup):
+        _, _, service = setup
+
+        class Empty:
+            def get_candles(self, *a, **k):
+                raise RuntimeError("offline")
+
+        bars = service.refresh(Empty())
+        assert bars.m1 == [] and bars.d1 == []
+        assert service.metrics.last_source == "backfill"
@@ -0,0 +1,101 @@
+"""Testes do worker de persistência assíncrona (fila limitada + backpressure)."""
+
+import threading
+
+from src.infrastructure.database.persistence_worker import (
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    PersistenceWorker,
+)
+
+
+def _blocked_worker(max_queue_size: int, block_timeout_s: float = 0.05):
+    """Worker com a thread presa numa tarefa, para encher a fila."""
+    gate = threading.Event()
+    started = threading.Event()
+
+    def _hold():
+        started.set()
+        gate.wait(5)
+
+    worker = PersistenceWorker(max_queue_size, block_timeout_s).start()
+    worker.submit("hold", _hold)
+    started.wait(5)
+    return worker, gate
+
+
+class TestPersistenceWorker:
+    """Ordem, coalescência, descarte por prioridade e drenagem."""
+
+    def test_executa_em_ordem_fifo(self):
+        worker = PersistenceWorker().start()
+        done = []
+        for i in range(20):
+            worker.submit(f"t{i}", lambda i=i: done.append(i))
+        assert worker.close(5)
+        assert done == list(range(20))
+        assert worker.metrics.processed == 20
+
+    def test_sem_thread_executa_sincrono(self):
+        worker = PersistenceWorker()
+        done = []
+        assert worker.submit("t", lambda: done.append(1))
+        assert done == [1]
+
+    def test_coalesce_substitui_pendente(self):
+        worker, gate = _blocked_worker(max_queue_size=10)
+        done = []
+        worker.submit("kpi", lambda: done.append("v1"), coalesce_key="kpi")
+        worker.submit("kpi", lambda: done.append("v2"), coalesce_key="kpi")
+        gate.set()
+        assert worker.close(5)
+        assert done == ["v2"]
+        assert worker.metrics.coalesced == 1
+
+    def test_fila_cheia_descarta_low(self):
+        worker, gate = _blocked_worker(max_queue_size=1)
+        assert worker.submit("a", lambda: None, PRIORITY_LOW)
+        assert not worker.submit("b", lambda: None, PRIORITY_LOW)
+        gate.set()
+        worker.close(5)
+        assert worker.metrics.dropped == 1
+
+    def test_high_despeja_low_mais_antiga(self):
+        worker, gate = _blocked_worker(max_queue_size=1)
+        done = []
+        worker.submit("low", lambda: done.append("low"), PRIORITY_LOW)
+        assert worker.submit("high", lambda: done.append("high"), PRIORITY_HIGH)
+        gate.set()
+        worker.close(5)
+        assert done == ["high"]
+        assert worker.metrics.dropped == 1
+
+    def test_high_descartada_apos_timeout(self):
+        worker, gate = _blocked_worker(max_queue_size=1, block_timeout_s=0.05)
+        worker.submit("h1", lambda: None)
+        assert not worker.submit("h2", lambda: None)
+        gate.set()
+        worker.close(5)
+        assert worker.metrics.dropped_high == 1
+
+    def test_close_drena_fila_e_registra_lag(self):
+        worker, gate = _blocked_worker(max_queue_size=10)
+        done = []
+        for i in range(5):
+            worker.submit(f"t{i}", lambda i=i: done.append(i))
+        assert worker.metrics.queue_depth == 5
+        gate.set()
+        assert worker.close(5)
+        assert done == list(range(5))
+        assert worker.metrics.queue_depth == 0
+        assert worker.metrics.max_lag_ms > 0
+
+    def test_erro_nao_derruba_worker(self):
+        worker = PersistenceWorker().start()
+        done = []
+        worker.submit("falha", lambda: 1 / 0)
+        worker.submit("ok", lambda: done.append(1))
+        assert worker.close(5)
+        assert done == [1]
+        assert worker.metrics.errors == 1
+        assert "falha" in worker.metrics.last_error
@@ -0,0 +1,121 @@
+"""Índice ordenado de níveis de preço — paridade com as varreduras par-a-par."""
+
+import os
+import random
+import sys
+from decimal import Decimal
+
+import pytest
+
+from src.application.services.price_level_index import PriceLevelIndex
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "scripts"))
+
+
+def _levels(seed: int, n: int = 80) -> list[Decimal]:
+    """Preços WIN em múltiplos de 5, concentrados para gerar muitos empates."""
+    rng = random.Random(seed)
+    return [Decimal(130000 + 5 * rng.randint(-120, 120)) for _ in range(n)]
+
+
+def _greedy_merge(prices: list[Decimal], pct: Decimal) -> list[list[int]]:
+    """Fusão original do agente (varredura quadrática em ordem de inserção)."""
+    used = [False] * len(prices)
+    groups = []
+    for i, pi in enumerate(prices):
+        if used[i]:
+            continue
+        used[i] = True
+        group = [i]
+        for j in range(i + 1, len(prices)):
+            if not used[j] and abs(prices[j] - pi) / pi * 100 < pct:
+                used[j] = True
+                group.append(j)
+        groups.append(group)
+    return groups
+
+
+def _index(prices: list[Decimal]) -> PriceLevelIndex[int]:
+    return PriceLevelIndex.from_items(range(len(prices)), key=lambda i: prices[i])
+
+
+def test_add_arredonda_ao_tick_e_mantem_ordem():
+    index: PriceLevelIndex[str] = PriceLevelIndex()
+    assert index.add(Decimal("130002.4"), "a") == Decimal("130000")
+    assert index.add(Decimal("130002.5"), "b") == Decimal("130005")
+    index.add(Decimal("129990"), "c")
+    index.add(Decimal("130000"), "d")
+    assert list(index) == ["c", "a", "d", "b"]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_within_igual_a_varredura(seed):
+    prices = _levels(seed)
+    index = _index(prices)
+    for center in (prices[0], Decimal("130003.7"), Decimal("129400")):
+        radius = center * Decimal("0.0015")
+        expected = {i for i, p in enumerate(prices) if abs(p - center) < radius}
+        assert set(index.within(center, radius)) == expected
+        assert index.count_within(center, radius) == len(expected)
+
+
+def test_within_limite_estrito_e_inclusivo():
+    prices = [Decimal("100"), Decimal("110"), Decimal("120")]
+    index = _index(prices)
+    assert index.within(Decimal("110"), Decimal("10")) == [1]
+    assert index.within(Decimal("110"), Decimal("10"), inclusive=True) == [0, 1, 2]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_cluster_igual_a_fusao_gulosa(seed):
+    prices = _levels(seed)
+    groups = _index(prices).cluster(Decimal("0.001"))
+    assert groups == _greedy_merge(prices, Decimal("0.10"))
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_above_below_como_sort_estavel(seed):
+    prices = _levels(seed)
+    index = _index(prices)
+    cur = prices[7]
+    above = sorted([i for i, p in enumerate(prices) if p > cur], key=lambda i: prices[i])
+    below = sorted(
+        [i for i, p in enumerate(prices) if p <= cur], key=lambda i: prices[i], reverse=True,
+    )
+    assert index.above(cur) == above
+    assert index.below(cur, inclusive=True) == below
+    assert index.above(cur, k=3) == above[:3]
+    assert index.below(cur, k=3, inclusive=True) == below[:3]
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_nearest_k(seed):
+    prices = _levels(seed)
+    index = _index(prices)
+    center = Decimal("130001")
+    got = index.nearest(center, k=10)
+    dists = sorted(abs(p - center) for p in prices)[:10]
+    assert [abs(prices[i] - center) for i in got] == dists
+    assert len(index.nearest(center, k=len(prices) + 5)) == len(prices)
+
+
+def test_map_regions_confluencias_iguais_a_contagem_par_a_par():
+    agente = pytest.importorskip("agente_micro_tendencia_winfut")
+    vwap = agente.VWAPData(
+        vwap=Decimal("130010"), upper_1=Decimal("130150"), upper_2=Decimal("130300"),
+        lower_1=Decimal("129870"), lower_2=Decimal("129720"),
+    )
+    pivots = agente.PivotLevels(
+        pp=Decimal("130000"), r1=Decimal("130180"), r2=Decimal("130420"),
+        s1=Decimal("129830"), s2=Decimal("129600"),
+    )
+    regions = agente._map_regions(
+        Decimal("130050"), vwap, pivots, agente.SMCData(),
+        Decimal("130190"), Decimal("129610"), Decimal("130005"),
+    )
+    for r in regions:
+        expected = 1 + sum(
+            1 for o in regions
+            if o is not r and abs(o.price - r.price) / r.price * 100 < Decimal("0.15")
+        )
+        assert r.confluences == expected
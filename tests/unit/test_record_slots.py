@@ -0,0 +1,43 @@
+"""Registros numerosos sem __dict__ por instância (dataclass slots=True)."""
+
+import os
+import pickle
+import sys
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from src.application.services.macro_score.engine import ItemScoreResult
+from src.domain.enums.trading_enums import TimeFrame
+from src.domain.value_objects import Price, Symbol
+from src.infrastructure.adapters.mt5_adapter import Candle, TickData
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "scripts"))
+
+
+@pytest.mark.parametrize("cls", [Price, TickData, Candle, ItemScoreResult])
+def test_classes_do_src_tem_slots(cls):
+    assert "__slots__" in cls.__dict__
+
+
+def test_classes_do_agente_tem_slots():
+    agente = pytest.importorskip("agente_micro_tendencia_winfut")
+    for cls in (agente.MacroItem, agente.RegionOfInterest, agente.Opportunity):
+        assert "__slots__" in cls.__dict__
+    region = agente.RegionOfInterest(Decimal("130000"), "VWAP", "VWAP")
+    region.confluences += 1
+    assert region.confluences == 2
+
+
+def test_candle_sem_dict_e_picklavel():
+    candle = Candle(
+        symbol=Symbol("WIN$N"), timeframe=TimeFrame.M1,
+        open=Price(Decimal("130000")), high=Price(Decimal("130010")),
+        low=Price(Decimal("129990")), close=Price(Decimal("130005")),
+        volume=10, timestamp=datetime(2026, 2, 16, 9, 0),
+    )
+    assert not hasattr(candle, "__dict__")
+    with pytest.raises(AttributeError):
+        candle.extra = 1
+    assert pickle.loads(pickle.dumps(candle)) == candle
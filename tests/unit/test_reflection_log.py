@@ -0,0 +1,189 @@
+"""Log de reflections em segmentos diários — janela por índice, legado e Parquet."""
+
+import json
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from src.infrastructure.database import reflection_log
+from src.infrastructure.database.reflection_log import ReflectionLog
+
+INICIO = datetime(2026, 2, 9, 9, 0)
+
+
+def _registros(dias: int = 3, por_dia: int = 50):
+    regs = []
+    for d in range(dias):
+        for i in range(por_dia):
+            ts = INICIO + timedelta(days=d, minutes=5 * i)
+            regs.append({
+                "timestamp": ts.isoformat(),
+                "current_price": 130000.0 + d * 100 + i,
+                "my_decision": "BUY" if i % 2 else "SELL",
+                "mood": "Confuso",
+                "plan_today": ["reduzir exposição"] if i == 0 else None,
+            })
+    return regs
+
+
+@pytest.fixture(params=["orjson", "json"])
+def log(request, tmp_path, monkeypatch):
+    if request.param == "json":
+        monkeypatch.setattr(reflection_log, "orjson", None)
+    elif reflection_log.orjson is None:
+        pytest.skip("orjson não instalado")
+    return ReflectionLog(tmp_path)
+
+
+def test_append_grava_segmento_do_dia_e_indice(log):
+    for rec in _registros(dias=2, por_dia=3):
+        log.append(rec)
+
+    assert log.days() == [date(2026, 2, 9), date(2026, 2, 10)]
+    segmento = log.segment_path(date(2026, 2, 10))
+    linhas = segmento.read_bytes().splitlines(keepends=True)
+    indice = [l.split("\t") for l in open(f"{segmento}.idx", encoding="utf-8").read().splitlines()]
+    assert len(linhas) == len(indice) == 3
+    # Cada offset aponta para o início da linha do registro
+    offsets = [0]
+    for linha in linhas[:-1]:
+        offsets.append(offsets[-1] + len(linha))
+    assert [int(o) for _, o in indice] == offsets
+    assert [json.loads(l)["timestamp"] for l in linhas] == [ts for ts, _ in indice]
+
+
+@pytest.mark.parametrize("inicio_min, fim_min", [
+    (0, None), (None, 0), (62, 3 * 1440), (1440 + 7, 1440 + 123), (2 * 1440 + 245, None),
+])
+def test_janela_igual_a_filtro_completo(log, inicio_min, fim_min):
+    regs = _registros()
+    for rec in regs:
+        log.append(rec)
+    start = INICIO + timedelta(minutes=inicio_min) if inicio_min is not None else None
+    end = INICIO + timedelta(minutes=fim_min) if fim_min is not None else None
+
+    esperado = [
+        r["timestamp"] for r in regs
+        if (start is None or r["timestamp"] >= start.isoformat())
+        and (end is None or r["timestamp"] <= end.isoformat())
+    ]
+    assert [r["timestamp"] for r in log.iter_records(start, end)] == esperado
+
+    df = log.read(start, end, columns=["current_price"])
+    assert list(df.columns) == ["timestamp", "current_price"]
+    assert [ts.isoformat() for ts in df["timestamp"]] == esperado
+
+
+def test_registro_retroativo_e_legado_entram_na_leitura(tmp_path):
+    log = ReflectionLog(tmp_path)
+    regs = _registros(dias=1, por_dia=10)
+    for rec in regs[5:]:
+        log.append(rec)
+    log.append(regs[0])  # fora de ordem no mesmo dia: leitura sem busca binária
+    with open(tmp_path / "reflections_log.jsonl", "w", encoding="utf-8") as f:
+        for rec in regs[1:5]:
+            f.write(json.dumps(rec) + "\n")
+        f.write("linha corrompida\n")
+
+    df = log.read()
+    assert [ts.isoformat() for ts in df["timestamp"]] == [r["timestamp"] for r in regs]
+    assert len(log.read(start=INICIO + timedelta(minutes=20))) == 6
+
+
+def test_janela_depois_do_legado_nao_parseia_o_legado(tmp_path, monkeypatch):
+    log = ReflectionLog(tmp_path)
+    regs = _registros(dias=3, por_dia=10)
+    legado = tmp_path / "reflections_log.jsonl"
+    legado.write_text("".join(json.dumps(r) + "\n" for r in regs[:10]), encoding="utf-8")
+    for rec in regs[10:]:
+        log.append(rec)
+    assert len(log.read()) == 30  # calcula o intervalo do legado
+
+    lidos = []
+    original = reflection_log.Path.read_bytes
+
+    def _read_bytes(path):
+        lidos.append(path.name)
+        return original(path)
+
+    monkeypatch.setattr(reflection_log.Path, "read_bytes", _read_bytes)
+    assert len(log.latest()) == 10
+    assert len(log.read(start=INICIO + timedelta(days=1))) == 20
+    assert "reflections_log.jsonl" not in lidos
+
+    # Janela que cruza o legado continua lendo; legado alterado recalcula o intervalo
+    assert len(log.read(end=INICIO + timedelta(minutes=20))) == 5
+    with open(legado, "a", encoding="utf-8") as f:
+        f.write(json.dumps({**regs[0], "timestamp": (INICIO + timedelta(days=5)).isoformat()}) + "\n")
+    assert len(log.read(start=INICIO + timedelta(days=4))) == 1
+
+
+def test_latest_le_so_o_ultimo_dia(tmp_path):
+    log = ReflectionLog(tmp_path)
+    for rec in _registros():
+        log.append(rec)
+
+    ultimo = log.latest(columns=["current_price"])
+    assert len(ultimo) == 50
+    assert ultimo["timestamp"].dt.date.unique().tolist() == [date(2026, 2, 11)]
+    assert len(log.latest(lookback_days=2)) == 100
+
+
+def test_migrar_legado_para_segmentos(tmp_path):
+    regs = _registros(dias=2, por_dia=5)
+    legado = tmp_path / "reflections_log.jsonl"
+    legado.write_text("".join(json.dumps(r) + "\n" for r in regs), encoding="utf-8")
+    log = ReflectionLog(tmp_path)
+
+    assert log.migrate_legacy() == 10
+    assert not legado.exists()
+    assert (tmp_path / "reflections_log.jsonl.migrated").exists()
+    assert [r["timestamp"] for r in log.iter_records()] == [r["timestamp"] for r in regs]
+
+
+def test_compactar_em_parquet_mantem_registros(tmp_path):
+    pytest.importorskip("pyarrow")
+    log = ReflectionLog(tmp_path)
+    regs = _registros()
+    for rec in regs:
+        log.append(rec)
+
+    gravados = log.compact(before=date(2026, 2, 11))
+    assert [p.name for p in gravados] == ["reflections_20260209.parquet", "reflections_20260210.parquet"]
+    assert not log.segment_path(date(2026, 2, 9)).exists()
+
+    # Registro retroativo num dia já compactado é fundido na próxima compactação
+    log.append({"timestamp": (INICIO + timedelta(minutes=1)).isoformat(), "current_price": 1.0})
+    assert len(log.read()) == len(regs) + 1
+    log.compact(before=date(2026, 2, 11))
+    df = log.read(end=INICIO + timedelta(days=1), columns=["current_price", "plan_today"])
+    assert len(df) == 51
+    assert df["current_price"].iloc[1] == 1.0
+    assert json.loads(df["plan_today"].iloc[0]) == ["reduzir exposição"]
+
+
+def test_tail_le_so_o_que_foi_acrescentado(tmp_path):
+    log = ReflectionLog(tmp_path)
+    regs = _registros(dias=2, por_dia=5)
+    assert log.tail(None) == ([], None)
+    for rec in regs[:3]:
+        log.append(rec)
+
+    cursor = log.end_cursor()
+    assert log.tail(cursor) == ([], cursor)
+
+    for rec in regs[3:]:  # resto do dia e o dia seguinte
+        log.append(rec)
+    novos, cursor = log.tail(cursor)
+    assert [r["timestamp"] for r in novos] == [r["timestamp"] for r in regs[3:]]
+    assert cursor == log.end_cursor()
+
+    # Linha ainda sem "\n" (escrita em andamento) fica para a próxima leitura
+    segmento = log.segment_path(cursor[0])
+    with open(segmento, "ab") as f:
+        f.write(b'{"timestamp": "2026-02-10T10:00:00"')
+    assert log.tail(cursor) == ([], cursor)
+    with open(segmento, "ab") as f:
+        f.write(b', "current_price": 1.0}\n')
+    novos, _ = log.tail(cursor)
+    assert novos == [{"timestamp": "2026-02-10T10:00:00", "current_price": 1.0}]
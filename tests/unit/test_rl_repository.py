@@ -0,0 +1,59 @@
+"""Testes do repositório RL — modo de commit da unidade de persistência."""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.infrastructure.database.rl_schema import RLRewardModel, create_rl_tables
+from src.infrastructure.repositories.rl_repository import SqliteRLRepository
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'rl.db'}")
+    create_rl_tables(engine)
+    return sessionmaker(bind=engine)
+
+
+def _decision() -> dict:
+    return {"timestamp": datetime.now(), "win_price": 130000, "action": "HOLD"}
+
+
+class TestSqliteRLRepositoryCommit:
+    """autocommit=False adia o commit para quem abriu a sessão."""
+
+    def test_autocommit_padrao_grava_imediatamente(self, session_factory):
+        session = session_factory()
+        SqliteRLRepository(session).create_pending_rewards("ep-1", _decision())
+        session.close()
+
+        check = session_factory()
+        assert check.query(RLRewardModel).count() == 5
+        check.close()
+
+    def test_sem_autocommit_rollback_descarta(self, session_factory):
+        session = session_factory()
+        repo = SqliteRLRepository(session, autocommit=False)
+        repo.create_pending_rewards("ep-1", _decision())
+        # Visível na própria sessão (flush), mas não commitado
+        assert session.query(RLRewardModel).count() == 5
+        session.rollback()
+        session.close()
+
+        check = session_factory()
+        assert check.query(RLRewardModel).count() == 0
+        check.close()
+
+    def test_sem_autocommit_commit_unico(self, session_factory):
+        session = session_factory()
+        repo = SqliteRLRepository(session, autocommit=False)
+        repo.create_pending_rewards("ep-1", _decision())
+        repo.create_pending_rewards("ep-2", _decision())
+        session.commit()
+        session.close()
+
+        check = session_factory()
+        assert check.query(RLRewardModel).count() == 10
+        check.close()
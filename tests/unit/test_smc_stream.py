@@ -0,0 +1,103 @@
+"""Paridade do detector SMC incremental com as varreduras em lote do agente micro.
+
+As sessões são reproduzidas barra a barra (com a última barra em formação
+sendo atualizada), como o agente vê o mercado a cada ciclo.
+"""
+
+import os
+import random
+import sys
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from src.application.services.smc_stream import StreamingSMCDetector
+from src.domain.enums.trading_enums import TimeFrame
+from src.domain.value_objects import Price, Symbol
+from src.infrastructure.adapters.mt5_adapter import Candle
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "scripts"))
+agente = pytest.importorskip("agente_micro_tendencia_winfut")
+
+
+def _candle(o, h, l, c, v, ts):
+    return Candle(
+        symbol=Symbol("WIN$N"), timeframe=TimeFrame.M5,
+        open=Price(Decimal(o)), high=Price(Decimal(h)),
+        low=Price(Decimal(l)), close=Price(Decimal(c)),
+        volume=v, timestamp=ts,
+    )
+
+
+def _session(seed: int, bars: int = 260) -> list[tuple]:
+    """Sessão sintética: passos de 5 pts, muitos empates de máxima/mínima."""
+    rng = random.Random(seed)
+    price = 130000
+    ts = datetime(2026, 2, 16, 9, 0)
+    out = []
+    for _ in range(bars):
+        o = price
+        c = o + rng.choice([-30, -15, -10, -5, 0, 0, 5, 10, 15, 30])
+        h = max(o, c) + rng.choice([0, 0, 5, 10, 40])
+        l = min(o, c) - rng.choice([0, 0, 5, 10, 40])
+        v = rng.choice([0, 80, 120, 150, 400, 900])
+        out.append((o, h, l, c, v, ts))
+        price = c + rng.choice([0, 0, 5, -5, 60, -60])  # Gaps geram FVGs
+        ts += timedelta(minutes=5)
+    return out
+
+
+def _replay(session, window):
+    """Gera (janela, forming) a cada passo: barra parcial e depois fechada."""
+    for n in range(1, len(session) + 1):
+        closed = [_candle(*b) for b in session[max(0, n - window):n]]
+        o, h, l, c, v, ts = session[n - 1]
+        partial = _candle(o, max(o, h - 5), min(o, l + 5), o, v // 2, ts)
+        yield closed[:-1] + [partial]
+        yield closed
+
+
+def _dump(regions):
+    return [asdict(r) for r in regions]
+
+
+@pytest.mark.parametrize("seed", range(4))
+@pytest.mark.parametrize("window", [100, 200])
+def test_paridade_com_lote(seed, window):
+    detector = StreamingSMCDetector(lookback=3)
+    for candles in _replay(_session(seed), window):
+        detector.sync(candles)
+        assert _dump(agente._stream_swing_regions(detector, "M5")) == _dump(
+            agente._detect_swing_with_volume(candles, lookback=3, tf_label="M5")
+        )
+        assert _dump(agente._stream_smc_regions(detector, "M5")) == _dump(
+            agente._detect_smc_regions(candles, "M5")
+        )
+        assert asdict(agente._stream_smc_timeframe(detector, "M5")) == asdict(
+            agente._detect_smc_for_timeframe(candles, "M5")
+        )
+    assert detector.rebuilds == 1  # Só a carga inicial
+
+
+def test_salto_maior_que_janela_reconstroi():
+    session = _session(1)
+    detector = StreamingSMCDetector(lookback=3)
+    detector.sync([_candle(*b) for b in session[:100]])
+    candles = [_candle(*b) for b in session[150:250]]
+    detector.sync(candles)
+    assert detector.rebuilds == 2
+    assert _dump(agente._stream_smc_regions(detector, "M5")) == _dump(
+        agente._detect_smc_regions(candles, "M5")
+    )
+
+
+def test_janela_vazia_e_curta():
+    detector = StreamingSMCDetector(lookback=3)
+    assert detector.sync([]).bars == 0
+    candles = [_candle(*b) for b in _session(2, bars=8)]
+    detector.sync(candles)
+    assert agente._stream_swing_regions(detector, "M5") == []
+    assert agente._stream_smc_regions(detector, "M5") == []
+    assert agente._stream_smc_timeframe(detector, "M5").bias == "NEUTRO"
@@ -0,0 +1,184 @@
+"""Pool de sessões SMTP e latência por canal no AlertaDeliveryManager."""
+
+import asyncio
+import socketserver
+import threading
+from datetime import datetime
+from decimal import Decimal
+from email.message import EmailMessage
+
+import pytest
+
+from src.application.services.alerta_delivery import AlertaDeliveryManager
+from src.domain.entities.alerta import AlertaOportunidade
+from src.domain.enums.alerta_enums import NivelAlerta, PatraoAlerta
+from src.domain.value_objects import Symbol
+from src.infrastructure.adapters.smtp_pool import SmtpSessionPool
+
+
+class _SmtpLocal(socketserver.ThreadingTCPServer):
+    """Servidor SMTP mínimo (sem TLS/AUTH): conta sessões e mensagens."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, mensagens_por_sessao: int = 0) -> None:
+        super().__init__(("127.0.0.1", 0), _SmtpHandler)
+        self.mensagens_por_sessao = mensagens_por_sessao  # 0 = sem limite
+        self.sessoes = 0
+        self.mensagens: list[bytes] = []
+        self.lock = threading.Lock()
+
+    @property
+    def porta(self) -> int:
+        return self.server_address[1]
+
+
+class _SmtpHandler(socketserver.StreamRequestHandler):
+    def _responder(self, linha: str) -> None:
+        self.wfile.write(linha.encode() + b"\r\n")
+
+    def handle(self) -> None:
+        servidor: _SmtpLocal = self.server
+        with servidor.lock:
+            servidor.sessoes += 1
+        recebidas = 0
+        self._responder("220 teste ESMTP")
+        while True:
+            linha = self.rfile.readline()
+            if not linha:
+                return
+            comando = linha.decode().strip().upper()
+            if comando.startswith("EHLO"):
+                self._responder("250 teste")
+            elif comando == "DATA":
+                self._responder("354 fim com <CRLF>.<CRLF>")
+                corpo = []
+                while (dados := self.rfile.readline()) not in (b".\r\n", b""):
+                    corpo.append(dados)
+                with servidor.lock:
+                    servidor.mensagens.append(b"".join(corpo))
+                self._responder("250 OK")
+                recebidas += 1
+                if servidor.mensagens_por_sessao and recebidas >= servidor.mensagens_por_sessao:
+                    return  # derruba a sessão sem QUIT
+            elif comando == "QUIT":
+                self._responder("221 tchau")
+                return
+            else:  # MAIL, RCPT, RSET, NOOP, HELO
+                self._responder("250 OK")
+
+
+@pytest.fixture
+def smtp_local():
+    servidor = _SmtpLocal()
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    yield servidor
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def _mensagem(i: int) -> EmailMessage:
+    msg = EmailMessage()
+    msg["From"] = "bot@trading.local"
+    msg["To"] = "operador@trading.local"
+    msg["Subject"] = f"alerta {i}"
+    msg.set_content(f"corpo {i}")
+    return msg
+
+
+@pytest.mark.asyncio
+async def test_rajada_reaproveita_poucas_sessoes(smtp_local):
+    pool = SmtpSessionPool(port=smtp_local.porta, starttls=False, pool_size=2)
+    latencias = await asyncio.gather(*(pool.enviar(_mensagem(i)) for i in range(30)))
+    pool.close()
+
+    assert len(smtp_local.mensagens) == 30
+    assert all(ms > 0 for ms in latencias)
+    assert pool.metrics.sent == 30
+    assert smtp_local.sessoes <= 2
+    assert pool.metrics.sessions_opened == smtp_local.sessoes
+
+
+@pytest.mark.asyncio
+async def test_reconecta_quando_o_servidor_derruba_a_sessao(smtp_local):
+    smtp_local.mensagens_por_sessao = 1
+    pool = SmtpSessionPool(port=smtp_local.porta, starttls=False, pool_size=1)
+    for i in range(3):
+        await pool.enviar(_mensagem(i))
+    pool.close()
+
+    assert len(smtp_local.mensagens) == 3
+    assert pool.metrics.reconnects == 2
+    assert pool.metrics.failed == 0
+
+
+@pytest.mark.asyncio
+async def test_falha_de_conexao_chega_ao_chamador():
+    pool = SmtpSessionPool(port=1, starttls=False, timeout_s=1)
+    with pytest.raises(OSError):
+        await pool.enviar(_mensagem(0))
+    pool.close()
+    assert pool.metrics.failed == 1
+
+
+class _AuditoriaFake:
+    def __init__(self) -> None:
+        self.entregas: list[dict] = []
+
+    def registrar_entrega(self, **kwargs) -> None:
+        self.entregas.append(kwargs)
+
+
+class _WebSocketLento:
+    async def enviar(self, alerta_id, payload) -> None:
+        await asyncio.sleep(0.02)
+
+
+def _alerta() -> AlertaOportunidade:
+    return AlertaOportunidade(
+        ativo=Symbol("WIN$N"),
+        padrao=PatraoAlerta.VOLATILIDADE_EXTREMA,
+        nivel=NivelAlerta.ALTO,
+        preco_atual=Decimal("130000"),
+        timestamp_deteccao=datetime.now(),
+        entrada_minima=Decimal("129950"),
+        entrada_maxima=Decimal("130050"),
+        stop_loss=Decimal("129700"),
+        take_profit=Decimal("130600"),
+        confianca=Decimal("0.8"),
+        risk_reward=Decimal("2.0"),
+    )
+
+
+@pytest.mark.asyncio
+async def test_latencia_real_por_canal_na_auditoria(smtp_local):
+    auditoria = _AuditoriaFake()
+    delivery = AlertaDeliveryManager(
+        websocket_client=_WebSocketLento(),
+        email_config={"smtp_host": "127.0.0.1", "smtp_port": smtp_local.porta,
+                      "smtp_starttls": False, "to_email": "operador@trading.local"},
+        audit_log=auditoria,
+    )
+    alertas = [_alerta() for _ in range(5)]
+    for alerta in alertas:
+        assert await delivery.entregar_alerta(alerta) is True
+    for _ in range(200):
+        if len(smtp_local.mensagens) == 5:
+            break
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.05)
+    delivery.fechar()
+
+    por_canal = {}
+    for entrega in auditoria.entregas:
+        por_canal.setdefault(entrega["canal"], []).append(entrega)
+    assert {e["status"] for e in por_canal["websocket"]} == {"entregue"}
+    assert all(e["latencia_ms"] >= 20 for e in por_canal["websocket"])
+    assert len(por_canal["email"]) == 5
+
+    metricas = delivery.obter_metricas_latencia()
+    assert metricas["websocket"]["n"] == 5
+    assert metricas["email"]["n"] == 5
+    assert metricas["smtp_pool"]["sessoes_abertas"] <= 2
+    assert metricas["smtp_pool"]["enviados"] == 5
@@ -0,0 +1,69 @@
+"""Testes do TickPrice (preço em ticks inteiros)."""
+
+import pickle
+import random
+from decimal import ROUND_HALF_UP, Decimal
+
+import pytest
+
+from src.domain.exceptions import InvalidPriceError
+from src.domain.value_objects import Price, TickPrice
+
+
+def _round_tick(price: Decimal, tick: Decimal) -> Decimal:
+    """Arredondamento do agente micro (referência)."""
+    return (price / tick).quantize(Decimal("1"), rounding=ROUND_HALF_UP) * tick
+
+
+@pytest.mark.parametrize("tick", [Decimal("5"), Decimal("0.5"), Decimal("0.01")])
+def test_conversoes_iguais_ao_round_tick(tick):
+    rng = random.Random(7)
+    for _ in range(2000):
+        value = round(rng.uniform(1, 200000), 2)
+        expected = _round_tick(Decimal(str(value)), tick)
+        assert TickPrice.from_float(value, tick).to_decimal() == expected
+        assert TickPrice.from_decimal(Decimal(str(value)), tick).to_decimal() == expected
+
+
+def test_meio_tick_arredonda_para_cima():
+    assert TickPrice.from_float(186482.5).to_decimal() == Decimal("186485")
+    assert TickPrice.from_float(1.005, Decimal("0.01")).to_decimal() == Decimal("1.01")
+    assert TickPrice.from_decimal(Decimal("185884.02")).ticks == 37177
+
+
+def test_ida_e_volta_com_price():
+    price = Price(Decimal("130005"))
+    tp = TickPrice.from_price(price)
+    assert tp.ticks == 26001
+    assert tp.to_price() == price
+    assert float(tp) == 130005.0
+
+
+def test_aritmetica_e_comparacao():
+    a = TickPrice(26001)
+    b = TickPrice(26000)
+    assert a.add(b).ticks == 52001
+    assert a.subtract(b) == TickPrice(1)
+    assert a.offset(-6) == TickPrice(25995)
+    assert a.distance(b) == 1 and b.distance(a) == -1
+    assert b < a and a >= b and a != b
+    assert sorted([a, b]) == [b, a]
+    assert len({a, TickPrice(26001), b}) == 2
+
+
+def test_validacoes():
+    with pytest.raises(InvalidPriceError):
+        TickPrice(-1)
+    with pytest.raises(InvalidPriceError):
+        TickPrice(1).subtract(TickPrice(2))
+    with pytest.raises(ValueError):
+        TickPrice(1).add(TickPrice(1, Decimal("0.5")))
+    with pytest.raises(AttributeError):
+        TickPrice(1).ticks = 2
+    with pytest.raises(AttributeError):
+        TickPrice(1).extra = 0  # __slots__: sem __dict__
+
+
+def test_pickle():
+    tp = TickPrice(123, Decimal("0.5"))
+    assert pickle.loads(pickle.dumps(tp)) == tp
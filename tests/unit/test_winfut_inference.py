@@ -0,0 +1,172 @@
+"""Inferência WINFUT residente — paridade com build_latest_features, refresh incremental e hot reload."""
+
+import os
+import sqlite3
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("sklearn")
+joblib = pytest.importorskip("joblib")
+
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import SimpleImputer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+
+from src.application.services.ml.winfut_dataset import build_latest_features
+from src.application.services.ml.winfut_inference import WinFutInferenceService
+from src.infrastructure.database.reflection_log import ReflectionLog
+
+INICIO = datetime(2026, 2, 10, 9, 0)
+NUMERICAS = ["current_price", "my_confidence", "total_raw"]
+
+SCHEMA = """
+CREATE TABLE ai_reflection_logs (id INTEGER PRIMARY KEY, timestamp TEXT, current_price REAL,
+    price_change_since_open REAL, price_change_last_10min REAL, my_decision TEXT,
+    my_confidence REAL, my_alignment REAL, human_makes_sense INTEGER,
+    my_data_correlation TEXT, mood TEXT);
+CREATE TABLE trading_journal_logs (id INTEGER PRIMARY KEY, timestamp TEXT, decision TEXT,
+    confidence REAL, market_feeling TEXT, macro_bias TEXT, fundamental_bias TEXT,
+    sentiment_bias TEXT, technical_bias TEXT, alignment_score REAL, market_regime TEXT);
+CREATE TABLE simple_macro_score_decisions (id INTEGER PRIMARY KEY, timestamp TEXT,
+    total_items INTEGER, items_available INTEGER, total_raw REAL, signal TEXT);
+CREATE TABLE simple_score_alignment (id INTEGER PRIMARY KEY, timestamp TEXT,
+    price_dir TEXT, score_dir TEXT, total_raw REAL);
+"""
+
+
+def _inserir(db_path, minuto: int) -> None:
+    ts = (INICIO + timedelta(minutes=minuto)).isoformat(sep=" ")
+    with sqlite3.connect(db_path) as con:
+        con.execute(
+            "INSERT INTO ai_reflection_logs (timestamp, current_price, price_change_since_open, "
+            "price_change_last_10min, my_decision, my_confidence, my_alignment, human_makes_sense, "
+            "my_data_correlation, mood) VALUES (?, ?, 0.1, 0.2, 'BUY', ?, 0.6, ?, 'FRACA', 'Confuso')",
+            (ts, 130000.0 + 10 * minuto, (minuto % 10) / 10, minuto % 2),
+        )
+        con.execute(
+            "INSERT INTO trading_journal_logs (timestamp, decision, confidence, market_feeling, "
+            "macro_bias, fundamental_bias, sentiment_bias, technical_bias, alignment_score, "
+            "market_regime) VALUES (?, 'HOLD', 0.5, 'neutro', 'NEUTRO', 'NEUTRO', 'NEUTRO', "
+            "'NEUTRO', ?, 'LATERAL')",
+            (ts, minuto / 100),
+        )
+        con.execute(
+            "INSERT INTO simple_macro_score_decisions (timestamp, total_items, items_available, "
+            "total_raw, signal) VALUES (?, 10, 9, ?, 'NEUTRO')",
+            (ts, float(minuto % 7 - 3)),
+        )
+        con.execute(
+            "INSERT INTO simple_score_alignment (timestamp, price_dir, score_dir, total_raw) "
+            "VALUES (?, 'UP', 'DOWN', ?)",
+            (ts, float(minuto % 5)),
+        )
+
+
+def _reflexao_jsonl(log: ReflectionLog, minuto: int) -> None:
+    log.append({
+        "timestamp": (INICIO + timedelta(minutes=minuto, seconds=30)).isoformat(),
+        "current_price": 131000.0 + minuto,
+        "my_decision": "SELL",
+        "my_confidence": 0.4,
+        "human_makes_sense": True,
+        "mood": "Atento",
+    })
+
+
+def _salvar_modelo(path, label_classes) -> None:
+    pipeline = Pipeline(steps=[
+        ("preprocessor", ColumnTransformer([("num", SimpleImputer(), NUMERICAS)])),
+        ("model", LogisticRegression(max_iter=200)),
+    ])
+    X = pd.DataFrame({
+        "current_price": [130000.0, 130500.0, 131000.0, 131500.0, 132000.0, 132500.0],
+        "my_confidence": [0.1, 0.2, 0.5, 0.6, 0.8, 0.9],
+        "total_raw": [-3.0, -2.0, 0.0, 1.0, 2.0, 3.0],
+    })
+    pipeline.fit(X, [0, 0, 1, 1, 2, 2])
+    joblib.dump({"pipeline": pipeline, "label_classes": label_classes}, path)
+
+
+@pytest.fixture
+def fontes(tmp_path):
+    db_path = tmp_path / "trading.db"
+    with sqlite3.connect(db_path) as con:
+        con.executescript(SCHEMA)
+    for minuto in range(0, 120, 2):
+        _inserir(db_path, minuto)
+    log = ReflectionLog(tmp_path / "reflections")
+    for minuto in range(1, 120, 4):
+        _reflexao_jsonl(log, minuto)
+    model_path = tmp_path / "winfut_model_latest.pkl"
+    _salvar_modelo(model_path, ["BUY", "HOLD", "SELL"])
+    return db_path, log, model_path
+
+
+def _servico(db_path, log, model_path) -> WinFutInferenceService:
+    return WinFutInferenceService(
+        model_path=model_path, db_path=db_path, jsonl_path=log.root,
+        buffer_rows=20, reload_check_seconds=0,
+    )
+
+
+def _assert_mesmas_features(servico, db_path, log) -> None:
+    esperado = build_latest_features(db_path=db_path, jsonl_path=log.root)
+    pd.testing.assert_frame_equal(
+        servico.latest_features().reset_index(drop=True),
+        esperado.reset_index(drop=True),
+        check_dtype=False,
+    )
+
+
+def test_features_iguais_a_build_latest_features(fontes):
+    db_path, log, model_path = fontes
+    servico = _servico(db_path, log, model_path)
+    _assert_mesmas_features(servico, db_path, log)
+
+    previsao = servico.predict()
+    assert previsao.signal in {"BUY", "HOLD", "SELL"}
+    assert set(previsao.probabilities) == {"BUY", "HOLD", "SELL"}
+    assert previsao.timestamp == servico.latest_features()["timestamp"].iloc[0]
+
+
+def test_refresh_incremental_acompanha_linhas_novas(fontes):
+    db_path, log, model_path = fontes
+    servico = _servico(db_path, log, model_path)
+    primeira = servico.predict()
+
+    # Sem linhas novas nem troca de modelo: mesma previsão, sem recalcular
+    assert servico.refresh() is False
+    assert servico.predict() is primeira
+
+    for minuto in range(120, 160):
+        if minuto % 2 == 0:
+            _inserir(db_path, minuto)
+        else:
+            _reflexao_jsonl(log, minuto)
+        previsao = servico.predict()
+        _assert_mesmas_features(servico, db_path, log)
+    assert previsao.timestamp == INICIO + timedelta(minutes=159, seconds=30)
+    # Os buffers não crescem com o histórico
+    assert all(len(df) <= 20 for df in servico._buffers.values())
+
+
+def test_recarrega_modelo_quando_o_arquivo_muda(fontes):
+    db_path, log, model_path = fontes
+    servico = _servico(db_path, log, model_path)
+    antes = servico.predict()
+
+    _salvar_modelo(model_path, ["COMPRA", "NEUTRO", "VENDA"])
+    os.utime(model_path, ns=(antes.model_mtime_ns + 10**9, antes.model_mtime_ns + 10**9))
+    depois = servico.predict()
+    assert depois is not antes
+    assert depois.signal in {"COMPRA", "NEUTRO", "VENDA"}
+    assert depois.model_mtime_ns == antes.model_mtime_ns + 10**9
+
+    # Arquivo corrompido (gravação em andamento): mantém o modelo anterior
+    model_path.write_bytes(b"incompleto")
+    os.utime(model_path, ns=(depois.model_mtime_ns + 10**9, depois.model_mtime_ns + 10**9))
+    assert servico.reload_model_if_changed(force=True) is False
+    assert servico.predict() is depois